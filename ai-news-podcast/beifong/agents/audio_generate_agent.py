@@ -4,10 +4,10 @@ from datetime import datetime
 import tempfile
 import numpy as np
 import soundfile as sf
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Optional, Tuple
 from utils.load_api_keys import load_api_key
+from utils.tts_stream import render_script
 from openai import OpenAI
-from scipy import signal
 
 
 PODCASTS_FOLDER = "podcasts"
@@ -16,40 +16,21 @@ PODCAST_MUSIC_FOLDER = os.path.join('static', "musics")
 OPENAI_VOICES = {1: "alloy", 2: "echo", 3: "fable", 4: "onyx", 5: "nova", 6: "shimmer"}
 DEFAULT_VOICE_MAP = {1: "alloy", 2: "nova"}
 TTS_MODEL = "gpt-4o-mini-tts"
+TTS_WORKERS = 4
 INTRO_MUSIC_FILE = os.path.join(PODCAST_MUSIC_FOLDER, "intro_audio.mp3")
 OUTRO_MUSIC_FILE = os.path.join(PODCAST_MUSIC_FOLDER, "intro_audio.mp3")
 
 
-def resample_audio_scipy(audio, original_sr, target_sr):
-    if original_sr == target_sr:
-        return audio
-    resampling_ratio = target_sr / original_sr
-    num_samples = int(len(audio) * resampling_ratio)
-    resampled = signal.resample(audio, num_samples)
-    return resampled
-
-
-def create_silence_audio(silence_duration: float, sampling_rate: int) -> np.ndarray:
-    if sampling_rate <= 0:
-        print(f"Invalid sampling rate ({sampling_rate}) for silence generation")
-        return np.zeros(0, dtype=np.float32)
-    return np.zeros(int(sampling_rate * silence_duration), dtype=np.float32)
-
-
-def combine_audio_segments(audio_segments: List[np.ndarray], silence_duration: float, sampling_rate: int) -> np.ndarray:
-    if not audio_segments:
-        return np.zeros(0, dtype=np.float32)
-    silence = create_silence_audio(silence_duration, sampling_rate)
-    combined_segments = []
-    for i, segment in enumerate(audio_segments):
-        combined_segments.append(segment)
-        if i < len(audio_segments) - 1:
-            combined_segments.append(silence)
-    combined = np.concatenate(combined_segments)
-    max_amp = np.max(np.abs(combined))
-    if max_amp > 0:
-        combined = combined / max_amp * 0.95
-    return combined
+def load_music(path: str, label: str) -> Optional[Tuple[np.ndarray, int]]:
+    if not os.path.exists(path):
+        return None
+    try:
+        music, sample_rate = sf.read(path)
+        print(f"Loaded {label} music: {len(music) / sample_rate:.1f} seconds")
+        return music, sample_rate
+    except Exception as e:
+        print(f"Could not add {label} music: {e}")
+        return None
 
 
 def process_audio_file(temp_path: str) -> Optional[Tuple[np.ndarray, int]]:
@@ -89,17 +70,16 @@ def process_audio_file(temp_path: str) -> Optional[Tuple[np.ndarray, int]]:
     return None
 
 
-def resample_audio(audio, orig_sr, target_sr):
-    try:
-        import librosa
-
-        return librosa.resample(audio, orig_sr=orig_sr, target_sr=target_sr)
-    except ImportError:
-        print("Librosa not available for resampling")
-        return audio
-    except Exception as e:
-        print(f"Resampling failed: {e}")
-        return audio
+def resolve_voice(speaker_id: int, voice_map: Dict[int, str] = None) -> str:
+    voice_map = voice_map or DEFAULT_VOICE_MAP
+    voice = voice_map.get(speaker_id)
+    if not voice:
+        if speaker_id in OPENAI_VOICES:
+            voice = OPENAI_VOICES[speaker_id]
+        else:
+            voice = next(iter(voice_map.values()), "alloy")
+        print(f"No voice mapping for speaker {speaker_id}, using {voice}")
+    return voice
 
 
 def text_to_speech_openai(
@@ -112,14 +92,7 @@ def text_to_speech_openai(
     if not text.strip():
         print("Empty text provided, skipping TTS generation")
         return None
-    voice_map = voice_map or DEFAULT_VOICE_MAP
-    voice = voice_map.get(speaker_id)
-    if not voice:
-        if speaker_id in OPENAI_VOICES:
-            voice = OPENAI_VOICES[speaker_id]
-        else:
-            voice = next(iter(voice_map.values()), "alloy")
-        print(f"No voice mapping for speaker {speaker_id}, using {voice}")
+    voice = resolve_voice(speaker_id, voice_map)
     try:
         print(f"Generating TTS for speaker {speaker_id} using voice '{voice}'")
         response = client.audio.speech.create(
@@ -181,102 +154,27 @@ def create_podcast(
     if model == "tts-1" and language_code == "en":
         model_to_use = "tts-1-hd"
         print(f"Using high-definition TTS model for English: {model_to_use}")
-    generated_segments = []
-    sampling_rate_detected = None
-
-    if hasattr(script, "entries"):
-        entries = script.entries
-    else:
-        entries = script
-
-    print(f"Processing {len(entries)} script entries")
-    for i, entry in enumerate(entries):
-        if hasattr(entry, "speaker"):
-            speaker_id = entry.speaker
-            entry_text = entry.text
-        else:
-            speaker_id = entry["speaker"]
-            entry_text = entry["text"]
-        print(f"Processing entry {i + 1}/{len(entries)}: Speaker {speaker_id}")
-        result = text_to_speech_openai(
-            client=client,
-            text=entry_text,
-            speaker_id=speaker_id,
-            voice_map=voice_map,
-            model=model_to_use,
-        )
-        if result:
-            segment_audio, segment_rate = result
-            if sampling_rate_detected is None:
-                sampling_rate_detected = segment_rate
-                print(f"Using sample rate: {sampling_rate_detected} Hz")
-            elif sampling_rate_detected != segment_rate:
-                print(f"Sample rate mismatch: {sampling_rate_detected} vs {segment_rate}")
-                try:
-                    segment_audio = resample_audio(segment_audio, segment_rate, sampling_rate_detected)
-                    print(f"Resampled to {sampling_rate_detected} Hz")
-                except Exception as e:
-                    sampling_rate_detected = segment_rate
-                    print(f"Resampling failed: {e}")
-            generated_segments.append(segment_audio)
-        else:
-            print(f"Failed to generate audio for entry {i + 1}")
-    if not generated_segments:
-        print("No audio segments were generated")
-        return None
-    if sampling_rate_detected is None:
-        print("Could not determine sample rate")
-        return None
-    print(f"Combining {len(generated_segments)} audio segments")
-    full_audio = combine_audio_segments(generated_segments, silence_duration, sampling_rate_detected)
-    if full_audio.size == 0:
-        print("Combined audio is empty")
-        return None
 
-    try:
-        if os.path.exists(INTRO_MUSIC_FILE):
-            intro_music, intro_sr = sf.read(INTRO_MUSIC_FILE)
-            print(f"Loaded intro music: {len(intro_music) / intro_sr:.1f} seconds")
-
-            if intro_music.ndim == 2:
-                intro_music = np.mean(intro_music, axis=1)
-
-            if intro_sr != sampling_rate_detected:
-                intro_music = resample_audio_scipy(intro_music, intro_sr, sampling_rate_detected)
-
-            full_audio = np.concatenate([intro_music, full_audio])
-            print("Added intro music")
-
-        if os.path.exists(OUTRO_MUSIC_FILE):
-            outro_music, outro_sr = sf.read(OUTRO_MUSIC_FILE)
-            print(f"Loaded outro music: {len(outro_music) / outro_sr:.1f} seconds")
-
-            if outro_music.ndim == 2:
-                outro_music = np.mean(outro_music, axis=1)
+    def synthesize(speaker_id: int, text: str):
+        return text_to_speech_openai(client=client, text=text, speaker_id=speaker_id, voice_map=voice_map, model=model_to_use)
 
-            if outro_sr != sampling_rate_detected:
-                outro_music = resample_audio_scipy(outro_music, outro_sr, sampling_rate_detected)
-
-            full_audio = np.concatenate([full_audio, outro_music])
-            print("Added outro music")
-
-    except Exception as e:
-        print(f"Could not add intro/outro music: {e}")
-        print("Continuing without background music")
+    def cache_key(speaker_id: int, text: str):
+        # a regenerated script re-synthesizes only the lines that changed
+        return "openai", model_to_use, resolve_voice(speaker_id, voice_map), language_code
 
+    intro, outro = load_music(INTRO_MUSIC_FILE, "intro"), load_music(OUTRO_MUSIC_FILE, "outro")
     print(f"Writing audio to {output_path}")
     try:
-        sf.write(output_path, full_audio, sampling_rate_detected)
+        result = render_script(
+            script, synthesize, output_path, silence_duration, TTS_WORKERS, intro=intro, outro=outro, cache_key=cache_key
+        )
     except Exception as e:
         print(f"Failed to write audio file: {e}")
         return None
-    if os.path.exists(output_path):
+    if result and os.path.exists(output_path):
         file_size = os.path.getsize(output_path)
         print(f"Audio file created: {output_path} ({file_size / 1024:.1f} KB)")
-        return output_path
-    else:
-        print(f"Failed to create audio file at {output_path}")
-        return None
+    return result
 
 
 def audio_generate_agent_run(agent: Agent) -> str:
@@ -1,14 +1,133 @@
+import re
 import json
-from datetime import datetime
+import zlib
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from .connection import db_connection, execute_query
+from .leases import CLAIM_LEASE_SECONDS, ensure_lease_columns, lease_timestamps, new_worker_id
 
+RAW_CONTENT_COMPRESSION_LEVEL = 6
+ISO_DATE_GLOB = "[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]*"
+ISO_DATE_PREFIX = re.compile(r"\d{4}-\d{2}-\d{2}")
 
-def store_crawled_article(tracking_db_path, entry, raw_content, metadata):
+
+def compress_raw_content(raw_content):
+    if raw_content is None:
+        return None
+    return zlib.compress(raw_content.encode("utf-8"), RAW_CONTENT_COMPRESSION_LEVEL)
+
+
+def decompress_raw_content(raw_content):
+    # rows crawled before compression was introduced hold plain text
+    if isinstance(raw_content, bytes):
+        return zlib.decompress(raw_content).decode("utf-8")
+    return raw_content
+
+
+def ensure_article_content_columns(tracking_db_path):
+    with db_connection(tracking_db_path) as conn:
+        cursor = conn.cursor()
+        cursor.execute("PRAGMA table_info(crawled_articles)")
+        if "content_tokens" not in {col[1] for col in cursor.fetchall()}:
+            cursor.execute("ALTER TABLE crawled_articles ADD COLUMN content_tokens INTEGER")
+            conn.commit()
+
+
+ARTICLE_SEARCH_TABLE = "crawled_articles_fts"
+# title matches outrank summary matches, which outrank body text matches
+ARTICLE_SEARCH_WEIGHTS = (10.0, 5.0, 1.0)
+ARTICLE_SEARCH_MATCHES = f"""
+    SELECT rowid AS article_id,
+           bm25({ARTICLE_SEARCH_TABLE}, {", ".join(str(weight) for weight in ARTICLE_SEARCH_WEIGHTS)}) AS score,
+           snippet({ARTICLE_SEARCH_TABLE}, -1, '[', ']', '...', 24) AS snippet
+    FROM {ARTICLE_SEARCH_TABLE}
+    WHERE {ARTICLE_SEARCH_TABLE} MATCH ?
+"""
+ARTICLE_SEARCH_SCHEMA = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {ARTICLE_SEARCH_TABLE} USING fts5(
+        title, summary, content,
+        content='crawled_articles', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS crawled_articles_fts_insert AFTER INSERT ON crawled_articles BEGIN
+        INSERT INTO {ARTICLE_SEARCH_TABLE} (rowid, title, summary, content)
+        VALUES (new.id, new.title, new.summary, new.content);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS crawled_articles_fts_delete AFTER DELETE ON crawled_articles BEGIN
+        INSERT INTO {ARTICLE_SEARCH_TABLE} ({ARTICLE_SEARCH_TABLE}, rowid, title, summary, content)
+        VALUES ('delete', old.id, old.title, old.summary, old.content);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS crawled_articles_fts_update AFTER UPDATE OF title, summary, content ON crawled_articles BEGIN
+        INSERT INTO {ARTICLE_SEARCH_TABLE} ({ARTICLE_SEARCH_TABLE}, rowid, title, summary, content)
+        VALUES ('delete', old.id, old.title, old.summary, old.content);
+        INSERT INTO {ARTICLE_SEARCH_TABLE} (rowid, title, summary, content)
+        VALUES (new.id, new.title, new.summary, new.content);
+    END
+    """,
+]
+
+
+def create_article_search_index(conn):
+    cursor = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (ARTICLE_SEARCH_TABLE,))
+    exists = cursor.fetchone() is not None
+    for statement in ARTICLE_SEARCH_SCHEMA:
+        conn.execute(statement)
+    if not exists:
+        # the index is external content, so articles stored before it existed are indexed from the table itself
+        conn.execute(f"INSERT INTO {ARTICLE_SEARCH_TABLE} ({ARTICLE_SEARCH_TABLE}) VALUES ('rebuild')")
+
+
+def ensure_article_search_index(tracking_db_path):
+    with db_connection(tracking_db_path) as conn:
+        create_article_search_index(conn)
+        conn.commit()
+
+
+def build_search_query(terms, operator="OR", columns=None):
+    # every term is matched as a quoted phrase so punctuation in user or model input cannot break the query syntax
+    phrases = ['"' + term.strip().replace('"', '""') + '"' for term in terms if term and term.strip()]
+    if not phrases:
+        return None
+    query = f" {operator} ".join(phrases)
+    if columns:
+        query = "{" + " ".join(columns) + "} : (" + query + ")"
+    return query
+
+
+def to_iso_date(value):
+    """Return ``value`` as a UTC ISO timestamp, parsing RFC 822 feed dates; ISO and unparseable values are kept."""
+    if not value or ISO_DATE_PREFIX.match(value):
+        return value
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return value
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed.isoformat()
+
+
+def normalize_published_dates(conn):
+    # listings compare and sort published_date as text, which only orders correctly for ISO dates
+    rows = conn.execute(f"SELECT id, published_date FROM crawled_articles WHERE published_date NOT GLOB '{ISO_DATE_GLOB}'").fetchall()
+    updates = [(iso, row[0]) for row in rows if (iso := to_iso_date(row[1])) != row[1]]
+    if updates:
+        conn.executemany("UPDATE crawled_articles SET published_date = ? WHERE id = ?", updates)
+    return len(updates)
+
+
+def store_crawled_article(tracking_db_path, entry, raw_content, metadata, content=None, content_tokens=None):
     metadata_json = json.dumps(metadata)
     query = """
     INSERT INTO crawled_articles 
-    (entry_id, source_id, feed_id, title, url, published_date, raw_content, metadata)
-    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    (entry_id, source_id, feed_id, title, url, published_date, raw_content, metadata, content, content_tokens)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
     """
     try:
         params = (
@@ -17,9 +136,11 @@ def store_crawled_article(tracking_db_path, entry, raw_content, metadata):
             entry.get("feed_id"),
             entry.get("title", ""),
             entry.get("link", ""),
-            entry.get("published_date", datetime.now().isoformat()),
-            raw_content,
+            to_iso_date(entry.get("published_date")) or datetime.now().isoformat(),
+            compress_raw_content(raw_content),
             metadata_json,
+            content,
+            content_tokens,
         )
         execute_query(tracking_db_path, query, params)
         return True
@@ -27,64 +148,61 @@ def store_crawled_article(tracking_db_path, entry, raw_content, metadata):
         return False
 
 
-def update_entry_status(tracking_db_path, entry_id, status):
+def update_entry_status(tracking_db_path, entry_id, status, lease_owner=None):
+    if lease_owner is None:
+        query = """
+        UPDATE feed_entries
+        SET crawl_attempts = crawl_attempts + 1, crawl_status = ?
+        WHERE id = ?
+        """
+        return execute_query(tracking_db_path, query, (status, entry_id))
+    # a worker whose lease expired and was taken over leaves the entry to its new owner
     query = """
     UPDATE feed_entries
-    SET crawl_attempts = crawl_attempts + 1, crawl_status = ?
-    WHERE id = ?
+    SET crawl_attempts = crawl_attempts + 1, crawl_status = ?, lease_owner = NULL, lease_expires_at = NULL
+    WHERE id = ? AND lease_owner = ?
     """
-    return execute_query(tracking_db_path, query, (status, entry_id))
+    return execute_query(tracking_db_path, query, (status, entry_id, lease_owner))
+
+
+def ensure_article_lease_columns(tracking_db_path):
+    with db_connection(tracking_db_path) as conn:
+        ensure_lease_columns(conn, "crawled_articles", "ai_status")
+        conn.commit()
 
 
-def get_unprocessed_articles(tracking_db_path, limit=5, max_attempts=1):
-    reset_stuck_articles(tracking_db_path)
+def get_unprocessed_articles(tracking_db_path, limit=5, max_attempts=1, worker_id=None, lease_seconds=CLAIM_LEASE_SECONDS):
+    """Claim up to ``limit`` articles to analyze for ``worker_id``, the same way get_uncrawled_entries claims entries."""
+    now, expires_at = lease_timestamps(lease_seconds)
     query = """
-    SELECT id, entry_id, source_id, feed_id, title, url, published_date, raw_content, metadata, ai_attempts
-    FROM crawled_articles
-    WHERE (ai_status = 'pending' OR ai_status = 'error')
-          AND ai_attempts < ?
-          AND processed = 0
-    ORDER BY published_date DESC
-    LIMIT ?
+    UPDATE crawled_articles
+    SET ai_status = 'processing', lease_owner = ?, lease_expires_at = ?
+    WHERE id IN (
+        SELECT id
+        FROM crawled_articles
+        WHERE (ai_status IN ('pending', 'error')
+               OR (ai_status = 'processing' AND (lease_expires_at IS NULL OR lease_expires_at < ?)))
+              AND ai_attempts < ?
+              AND processed = 0
+        ORDER BY published_date DESC
+        LIMIT ?
+    )
+    RETURNING id, entry_id, source_id, feed_id, title, url, published_date, raw_content, content, metadata, ai_attempts, lease_owner
     """
-    articles = execute_query(tracking_db_path, query, (max_attempts, limit), fetch=True)
+    with db_connection(tracking_db_path) as conn:
+        articles = [dict(row) for row in conn.execute(query, (worker_id or new_worker_id(), expires_at, now, max_attempts, limit))]
+        conn.commit()
+    articles.sort(key=lambda article: article["published_date"] or "", reverse=True)
     for article in articles:
+        article["raw_content"] = decompress_raw_content(article["raw_content"])
         if article.get("metadata"):
             try:
                 article["metadata"] = json.loads(article["metadata"])
             except json.JSONDecodeError:
                 article["metadata"] = {}
-    if articles:
-        article_ids = [a["id"] for a in articles]
-        mark_articles_as_processing(tracking_db_path, article_ids)
     return articles
 
 
-def reset_stuck_articles(tracking_db_path):
-    query = """
-    UPDATE crawled_articles 
-    SET ai_status = 'pending' 
-    WHERE ai_status = 'processing'
-    """
-    return execute_query(tracking_db_path, query)
-
-
-def mark_articles_as_processing(tracking_db_path, article_ids):
-    if not article_ids:
-        return 0
-    with db_connection(tracking_db_path) as conn:
-        cursor = conn.cursor()
-        placeholders = ",".join(["?"] * len(article_ids))
-        query = f"""
-        UPDATE crawled_articles 
-        SET ai_status = 'processing' 
-        WHERE id IN ({placeholders})
-        """
-        cursor.execute(query, article_ids)
-        conn.commit()
-        return cursor.rowcount
-
-
 def save_article_categories(tracking_db_path, article_id, categories):
     if not categories:
         return 0
@@ -124,57 +242,80 @@ def get_article_categories(tracking_db_path, article_id):
     return [row["category_name"] for row in results]
 
 
-def update_article_status(tracking_db_path, article_id, results=None, success=False, error_message=None):
+def _result_categories(results):
+    categories = results.get("categories", [])
+    if isinstance(categories, str):
+        try:
+            categories = json.loads(categories)
+        except json.JSONDecodeError:
+            categories = [c.strip() for c in categories.split(",") if c.strip()]
+    if not isinstance(categories, list):
+        return []
+    return sorted({str(c).lower().strip() for c in categories if str(c).strip()})
+
+
+def update_articles_status(tracking_db_path, outcomes, max_attempts=3, lease_owner=None):
+    """
+    Persist ``(article_id, results, success, error_message)`` outcomes of an analysis batch in one transaction.
+
+    With ``lease_owner`` only articles still leased to it are written, and their leases are released.
+    """
+    if not outcomes:
+        return 0
     with db_connection(tracking_db_path) as conn:
         cursor = conn.cursor()
-        cursor.execute(
-            """
-        UPDATE crawled_articles
-        SET ai_attempts = ai_attempts + 1
-        WHERE id = ?
-        """,
-            (article_id,),
-        )
-        if success and results:
-            categories = []
-            if "categories" in results:
-                if isinstance(results["categories"], str):
-                    try:
-                        categories = json.loads(results["categories"])
-                    except json.JSONDecodeError:
-                        categories = [c.strip() for c in results["categories"].split(",") if c.strip()]
-                elif isinstance(results["categories"], list):
-                    categories = results["categories"]
+        if lease_owner is not None:
+            # taken before reading, so no lease can change hands between the check and the writes
+            cursor.execute("BEGIN IMMEDIATE")
+            placeholders = ",".join(["?"] * len(outcomes))
             cursor.execute(
-                """
-            UPDATE crawled_articles
-            SET summary = ?, content = ?, processed = 1, ai_status = 'success'
-            WHERE id = ?
-            """,
-                (results.get("summary", ""), results.get("content", ""), article_id),
+                f"SELECT id FROM crawled_articles WHERE lease_owner = ? AND id IN ({placeholders})",
+                (lease_owner, *[outcome[0] for outcome in outcomes]),
             )
-            conn.commit()
-            if categories:
-                save_article_categories(tracking_db_path, article_id, categories)
-        else:
-            cursor.execute(
-                """
-            UPDATE crawled_articles
-            SET ai_status = 'error', ai_error = ?
-            WHERE id = ?
-            """,
-                (error_message, article_id),
-            )
-            cursor.execute(
-                """
-            UPDATE crawled_articles
-            SET ai_status = 'failed'
-            WHERE id = ? AND ai_attempts >= 3
-            """,
-                (article_id,),
+            owned = {row[0] for row in cursor.fetchall()}
+            if len(owned) < len(outcomes):
+                print(f"WARNING: {len(outcomes) - len(owned)} analyzed articles were reclaimed after their lease expired, not saving them")
+            outcomes = [outcome for outcome in outcomes if outcome[0] in owned]
+            cursor.executemany(
+                "UPDATE crawled_articles SET lease_owner = NULL, lease_expires_at = NULL WHERE id = ?",
+                [(outcome[0],) for outcome in outcomes],
             )
-            conn.commit()
-        return cursor.rowcount
+        _write_article_outcomes(cursor, outcomes, max_attempts)
+        conn.commit()
+    return sum(1 for _, results, success, _ in outcomes if success and results)
+
+
+def _write_article_outcomes(cursor, outcomes, max_attempts):
+    succeeded = [(article_id, results) for article_id, results, success, _ in outcomes if success and results]
+    failed = [(error_message, article_id) for article_id, results, success, error_message in outcomes if not (success and results)]
+    cursor.executemany(
+        "UPDATE crawled_articles SET ai_attempts = ai_attempts + 1 WHERE id = ?",
+        [(outcome[0],) for outcome in outcomes],
+    )
+    cursor.executemany(
+        """
+    UPDATE crawled_articles
+    SET summary = ?, content = ?, processed = 1, ai_status = 'success', ai_error = NULL
+    WHERE id = ?
+    """,
+        [(results.get("summary", ""), results.get("content", ""), article_id) for article_id, results in succeeded],
+    )
+    cursor.executemany(
+        "DELETE FROM article_categories WHERE article_id = ?",
+        [(article_id,) for article_id, _ in succeeded],
+    )
+    cursor.executemany(
+        "INSERT OR IGNORE INTO article_categories (article_id, category_name) VALUES (?, ?)",
+        [(article_id, category) for article_id, results in succeeded for category in _result_categories(results)],
+    )
+    cursor.executemany(
+        """
+    UPDATE crawled_articles
+    SET ai_status = CASE WHEN ai_attempts >= ? THEN 'failed' ELSE 'error' END, ai_error = ?
+    WHERE id = ?
+    """,
+        [(max_attempts, error_message, article_id) for error_message, article_id in failed],
+    )
 
 
 def get_articles_by_date_range(tracking_db_path, start_date=None, end_date=None, limit=None, offset=0):
@@ -211,6 +352,7 @@ def get_article_by_id(tracking_db_path, article_id):
     """
     article = execute_query(tracking_db_path, query, (article_id,), fetch=True, fetch_one=True)
     if article:
+        article["raw_content"] = decompress_raw_content(article["raw_content"])
         if article.get("metadata"):
             try:
                 article["metadata"] = json.loads(article["metadata"])
@@ -1,27 +1,138 @@
+import os
+import queue
 import sqlite3
+import threading
 from contextlib import contextmanager
 
+DEFAULT_POOL_SIZE = 8
+DEFAULT_PRAGMAS = (
+    "journal_mode=WAL",
+    "synchronous=NORMAL",
+    "busy_timeout=5000",
+    "cache_size=-16000",
+    "mmap_size=268435456",
+    "temp_store=MEMORY",
+)
 
-@contextmanager
-def db_connection(db_path):
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _file_id(db_path):
     try:
+        stat = os.stat(db_path)
+    except FileNotFoundError:
+        return None
+    return stat.st_dev, stat.st_ino
+
+
+class ConnectionPool:
+    """
+    Keeps up to ``max_idle`` open connections to one SQLite file and hands them out per thread of work.
+
+    Pragmas are applied once when a connection is opened. When every pooled connection is in use an
+    extra one is opened and closed on release, so nested or bursty callers never wait on each other.
+    """
+
+    def __init__(self, db_path, pragmas=DEFAULT_PRAGMAS, max_idle=DEFAULT_POOL_SIZE):
+        self.db_path = db_path
+        self.pragmas = tuple(pragmas)
+        self.max_idle = max_idle
+        self.pid = os.getpid()
+        self.file_id = None
+        self._idle = queue.LifoQueue()
+
+    def _open(self):
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        for pragma in self.pragmas:
+            conn.execute(f"PRAGMA {pragma}")
+        self.file_id = _file_id(self.db_path)
+        return conn
+
+    def _release(self, conn):
+        # uncommitted work is discarded, as it was when every call closed its own connection
+        if conn.in_transaction:
+            conn.rollback()
+        conn.row_factory = sqlite3.Row
+        if self._idle.qsize() < self.max_idle:
+            self._idle.put(conn)
+        else:
+            conn.close()
+
+    @contextmanager
+    def connection(self):
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._open()
+        try:
+            yield conn
+        except BaseException:
+            try:
+                self._release(conn)
+            except sqlite3.Error:
+                conn.close()
+            raise
+        self._release(conn)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+def get_connection_pool(db_path, pragmas=()):
+    pragmas = tuple(dict.fromkeys((*DEFAULT_PRAGMAS, *pragmas)))
+    key = (os.path.abspath(db_path), pragmas)
+    with _pools_lock:
+        pool = _pools.get(key)
+        # connections must not cross a fork, and must not outlive a database file that was replaced
+        if pool is None or pool.pid != os.getpid() or (pool.file_id and pool.file_id != _file_id(db_path)):
+            if pool is not None and pool.pid == os.getpid():
+                pool.close()
+            pool = _pools[key] = ConnectionPool(db_path, pragmas)
+        return pool
+
+
+def close_connection_pools():
+    with _pools_lock:
+        for pool in _pools.values():
+            if pool.pid == os.getpid():
+                pool.close()
+        _pools.clear()
+
+
+@contextmanager
+def db_connection(db_path, pragmas=()):
+    if db_path == ":memory:":
+        conn = sqlite3.connect(db_path)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+        return
+    with get_connection_pool(db_path, pragmas).connection() as conn:
         yield conn
-    finally:
-        conn.close()
 
 
 def execute_query(db_path, query, params=(), fetch=False, fetch_one=False):
     with db_connection(db_path) as conn:
         cursor = conn.cursor()
-        cursor.execute(query, params)
+        try:
+            cursor.execute(query, params)
 
-        if fetch_one:
-            result = cursor.fetchone()
-            return dict(result) if result else None
-        elif fetch:
-            return [dict(row) for row in cursor.fetchall()]
-        else:
-            conn.commit()
-            return cursor.lastrowid
+            if fetch_one:
+                result = cursor.fetchone()
+                return dict(result) if result else None
+            elif fetch:
+                return [dict(row) for row in cursor.fetchall()]
+            else:
+                conn.commit()
+                return cursor.lastrowid
+        finally:
+            # a half-read statement would pin an old WAL snapshot on a pooled connection
+            cursor.close()
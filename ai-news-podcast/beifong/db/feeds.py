@@ -1,6 +1,11 @@
 from datetime import datetime
-import sqlite3
+import hashlib
 from .connection import db_connection, execute_query
+from .leases import CLAIM_LEASE_SECONDS, ensure_lease_columns, lease_timestamps, new_worker_id
+
+# WAL lets the crawler and processors read while feeds are being ingested, and
+# NORMAL sync is durable across application crashes in WAL mode
+TRACKING_DB_PRAGMAS = ("journal_mode=WAL", "synchronous=NORMAL")
 
 
 def get_active_feeds(sources_db_path, limit=None, offset=0):
@@ -41,6 +46,17 @@ def get_feed_tracking_info(tracking_db_path, feed_id):
     return execute_query(tracking_db_path, query, (feed_id,), fetch=True, fetch_one=True)
 
 
+def get_feed_tracking_infos(tracking_db_path, feed_ids, chunk_size=900):
+    infos = {}
+    with db_connection(tracking_db_path) as conn:
+        for start in range(0, len(feed_ids), chunk_size):
+            chunk = feed_ids[start : start + chunk_size]
+            placeholders = ",".join(["?"] * len(chunk))
+            cursor = conn.execute(f"SELECT * FROM feed_tracking WHERE feed_id IN ({placeholders})", chunk)
+            infos.update((row["feed_id"], dict(row)) for row in cursor.fetchall())
+    return infos
+
+
 def update_feed_tracking(tracking_db_path, feed_id, etag, modified, entry_hash):
     query = """
     UPDATE feed_tracking 
@@ -51,34 +67,124 @@ def update_feed_tracking(tracking_db_path, feed_id, etag, modified, entry_hash):
     return execute_query(tracking_db_path, query, params)
 
 
-def store_feed_entries(tracking_db_path, feed_id, source_id, entries):
-    count = 0
+FEED_SCHEDULE_COLUMNS = {
+    "poll_interval": "REAL",
+    "next_poll_at": "TIMESTAMP",
+    "failure_count": "INTEGER DEFAULT 0",
+    "publish_interval": "REAL",
+}
+
+
+def ensure_feed_schedule_columns(tracking_db_path):
     with db_connection(tracking_db_path) as conn:
         cursor = conn.cursor()
-        for entry in entries:
-            try:
-                cursor.execute(
-                    """
-                INSERT INTO feed_entries 
-                (feed_id, source_id, entry_id, title, link, published_date, content, summary)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                    (
-                        feed_id,
-                        source_id,
-                        entry.get("entry_id", ""),
-                        entry.get("title", ""),
-                        entry.get("link", ""),
-                        entry.get("published_date", datetime.now().isoformat()),
-                        entry.get("content", ""),
-                        entry.get("summary", ""),
-                    ),
-                )
-                count += 1
-            except sqlite3.IntegrityError:
-                pass
+        cursor.execute("PRAGMA table_info(feed_tracking)")
+        columns = {col[1] for col in cursor.fetchall()}
+        for column, column_type in FEED_SCHEDULE_COLUMNS.items():
+            if column not in columns:
+                cursor.execute(f"ALTER TABLE feed_tracking ADD COLUMN {column} {column_type}")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_feed_tracking_next_poll_at ON feed_tracking(next_poll_at)")
         conn.commit()
-    return count
+
+
+def update_feed_schedules(tracking_db_path, schedules):
+    if not schedules:
+        return 0
+    with db_connection(tracking_db_path) as conn:
+        cursor = conn.cursor()
+        cursor.executemany(
+            """
+        UPDATE feed_tracking
+        SET poll_interval = ?, next_poll_at = ?, failure_count = ?,
+            publish_interval = COALESCE(?, publish_interval)
+        WHERE feed_id = ?
+        """,
+            [
+                (poll_interval, next_poll_at, failure_count, publish_interval, feed_id)
+                for feed_id, poll_interval, next_poll_at, failure_count, publish_interval in schedules
+            ],
+        )
+        conn.commit()
+        return cursor.rowcount
+
+
+def entry_fingerprint(entry_id, link=""):
+    return hashlib.sha1((entry_id or link or "").encode("utf-8")).hexdigest()
+
+
+def ensure_feed_entry_fingerprints(tracking_db_path, batch_size=10000):
+    with db_connection(tracking_db_path, TRACKING_DB_PRAGMAS) as conn:
+        cursor = conn.cursor()
+        cursor.execute("PRAGMA table_info(feed_entries)")
+        if "fingerprint" not in {col[1] for col in cursor.fetchall()}:
+            cursor.execute("ALTER TABLE feed_entries ADD COLUMN fingerprint TEXT")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_feed_entries_fingerprint ON feed_entries(feed_id, fingerprint)")
+        while True:
+            cursor.execute("SELECT id, entry_id, link FROM feed_entries WHERE fingerprint IS NULL LIMIT ?", (batch_size,))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            cursor.executemany(
+                "UPDATE feed_entries SET fingerprint = ? WHERE id = ?",
+                [(entry_fingerprint(row["entry_id"], row["link"]), row["id"]) for row in rows],
+            )
+        conn.commit()
+
+
+def get_known_fingerprints(conn, feed_id, fingerprints, chunk_size=900):
+    known = set()
+    for start in range(0, len(fingerprints), chunk_size):
+        chunk = fingerprints[start : start + chunk_size]
+        placeholders = ",".join(["?"] * len(chunk))
+        cursor = conn.execute(
+            f"SELECT fingerprint FROM feed_entries WHERE feed_id = ? AND fingerprint IN ({placeholders})",
+            [feed_id, *chunk],
+        )
+        known.update(row[0] for row in cursor.fetchall())
+    return known
+
+
+def store_feed_entries(tracking_db_path, feed_id, source_id, entries, conn=None):
+    if not entries:
+        return 0
+    if conn is None:
+        with db_connection(tracking_db_path, TRACKING_DB_PRAGMAS) as conn:
+            return store_feed_entries(tracking_db_path, feed_id, source_id, entries, conn)
+    by_fingerprint = {}
+    for entry in entries:
+        fingerprint = entry.get("fingerprint") or entry_fingerprint(entry.get("entry_id"), entry.get("link"))
+        by_fingerprint.setdefault(fingerprint, entry)
+    known = get_known_fingerprints(conn, feed_id, list(by_fingerprint))
+    now = datetime.now().isoformat()
+    rows = [
+        (
+            feed_id,
+            source_id,
+            entry.get("entry_id", ""),
+            entry.get("title", ""),
+            entry.get("link", ""),
+            entry.get("published_date", now),
+            entry.get("content", ""),
+            entry.get("summary", ""),
+            fingerprint,
+        )
+        for fingerprint, entry in by_fingerprint.items()
+        if fingerprint not in known
+    ]
+    if not rows:
+        return 0
+    changes_before = conn.total_changes
+    conn.executemany(
+        """
+    INSERT INTO feed_entries
+    (feed_id, source_id, entry_id, title, link, published_date, content, summary, fingerprint)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT DO NOTHING
+    """,
+        rows,
+    )
+    conn.commit()
+    return conn.total_changes - changes_before
 
 
 def update_tracking_info(tracking_db_path, feeds):
@@ -96,52 +202,47 @@ def update_tracking_info(tracking_db_path, feeds):
         conn.commit()
 
 
-def get_uncrawled_entries(tracking_db_path, limit=20, max_attempts=3):
-    reset_stuck_entries(tracking_db_path)
-    query = """
-    SELECT e.id, e.feed_id, e.source_id, e.title, e.link, e.published_date,
-           e.crawl_attempts, e.entry_id as original_entry_id
-    FROM feed_entries e
-    WHERE (e.crawl_status = 'pending' OR e.crawl_status = 'failed') 
-          AND e.crawl_attempts < ?
-          AND e.link IS NOT NULL
-          AND e.link != ''
-          AND NOT EXISTS (
-              SELECT 1 FROM crawled_articles ca WHERE ca.url = e.link
-          )
-    ORDER BY e.published_date DESC
-    LIMIT ?
-    """
-    entries = execute_query(tracking_db_path, query, (max_attempts, limit), fetch=True)
-    if entries:
-        entry_ids = [e["id"] for e in entries]
-        mark_entries_as_processing(tracking_db_path, entry_ids)
-    return entries
+def ensure_entry_lease_columns(tracking_db_path):
+    with db_connection(tracking_db_path) as conn:
+        ensure_lease_columns(conn, "feed_entries", "crawl_status")
+        conn.commit()
 
 
-def reset_stuck_entries(tracking_db_path):
-    query = """
-    UPDATE feed_entries 
-    SET crawl_status = 'pending' 
-    WHERE crawl_status = 'processing'
+def get_uncrawled_entries(tracking_db_path, limit=20, max_attempts=3, worker_id=None, lease_seconds=CLAIM_LEASE_SECONDS):
     """
-    return execute_query(tracking_db_path, query)
-
+    Claim up to ``limit`` entries to crawl for ``worker_id`` and return them.
 
-def mark_entries_as_processing(tracking_db_path, entry_ids):
-    if not entry_ids:
-        return 0
+    Selecting and marking happen in one UPDATE ... RETURNING, so concurrent crawlers never get
+    the same entry. Entries left 'processing' by a worker that died are claimable again once
+    their lease has expired.
+    """
+    now, expires_at = lease_timestamps(lease_seconds)
+    query = """
+    UPDATE feed_entries
+    SET crawl_status = 'processing', lease_owner = ?, lease_expires_at = ?
+    WHERE id IN (
+        SELECT e.id
+        FROM feed_entries e
+        WHERE (e.crawl_status IN ('pending', 'failed')
+               OR (e.crawl_status = 'processing' AND (e.lease_expires_at IS NULL OR e.lease_expires_at < ?)))
+              AND e.crawl_attempts < ?
+              AND e.link IS NOT NULL
+              AND e.link != ''
+              AND NOT EXISTS (
+                  SELECT 1 FROM crawled_articles ca WHERE ca.url = e.link
+              )
+        ORDER BY e.published_date DESC
+        LIMIT ?
+    )
+    RETURNING id, feed_id, source_id, title, link, published_date,
+              crawl_attempts, entry_id AS original_entry_id, lease_owner
+    """
     with db_connection(tracking_db_path) as conn:
-        cursor = conn.cursor()
-        placeholders = ",".join(["?"] * len(entry_ids))
-        query = f"""
-        UPDATE feed_entries 
-        SET crawl_status = 'processing' 
-        WHERE id IN ({placeholders})
-        """
-        cursor.execute(query, entry_ids)
+        entries = [dict(row) for row in conn.execute(query, (worker_id or new_worker_id(), expires_at, now, max_attempts, limit))]
         conn.commit()
-        return cursor.rowcount
+    # RETURNING does not keep the subquery's order
+    entries.sort(key=lambda entry: entry["published_date"] or "", reverse=True)
+    return entries
 
 
 def ensure_feed_tracking_exists(tracking_db_path, feed_id, source_id, feed_url):
@@ -0,0 +1,26 @@
+import os
+import uuid
+import socket
+from datetime import datetime, timedelta
+
+# how long a claimed row stays with its worker before another worker may take it over
+CLAIM_LEASE_SECONDS = int(os.environ.get("CLAIM_LEASE_SECONDS", 900))
+LEASE_COLUMNS = {"lease_owner": "TEXT", "lease_expires_at": "TIMESTAMP"}
+
+
+def new_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def lease_timestamps(lease_seconds=CLAIM_LEASE_SECONDS):
+    """Return ``(now, expiry)`` as ISO timestamps, the format lease_expires_at is compared in."""
+    now = datetime.now()
+    return now.isoformat(), (now + timedelta(seconds=lease_seconds)).isoformat()
+
+
+def ensure_lease_columns(conn, table, status_column):
+    columns = {col[1] for col in conn.execute(f"PRAGMA table_info({table})").fetchall()}
+    for column, column_type in LEASE_COLUMNS.items():
+        if column not in columns:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+    conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_lease ON {table}({status_column}, lease_expires_at)")
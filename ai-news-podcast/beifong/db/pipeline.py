@@ -0,0 +1,76 @@
+from .connection import db_connection, execute_query
+
+# each pipeline stage's output bumps its row, so the stage downstream can tell new work
+# arrived without scanning the tables it reads
+PIPELINE_CHANGES_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS pipeline_changes (
+        stage TEXT PRIMARY KEY,
+        version INTEGER NOT NULL DEFAULT 0,
+        updated_at TIMESTAMP
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS pipeline_feed_entries_insert AFTER INSERT ON feed_entries BEGIN
+        UPDATE pipeline_changes SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE stage = 'feed_processor';
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS pipeline_crawled_articles_insert AFTER INSERT ON crawled_articles BEGIN
+        UPDATE pipeline_changes SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE stage = 'url_crawler';
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS pipeline_crawled_articles_analyzed AFTER UPDATE OF ai_status ON crawled_articles
+    WHEN new.ai_status = 'success' AND old.ai_status IS NOT 'success' BEGIN
+        UPDATE pipeline_changes SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE stage = 'ai_analyzer';
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS pipeline_article_embeddings_insert AFTER INSERT ON article_embeddings BEGIN
+        UPDATE pipeline_changes SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE stage = 'embedding_processor';
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS pipeline_article_embeddings_indexed AFTER UPDATE OF in_faiss_index ON article_embeddings
+    WHEN new.in_faiss_index = 1 AND old.in_faiss_index IS NOT 1 BEGIN
+        UPDATE pipeline_changes SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE stage = 'faiss_indexer';
+    END
+    """,
+]
+PIPELINE_CHANGE_STAGES = ["feed_processor", "url_crawler", "ai_analyzer", "embedding_processor", "faiss_indexer"]
+
+# rows waiting for each stage; counted with a LIMIT so a long backlog costs no more than the threshold
+PIPELINE_BACKLOG_QUERIES = {
+    "url_crawler": "SELECT 1 FROM feed_entries WHERE crawl_status = 'pending' AND link IS NOT NULL AND link != ''",
+    "ai_analyzer": "SELECT 1 FROM crawled_articles WHERE ai_status = 'pending' AND processed = 0",
+    "embedding_processor": """
+        SELECT 1 FROM crawled_articles ca
+        WHERE ca.processed = 1 AND ca.ai_status = 'success'
+        AND NOT EXISTS (SELECT 1 FROM article_embeddings ae WHERE ae.article_id = ca.id)
+    """,
+    "faiss_indexer": "SELECT 1 FROM article_embeddings WHERE in_faiss_index = 0",
+}
+
+
+def create_pipeline_changes(conn):
+    for statement in PIPELINE_CHANGES_SCHEMA:
+        conn.execute(statement)
+    conn.executemany("INSERT OR IGNORE INTO pipeline_changes (stage) VALUES (?)", [(stage,) for stage in PIPELINE_CHANGE_STAGES])
+
+
+def ensure_pipeline_changes(tracking_db_path):
+    with db_connection(tracking_db_path) as conn:
+        create_pipeline_changes(conn)
+        conn.commit()
+
+
+def get_stage_versions(tracking_db_path):
+    rows = execute_query(tracking_db_path, "SELECT stage, version FROM pipeline_changes", fetch=True)
+    return {row["stage"]: row["version"] for row in rows}
+
+
+def count_stage_backlog(tracking_db_path, stage, limit):
+    """Rows waiting for ``stage``, counted up to ``limit``."""
+    query = f"SELECT COUNT(*) AS backlog FROM ({PIPELINE_BACKLOG_QUERIES[stage]} LIMIT ?)"
+    return execute_query(tracking_db_path, query, (limit,), fetch=True, fetch_one=True)["backlog"]
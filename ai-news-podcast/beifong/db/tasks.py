@@ -228,7 +228,7 @@ def get_execution_stats(tasks_db_path, days=7):
 
 def get_pending_tasks(tasks_db_path):
     query = """
-    SELECT id, name, description, command, frequency, frequency_unit, enabled, last_run
+    SELECT id, name, description, command, task_type, frequency, frequency_unit, enabled, last_run
     FROM tasks
     WHERE enabled = 1
     AND (
@@ -245,3 +245,14 @@ def get_pending_tasks(tasks_db_path):
     """
     tasks = execute_query(tasks_db_path, query, fetch=True)
     return tasks
+
+
+def get_enabled_task_by_type(tasks_db_path, task_type):
+    query = """
+    SELECT id, name, command, task_type
+    FROM tasks
+    WHERE enabled = 1 AND task_type = ?
+    ORDER BY id
+    LIMIT 1
+    """
+    return execute_query(tasks_db_path, query, (task_type,), fetch=True, fetch_one=True)
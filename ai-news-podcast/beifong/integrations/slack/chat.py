@@ -4,6 +4,8 @@ import sqlite3
 import asyncio
 import aiohttp
 import json
+import time
+import codecs
 from concurrent.futures import ThreadPoolExecutor
 from slack_bolt import App
 from slack_bolt.adapter.socket_mode import SocketModeHandler
@@ -18,6 +20,8 @@ app = App(token=os.environ["SLACK_BOT_TOKEN"])
 # local url works but banner images won't work in slack unless it's https with proper domain
 # you can use ngrok to port forward local url to https and replace this local url with ngrok url
 API_BASE_URL = os.environ.get("API_BASE_URL", "http://localhost:7000")
+STREAM_READ_TIMEOUT = 60
+STREAM_MAX_SECONDS = 600
 executor = ThreadPoolExecutor(max_workers=10)
 active_sessions: Dict[str, Dict] = {}
 DB_PATH = get_slack_sessions_db_path()
@@ -131,6 +135,34 @@ class PodcastAgentClient:
             print(f"API chat error: {e}")
             raise
 
+    async def stream_progress(self, session_id: str, task_id=None):
+        """Yield ``(event, data)`` from the server-sent progress stream, with ``("keepalive", None)`` for heartbeats."""
+        params = {"session_id": session_id}
+        if task_id:
+            params["task_id"] = task_id
+        # no total timeout, the stream lasts as long as the task; heartbeats keep reads short
+        timeout = aiohttp.ClientTimeout(total=None, connect=10, sock_read=STREAM_READ_TIMEOUT)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            async with session.get(f"{self.base_url}/api/podcast-agent/stream", params=params) as resp:
+                resp.raise_for_status()
+                decoder = codecs.getincrementaldecoder("utf-8")()
+                buffer = ""
+                # state deltas can be far longer than aiohttp's line limit, so frames are split here
+                async for chunk in resp.content.iter_any():
+                    buffer += decoder.decode(chunk)
+                    while "\n\n" in buffer:
+                        frame, buffer = buffer.split("\n\n", 1)
+                        event, data = None, []
+                        for line in frame.split("\n"):
+                            if line.startswith(":"):
+                                event = event or "keepalive"
+                            elif line.startswith("event: "):
+                                event = line[7:]
+                            elif line.startswith("data: "):
+                                data.append(line[6:])
+                        if event:
+                            yield event, json.loads("\n".join(data)) if data else None
+
     async def check_status(self, session_id: str, task_id=None):
         try:
             async with aiohttp.ClientSession(timeout=self.timeout) as session:
@@ -218,10 +250,61 @@ async def poll_for_completion(session_id: str, thread_key: str, task_id=None):
             del active_sessions[session_id]
 
 
+async def follow_progress_stream(session_id: str, thread_key: str, task_id=None) -> bool:
+    """Relay the progress stream to the thread; False when it ended without an answer and polling should take over."""
+    state, finished = {}, False
+    started = time.monotonic()
+    next_notice = started + 30
+    try:
+        async for event, data in api_client.stream_progress(session_id, task_id):
+            if event in ("snapshot", "done") and data.get("session_state"):
+                state = json.loads(data["session_state"])
+            elif event == "state":
+                state.update(data["changed"])
+                for key in data["removed"]:
+                    state.pop(key, None)
+            if event == "done":
+                finished = True
+                save_session_state(session_id, state)
+                await send_completion_message(thread_key, dict(data, session_state=json.dumps(state)))
+                return True
+            now = time.monotonic()
+            if now >= next_notice:
+                await send_slack_message(thread_key, f"🔄 Still processing request... ({int(now - started)}s elapsed)")
+                next_notice = now + 30
+            if now - started > STREAM_MAX_SECONDS:
+                print(f"Progress stream for {session_id} still running after {STREAM_MAX_SECONDS}s, giving up")
+                await send_slack_message(thread_key, "⏳ This request is still running. Send a message in this thread to check on it.")
+                return True
+        # closed without a done event, e.g. the API restarted or a proxy dropped the connection
+        print(f"Progress stream for {session_id} ended before the task finished, falling back to polling")
+    except Exception as e:
+        if finished:
+            print(f"Error sending completion for {session_id}: {e}")
+            return True
+        print(f"Progress stream error, falling back to polling: {e}")
+    return False
+
+
+async def stream_for_completion(session_id: str, thread_key: str, task_id=None):
+    print(f"Following progress stream for session: {session_id}, task: {task_id}")
+    active_sessions[session_id] = {
+        "thread_key": thread_key,
+        "task_id": task_id,
+        "start_time": datetime.now(),
+    }
+    try:
+        if not await follow_progress_stream(session_id, thread_key, task_id):
+            await poll_for_completion(session_id, thread_key, task_id)
+    finally:
+        if session_id in active_sessions:
+            del active_sessions[session_id]
+
+
 def start_background_polling(session_id: str, thread_key: str, task_id=None):
     if session_id in active_sessions:
         print(f"Replacing existing poll for session: {session_id}")
-    future = run_async_in_thread(poll_for_completion(session_id, thread_key, task_id))
+    future = run_async_in_thread(stream_for_completion(session_id, thread_key, task_id))
     active_sessions[session_id] = {
         "thread_key": thread_key,
         "task_id": task_id,
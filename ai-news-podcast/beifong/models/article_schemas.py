@@ -26,4 +26,5 @@ class PaginatedArticles(BaseModel):
     per_page: int
     total_pages: int
     has_next: bool
-    has_prev: bool
\ No newline at end of file
+    has_prev: bool
+    next_cursor: Optional[str] = None
\ No newline at end of file
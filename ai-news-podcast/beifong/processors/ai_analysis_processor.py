@@ -1,120 +1,163 @@
 import json
 import time
-import random
 import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from bs4 import BeautifulSoup
-from openai import OpenAI
+from openai import OpenAI, APIConnectionError, InternalServerError, RateLimitError
 from db.config import get_tracking_db_path
-from db.articles import get_unprocessed_articles, update_article_status
+from db.articles import ensure_article_lease_columns, get_unprocessed_articles, update_articles_status
+from db.leases import new_worker_id
+from utils.crawl_url import HTML_PARSER
 from utils.load_api_keys import load_api_key
+from utils.rate_limit import AdaptiveBackoff, retry_after_seconds
 
 WEB_PAGE_ANALYSE_MODEL = "gpt-4o"
 MODEL_INSTRUCTION = "You are a helpful assistant that analyzes articles and extracts structured information."
+MAX_PROMPT_TOKENS = 4000
+MAX_COMPLETION_TOKENS = 300
+DEFAULT_CONCURRENCY = 4
+MAX_REQUEST_RETRIES = 6
 
 
-def extract_clean_text(raw_html, max_tokens=8000):
-    soup = BeautifulSoup(raw_html, "html.parser")
+def extract_clean_text(raw_html, max_tokens=None):
+    soup = BeautifulSoup(raw_html, HTML_PARSER)
     for element in soup(["script", "style", "nav", "header", "footer", "aside"]):
         element.decompose()
     text = soup.get_text(separator="\n", strip=True)
     lines = [line.strip() for line in text.splitlines() if line.strip()]
     text = "\n".join(lines)
-    approx_tokens = len(text) / 4
-    if approx_tokens > max_tokens:
-        text = text[: max_tokens * 4]
-    return text
-
-
-def process_article_with_ai(client, article, max_tokens=8000):
-    clean_text = extract_clean_text(article["raw_content"], max_tokens)
-    metadata = article.get("metadata", {})
-    title = article["title"]
-    url = article["url"]
-    description = ""
+    return truncate_to_tokens(text, max_tokens) if max_tokens else text
+
+
+def truncate_to_tokens(text, max_tokens):
+    # roughly four characters per token is close enough for a prompt budget
+    return text[: max_tokens * 4]
+
+
+def get_article_description(metadata):
     if metadata and isinstance(metadata, dict):
         if "description" in metadata:
-            description = metadata["description"]
-        elif "og" in metadata and "description" in metadata["og"]:
-            description = metadata["og"]["description"]
-    try:
-        response = client.chat.completions.create(
-            model=WEB_PAGE_ANALYSE_MODEL,
-            response_format={"type": "json_object"},
-            messages=[
-                {
-                    "role": "system",
-                    "content": MODEL_INSTRUCTION,
-                },
-                {
-                    "role": "user",
-                    "content": f"""
-                                Analyze this article and provide a structured output with three components:
-
-                                1. A list of 3-5 relevant categories for this article
-                                2. A concise 2-3 sentence summary of the article
-                                3. The extracted main article content, removing any navigation, ads, or irrelevant elements
-
-                                Article Title: {title}
-                                Article URL: {url}
-                                Description: {description}
-
-                                Article Text:
-                                {clean_text}
-
-                                Provide your response as a JSON object with these keys:
-                                - categories: an array of 3-5 relevant categories (as strings)
-                                - summary: a 2-3 sentence summary of the article
-                                - content: the cleaned main article content
-                                """,
-                },
-            ],
-            temperature=0.3,
-            max_tokens=1500,
-        )
-        response_json = json.loads(response.choices[0].message.content)
-        categories = response_json.get("categories", [])
-        if isinstance(categories, str):
-            categories = [cat.strip() for cat in categories.split(",") if cat.strip()]
-        results = {
-            "categories": categories,
-            "summary": response_json.get("summary", ""),
-            "content": response_json.get("content", ""),
-        }
-        return results, True, None
-    except Exception as e:
-        error_message = str(e)
-        print(f"Error processing article with AI: {error_message}")
-        return None, False, error_message
+            return metadata["description"]
+        if "og" in metadata and "description" in metadata["og"]:
+            return metadata["og"]["description"]
+    return ""
+
+
+def build_analysis_messages(article, article_text):
+    return [
+        {
+            "role": "system",
+            "content": MODEL_INSTRUCTION,
+        },
+        {
+            "role": "user",
+            "content": f"""
+                        Analyze this article and provide a structured output with two components:
 
+                        1. A list of 3-5 relevant categories for this article
+                        2. A concise 2-3 sentence summary of the article
 
-def analyze_articles(tracking_db_path=None, openai_api_key=None, batch_size=5, delay_range=(1, 3)):
+                        Article Title: {article["title"]}
+                        Article URL: {article["url"]}
+                        Description: {get_article_description(article.get("metadata", {}))}
+
+                        Article Text:
+                        {article_text}
+
+                        Provide your response as a JSON object with these keys:
+                        - categories: an array of 3-5 relevant categories (as strings)
+                        - summary: a 2-3 sentence summary of the article
+                        """,
+        },
+    ]
+
+
+def process_article_with_ai(
+    client,
+    article,
+    backoff,
+    model=WEB_PAGE_ANALYSE_MODEL,
+    max_prompt_tokens=MAX_PROMPT_TOKENS,
+    max_retries=MAX_REQUEST_RETRIES,
+):
+    # the crawler stores the extracted article text, older rows only have the raw HTML
+    clean_text = article.get("content") or extract_clean_text(article["raw_content"] or "")
+    messages = build_analysis_messages(article, truncate_to_tokens(clean_text, max_prompt_tokens))
+    for attempt in range(max_retries + 1):
+        backoff.wait()
+        try:
+            response = client.chat.completions.create(
+                model=model,
+                response_format={"type": "json_object"},
+                messages=messages,
+                temperature=0.3,
+                max_tokens=MAX_COMPLETION_TOKENS,
+            )
+            backoff.on_success()
+            response_json = json.loads(response.choices[0].message.content)
+            categories = response_json.get("categories", [])
+            if isinstance(categories, str):
+                categories = [cat.strip() for cat in categories.split(",") if cat.strip()]
+            results = {
+                "categories": categories,
+                "summary": response_json.get("summary", ""),
+                "content": clean_text,
+            }
+            return results, True, None
+        except RateLimitError as e:
+            backoff.on_rate_limit(retry_after_seconds(e))
+        except (APIConnectionError, InternalServerError) as e:
+            print(f"Transient error analyzing article {article['id']} (attempt {attempt + 1}): {str(e)}")
+            time.sleep(backoff.transient_pause(attempt))
+        except Exception as e:
+            error_message = str(e)
+            print(f"Error processing article with AI: {error_message}")
+            return None, False, error_message
+    return None, False, f"Gave up after {max_retries + 1} attempts"
+
+
+def analyze_articles(
+    tracking_db_path=None,
+    openai_api_key=None,
+    batch_size=20,
+    concurrency=DEFAULT_CONCURRENCY,
+    max_prompt_tokens=MAX_PROMPT_TOKENS,
+    base_url=None,
+    model=WEB_PAGE_ANALYSE_MODEL,
+    client=None,
+    backoff=None,
+    worker_id=None,
+):
     if tracking_db_path is None:
         tracking_db_path = get_tracking_db_path()
-    if openai_api_key is None:
-        raise ValueError("OpenAI API key is required")
-    client = OpenAI(api_key=openai_api_key)
-    articles = get_unprocessed_articles(tracking_db_path, limit=batch_size)
+    if client is None:
+        if openai_api_key is None:
+            raise ValueError("OpenAI API key is required")
+        # retries are handled here so one shared backoff sees every rate limit
+        client = OpenAI(api_key=openai_api_key, base_url=base_url, max_retries=0)
+    backoff = backoff or AdaptiveBackoff()
+    worker_id = worker_id or new_worker_id()
+    articles = get_unprocessed_articles(tracking_db_path, limit=batch_size, worker_id=worker_id)
     stats = {"total_articles": len(articles), "success_count": 0, "failed_count": 0}
-    for i, article in enumerate(articles):
-        article_id = article["id"]
-        title = article["title"]
-        attempt = article.get("ai_attempts", 0) + 1
-        print(f"[{i + 1}/{len(articles)}] Processing article: {title} (Attempt {attempt})")
-        results, success, error_message = process_article_with_ai(client, article)
-        update_article_status(tracking_db_path, article_id, results, success, error_message)
-        if success:
-            categories_display = ", ".join(results["categories"])
-            print(f"Successfully processed article ID {article_id}")
-            print(f"Categories: {categories_display}")
-            print(f"Summary: {results['summary'][:100]}..." if len(results["summary"]) > 100 else f"Summary: {results['summary']}")
-            stats["success_count"] += 1
-        else:
-            print(f"Failed to process article ID {article_id}: {error_message}")
-            stats["failed_count"] += 1
-
-        if i < len(articles) - 1:
-            delay = random.uniform(delay_range[0], delay_range[1])
-            time.sleep(delay)
+    if not articles:
+        return stats
+    outcomes = []
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = {
+            executor.submit(process_article_with_ai, client, article, backoff, model, max_prompt_tokens): article
+            for article in articles
+        }
+        for i, future in enumerate(as_completed(futures)):
+            article = futures[future]
+            results, success, error_message = future.result()
+            outcomes.append((article["id"], results, success, error_message))
+            if success:
+                print(f"[{i + 1}/{len(articles)}] Analyzed article ID {article['id']}: {', '.join(results['categories'])}")
+                stats["success_count"] += 1
+            else:
+                print(f"[{i + 1}/{len(articles)}] Failed to process article ID {article['id']}: {error_message}")
+                stats["failed_count"] += 1
+    update_articles_status(tracking_db_path, outcomes, lease_owner=worker_id)
     return stats
 
 
@@ -123,6 +166,9 @@ def print_stats(stats):
     print(f"Total articles processed: {stats['total_articles']}")
     print(f"Successfully analyzed: {stats['success_count']}")
     print(f"Failed: {stats['failed_count']}")
+    if stats.get("elapsed_seconds"):
+        print(f"Rate limited requests: {stats['rate_limited']}")
+        print(f"Throughput: {stats['articles_per_second']:.2f} articles/sec")
 
 
 def analyze_in_batches(
@@ -130,19 +176,32 @@ def analyze_in_batches(
     openai_api_key=None,
     batch_size=20,
     total_batches=1,
-    delay_between_batches=10,
+    concurrency=DEFAULT_CONCURRENCY,
+    max_prompt_tokens=MAX_PROMPT_TOKENS,
+    base_url=None,
+    model=WEB_PAGE_ANALYSE_MODEL,
 ):
     if tracking_db_path is None:
         tracking_db_path = get_tracking_db_path()
     if openai_api_key is None:
         raise ValueError("OpenAI API key is required")
+    client = OpenAI(api_key=openai_api_key, base_url=base_url, max_retries=0)
+    backoff = AdaptiveBackoff()
+    ensure_article_lease_columns(tracking_db_path)
+    worker_id = new_worker_id()
     total_stats = {"total_articles": 0, "success_count": 0, "failed_count": 0}
+    start_time = time.perf_counter()
     for i in range(total_batches):
         print(f"\nProcessing batch {i + 1}/{total_batches}")
         batch_stats = analyze_articles(
             tracking_db_path=tracking_db_path,
-            openai_api_key=openai_api_key,
             batch_size=batch_size,
+            concurrency=concurrency,
+            max_prompt_tokens=max_prompt_tokens,
+            model=model,
+            client=client,
+            backoff=backoff,
+            worker_id=worker_id,
         )
         total_stats["total_articles"] += batch_stats["total_articles"]
         total_stats["success_count"] += batch_stats["success_count"]
@@ -150,19 +209,19 @@ def analyze_in_batches(
         if batch_stats["total_articles"] == 0:
             print("No more articles to process")
             break
-        if i < total_batches - 1:
-            print(f"Waiting {delay_between_batches} seconds before next batch...")
-            time.sleep(delay_between_batches)
+    total_stats["rate_limited"] = backoff.rate_limited
+    total_stats["elapsed_seconds"] = time.perf_counter() - start_time
+    total_stats["articles_per_second"] = total_stats["success_count"] / total_stats["elapsed_seconds"]
     return total_stats
 
 
-def parse_arguments():
+def parse_arguments(argv=None):
     parser = argparse.ArgumentParser(description="Process articles with AI analysis")
     parser.add_argument("--api_key", help="OpenAI API Key (overrides environment variables)")
     parser.add_argument(
         "--batch_size",
         type=int,
-        default=10,
+        default=20,
         help="Number of articles to process in each batch",
     )
     parser.add_argument(
@@ -171,18 +230,39 @@ def parse_arguments():
         default=1,
         help="Total number of batches to process",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help="Maximum number of analysis requests in flight",
+    )
+    parser.add_argument(
+        "--max_prompt_tokens",
+        type=int,
+        default=MAX_PROMPT_TOKENS,
+        help="Approximate token budget for the article text sent to the model",
+    )
+    parser.add_argument("--base_url", help="OpenAI-compatible API base URL")
+    return parser.parse_args(argv)
 
 
-if __name__ == "__main__":
-    args = parse_arguments()
+def main(argv=None):
+    args = parse_arguments(argv)
     api_key = args.api_key or load_api_key()
     if not api_key:
         print("Error: No OpenAI API key provided. Please provide via --api_key or set OPENAI_API_KEY in .env file")
-        exit(1)
+        return 1
     stats = analyze_in_batches(
         openai_api_key=api_key,
         batch_size=args.batch_size,
         total_batches=args.total_batches,
+        concurrency=args.concurrency,
+        max_prompt_tokens=args.max_prompt_tokens,
+        base_url=args.base_url,
     )
     print_stats(stats)
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
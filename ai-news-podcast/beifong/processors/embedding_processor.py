@@ -1,13 +1,24 @@
 import time
+import hashlib
 import argparse
-import random
+import unicodedata
+from datetime import datetime
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import numpy as np
-from openai import OpenAI
+import tiktoken
+from openai import OpenAI, APIConnectionError, InternalServerError, RateLimitError
 from db.config import get_tracking_db_path
 from db.connection import db_connection, execute_query
 from utils.load_api_keys import load_api_key
+from utils.rate_limit import AdaptiveBackoff, retry_after_seconds
 
 EMBEDDING_MODEL = "text-embedding-3-small"
+MAX_EMBEDDING_TOKENS = 8191
+REQUEST_TOKEN_BUDGET = 100_000
+MAX_INPUTS_PER_REQUEST = 512
+DEFAULT_CONCURRENCY = 4
+MAX_REQUEST_RETRIES = 6
 
 def create_embedding_table(tracking_db_path):
     with db_connection(tracking_db_path) as conn:
@@ -41,6 +52,16 @@ def create_embedding_table(tracking_db_path):
             print("Article embeddings table created successfully.")
         else:
             print("Article embeddings table already exists.")
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS embedding_cache (
+            text_hash TEXT NOT NULL,
+            embedding_model TEXT NOT NULL,
+            embedding BLOB NOT NULL,
+            created_at TEXT NOT NULL,
+            PRIMARY KEY (text_hash, embedding_model)
+        )
+        """)
+        conn.commit()
 
 
 def get_articles_without_embeddings(tracking_db_path, limit=20):
@@ -87,13 +108,28 @@ def mark_articles_as_processing(tracking_db_path, article_ids):
         return 0
 
 
-def generate_embedding(client, text, model=EMBEDDING_MODEL):
+def get_tokenizer(model=EMBEDDING_MODEL):
     try:
-        response = client.embeddings.create(input=text, model=model)
-        return response.data[0].embedding, model
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
     except Exception as e:
-        print(f"Error generating embedding: {str(e)}")
-        return None, None
+        # tiktoken downloads its vocabulary on first use, don't fail the embedding run without it
+        print(f"Token encoding unavailable, approximating token counts: {str(e)}")
+        return None
+
+
+def truncate_to_token_limit(text, encoding, max_tokens=MAX_EMBEDDING_TOKENS):
+    if encoding is None:
+        # same approximation as utils.content_extractor.count_tokens
+        if len(text) // 4 <= max_tokens:
+            return text, len(text) // 4
+        return text[: max_tokens * 4], max_tokens
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text, len(tokens)
+    return encoding.decode(tokens[:max_tokens]), max_tokens
 
 
 def prepare_article_text(article):
@@ -104,64 +140,167 @@ def prepare_article_text(article):
     return full_text
 
 
-def store_embedding(tracking_db_path, article_id, embedding, model):
-    from datetime import datetime
-    import sqlite3
-    embedding_blob = np.array(embedding, dtype=np.float32).tobytes()
+def normalize_embedding_text(text):
+    return " ".join(unicodedata.normalize("NFKC", text).split()).casefold()
+
+
+def embedding_text_hash(text, model=EMBEDDING_MODEL):
+    return hashlib.sha256(f"{model}\n{normalize_embedding_text(text)}".encode("utf-8")).hexdigest()
+
+
+def get_cached_embeddings(tracking_db_path, text_hashes, model=EMBEDDING_MODEL, chunk_size=900):
+    text_hashes = list(text_hashes)
+    cached = {}
+    with db_connection(tracking_db_path) as conn:
+        for start in range(0, len(text_hashes), chunk_size):
+            chunk = text_hashes[start : start + chunk_size]
+            placeholders = ",".join(["?"] * len(chunk))
+            cursor = conn.execute(
+                f"""
+                SELECT text_hash, embedding FROM embedding_cache
+                WHERE embedding_model = ? AND text_hash IN ({placeholders})
+                """,
+                [model, *chunk],
+            )
+            cached.update((row["text_hash"], row["embedding"]) for row in cursor.fetchall())
+    return cached
+
+
+def pack_embedding_requests(texts, encoding, token_budget=REQUEST_TOKEN_BUDGET, max_inputs=MAX_INPUTS_PER_REQUEST):
+    requests = []
+    current = []
+    current_tokens = 0
+    for article_id, text in texts:
+        text, token_count = truncate_to_token_limit(text, encoding)
+        if current and (current_tokens + token_count > token_budget or len(current) >= max_inputs):
+            requests.append(current)
+            current = []
+            current_tokens = 0
+        current.append((article_id, text))
+        current_tokens += token_count
+    if current:
+        requests.append(current)
+    return requests
+
+
+def generate_embeddings(client, batch, backoff, model=EMBEDDING_MODEL, max_retries=MAX_REQUEST_RETRIES):
+    texts = [text for _, text in batch]
+    for attempt in range(max_retries + 1):
+        backoff.wait()
+        try:
+            response = client.embeddings.create(input=texts, model=model)
+            backoff.on_success()
+            vectors = [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+            return [(article_id, vector) for (article_id, _), vector in zip(batch, vectors)]
+        except RateLimitError as e:
+            backoff.on_rate_limit(retry_after_seconds(e))
+        except (APIConnectionError, InternalServerError) as e:
+            print(f"Transient error generating embeddings (attempt {attempt + 1}): {str(e)}")
+            time.sleep(backoff.transient_pause(attempt))
+        except Exception as e:
+            print(f"Error generating embeddings: {str(e)}")
+            return []
+    print(f"Giving up on a batch of {len(batch)} articles after {max_retries + 1} attempts")
+    return []
+
+
+def _embedding_blob(embedding):
+    if isinstance(embedding, bytes):
+        return embedding
+    return np.asarray(embedding, dtype=np.float32).tobytes()
+
+
+def store_embeddings(tracking_db_path, embedded_articles, model, cache_entries=None):
+    if not embedded_articles:
+        return 0
+    created_at = datetime.now().isoformat()
+    rows = [(article_id, _embedding_blob(embedding), model, created_at) for article_id, embedding in embedded_articles]
     query = """
     INSERT INTO article_embeddings 
     (article_id, embedding, embedding_model, created_at, in_faiss_index)
     VALUES (?, ?, ?, ?, 0)
     """
-    params = (article_id, embedding_blob, model, datetime.now().isoformat())
+    cache_query = """
+    INSERT OR IGNORE INTO embedding_cache (text_hash, embedding_model, embedding, created_at)
+    VALUES (?, ?, ?, ?)
+    """
     try:
-        execute_query(tracking_db_path, query, params)
-        return True
-    except sqlite3.IntegrityError:
-        print(f"Warning: Embedding already exists for article {article_id}")
-        return False
+        with db_connection(tracking_db_path) as conn:
+            conn.executemany(query, rows)
+            if cache_entries:
+                conn.executemany(cache_query, ((text_hash, model, _embedding_blob(embedding), created_at) for text_hash, embedding in cache_entries))
+            conn.commit()
+        return len(rows)
     except Exception as e:
-        print(f"Error storing embedding: {str(e)}")
-        return False
+        print(f"Error storing embeddings: {str(e)}")
+        return 0
 
 
-def process_articles_for_embedding(tracking_db_path=None, openai_api_key=None, batch_size=20, delay_range=(1, 3)):
+def process_articles_for_embedding(
+    tracking_db_path=None,
+    openai_api_key=None,
+    batch_size=500,
+    concurrency=DEFAULT_CONCURRENCY,
+    request_token_budget=REQUEST_TOKEN_BUDGET,
+    max_inputs_per_request=MAX_INPUTS_PER_REQUEST,
+    base_url=None,
+    model=EMBEDDING_MODEL,
+):
     if tracking_db_path is None:
         tracking_db_path = get_tracking_db_path()
     if openai_api_key is None:
         raise ValueError("OpenAI API key is required")
     create_embedding_table(tracking_db_path)
-    client = OpenAI(api_key=openai_api_key)
+    # retries are handled by the shared backoff so parallel requests slow down together
+    client = OpenAI(api_key=openai_api_key, base_url=base_url, max_retries=0)
     articles = get_articles_without_embeddings(tracking_db_path, limit=batch_size)
     if not articles:
         print("No articles found that need embeddings")
         return {"total_articles": 0, "success_count": 0, "failed_count": 0}
     article_ids = [article["id"] for article in articles]
     mark_articles_as_processing(tracking_db_path, article_ids)
-    stats = {"total_articles": len(articles), "success_count": 0, "failed_count": 0}
-    for i, article in enumerate(articles):
-        article_id = article["id"]
-        try:
-            print(f"[{i + 1}/{len(articles)}] Generating embedding for article {article_id}: {article['title']}")
-            text = prepare_article_text(article)
-            embedding, model = generate_embedding(client, text)
-            if embedding:
-                success = store_embedding(tracking_db_path, article_id, embedding, model)
-                if success:
-                    print(f"Successfully stored embedding for article {article_id}")
-                    stats["success_count"] += 1
-                else:
-                    print(f"Failed to store embedding for article {article_id}")
-                    stats["failed_count"] += 1
-            else:
-                print(f"Failed to generate embedding for article {article_id}")
-                stats["failed_count"] += 1
-        except Exception as e:
-            print(f"Error processing article {article_id}: {str(e)}")
-            stats["failed_count"] += 1
-        if i < len(articles) - 1:
-            delay = random.uniform(delay_range[0], delay_range[1])
-            time.sleep(delay)
+    start_time = time.perf_counter()
+    texts = [(article["id"], prepare_article_text(article)) for article in articles]
+    text_hashes = {article_id: embedding_text_hash(text, model) for article_id, text in texts}
+    cached = get_cached_embeddings(tracking_db_path, set(text_hashes.values()), model)
+    cache_hits = [(article_id, cached[text_hashes[article_id]]) for article_id, _ in texts if text_hashes[article_id] in cached]
+    # copies of the same text within this batch are embedded once and shared
+    duplicates = defaultdict(list)
+    to_embed = []
+    for article_id, text in texts:
+        text_hash = text_hashes[article_id]
+        if text_hash in cached:
+            continue
+        if text_hash in duplicates:
+            duplicates[text_hash].append(article_id)
+            continue
+        duplicates[text_hash] = []
+        to_embed.append((article_id, text))
+    stats = {
+        "total_articles": len(articles),
+        "success_count": store_embeddings(tracking_db_path, cache_hits, model),
+        "failed_count": 0,
+        "cache_hits": len(articles) - len(to_embed),
+        "cache_misses": len(to_embed),
+    }
+    requests = pack_embedding_requests(to_embed, get_tokenizer(model), request_token_budget, max_inputs_per_request)
+    stats["requests"] = len(requests)
+    print(f"Embedding {len(to_embed)} articles in {len(requests)} requests with up to {concurrency} in flight ({stats['cache_hits']} cache hits)")
+    backoff = AdaptiveBackoff()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [executor.submit(generate_embeddings, client, batch, backoff, model) for batch in requests]
+        for future in as_completed(futures):
+            embedded = future.result()
+            rows = list(embedded)
+            for article_id, embedding in embedded:
+                rows.extend((duplicate_id, embedding) for duplicate_id in duplicates[text_hashes[article_id]])
+            cache_entries = [(text_hashes[article_id], embedding) for article_id, embedding in embedded]
+            stats["success_count"] += store_embeddings(tracking_db_path, rows, model, cache_entries=cache_entries)
+    stats["failed_count"] = stats["total_articles"] - stats["success_count"]
+    stats["cache_hit_rate"] = stats["cache_hits"] / stats["total_articles"]
+    stats["rate_limited"] = backoff.rate_limited
+    stats["elapsed_seconds"] = time.perf_counter() - start_time
+    stats["articles_per_second"] = stats["success_count"] / stats["elapsed_seconds"] if stats["elapsed_seconds"] else 0.0
     return stats
 
 
@@ -170,42 +309,64 @@ def print_stats(stats):
     print(f"Total articles processed: {stats['total_articles']}")
     print(f"Successfully embedded: {stats['success_count']}")
     print(f"Failed: {stats['failed_count']}")
+    if "cache_hits" in stats:
+        lookups = stats["cache_hits"] + stats["cache_misses"]
+        hit_rate = stats["cache_hits"] / lookups if lookups else 0.0
+        print(f"Embedding cache hits: {stats['cache_hits']}/{lookups} ({hit_rate:.1%}, API calls skipped)")
+    if "articles_per_second" in stats:
+        print(f"Throughput: {stats['articles_per_second']:.1f} articles/sec")
 
 
-def parse_arguments():
+def parse_arguments(argv=None):
     parser = argparse.ArgumentParser(description="Generate embeddings for processed articles")
     parser.add_argument("--api_key", help="OpenAI API Key (overrides environment variables)")
     parser.add_argument(
         "--batch_size",
         type=int,
-        default=20,
+        default=500,
         help="Number of articles to process in each batch",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help="Maximum number of embedding requests in flight",
+    )
+    parser.add_argument(
+        "--base_url",
+        help="OpenAI-compatible API base URL (e.g. a local stub server)",
+    )
+    return parser.parse_args(argv)
 
 
 def process_in_batches(
     tracking_db_path=None,
     openai_api_key=None,
-    batch_size=20,
+    batch_size=500,
     total_batches=1,
     delay_between_batches=10,
+    concurrency=DEFAULT_CONCURRENCY,
+    base_url=None,
 ):
     if tracking_db_path is None:
         tracking_db_path = get_tracking_db_path()
     if openai_api_key is None:
         raise ValueError("OpenAI API key is required")
-    total_stats = {"total_articles": 0, "success_count": 0, "failed_count": 0}
+    total_stats = {"total_articles": 0, "success_count": 0, "failed_count": 0, "cache_hits": 0, "cache_misses": 0}
     for i in range(total_batches):
         print(f"\nProcessing batch {i + 1}/{total_batches}")
         batch_stats = process_articles_for_embedding(
             tracking_db_path=tracking_db_path,
             openai_api_key=openai_api_key,
             batch_size=batch_size,
+            concurrency=concurrency,
+            base_url=base_url,
         )
         total_stats["total_articles"] += batch_stats["total_articles"]
         total_stats["success_count"] += batch_stats["success_count"]
         total_stats["failed_count"] += batch_stats["failed_count"]
+        total_stats["cache_hits"] += batch_stats.get("cache_hits", 0)
+        total_stats["cache_misses"] += batch_stats.get("cache_misses", 0)
         if batch_stats["total_articles"] == 0:
             print("No more articles to process")
             break
@@ -215,15 +376,22 @@ def process_in_batches(
     return total_stats
 
 
-if __name__ == "__main__":
-    args = parse_arguments()
+def main(argv=None):
+    args = parse_arguments(argv)
     api_key = args.api_key or load_api_key()
     if not api_key:
         print("Error: No OpenAI API key provided. Please provide via --api_key or set OPENAI_API_KEY in .env file")
-        exit(1)
+        return 1
     stats = process_in_batches(
         openai_api_key=api_key,
         batch_size=args.batch_size,
         total_batches=3,
+        concurrency=args.concurrency,
+        base_url=args.base_url,
     )
     print_stats(stats)
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
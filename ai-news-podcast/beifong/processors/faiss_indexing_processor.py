@@ -1,13 +1,49 @@
 import os
 import time
+import json
+import struct
 import argparse
 import numpy as np
 import faiss
 from db.config import get_tracking_db_path, get_faiss_db_path
 from db.connection import db_connection, execute_query
 
+DELTA_LOG_MAGIC = b"BFDELTA1"
+# magic, vector dimension, index position of the first record in the log
+DELTA_LOG_HEADER = struct.Struct("<8sqq")
+IVF_INDEX_TYPES = ("ivfflat", "ivfpq")
+# FAISS k-means warns below 39 points per centroid and PQ needs 256 points per sub-quantizer
+MIN_POINTS_PER_CENTROID = 39
+PQ_CODEBOOK_SIZE = 256
+TRAINING_POINTS_PER_CENTROID = 64
+MAX_DEFAULT_NPROBE = 64
 
-def initialize_faiss_index(dimension=1536, index_path=None, index_type="hnsw", n_list=100):
+
+def choose_n_list(n_vectors):
+    if n_vectors < MIN_POINTS_PER_CENTROID:
+        return 1
+    n_list = int(4 * np.sqrt(n_vectors))
+    return max(1, min(n_list, n_vectors // MIN_POINTS_PER_CENTROID))
+
+
+def default_nprobe(n_list):
+    return max(1, min(MAX_DEFAULT_NPROBE, n_list // 16))
+
+
+def train_ivf_index(index, n_list, train_vectors=None):
+    if train_vectors is None or len(train_vectors) < n_list:
+        print("Training IVF index with random vectors (not enough real embeddings available)...")
+        train_size = max(10000, n_list * 10)
+        train_vectors = np.random.random((train_size, index.d)).astype(np.float32)
+        faiss.normalize_L2(train_vectors)
+    else:
+        print(f"Training IVF index with {len(train_vectors)} sampled embeddings...")
+    index.train(train_vectors)
+    index.nprobe = default_nprobe(n_list)
+    return index
+
+
+def initialize_faiss_index(dimension=1536, index_path=None, index_type="hnsw", n_list=100, train_vectors=None):
     if index_path and os.path.exists(index_path):
         print(f"Loading existing FAISS index from {index_path}")
         try:
@@ -18,46 +54,54 @@ def initialize_faiss_index(dimension=1536, index_path=None, index_type="hnsw", n
             print(f"Error loading FAISS index: {str(e)}")
             print("Creating a new index instead")
     print(f"Creating new FAISS index with dimension {dimension}, type: {index_type}")
+    # vectors are L2-normalized before they are added, so inner product is cosine similarity
+    metric = faiss.METRIC_INNER_PRODUCT
     if index_type == "flat":
-        return faiss.IndexFlatL2(dimension)
-
-    elif index_type == "ivfflat":
-        quantizer = faiss.IndexFlatL2(dimension)
-        index = faiss.IndexIVFFlat(quantizer, dimension, n_list)
-        print("Training IVF index with random vectors...")
-        train_size = max(10000, n_list * 10)
-        train_vectors = np.random.random((train_size, dimension)).astype(np.float32)
-        index.train(train_vectors)
-        index.nprobe = min(10, n_list // 10)
-        return index
-    elif index_type == "ivfpq":
-        quantizer = faiss.IndexFlatL2(dimension)
+        return faiss.IndexFlatIP(dimension)
+    elif index_type == "ivfpq" and train_vectors is not None and len(train_vectors) < PQ_CODEBOOK_SIZE:
+        print(f"Only {len(train_vectors)} training vectors available, using IVF Flat until IVF-PQ can be trained")
+        index_type = "ivfflat"
+    if index_type == "ivfpq":
+        quantizer = faiss.IndexFlatIP(dimension)
         m = 16
         bits = 8
-        index = faiss.IndexIVFPQ(quantizer, dimension, n_list, m, bits)
-        print("Training IVF-PQ index with random vectors...")
-        train_size = max(10000, n_list * 10)
-        train_vectors = np.random.random((train_size, dimension)).astype(np.float32)
-        index.train(train_vectors)
-        index.nprobe = min(10, n_list // 10)
-        return index
+        index = faiss.IndexIVFPQ(quantizer, dimension, n_list, m, bits, metric)
+        return train_ivf_index(index, n_list, train_vectors)
     elif index_type == "hnsw":
         m = 32
         ef_construction = 100
-        index = faiss.IndexHNSWFlat(dimension, m)
+        index = faiss.IndexHNSWFlat(dimension, m, metric)
         index.hnsw.efConstruction = ef_construction
         index.hnsw.efSearch = 64
         return index
-    else:
+    if index_type != "ivfflat":
         print(f"Unknown index type '{index_type}', falling back to IVF Flat")
-        quantizer = faiss.IndexFlatL2(dimension)
-        index = faiss.IndexIVFFlat(quantizer, dimension, n_list)
-        print("Training IVF index with random vectors...")
-        train_size = max(10000, n_list * 10)
-        train_vectors = np.random.random((train_size, dimension)).astype(np.float32)
-        index.train(train_vectors)
-        index.nprobe = min(10, n_list // 10)
-        return index
+    quantizer = faiss.IndexFlatIP(dimension)
+    index = faiss.IndexIVFFlat(quantizer, dimension, n_list, metric)
+    return train_ivf_index(index, n_list, train_vectors)
+
+
+def get_index_meta_path(index_path):
+    return f"{index_path}.meta.json"
+
+
+def load_index_meta(index_path):
+    meta_path = get_index_meta_path(index_path)
+    if os.path.exists(meta_path):
+        try:
+            with open(meta_path) as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"Error loading FAISS index metadata: {str(e)}")
+    return {}
+
+
+def save_index_meta(index_path, meta):
+    meta_path = get_index_meta_path(index_path)
+    temp_path = f"{meta_path}.tmp"
+    with open(temp_path, "w") as f:
+        json.dump(meta, f)
+    os.replace(temp_path, meta_path)
 
 
 def save_faiss_index(index, index_path):
@@ -78,7 +122,10 @@ def save_id_mapping(id_map, mapping_path):
     try:
         mapping_dir = os.path.dirname(mapping_path)
         os.makedirs(mapping_dir, exist_ok=True)
-        np.save(mapping_path, np.array(id_map))
+        temp_path = f"{mapping_path}.tmp"
+        with open(temp_path, "wb") as f:
+            np.save(f, np.array(id_map))
+        os.replace(temp_path, mapping_path)
         print(f"ID mapping saved to {mapping_path}")
         return True
     except Exception as e:
@@ -103,35 +150,145 @@ def load_id_mapping(mapping_path):
     return []
 
 
-def get_embeddings_not_in_index(tracking_db_path, limit=100):
+def get_delta_log_path(index_path):
+    return f"{index_path}.delta"
+
+
+def _delta_record_dtype(dimension):
+    return np.dtype([("embedding_id", "<i8"), ("article_id", "<i8"), ("embedding", "<f4", (dimension,))])
+
+
+def read_delta_log(delta_path, dimension):
+    record_dtype = _delta_record_dtype(dimension)
+    empty = np.empty(0, dtype=record_dtype)
+    if not os.path.exists(delta_path):
+        return None, empty
+    with open(delta_path, "rb") as f:
+        header = f.read(DELTA_LOG_HEADER.size)
+        if len(header) < DELTA_LOG_HEADER.size:
+            return None, empty
+        magic, log_dimension, base = DELTA_LOG_HEADER.unpack(header)
+        if magic != DELTA_LOG_MAGIC or log_dimension != dimension:
+            print(f"Ignoring incompatible FAISS delta log at {delta_path}")
+            return None, empty
+        payload = f.read()
+    # a torn trailing record from a crash mid-append is dropped
+    count = len(payload) // record_dtype.itemsize
+    return base, np.frombuffer(payload[: count * record_dtype.itemsize], dtype=record_dtype)
+
+
+def append_delta_log(delta_path, base, embedding_ids, article_ids, embeddings):
+    dimension = embeddings.shape[1]
+    records = np.empty(len(embedding_ids), dtype=_delta_record_dtype(dimension))
+    records["embedding_id"] = embedding_ids
+    records["article_id"] = article_ids
+    records["embedding"] = embeddings
+    with open(delta_path, "ab") as f:
+        if f.tell() == 0:
+            f.write(DELTA_LOG_HEADER.pack(DELTA_LOG_MAGIC, dimension, base))
+        f.write(records.tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+    return len(records)
+
+
+def apply_delta_log(faiss_index, id_map, delta_path, tracking_db_path=None):
+    base, records = read_delta_log(delta_path, faiss_index.d)
+    if base is None or len(records) == 0:
+        return 0
+    if faiss_index.ntotal < base or len(id_map) < base:
+        print(f"FAISS delta log at {delta_path} starts past the saved index, ignoring it")
+        return 0
+    vector_start = min(faiss_index.ntotal - base, len(records))
+    if vector_start < len(records):
+        faiss_index.add(np.ascontiguousarray(records["embedding"][vector_start:]))
+    mapping_start = min(len(id_map) - base, len(records))
+    id_map.extend(int(article_id) for article_id in records["article_id"][mapping_start:])
+    if tracking_db_path:
+        mark_embeddings_as_indexed(tracking_db_path, [int(embedding_id) for embedding_id in records["embedding_id"]])
+    replayed = len(records) - vector_start
+    if replayed:
+        print(f"Replayed {replayed} vectors from FAISS delta log")
+    return replayed
+
+
+def remove_delta_log(delta_path):
+    if os.path.exists(delta_path):
+        os.remove(delta_path)
+
+
+def get_embeddings_not_in_index(tracking_db_path, limit=100, after_id=0):
+    query = """
+    SELECT ae.id, ae.article_id, ae.embedding, ae.embedding_model
+    FROM article_embeddings ae
+    WHERE ae.in_faiss_index = 0 AND ae.id > ?
+    ORDER BY ae.id
+    LIMIT ?
+    """
+    return execute_query(tracking_db_path, query, (after_id, limit), fetch=True)
+
+
+def get_embeddings_after(tracking_db_path, after_id=0, limit=5000):
     query = """
     SELECT ae.id, ae.article_id, ae.embedding, ae.embedding_model
     FROM article_embeddings ae
-    WHERE ae.in_faiss_index = 0
+    WHERE ae.id > ?
+    ORDER BY ae.id
+    LIMIT ?
+    """
+    return execute_query(tracking_db_path, query, (after_id, limit), fetch=True)
+
+
+def count_embeddings(tracking_db_path):
+    result = execute_query(tracking_db_path, "SELECT COUNT(*) AS count FROM article_embeddings", fetch=True, fetch_one=True)
+    return result["count"] if result else 0
+
+
+def sample_training_vectors(tracking_db_path, dimension, sample_size, chunk_size=900):
+    # sample row ids from the index first so the random sort never touches the embedding blobs
+    id_query = """
+    SELECT id FROM article_embeddings
+    ORDER BY RANDOM()
     LIMIT ?
     """
-    return execute_query(tracking_db_path, query, (limit,), fetch=True)
+    sampled_ids = [row["id"] for row in execute_query(tracking_db_path, id_query, (sample_size,), fetch=True)]
+    vectors = []
+    for start in range(0, len(sampled_ids), chunk_size):
+        chunk = sampled_ids[start : start + chunk_size]
+        placeholders = ",".join(["?"] * len(chunk))
+        query = f"SELECT embedding FROM article_embeddings WHERE id IN ({placeholders})"
+        for row in execute_query(tracking_db_path, query, chunk, fetch=True):
+            embedding = np.frombuffer(row["embedding"], dtype=np.float32)
+            if embedding.shape[0] == dimension:
+                vectors.append(embedding)
+    if not vectors:
+        return None
+    vectors = np.vstack(vectors).astype(np.float32)
+    faiss.normalize_L2(vectors)
+    return vectors
 
 
-def mark_embeddings_as_indexed(tracking_db_path, embedding_ids):
+def mark_embeddings_as_indexed(tracking_db_path, embedding_ids, chunk_size=900):
     if not embedding_ids:
         return 0
+    marked_count = 0
     with db_connection(tracking_db_path) as conn:
         cursor = conn.cursor()
-        placeholders = ",".join(["?"] * len(embedding_ids))
-        query = f"""
-        UPDATE article_embeddings 
-        SET in_faiss_index = 1 
-        WHERE id IN ({placeholders})
-        """
-        cursor.execute(query, embedding_ids)
+        for start in range(0, len(embedding_ids), chunk_size):
+            chunk = embedding_ids[start : start + chunk_size]
+            placeholders = ",".join(["?"] * len(chunk))
+            query = f"""
+            UPDATE article_embeddings 
+            SET in_faiss_index = 1 
+            WHERE id IN ({placeholders})
+            """
+            cursor.execute(query, chunk)
+            marked_count += cursor.rowcount
         conn.commit()
-        return cursor.rowcount
+        return marked_count
 
 
-def add_embeddings_to_index(embeddings_data, faiss_index, id_map):
-    if not embeddings_data:
-        return 0, []
+def decode_embeddings(embeddings_data, dimension):
     embeddings = []
     article_ids = []
     embedding_ids = []
@@ -140,8 +297,8 @@ def add_embeddings_to_index(embeddings_data, faiss_index, id_map):
             embedding_blob = data["embedding"]
             embedding = np.frombuffer(embedding_blob, dtype=np.float32)
 
-            if embedding.shape[0] != faiss_index.d:
-                print(f"Embedding dimension mismatch: expected {faiss_index.d}, got {embedding.shape[0]}")
+            if embedding.shape[0] != dimension:
+                print(f"Embedding dimension mismatch: expected {dimension}, got {embedding.shape[0]}")
                 continue
             embeddings.append(embedding)
             article_ids.append(data["article_id"])
@@ -149,54 +306,159 @@ def add_embeddings_to_index(embeddings_data, faiss_index, id_map):
         except Exception as e:
             print(f"Error processing embedding {data['id']}: {str(e)}")
     if not embeddings:
+        return None, [], []
+    embeddings_array = np.vstack(embeddings).astype(np.float32)
+    faiss.normalize_L2(embeddings_array)
+    return embeddings_array, article_ids, embedding_ids
+
+
+def add_embeddings_to_index(embeddings_data, faiss_index, id_map):
+    if not embeddings_data:
+        return 0, []
+    embeddings_array, article_ids, embedding_ids = decode_embeddings(embeddings_data, faiss_index.d)
+    if embeddings_array is None:
         return 0, []
     try:
-        embeddings_array = np.vstack(embeddings).astype(np.float32)
         faiss_index.add(embeddings_array)
         for article_id in article_ids:
             id_map.append(article_id)
-        print(f"Added {len(embeddings)} embeddings to FAISS index")
-        return len(embeddings), embedding_ids
+        print(f"Added {len(article_ids)} embeddings to FAISS index")
+        return len(article_ids), embedding_ids
     except Exception as e:
         print(f"Error adding embeddings to FAISS index: {str(e)}")
         return 0, []
 
 
-def process_embeddings_for_indexing(
-    tracking_db_path=None,
-    index_path=None,
-    mapping_path=None,
-    batch_size=100,
-    index_type="ivfflat",
-    n_list=100,
-):
-    if tracking_db_path is None:
-        tracking_db_path = get_tracking_db_path()
-    index_dir = os.path.dirname(index_path)
-    os.makedirs(index_dir, exist_ok=True)
-    id_map = load_id_mapping(mapping_path)
+def embeddings_table_exists(tracking_db_path):
     with db_connection(tracking_db_path) as conn:
         cursor = conn.cursor()
         cursor.execute("""
         SELECT name FROM sqlite_master 
         WHERE type='table' AND name='article_embeddings'
         """)
-        table_exists = cursor.fetchone() is not None
+        return cursor.fetchone() is not None
 
-        if not table_exists:
-            print("article_embeddings table does not exist. Please run embedding_processor first.")
-            return {"processed": 0, "added": 0, "errors": 0, "total_vectors": 0, "status": "table_missing"}
+
+def detect_embedding_dimension(tracking_db_path):
     sample_query = """
     SELECT embedding FROM article_embeddings LIMIT 1
     """
     sample = execute_query(tracking_db_path, sample_query, fetch=True, fetch_one=True)
     if not sample:
+        return None
+    return len(np.frombuffer(sample["embedding"], dtype=np.float32))
+
+
+def compact_faiss_index(faiss_index, id_map, index_path, mapping_path, meta_updates=None):
+    if not save_faiss_index(faiss_index, index_path):
+        return False
+    if not save_id_mapping(id_map, mapping_path):
+        return False
+    remove_delta_log(get_delta_log_path(index_path))
+    meta = load_index_meta(index_path)
+    meta.update(meta_updates or {})
+    meta["generation"] = meta.get("generation", 0) + 1
+    meta["total_vectors"] = faiss_index.ntotal
+    save_index_meta(index_path, meta)
+    return True
+
+
+def build_trained_index(tracking_db_path, dimension, index_type="hnsw", n_list=None):
+    n_vectors = count_embeddings(tracking_db_path)
+    if n_list is None:
+        n_list = choose_n_list(n_vectors)
+    train_vectors = None
+    if index_type in IVF_INDEX_TYPES:
+        sample_size = max(n_list * TRAINING_POINTS_PER_CENTROID, PQ_CODEBOOK_SIZE * MIN_POINTS_PER_CENTROID)
+        train_vectors = sample_training_vectors(tracking_db_path, dimension, sample_size)
+        print(f"Selected n_list={n_list} for {n_vectors} embeddings")
+    index = initialize_faiss_index(dimension=dimension, index_type=index_type, n_list=n_list, train_vectors=train_vectors)
+    trained_on_embeddings = train_vectors is not None and len(train_vectors) >= n_list
+    meta = {
+        "index_type": index_type,
+        "metric": "inner_product",
+        "n_list": n_list,
+        "trained_vectors": n_vectors if trained_on_embeddings else 0,
+    }
+    return index, meta
+
+
+def load_or_build_faiss_index(tracking_db_path, index_path, dimension, index_type="hnsw", n_list=None):
+    if os.path.exists(index_path):
+        print(f"Loading existing FAISS index from {index_path}")
+        try:
+            index = faiss.read_index(index_path)
+            print(f"Loaded index with {index.ntotal} vectors")
+            return index, None
+        except Exception as e:
+            print(f"Error loading FAISS index: {str(e)}")
+            print("Creating a new index instead")
+    return build_trained_index(tracking_db_path, dimension, index_type=index_type, n_list=n_list)
+
+
+def needs_retraining(faiss_index, index_path, tracking_db_path, retrain_growth=2.0):
+    if not isinstance(faiss_index, faiss.IndexIVF) or not retrain_growth:
+        return False
+    n_vectors = count_embeddings(tracking_db_path)
+    if n_vectors < MIN_POINTS_PER_CENTROID:
+        return False
+    # indexes without metadata were trained on random vectors by older versions
+    trained_vectors = load_index_meta(index_path).get("trained_vectors", 0)
+    return n_vectors >= max(trained_vectors, 1) * retrain_growth
+
+
+def rebuild_faiss_index(tracking_db_path, index_path, mapping_path, index_type, dimension, n_list=None, chunk_size=5000):
+    print(f"Rebuilding {index_type} FAISS index with centroids trained on stored embeddings")
+    new_index, meta = build_trained_index(tracking_db_path, dimension, index_type=index_type, n_list=n_list)
+    id_map = []
+    embedding_ids = []
+    last_id = 0
+    while True:
+        embeddings_data = get_embeddings_after(tracking_db_path, after_id=last_id, limit=chunk_size)
+        if not embeddings_data:
+            break
+        last_id = embeddings_data[-1]["id"]
+        embeddings_array, article_ids, chunk_embedding_ids = decode_embeddings(embeddings_data, dimension)
+        if embeddings_array is not None:
+            new_index.add(embeddings_array)
+            id_map.extend(article_ids)
+            embedding_ids.extend(chunk_embedding_ids)
+    # the rebuilt index is written beside the live one and swapped in with os.replace
+    if not compact_faiss_index(new_index, id_map, index_path, mapping_path, meta_updates=meta):
+        return None, None
+    mark_embeddings_as_indexed(tracking_db_path, embedding_ids)
+    print(f"Rebuilt FAISS index with {new_index.ntotal} vectors")
+    return new_index, id_map
+
+
+def process_embeddings_for_indexing(
+    tracking_db_path=None,
+    index_path=None,
+    mapping_path=None,
+    batch_size=100,
+    index_type="ivfflat",
+    n_list=None,
+    retrain_growth=2.0,
+):
+    if tracking_db_path is None:
+        tracking_db_path = get_tracking_db_path()
+    index_dir = os.path.dirname(index_path)
+    os.makedirs(index_dir, exist_ok=True)
+    id_map = load_id_mapping(mapping_path)
+    if not embeddings_table_exists(tracking_db_path):
+        print("article_embeddings table does not exist. Please run embedding_processor first.")
+        return {"processed": 0, "added": 0, "errors": 0, "total_vectors": 0, "status": "table_missing"}
+    embedding_dimension = detect_embedding_dimension(tracking_db_path)
+    if not embedding_dimension:
         print("No embeddings found in the database")
         default_dimension = 1536
         print(f"Using default dimension: {default_dimension}")
 
         faiss_index = initialize_faiss_index(
-            dimension=default_dimension, index_path=index_path if os.path.exists(index_path) else None, index_type=index_type, n_list=n_list
+            dimension=default_dimension,
+            index_path=index_path if os.path.exists(index_path) else None,
+            index_type=index_type,
+            n_list=n_list or 1,
         )
         return {
             "processed": 0,
@@ -205,17 +467,24 @@ def process_embeddings_for_indexing(
             "total_vectors": faiss_index.ntotal if hasattr(faiss_index, "ntotal") else 0,
             "status": "no_embeddings",
         }
-    embedding_dimension = len(np.frombuffer(sample["embedding"], dtype=np.float32))
     print(f"Detected embedding dimension: {embedding_dimension}")
-    faiss_index = initialize_faiss_index(dimension=embedding_dimension, index_path=index_path, index_type=index_type, n_list=n_list)
+    faiss_index, pending_meta = load_or_build_faiss_index(tracking_db_path, index_path, embedding_dimension, index_type, n_list)
+    replayed = apply_delta_log(faiss_index, id_map, get_delta_log_path(index_path), tracking_db_path)
+    if pending_meta is None and needs_retraining(faiss_index, index_path, tracking_db_path, retrain_growth):
+        faiss_index, id_map = rebuild_faiss_index(tracking_db_path, index_path, mapping_path, index_type, embedding_dimension, n_list)
+        if faiss_index is None:
+            return {"processed": 0, "added": 0, "errors": 0, "total_vectors": 0, "status": "rebuild_failed"}
+        replayed = 0
     embeddings_data = get_embeddings_not_in_index(tracking_db_path, limit=batch_size)
     if not embeddings_data:
+        if replayed:
+            compact_faiss_index(faiss_index, id_map, index_path, mapping_path)
         print("No new embeddings to add to the index")
         return {"processed": 0, "added": 0, "errors": 0, "total_vectors": faiss_index.ntotal, "status": "no_new_embeddings"}
     added_count, embedding_ids = add_embeddings_to_index(embeddings_data, faiss_index, id_map)
+    if added_count > 0 or replayed:
+        compact_faiss_index(faiss_index, id_map, index_path, mapping_path, meta_updates=pending_meta)
     if added_count > 0:
-        save_faiss_index(faiss_index, index_path)
-        save_id_mapping(id_map, mapping_path)
         marked_count = mark_embeddings_as_indexed(tracking_db_path, embedding_ids)
         print(f"Marked {marked_count} embeddings as indexed in the database")
     stats = {
@@ -229,6 +498,132 @@ def process_embeddings_for_indexing(
     return stats
 
 
+class ResidentFaissIndexer:
+    """
+    Long-lived indexer that keeps the FAISS index and id mapping in memory.
+
+    Each chunk of new embeddings is appended to a delta log next to the index file
+    (``<index_path>.delta``) before the rows are marked as indexed, so a chunk costs
+    O(chunk) disk I/O instead of rewriting the whole index. The full index and mapping
+    are only rewritten on compaction, every ``compact_every`` chunks and on close.
+    Searchers read the compacted index file, so new vectors become visible to them
+    at the next compaction. IVF indexes are rebuilt with freshly trained centroids
+    once the corpus has grown ``retrain_growth`` times past the size they were
+    trained on.
+    """
+
+    def __init__(
+        self,
+        tracking_db_path=None,
+        index_path=None,
+        mapping_path=None,
+        index_type="hnsw",
+        n_list=None,
+        chunk_size=5000,
+        compact_every=20,
+        retrain_growth=2.0,
+    ):
+        default_index_path, default_mapping_path = get_faiss_db_path()
+        self.tracking_db_path = tracking_db_path or get_tracking_db_path()
+        self.index_path = index_path or default_index_path
+        self.mapping_path = mapping_path or default_mapping_path
+        self.delta_path = get_delta_log_path(self.index_path)
+        self.index_type = index_type
+        self.n_list = n_list
+        self.chunk_size = chunk_size
+        self.compact_every = compact_every
+        self.retrain_growth = retrain_growth
+        self.faiss_index = None
+        self.pending_meta = None
+        self.id_map = []
+        self.last_embedding_id = 0
+        self.chunks_since_compaction = 0
+        self.stats = {"processed": 0, "added": 0, "errors": 0, "chunks": 0, "compactions": 0, "rebuilds": 0, "index_type": index_type}
+
+    def load(self):
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        if not embeddings_table_exists(self.tracking_db_path):
+            print("article_embeddings table does not exist. Please run embedding_processor first.")
+            return False
+        dimension = detect_embedding_dimension(self.tracking_db_path)
+        if not dimension:
+            print("No embeddings found in the database")
+            return False
+        self.faiss_index, self.pending_meta = load_or_build_faiss_index(
+            self.tracking_db_path, self.index_path, dimension, self.index_type, self.n_list
+        )
+        self.id_map = load_id_mapping(self.mapping_path)
+        if apply_delta_log(self.faiss_index, self.id_map, self.delta_path, self.tracking_db_path):
+            self.chunks_since_compaction += 1
+        if self.pending_meta is None:
+            self.rebuild_if_needed()
+        return True
+
+    def rebuild_if_needed(self):
+        if not needs_retraining(self.faiss_index, self.index_path, self.tracking_db_path, self.retrain_growth):
+            return False
+        faiss_index, id_map = rebuild_faiss_index(
+            self.tracking_db_path, self.index_path, self.mapping_path, self.index_type, self.faiss_index.d, self.n_list
+        )
+        if faiss_index is None:
+            return False
+        self.faiss_index = faiss_index
+        self.id_map = id_map
+        self.chunks_since_compaction = 0
+        self.stats["rebuilds"] += 1
+        return True
+
+    def index_next_chunk(self):
+        embeddings_data = get_embeddings_not_in_index(self.tracking_db_path, limit=self.chunk_size, after_id=self.last_embedding_id)
+        if not embeddings_data:
+            return 0
+        self.last_embedding_id = embeddings_data[-1]["id"]
+        embeddings_array, article_ids, embedding_ids = decode_embeddings(embeddings_data, self.faiss_index.d)
+        added_count = 0
+        if embeddings_array is not None:
+            append_delta_log(self.delta_path, self.faiss_index.ntotal, embedding_ids, article_ids, embeddings_array)
+            self.faiss_index.add(embeddings_array)
+            self.id_map.extend(article_ids)
+            mark_embeddings_as_indexed(self.tracking_db_path, embedding_ids)
+            added_count = len(embedding_ids)
+            self.chunks_since_compaction += 1
+        self.stats["chunks"] += 1
+        self.stats["processed"] += len(embeddings_data)
+        self.stats["added"] += added_count
+        self.stats["errors"] += len(embeddings_data) - added_count
+        if self.chunks_since_compaction >= self.compact_every:
+            self.compact()
+        return len(embeddings_data)
+
+    def compact(self):
+        if self.chunks_since_compaction == 0:
+            return True
+        print(f"Compacting FAISS index with {self.faiss_index.ntotal} vectors")
+        if not compact_faiss_index(self.faiss_index, self.id_map, self.index_path, self.mapping_path, meta_updates=self.pending_meta):
+            return False
+        self.pending_meta = None
+        self.chunks_since_compaction = 0
+        self.stats["compactions"] += 1
+        self.rebuild_if_needed()
+        return True
+
+    def run(self, poll_interval=None):
+        if self.faiss_index is None and not self.load():
+            return self.stats
+        try:
+            while True:
+                if self.index_next_chunk():
+                    continue
+                if poll_interval is None:
+                    break
+                self.compact()
+                time.sleep(poll_interval)
+        finally:
+            self.compact()
+        self.stats["total_vectors"] = self.faiss_index.ntotal
+        return self.stats
+
+
 def process_in_batches(
     tracking_db_path=None,
     index_path=None,
@@ -237,7 +632,8 @@ def process_in_batches(
     total_batches=5,
     delay_between_batches=2,
     index_type="ivfflat",
-    n_list=100,
+    n_list=None,
+    retrain_growth=2.0,
 ):
     if tracking_db_path is None:
         tracking_db_path = get_tracking_db_path()
@@ -251,6 +647,7 @@ def process_in_batches(
             batch_size=batch_size,
             index_type=index_type,
             n_list=n_list,
+            retrain_growth=retrain_growth,
         )
         total_stats["processed"] += batch_stats["processed"]
         total_stats["added"] += batch_stats["added"]
@@ -285,7 +682,7 @@ def print_stats(stats):
             print("Index performance: Excellent search speed with good accuracy")
 
 
-def parse_arguments():
+def parse_arguments(argv=None):
     parser = argparse.ArgumentParser(description="Process embeddings and add to FAISS index")
     parser.add_argument(
         "--batch_size",
@@ -312,8 +709,13 @@ def parse_arguments():
     parser.add_argument(
         "--n_list",
         type=int,
-        default=100,
-        help="Number of clusters for IVF-based indexes",
+        help="Number of clusters for IVF-based indexes (chosen from the corpus size by default)",
+    )
+    parser.add_argument(
+        "--retrain_growth",
+        type=float,
+        default=2.0,
+        help="Rebuild IVF indexes once the corpus grows by this factor since training (0 disables)",
     )
     parser.add_argument(
         "--total_batches",
@@ -321,19 +723,60 @@ def parse_arguments():
         default=5,
         help="Total number of batches to process",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--resident",
+        action="store_true",
+        help="Keep the index in memory and drain all pending embeddings using the delta log",
+    )
+    parser.add_argument(
+        "--chunk_size",
+        type=int,
+        default=5000,
+        help="Number of embeddings streamed per chunk in resident mode",
+    )
+    parser.add_argument(
+        "--compact_every",
+        type=int,
+        default=20,
+        help="Rewrite the full index after this many chunks in resident mode",
+    )
+    parser.add_argument(
+        "--poll_interval",
+        type=float,
+        help="In resident mode, keep running and poll for new embeddings every N seconds",
+    )
+    return parser.parse_args(argv)
 
 
-if __name__ == "__main__":
-    args = parse_arguments()
+def main(argv=None):
+    args = parse_arguments(argv)
     index_path, mapping_path = get_faiss_db_path()
     index_path = args.index_path or index_path
     mapping_path = args.mapping_path or mapping_path
-    stats = process_in_batches(
-        batch_size=args.batch_size,
-        index_path=index_path,
-        mapping_path=mapping_path,
-        total_batches=args.total_batches,
-        index_type=args.index_type,
-        n_list=args.n_list,
-    )
+    if args.resident:
+        indexer = ResidentFaissIndexer(
+            index_path=index_path,
+            mapping_path=mapping_path,
+            index_type=args.index_type,
+            n_list=args.n_list,
+            chunk_size=args.chunk_size,
+            compact_every=args.compact_every,
+            retrain_growth=args.retrain_growth,
+        )
+        stats = indexer.run(poll_interval=args.poll_interval)
+        print_stats(stats)
+    else:
+        stats = process_in_batches(
+            batch_size=args.batch_size,
+            index_path=index_path,
+            mapping_path=mapping_path,
+            total_batches=args.total_batches,
+            index_type=args.index_type,
+            n_list=args.n_list,
+            retrain_growth=args.retrain_growth,
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -1,89 +1,192 @@
 import time
-import random
-from utils.rss_feed_parser import get_feed_data
+import asyncio
+import argparse
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from utils.feed_schedule import FEED_FAILED, FEED_NEW_ENTRIES, FEED_UNCHANGED, is_feed_due, next_poll_interval, schedule_next_poll
+from utils.feed_fetcher import DEFAULT_CONCURRENCY, DEFAULT_PER_HOST_DELAY, DEFAULT_PER_HOST_LIMIT, iter_fetched_feeds
 from db.config import get_sources_db_path, get_tracking_db_path
+from db.connection import db_connection
 from db.feeds import (
+    TRACKING_DB_PRAGMAS,
+    ensure_feed_entry_fingerprints,
+    ensure_feed_schedule_columns,
     get_active_feeds,
-    count_active_feeds,
-    get_feed_tracking_info,
+    get_feed_tracking_infos,
+    update_feed_schedules,
     update_feed_tracking,
     store_feed_entries,
     update_tracking_info,
 )
 
 
-def fetch_and_process_feeds(sources_db_path=None, tracking_db_path=None, delay_between_feeds=2, batch_size=100):
+def store_feed_result(tracking_db_path, feed, feed_data, tracking_info, stats, conn=None):
+    feed_id = feed["id"]
+    feed_url = feed["feed_url"]
+    if "error" in feed_data:
+        print(f"Error processing feed {feed_url}: {feed_data['error']}")
+        stats["failed_feeds"] += 1
+        return FEED_FAILED
+    if not feed_data["is_rss_feed"]:
+        print(f"Feed {feed_url} is not a valid RSS feed")
+        stats["failed_feeds"] += 1
+        return FEED_FAILED
+    if feed_data["status"] == 304:
+        print(f"Feed {feed_url} not modified since last check")
+        stats["unchanged_feeds"] += 1
+        return FEED_UNCHANGED
+    current_hash = feed_data["current_hash"]
+    last_hash = tracking_info.get("entry_hash") if tracking_info else None
+    if last_hash and current_hash == last_hash:
+        print(f"Feed {feed_url} content unchanged based on hash")
+        stats["unchanged_feeds"] += 1
+        return FEED_UNCHANGED
+    new_entries = 0
+    parsed_entries = feed_data["parsed_entries"]
+    if parsed_entries:
+        new_entries = store_feed_entries(tracking_db_path, feed_id, feed["source_id"], parsed_entries, conn)
+        stats["new_entries"] += new_entries
+        print(f"Stored {new_entries} new entries from {feed_url}")
+    update_feed_tracking(
+        tracking_db_path,
+        feed_id,
+        feed_data["etag"],
+        feed_data["modified"],
+        current_hash,
+    )
+    stats["processed_feeds"] += 1
+    return FEED_NEW_ENTRIES if new_entries else FEED_UNCHANGED
+
+
+def plan_next_poll(feed_id, feed_data, tracking_info, outcome):
+    tracking_info = tracking_info or {}
+    failure_count = (tracking_info.get("failure_count") or 0) + 1 if outcome == FEED_FAILED else 0
+    publish_interval = feed_data.get("publish_interval") or tracking_info.get("publish_interval")
+    interval = next_poll_interval(outcome, tracking_info.get("poll_interval"), publish_interval, failure_count)
+    return (feed_id, interval, schedule_next_poll(interval), failure_count, feed_data.get("publish_interval"))
+
+
+async def fetch_and_store_feeds(tracking_db_path, feeds, tracking_infos, stats, parse_executor, **fetch_options):
+    schedules = []
+    # one connection for the whole run, reopening it per feed costs a WAL checkpoint each time
+    with db_connection(tracking_db_path, TRACKING_DB_PRAGMAS) as conn:
+        async for feed, feed_data in iter_fetched_feeds(feeds, tracking_infos, parse_executor=parse_executor, **fetch_options):
+            tracking_info = tracking_infos.get(feed["id"])
+            try:
+                outcome = store_feed_result(tracking_db_path, feed, feed_data, tracking_info, stats, conn)
+            except Exception as e:
+                print(f"Error processing feed {feed['feed_url']}: {str(e)}")
+                stats["failed_feeds"] += 1
+                outcome = FEED_FAILED
+            schedules.append(plan_next_poll(feed["id"], feed_data, tracking_info, outcome))
+    update_feed_schedules(tracking_db_path, schedules)
+
+
+def fetch_and_process_feeds(
+    sources_db_path=None,
+    tracking_db_path=None,
+    concurrency=DEFAULT_CONCURRENCY,
+    per_host_limit=DEFAULT_PER_HOST_LIMIT,
+    per_host_delay=DEFAULT_PER_HOST_DELAY,
+    parse_workers=None,
+    ignore_schedule=False,
+):
     if sources_db_path is None:
         sources_db_path = get_sources_db_path()
     if tracking_db_path is None:
         tracking_db_path = get_tracking_db_path()
-    total_feeds = count_active_feeds(sources_db_path)
+    feeds = get_active_feeds(sources_db_path)
     stats = {
-        "total_feeds": total_feeds,
+        "total_feeds": len(feeds),
+        "due_feeds": 0,
         "processed_feeds": 0,
         "new_entries": 0,
         "unchanged_feeds": 0,
         "failed_feeds": 0,
     }
-    offset = 0
-    while offset < total_feeds:
-        feeds = get_active_feeds(sources_db_path, limit=batch_size, offset=offset)
-        if not feeds:
-            break
-        update_tracking_info(tracking_db_path, feeds)
-        for feed in feeds:
-            feed_id = feed["id"]
-            source_id = feed["source_id"]
-            feed_url = feed["feed_url"]
-            tracking_info = get_feed_tracking_info(tracking_db_path, feed_id)
-            etag = tracking_info.get("last_etag") if tracking_info else None
-            modified = tracking_info.get("last_modified") if tracking_info else None
-            last_hash = tracking_info.get("entry_hash") if tracking_info else None
-            try:
-                feed_data = get_feed_data(feed_url, etag=etag, modified=modified)
-                if not feed_data["is_rss_feed"]:
-                    print(f"Feed {feed_url} is not a valid RSS feed")
-                    stats["failed_feeds"] += 1
-                    continue
-                if feed_data["status"] == 304:
-                    print(f"Feed {feed_url} not modified since last check")
-                    stats["unchanged_feeds"] += 1
-                    continue
-                current_hash = feed_data["current_hash"]
-                if last_hash and current_hash == last_hash:
-                    print(f"Feed {feed_url} content unchanged based on hash")
-                    stats["unchanged_feeds"] += 1
-                    continue
-                parsed_entries = feed_data["parsed_entries"]
-                if parsed_entries:
-                    new_entries = store_feed_entries(tracking_db_path, feed_id, source_id, parsed_entries)
-                    stats["new_entries"] += new_entries
-                    print(f"Stored {new_entries} new entries from {feed_url}")
-                update_feed_tracking(
-                    tracking_db_path,
-                    feed_id,
-                    feed_data["etag"],
-                    feed_data["modified"],
-                    current_hash,
-                )
-                stats["processed_feeds"] += 1
-            except Exception as e:
-                print(f"Error processing feed {feed_url}: {str(e)}")
-                stats["failed_feeds"] += 1
-            time.sleep(random.uniform(1, delay_between_feeds))
-        offset += batch_size
+    if not feeds:
+        return stats
+    ensure_feed_schedule_columns(tracking_db_path)
+    ensure_feed_entry_fingerprints(tracking_db_path)
+    update_tracking_info(tracking_db_path, feeds)
+    tracking_infos = get_feed_tracking_infos(tracking_db_path, [feed["id"] for feed in feeds])
+    if not ignore_schedule:
+        now = datetime.now()
+        feeds = [feed for feed in feeds if is_feed_due(tracking_infos.get(feed["id"]), now)]
+    stats["due_feeds"] = len(feeds)
+    if not feeds:
+        print("No feeds are due for polling")
+        return stats
+    start_time = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=parse_workers) as parse_executor:
+        asyncio.run(
+            fetch_and_store_feeds(
+                tracking_db_path,
+                feeds,
+                tracking_infos,
+                stats,
+                parse_executor,
+                concurrency=concurrency,
+                per_host_limit=per_host_limit,
+                per_host_delay=per_host_delay,
+            )
+        )
+    stats["elapsed_seconds"] = time.perf_counter() - start_time
+    stats["feeds_per_second"] = len(feeds) / stats["elapsed_seconds"] if stats["elapsed_seconds"] else 0.0
     return stats
 
 
 def print_stats(stats):
     print("\nFeed Processing Statistics:")
     print(f"Total feeds: {stats['total_feeds']}")
+    print(f"Due feeds: {stats['due_feeds']}")
     print(f"Processed feeds: {stats['processed_feeds']}")
     print(f"Unchanged feeds: {stats['unchanged_feeds']}")
     print(f"Failed feeds: {stats['failed_feeds']}")
     print(f"New entries: {stats['new_entries']}")
+    if "feeds_per_second" in stats:
+        print(f"Throughput: {stats['feeds_per_second']:.1f} feeds/sec")
 
 
-if __name__ == "__main__":
-    stats = fetch_and_process_feeds()
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(description="Fetch active RSS feeds and store new entries")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help="Maximum number of feed requests in flight",
+    )
+    parser.add_argument(
+        "--per_host_limit",
+        type=int,
+        default=DEFAULT_PER_HOST_LIMIT,
+        help="Maximum concurrent requests to a single host",
+    )
+    parser.add_argument(
+        "--per_host_delay",
+        type=float,
+        default=DEFAULT_PER_HOST_DELAY,
+        help="Minimum seconds between request starts to the same host",
+    )
+    parser.add_argument(
+        "--ignore_schedule",
+        action="store_true",
+        help="Poll every active feed instead of only those that are due",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_arguments(argv)
+    stats = fetch_and_process_feeds(
+        concurrency=args.concurrency,
+        per_host_limit=args.per_host_limit,
+        per_host_delay=args.per_host_delay,
+        ignore_schedule=args.ignore_schedule,
+    )
     print_stats(stats)
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -1,47 +1,111 @@
+import time
+import asyncio
+import argparse
+from concurrent.futures import ProcessPoolExecutor
 from db.config import get_tracking_db_path
-from db.feeds import get_uncrawled_entries
-from db.articles import store_crawled_article, update_entry_status
-from utils.crawl_url import get_web_data
+from db.feeds import ensure_entry_lease_columns, get_uncrawled_entries
+from db.leases import new_worker_id
+from db.articles import (
+    ensure_article_content_columns,
+    ensure_article_search_index,
+    store_crawled_article,
+    update_entry_status,
+)
+from utils.crawl_url import (
+    DEFAULT_CONCURRENCY,
+    DEFAULT_PER_HOST_DELAY,
+    DEFAULT_PER_HOST_LIMIT,
+    MAX_HTML_BYTES,
+    iter_crawled_pages,
+)
 
 
-def crawl_pending_entries(tracking_db_path=None, batch_size=20, delay_range=(1, 3), max_attempts=3):
+def store_crawl_result(tracking_db_path, entry, web_data, error, stats):
+    entry_id = entry["id"]
+    url = entry["link"]
+    if error:
+        print(f"Error crawling {url}: {error}")
+        update_entry_status(tracking_db_path, entry_id, "failed", entry.get("lease_owner"))
+        stats["failed_count"] += 1
+        return
+    if not web_data or not web_data["raw_html"]:
+        print(f"No content retrieved for {url}")
+        update_entry_status(tracking_db_path, entry_id, "failed", entry.get("lease_owner"))
+        stats["failed_count"] += 1
+        return
+    success = store_crawled_article(
+        tracking_db_path,
+        entry,
+        web_data["raw_html"],
+        web_data["metadata"],
+        web_data["text"],
+        web_data["token_count"],
+    )
+    if success:
+        update_entry_status(tracking_db_path, entry_id, "success", entry.get("lease_owner"))
+        stats["success_count"] += 1
+        print(f"Successfully crawled: {url}")
+    else:
+        update_entry_status(tracking_db_path, entry_id, "failed", entry.get("lease_owner"))
+        stats["failed_count"] += 1
+        print(f"Failed to store: {url} (likely duplicate)")
+
+
+async def crawl_and_store_entries(tracking_db_path, entries, stats, parse_executor, **crawl_options):
+    async for entry, web_data, error in iter_crawled_pages(entries, parse_executor=parse_executor, **crawl_options):
+        try:
+            store_crawl_result(tracking_db_path, entry, web_data, error, stats)
+        except Exception as e:
+            print(f"Error storing {entry['link']}: {str(e)}")
+            update_entry_status(tracking_db_path, entry["id"], "failed", entry.get("lease_owner"))
+            stats["failed_count"] += 1
+
+
+def crawl_pending_entries(
+    tracking_db_path=None,
+    batch_size=100,
+    max_attempts=3,
+    concurrency=DEFAULT_CONCURRENCY,
+    per_host_limit=DEFAULT_PER_HOST_LIMIT,
+    per_host_delay=DEFAULT_PER_HOST_DELAY,
+    max_bytes=MAX_HTML_BYTES,
+    parse_executor=None,
+    worker_id=None,
+):
     if tracking_db_path is None:
         tracking_db_path = get_tracking_db_path()
-    entries = get_uncrawled_entries(tracking_db_path, limit=batch_size, max_attempts=max_attempts)
+    entries = get_uncrawled_entries(tracking_db_path, limit=batch_size, max_attempts=max_attempts, worker_id=worker_id)
     stats = {
         "total_entries": len(entries),
         "success_count": 0,
         "failed_count": 0,
         "skipped_count": 0,
+        "elapsed_seconds": 0.0,
     }
+    crawlable = []
     for entry in entries:
-        entry_id = entry["id"]
-        url = entry["link"]
-        if not url or url.strip() == "":
-            update_entry_status(tracking_db_path, entry_id, "skipped")
+        if not entry["link"] or entry["link"].strip() == "":
+            update_entry_status(tracking_db_path, entry["id"], "skipped", entry.get("lease_owner"))
             stats["skipped_count"] += 1
-            continue
-        print(f"Crawling URL: {url}")
-        try:
-            web_data = get_web_data(url)
-            if not web_data or not web_data["raw_html"]:
-                print(f"No content retrieved for {url}")
-                update_entry_status(tracking_db_path, entry_id, "failed")
-                stats["failed_count"] += 1
-                continue
-            success = store_crawled_article(tracking_db_path, entry, web_data["raw_html"], web_data["metadata"])
-            if success:
-                update_entry_status(tracking_db_path, entry_id, "success")
-                stats["success_count"] += 1
-                print(f"Successfully crawled: {url}")
-            else:
-                update_entry_status(tracking_db_path, entry_id, "failed")
-                stats["failed_count"] += 1
-                print(f"Failed to store: {url} (likely duplicate)")
-        except Exception as e:
-            print(f"Error crawling {url}: {str(e)}")
-            update_entry_status(tracking_db_path, entry_id, "failed")
-            stats["failed_count"] += 1
+        else:
+            crawlable.append(entry)
+    if not crawlable:
+        return stats
+    print(f"Crawling {len(crawlable)} URLs")
+    start_time = time.perf_counter()
+    asyncio.run(
+        crawl_and_store_entries(
+            tracking_db_path,
+            crawlable,
+            stats,
+            parse_executor,
+            concurrency=concurrency,
+            per_host_limit=per_host_limit,
+            per_host_delay=per_host_delay,
+            max_bytes=max_bytes,
+        )
+    )
+    stats["elapsed_seconds"] = time.perf_counter() - start_time
     return stats
 
 
@@ -51,9 +115,11 @@ def print_stats(stats):
     print(f"Successfully crawled: {stats['success_count']}")
     print(f"Failed: {stats['failed_count']}")
     print(f"Skipped (no URL): {stats['skipped_count']}")
+    if stats.get("elapsed_seconds"):
+        print(f"Throughput: {stats['success_count'] / stats['elapsed_seconds']:.1f} pages/sec")
 
 
-def crawl_in_batches(tracking_db_path=None, batch_size=20, total_batches=5, delay_between_batches=10):
+def crawl_in_batches(tracking_db_path=None, batch_size=100, total_batches=10, parse_workers=None, **crawl_options):
     if tracking_db_path is None:
         tracking_db_path = get_tracking_db_path()
     total_stats = {
@@ -61,22 +127,59 @@ def crawl_in_batches(tracking_db_path=None, batch_size=20, total_batches=5, dela
         "success_count": 0,
         "failed_count": 0,
         "skipped_count": 0,
+        "elapsed_seconds": 0.0,
     }
-    for i in range(total_batches):
-        print(f"\nProcessing batch {i + 1}/{total_batches}")
-        batch_stats = crawl_pending_entries(tracking_db_path=tracking_db_path, batch_size=batch_size)
-        total_stats["total_entries"] += batch_stats["total_entries"]
-        total_stats["success_count"] += batch_stats["success_count"]
-        total_stats["failed_count"] += batch_stats["failed_count"]
-        total_stats["skipped_count"] += batch_stats["skipped_count"]
-        if batch_stats["total_entries"] == 0:
-            print("No more entries to process")
-            break
-        if i < total_batches - 1:
-            print(f"Waiting {delay_between_batches} seconds before next batch...")
+    ensure_article_content_columns(tracking_db_path)
+    ensure_article_search_index(tracking_db_path)
+    ensure_entry_lease_columns(tracking_db_path)
+    worker_id = new_worker_id()
+    with ProcessPoolExecutor(max_workers=parse_workers) as parse_executor:
+        for i in range(total_batches):
+            print(f"\nProcessing batch {i + 1}/{total_batches}")
+            batch_stats = crawl_pending_entries(
+                tracking_db_path=tracking_db_path,
+                batch_size=batch_size,
+                parse_executor=parse_executor,
+                worker_id=worker_id,
+                **crawl_options,
+            )
+            for key in total_stats:
+                total_stats[key] += batch_stats[key]
+            if batch_stats["total_entries"] == 0:
+                print("No more entries to process")
+                break
     return total_stats
 
 
-if __name__ == "__main__":
-    stats = crawl_in_batches(batch_size=20, total_batches=50)
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(description="Crawl pending feed entry URLs")
+    parser.add_argument("--batch_size", type=int, default=100, help="Entries claimed per batch")
+    parser.add_argument("--total_batches", type=int, default=10, help="Maximum number of batches per run")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Maximum number of requests in flight")
+    parser.add_argument("--per_host_limit", type=int, default=DEFAULT_PER_HOST_LIMIT, help="Maximum concurrent requests to a single host")
+    parser.add_argument(
+        "--per_host_delay",
+        type=float,
+        default=DEFAULT_PER_HOST_DELAY,
+        help="Minimum seconds between request starts to the same host",
+    )
+    parser.add_argument("--max_bytes", type=int, default=MAX_HTML_BYTES, help="Stop reading a page after this many bytes")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_arguments(argv)
+    stats = crawl_in_batches(
+        batch_size=args.batch_size,
+        total_batches=args.total_batches,
+        concurrency=args.concurrency,
+        per_host_limit=args.per_host_limit,
+        per_host_delay=args.per_host_delay,
+        max_bytes=args.max_bytes,
+    )
     print_stats(stats)
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -15,6 +15,7 @@ async def read_articles(
     date_from: Optional[str] = Query(None, description="Filter by start date (format: YYYY-MM-DD)"),
     date_to: Optional[str] = Query(None, description="Filter by end date (format: YYYY-MM-DD)"),
     search: Optional[str] = Query(None, description="Search in title and summary"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page, replaces page for deep paging"),
 ):
     """
     Get all articles with pagination and filtering.
@@ -26,9 +27,10 @@ async def read_articles(
     - **date_from**: Filter by start date (format: YYYY-MM-DD)
     - **date_to**: Filter by end date (format: YYYY-MM-DD)
     - **search**: Search in title and summary
+    - **cursor**: next_cursor of the previous page, faster than page for deep pages
     """
     return await article_service.get_articles(
-        page=page, per_page=per_page, source=source, category=category, date_from=date_from, date_to=date_to, search=search
+        page=page, per_page=per_page, source=source, category=category, date_from=date_from, date_to=date_to, search=search, cursor=cursor
     )
 
 
@@ -49,6 +49,12 @@ async def check_status(request: StatusRequest):
     return await podcast_agent_service.check_result_status(request)
 
 
+@router.get("/stream")
+async def stream_progress(session_id: str, task_id: Optional[str] = None):
+    """Stream stage and state changes for the session's running task as server-sent events"""
+    return await podcast_agent_service.stream_progress(session_id, task_id)
+
+
 @router.get("/sessions")
 async def list_sessions(page: int = 1, per_page: int = 10):
     """List all saved podcast sessions with pagination"""
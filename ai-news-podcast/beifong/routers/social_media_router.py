@@ -19,6 +19,7 @@ async def read_posts(
     date_from: Optional[str] = Query(None, description="Filter by start date (format: YYYY-MM-DD)"),
     date_to: Optional[str] = Query(None, description="Filter by end date (format: YYYY-MM-DD)"),
     search: Optional[str] = Query(None, description="Search in post text, user display name, or handle"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page, replaces page for deep paging"),
 ):
     """
     Get all social media posts with pagination and filtering.
@@ -33,6 +34,7 @@ async def read_posts(
         date_from=date_from,
         date_to=date_to,
         search=search,
+        cursor=cursor,
     )
 
 
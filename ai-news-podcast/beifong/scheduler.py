@@ -1,7 +1,6 @@
 import os
 import time
 import signal
-import subprocess
 from datetime import datetime
 import traceback
 from concurrent.futures import ThreadPoolExecutor
@@ -11,14 +10,28 @@ from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
 from db.config import get_tasks_db_path
 from db.connection import db_connection
 from db.tasks import (
+    get_enabled_task_by_type,
     get_pending_tasks,
     update_task_last_run,
     update_task_execution,
 )
+from utils.task_runner import TaskRunner
+from utils.pipeline_scheduler import PIPELINE_POLL_SECONDS, PipelineScheduler
 
 running = True
 MAX_WORKERS = 5
 DEFAULT_TASK_TIMEOUT = 3600
+task_runner = TaskRunner(MAX_WORKERS)
+
+
+def run_pipeline_stage(task_type):
+    task = get_enabled_task_by_type(get_tasks_db_path(), task_type)
+    if task is None:
+        return
+    execute_task(task["id"], task["command"])
+
+
+pipeline = PipelineScheduler(run_pipeline_stage)
 
 
 def cleanup_stuck_tasks():
@@ -94,31 +107,12 @@ def execute_task(task_id, command):
             return
     print(f"INFO: Starting task {task_id}: {command}")
     try:
-        process = subprocess.Popen(
-            command,
-            shell=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-        )
-        try:
-            stdout, stderr = process.communicate(timeout=DEFAULT_TASK_TIMEOUT)
-            if process.returncode == 0:
-                status = "success"
-                error_message = None
-                print(f"INFO: Task {task_id} completed successfully")
-            else:
-                status = "failed"
-                error_message = stderr if stderr else f"Process exited with code {process.returncode}"
-                print(f"ERROR: Task {task_id} failed: {error_message}")
-        except subprocess.TimeoutExpired:
-            process.kill()
-            stdout, stderr = process.communicate()
-            status = "failed"
-            error_message = f"Task timed out after {DEFAULT_TASK_TIMEOUT} seconds"
-            print(f"ERROR: Task {task_id} timed out")
-        output = f"STDOUT:\n{stdout}\n\nSTDERR:\n{stderr}" if stderr else stdout
-        update_task_execution(tasks_db_path, execution_id, status, error_message, output)
+        result = task_runner.run(command, DEFAULT_TASK_TIMEOUT)
+        if result["status"] == "success":
+            print(f"INFO: Task {task_id} completed successfully in {result['seconds']:.1f}s ({result['mode']})")
+        else:
+            print(f"ERROR: Task {task_id} failed: {result['error_message']}")
+        update_task_execution(tasks_db_path, execution_id, result["status"], result["error_message"], result["output"])
         timestamp = datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
         update_task_last_run(tasks_db_path, task_id, timestamp)
     except Exception as e:
@@ -142,6 +136,9 @@ def check_for_tasks():
             for task in pending_tasks:
                 task_id = task["id"]
                 command = task["command"]
+                if pipeline.is_held(task["task_type"]):
+                    print(f"INFO: Holding task {task_id}: {task['name']}, the next pipeline stage is backlogged")
+                    continue
                 print(f"INFO: Scheduling task {task_id}: {task['name']} (Last run: {task['last_run']})")
                 executor.submit(execute_task, task_id, command)
     except Exception as e:
@@ -175,6 +172,8 @@ def main():
     print("INFO: Starting task scheduler")
     tasks_db_path = get_tasks_db_path()
     cleanup_stuck_tasks()
+    task_runner.start()
+    pipeline.start()
     scheduler_dir = os.path.dirname(tasks_db_path)
     os.makedirs(scheduler_dir, exist_ok=True)
     scheduler_db_path = os.path.join(scheduler_dir, "scheduler.sqlite")
@@ -188,16 +187,19 @@ def main():
         replace_existing=True,
     )
     scheduler.start()
-    print("INFO: Scheduler started, checking for tasks every minute")
+    print(f"INFO: Scheduler started, checking for tasks every minute and for new pipeline work every {PIPELINE_POLL_SECONDS}s")
     check_for_tasks()
     check_missed_tasks()
     try:
         while running:
-            time.sleep(1)
+            pipeline.poll()
+            time.sleep(PIPELINE_POLL_SECONDS)
     except (KeyboardInterrupt, SystemExit):
         print("INFO: Scheduler interrupted")
     finally:
         scheduler.shutdown()
+        pipeline.shutdown()
+        task_runner.shutdown()
         print("INFO: Scheduler shutdown complete")
 
 
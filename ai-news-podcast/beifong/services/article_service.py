@@ -1,7 +1,10 @@
 from typing import List, Optional, Dict, Any
+from operator import itemgetter
 from fastapi import HTTPException
 import json
 from services.db_service import tracking_db, sources_db
+from db.articles import ARTICLE_SEARCH_MATCHES, build_search_query
+from services.pagination import count_cache, decode_cursor, keyset_condition, page_info
 from models.article_schemas import Article, PaginatedArticles
 
 
@@ -17,16 +20,18 @@ class ArticleService:
         date_to: Optional[str] = None,
         search: Optional[str] = None,
         category: Optional[str] = None,
+        cursor: Optional[str] = None,
     ) -> PaginatedArticles:
-        """Get articles with pagination and filtering."""
+        """Get articles with pagination and filtering, by page number or by the ``next_cursor`` of the previous page."""
         try:
-            offset = (page - 1) * per_page
-            query_parts = [
-                "SELECT ca.id, ca.title, ca.url, ca.published_date, ca.summary, ca.feed_id",
-                "FROM crawled_articles ca",
-                "WHERE ca.processed = 1 AND ca.ai_status = 'success'",
-            ]
+            from_parts = ["FROM crawled_articles ca"]
+            conditions = ["ca.processed = 1", "ca.ai_status = 'success'"]
+            join_params = []
             query_params = []
+            match_query = build_search_query([search], columns=("title", "summary")) if search else None
+            if match_query:
+                from_parts.append(f"JOIN ({ARTICLE_SEARCH_MATCHES}) matches ON matches.article_id = ca.id")
+                join_params.append(match_query)
             if source:
                 source_id_query = "SELECT id FROM sources WHERE name = ?"
                 source_id_result = await sources_db.execute_query(source_id_query, (source,), fetch=True, fetch_one=True)
@@ -36,37 +41,48 @@ class ArticleService:
                     if feed_ids_result:
                         feed_ids = [item["id"] for item in feed_ids_result]
                         placeholders = ",".join(["?" for _ in feed_ids])
-                        query_parts.append(f"AND ca.feed_id IN ({placeholders})")
+                        conditions.append(f"ca.feed_id IN ({placeholders})")
                         query_params.extend(feed_ids)
             if category:
-                query_parts.append("""
-                    AND EXISTS (
-                        SELECT 1 FROM article_categories ac 
-                        WHERE ac.article_id = ca.id AND ac.category_name = ?
-                    )
-                """)
+                conditions.append(
+                    "EXISTS (SELECT 1 FROM article_categories ac WHERE ac.article_id = ca.id AND ac.category_name = ?)"
+                )
                 query_params.append(category.lower())
+            # plain comparisons on the stored ISO dates keep the published_date index usable
             if date_from:
-                query_parts.append("AND datetime(ca.published_date) >= datetime(?)")
+                conditions.append("ca.published_date >= ?")
                 query_params.append(date_from)
             if date_to:
-                query_parts.append("AND datetime(ca.published_date) <= datetime(?)")
+                conditions.append("ca.published_date <= ?")
                 query_params.append(date_to)
-            if search:
-                query_parts.append("AND (ca.title LIKE ? OR ca.summary LIKE ?)")
-                search_param = f"%{search}%"
-                query_params.extend([search_param, search_param])
-            count_query = " ".join(query_parts).replace(
-                "SELECT ca.id, ca.title, ca.url, ca.published_date, ca.summary, ca.feed_id",
-                "SELECT COUNT(*)",
-            )
-            total_articles = await tracking_db.execute_query(count_query, tuple(query_params), fetch=True, fetch_one=True)
-            total_count = total_articles.get("COUNT(*)", 0) if total_articles else 0
-            query_parts.append("ORDER BY datetime(ca.published_date) DESC, ca.id DESC")
-            query_parts.append("LIMIT ? OFFSET ?")
-            query_params.extend([per_page, offset])
-            articles_query = " ".join(query_parts)
-            articles = await tracking_db.execute_query(articles_query, tuple(query_params), fetch=True)
+            filtered = f"{' '.join(from_parts)} WHERE {' AND '.join(conditions)}"
+            filter_params = (*join_params, *query_params)
+
+            async def count_articles():
+                result = await tracking_db.execute_query(f"SELECT COUNT(*) AS count {filtered}", filter_params, fetch=True, fetch_one=True)
+                return result["count"] if result else 0
+
+            total_count = await count_cache.get_or_count((tracking_db.db_path, filtered, filter_params), count_articles)
+            select = "SELECT ca.id, ca.title, ca.url, ca.published_date, ca.summary, ca.feed_id"
+            if match_query:
+                # relevance order has no stable keyset, search results are paged by number
+                articles_query = f"{select} {filtered} ORDER BY matches.score, ca.published_date DESC, ca.id DESC LIMIT ? OFFSET ?"
+                articles_params = (*filter_params, per_page + 1, (page - 1) * per_page)
+                sort_key = None
+            elif cursor:
+                published_date, article_id = decode_cursor(cursor, 2)
+                articles_query = (
+                    f"{select} {filtered} AND {keyset_condition(['ca.published_date', 'ca.id'])} "
+                    "ORDER BY ca.published_date DESC, ca.id DESC LIMIT ?"
+                )
+                articles_params = (*filter_params, published_date, article_id, per_page + 1)
+                sort_key = itemgetter("published_date", "id")
+            else:
+                articles_query = f"{select} {filtered} ORDER BY ca.published_date DESC, ca.id DESC LIMIT ? OFFSET ?"
+                articles_params = (*filter_params, per_page + 1, (page - 1) * per_page)
+                sort_key = itemgetter("published_date", "id")
+            articles = await tracking_db.execute_query(articles_query, articles_params, fetch=True)
+            articles, pagination = page_info(articles, per_page, page, total_count, cursor, sort_key)
             feed_ids = [article["feed_id"] for article in articles if article.get("feed_id")]
             source_names = {}
             if feed_ids:
@@ -79,23 +95,13 @@ class ArticleService:
                 """
                 sources_result = await sources_db.execute_query(source_query, tuple(feed_ids), fetch=True)
                 source_names = {item["feed_id"]: item["source_name"] for item in sources_result}
+            categories = await self.get_categories_for_articles([article["id"] for article in articles])
             for article in articles:
                 feed_id = article.get("feed_id")
                 article["source_name"] = source_names.get(feed_id, "Unknown Source")
                 article.pop("feed_id", None)
-                article["categories"] = await self.get_article_categories(article["id"])
-            total_pages = (total_count + per_page - 1) // per_page if total_count > 0 else 0
-            has_next = page < total_pages
-            has_prev = page > 1
-            return PaginatedArticles(
-                items=articles,
-                total=total_count,
-                page=page,
-                per_page=per_page,
-                total_pages=total_pages,
-                has_next=has_next,
-                has_prev=has_prev,
-            )
+                article["categories"] = categories.get(article["id"], [])
+            return PaginatedArticles(items=articles, **pagination)
         except Exception as e:
             if isinstance(e, HTTPException):
                 raise e
@@ -150,6 +156,17 @@ class ArticleService:
         categories = await tracking_db.execute_query(query, (article_id,), fetch=True)
         return [category.get("category_name", "") for category in categories]
 
+    async def get_categories_for_articles(self, article_ids: List[int]) -> Dict[int, List[str]]:
+        """Get categories for several articles in one query."""
+        if not article_ids:
+            return {}
+        placeholders = ",".join("?" for _ in article_ids)
+        query = f"SELECT article_id, category_name FROM article_categories WHERE article_id IN ({placeholders})"
+        categories = {}
+        for row in await tracking_db.execute_query(query, tuple(article_ids), fetch=True):
+            categories.setdefault(row["article_id"], []).append(row["category_name"])
+        return categories
+
     async def get_sources(self) -> List[str]:
         """Get all available active sources."""
         query = """
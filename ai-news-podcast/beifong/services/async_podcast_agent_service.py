@@ -2,7 +2,8 @@ import os
 import json
 import uuid
 from fastapi import status
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
+from types import SimpleNamespace
 import aiosqlite
 import glob
 from redis.asyncio import ConnectionPool, Redis
@@ -11,6 +12,7 @@ from db.agent_config_v2 import PODCAST_DIR, PODCAST_AUIDO_DIR, PODCAST_IMG_DIR,
 from services.celery_tasks import agent_chat
 from dotenv import load_dotenv
 from services.internal_session_service import SessionService
+from services.progress_events import ProgressHub, progress_stream
 
 load_dotenv()
 
@@ -27,6 +29,7 @@ class PodcastAgentService:
         self.redis_db = int(os.environ.get("REDIS_DB", 0))
         self.redis_pool = ConnectionPool.from_url(f"redis://{self.redis_host}:{self.redis_port}/{self.redis_db + 1}", max_connections=10)
         self.redis = Redis(connection_pool=self.redis_pool)
+        self.progress_hub = ProgressHub(self.redis)
 
     async def get_active_task(self, session_id):
         try:
@@ -173,6 +176,18 @@ class PodcastAgentService:
                 },
             )
 
+    async def stream_progress(self, session_id, task_id=None):
+        task_id = task_id or await self.get_active_task(session_id)
+        request = SimpleNamespace(session_id=session_id, task_id=task_id)
+
+        async def get_status():
+            result = await self.check_result_status(request)
+            # an error response ends the stream with its content as the final event
+            return json.loads(result.body) if isinstance(result, JSONResponse) else result
+
+        events = progress_stream(self.progress_hub, session_id, get_status, lambda: SessionService.get_state_json(session_id))
+        return StreamingResponse(events, media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
     async def get_session_state(self, session_id):
         try:
             db_path = get_agent_session_db_path()
@@ -189,13 +204,13 @@ class PodcastAgentService:
                     "is_processing": False,
                 }
 
-            session = SessionService.get_session(session_id)
-            session_state = session.get("state", {})
+            # polled by the UI: cached JSON text for the current version, no full parse
+            stage = SessionService.get_state_values(session_id, ["stage"]).get("stage", "idle")
             return {
                 "session_id": session_id,
                 "response": "",
-                "stage": session_state.get("stage", "idle"),
-                "session_state": json.dumps(session_state),
+                "stage": stage,
+                "session_state": SessionService.get_state_json(session_id),
                 "is_processing": False,
             }
         except Exception as e:
@@ -240,8 +255,7 @@ class PodcastAgentService:
                     sessions = []
                     for row in rows:
                         try:
-                            session = SessionService.get_session(row["session_id"])
-                            session_state = session.get("state", {})
+                            session_state = SessionService.get_state_values(row["session_id"], ["title", "stage"])
                             title = session_state.get("title", "Untitled Podcast")
                             stage = session_state.get("stage", "welcome")
                             updated_at = row["updated_at"]
@@ -271,8 +285,9 @@ class PodcastAgentService:
                 if not row:
                     return JSONResponse(status_code=status.HTTP_404_NOT_FOUND, content={"error": f"Session with ID {session_id} not found"})
                 try:
-                    session = SessionService.get_session(session_id)
-                    session_state = session.get("state", {})
+                    session_state = SessionService.get_state_values(
+                        session_id, ["stage", "podcast_generated", "banner_url", "audio_url", "web_search_recording"]
+                    )
                     stage = session_state.get("stage")
                     is_completed = stage == "complete" or session_state.get("podcast_generated", False)
                     banner_url = session_state.get("banner_url")
@@ -3,7 +3,10 @@ from agno.models.openai import OpenAIChat
 from agno.storage.sqlite import SqliteStorage
 import os
 from dotenv import load_dotenv
-from services.celery_app import app, SessionLockedTask
+from celery.signals import worker_ready
+from services.celery_app import app, SessionLockedTask, redis_client
+from services.progress_events import ProgressPublisher
+from services.session_store import session_store
 from db.config import get_agent_session_db_path
 from db.agent_config_v2 import (
     AGENT_DESCRIPTION,
@@ -19,11 +22,19 @@ from tools.user_source_selection import user_source_selection_run
 from tools.session_state_manager import update_language, update_chat_title, mark_session_finished
 from agents.image_generate_agent import image_generation_agent_run
 from agents.audio_generate_agent import audio_generate_agent_run
-import json
 
 load_dotenv()
 
 db_file = get_agent_session_db_path()
+# every state change saved while a task runs reaches the open progress streams as a delta
+progress = ProgressPublisher(redis_client)
+session_store.listeners.append(progress.publish_state)
+
+
+def finish_chat(result):
+    # the final state already went out as deltas, so the done event leaves it out
+    progress.publish(result["session_id"], "done", **{key: value for key, value in result.items() if key not in ("session_id", "session_state")})
+    return result
 
 
 @app.task(bind=True, max_retries=0, base=SessionLockedTask)
@@ -34,6 +45,7 @@ def agent_chat(self, session_id, message):
         os.makedirs(os.path.dirname(db_file), exist_ok=True)
         from services.internal_session_service import SessionService
 
+        progress.publish(session_id, "started", stage="processing", task_id=self.request.id, is_processing=True, process_type="chat")
         session_state = SessionService.get_session(session_id).get("state", INITIAL_SESSION_STATE)
 
         _agent = Agent(
@@ -64,22 +76,41 @@ def agent_chat(self, session_id, message):
         response = _agent.run(message, session_id=session_id)
         print(f"Response generated for session {session_id}")
         _agent.write_to_storage(session_id=session_id)
-        session_state = SessionService.get_session(session_id).get("state", INITIAL_SESSION_STATE)
-        return {
+        return finish_chat({
             "session_id": session_id,
             "response": response.content,
             "stage": _agent.session_state.get("stage", "unknown"),
-            "session_state": json.dumps(session_state),
+            "session_state": SessionService.get_state_json(session_id),
             "is_processing": False,
             "process_type": None,
-        }
+        })
     except Exception as e:
         print(f"Error in agent_chat for session {session_id}: {str(e)}")
-        return {
+        return finish_chat({
             "session_id": session_id,
             "response": f"I'm sorry, I encountered an error: {str(e)}. Please try again.",
             "stage": "error",
             "session_state": "{}",
             "is_processing": False,
             "process_type": None,
-        }
+        })
+
+
+@worker_ready.connect
+def warm_up_tts_engines(**kwargs):
+    # the worker runs a threads pool, so pipelines loaded here serve every task in the process
+    from utils.tts_engine_selector import TTS_WARM_LANGUAGES, kokoro_registry
+
+    if not TTS_WARM_LANGUAGES:
+        return
+    try:
+        print(f"Kokoro warm-up timings: {kokoro_registry.warm_up()}")
+    except Exception as e:
+        print(f"Kokoro warm-up failed, pipelines will load on first use: {str(e)}")
+
+
+@app.task(name="tts_engine_health")
+def tts_engine_health():
+    from utils.tts_engine_selector import kokoro_registry
+
+    return kokoro_registry.health()
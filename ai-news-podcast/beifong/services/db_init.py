@@ -5,6 +5,11 @@ import time
 from contextlib import contextmanager
 from concurrent.futures import ThreadPoolExecutor
 from services.db_service import get_db_path
+from db.articles import create_article_search_index, normalize_published_dates
+from db.pipeline import create_pipeline_changes
+from db.leases import ensure_lease_columns
+from tools.social.db import create_post_label_tables
+from services.session_store import create_session_patch_tables
 
 
 @contextmanager
@@ -90,7 +95,11 @@ def init_tracking_db():
             last_processed TIMESTAMP,
             last_etag TEXT,
             last_modified TEXT,
-            entry_hash TEXT
+            entry_hash TEXT,
+            poll_interval REAL,
+            next_poll_at TIMESTAMP,
+            failure_count INTEGER DEFAULT 0,
+            publish_interval REAL
         )
         """)
         cursor.execute("""
@@ -107,6 +116,7 @@ def init_tracking_db():
             crawl_status TEXT DEFAULT 'pending',
             crawl_attempts INTEGER DEFAULT 0,
             processed_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            fingerprint TEXT,
             UNIQUE(feed_id, entry_id)
         )
         """)
@@ -121,6 +131,7 @@ def init_tracking_db():
             published_date TIMESTAMP,
             raw_content TEXT,
             content TEXT,
+            content_tokens INTEGER,
             summary TEXT,
             metadata TEXT,
             ai_status TEXT DEFAULT 'pending',
@@ -151,8 +162,19 @@ def init_tracking_db():
             FOREIGN KEY (article_id) REFERENCES crawled_articles(id)
         )
         """)
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS embedding_cache (
+            text_hash TEXT NOT NULL,
+            embedding_model TEXT NOT NULL,
+            embedding BLOB NOT NULL,
+            created_at TEXT NOT NULL,
+            PRIMARY KEY (text_hash, embedding_model)
+        )
+        """)
         indexes = [
             "CREATE INDEX IF NOT EXISTS idx_feed_entries_feed_id ON feed_entries(feed_id)",
+            "CREATE INDEX IF NOT EXISTS idx_feed_entries_fingerprint ON feed_entries(feed_id, fingerprint)",
+            "CREATE INDEX IF NOT EXISTS idx_feed_tracking_next_poll_at ON feed_tracking(next_poll_at)",
             "CREATE INDEX IF NOT EXISTS idx_feed_entries_link ON feed_entries(link)",
             "CREATE INDEX IF NOT EXISTS idx_crawled_articles_url ON crawled_articles(url)",
             "CREATE INDEX IF NOT EXISTS idx_crawled_articles_entry_id ON crawled_articles(entry_id)",
@@ -164,9 +186,15 @@ def init_tracking_db():
             "CREATE INDEX IF NOT EXISTS idx_article_embeddings_article_id ON article_embeddings(article_id)",
             "CREATE INDEX IF NOT EXISTS idx_article_embeddings_in_faiss ON article_embeddings(in_faiss_index)",
             "CREATE INDEX IF NOT EXISTS idx_crawled_articles_embedding_status ON crawled_articles(embedding_status)",
+            "CREATE INDEX IF NOT EXISTS idx_crawled_articles_listing ON crawled_articles(ai_status, processed, published_date)",
         ]
         for index_sql in indexes:
             cursor.execute(index_sql)
+        create_article_search_index(conn)
+        create_pipeline_changes(conn)
+        ensure_lease_columns(conn, "feed_entries", "crawl_status")
+        ensure_lease_columns(conn, "crawled_articles", "ai_status")
+        normalize_published_dates(conn)
         conn.commit()
     elapsed = time.time() - start_time
     print(f"Tracking database initialized in {elapsed:.3f}s")
@@ -292,6 +320,7 @@ def init_internal_sessions_db():
         )
         """)
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_session_state_session_id ON session_state(session_id)")
+        create_session_patch_tables(conn)
         conn.commit()
     elapsed = time.time() - start_time
     print(f"Internal sessions database initialized in {elapsed:.3f}s")
@@ -335,10 +364,12 @@ def init_social_media_db():
             "CREATE INDEX IF NOT EXISTS idx_posts_platform ON posts(platform)",
             "CREATE INDEX IF NOT EXISTS idx_posts_user_handle ON posts(user_handle)",
             "CREATE INDEX IF NOT EXISTS idx_posts_post_timestamp ON posts(post_timestamp)",
+            "CREATE INDEX IF NOT EXISTS idx_posts_timestamp_post_id ON posts(post_timestamp, post_id)",
             "CREATE INDEX IF NOT EXISTS idx_posts_sentiment ON posts(sentiment)",
         ]
         for index_sql in indexes:
             cursor.execute(index_sql)
+        create_post_label_tables(conn)
         conn.commit()
     elapsed = time.time() - start_time
     print(f"Social media database initialized in {elapsed:.3f}s")
@@ -1,22 +1,28 @@
 import os
+import asyncio
 from typing import Dict, List, Any, Tuple, Union
+from concurrent.futures import ThreadPoolExecutor
 from fastapi import HTTPException
 from contextlib import contextmanager
-import sqlite3
 from db.config import get_db_path
+from db.connection import DEFAULT_POOL_SIZE, get_connection_pool
+
+# sqlite calls run on these threads so request handlers never block the event loop
+_db_executor = ThreadPoolExecutor(max_workers=DEFAULT_POOL_SIZE, thread_name_prefix="db")
 
 
 @contextmanager
 def db_connection(db_path: str):
-    """Context manager for database connections."""
+    """Context manager for pooled database connections."""
     if not os.path.exists(db_path):
         raise HTTPException(status_code=404, detail=f"Database {db_path} not found. Initialize the database first.")
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    try:
+    with get_connection_pool(db_path).connection() as conn:
         yield conn
-    finally:
-        conn.close()
+
+
+async def run_in_db_executor(func, *args):
+    """Run a blocking database function on the shared database thread pool."""
+    return await asyncio.get_running_loop().run_in_executor(_db_executor, func, *args)
 
 
 class DatabaseService:
@@ -31,13 +37,10 @@ class DatabaseService:
         """
         self.db_path = get_db_path(db_name)
 
-    async def execute_query(
-        self, query: str, params: Tuple = (), fetch: bool = False, fetch_one: bool = False
-    ) -> Union[List[Dict[str, Any]], Dict[str, Any], int]:
-        """Execute a query with error handling for FastAPI."""
-        try:
-            with db_connection(self.db_path) as conn:
-                cursor = conn.cursor()
+    def _execute_query(self, query: str, params: Tuple, fetch: bool, fetch_one: bool):
+        with db_connection(self.db_path) as conn:
+            cursor = conn.cursor()
+            try:
                 cursor.execute(query, params)
 
                 if fetch_one:
@@ -48,6 +51,22 @@ class DatabaseService:
                 else:
                     conn.commit()
                     return cursor.lastrowid
+            finally:
+                cursor.close()
+
+    def _execute_write_many(self, query: str, params_list: List[Tuple]) -> int:
+        with db_connection(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.executemany(query, params_list)
+            conn.commit()
+            return cursor.rowcount
+
+    async def execute_query(
+        self, query: str, params: Tuple = (), fetch: bool = False, fetch_one: bool = False
+    ) -> Union[List[Dict[str, Any]], Dict[str, Any], int]:
+        """Execute a query with error handling for FastAPI."""
+        try:
+            return await run_in_db_executor(self._execute_query, query, params, fetch, fetch_one)
         except Exception as e:
             if isinstance(e, HTTPException):
                 raise e
@@ -56,18 +75,13 @@ class DatabaseService:
     async def execute_write_many(self, query: str, params_list: List[Tuple]) -> int:
         """Execute multiple write operations in a single transaction."""
         try:
-            with db_connection(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.executemany(query, params_list)
-                conn.commit()
-                return cursor.rowcount
+            return await run_in_db_executor(self._execute_write_many, query, params_list)
         except Exception as e:
             if isinstance(e, HTTPException):
                 raise e
             raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 
-
 sources_db = DatabaseService(db_name="sources_db")
 tracking_db = DatabaseService(db_name="tracking_db")
 podcasts_db = DatabaseService(db_name="podcasts_db")
@@ -1,23 +1,17 @@
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from fastapi import HTTPException
-import json
-from datetime import datetime
 from db.config import get_db_path
+from db.connection import db_connection
 from db.agent_config_v2 import INITIAL_SESSION_STATE
-import sqlite3
+from services.session_store import session_store
 from contextlib import contextmanager
 
 
 @contextmanager
 def get_db_connection(db_name: str):
-    """Get a fresh database connection each time."""
-    db_path = get_db_path(db_name)
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    try:
+    """Get a pooled connection to the named database."""
+    with db_connection(get_db_path(db_name)) as conn:
         yield conn
-    finally:
-        conn.close()
 
 
 class SessionService:
@@ -26,65 +20,47 @@ class SessionService:
     @staticmethod
     def get_session(session_id: str) -> Dict[str, Any]:
         try:
-            with get_db_connection("internal_sessions_db") as conn:
-                cursor = conn.cursor()
-                query = """
-                SELECT session_id, state, created_at
-                FROM session_state
-                WHERE session_id = ?
-                """
-                cursor.execute(query, (session_id,))
-                session = cursor.fetchone()
-                if not session:
-                    return SessionService._initialize_session(session_id)
-                session_dict = dict(session)
-                if session_dict.get("state"):
-                    try:
-                        session_dict["state"] = json.loads(session_dict["state"])
-                    except json.JSONDecodeError:
-                        session_dict["state"] = {}
-                return session_dict
+            entry = session_store.get(session_id)
+            if entry is None:
+                return SessionService._initialize_session(session_id)
+            return {"session_id": session_id, "state": entry.state(), "created_at": entry.created_at}
         except Exception as e:
             if isinstance(e, HTTPException):
                 raise e
             raise HTTPException(status_code=500, detail=f"Error fetching session: {str(e)}")
 
+    @staticmethod
+    def get_state_json(session_id: str) -> str:
+        """The session state as JSON text, served from the version cache without parsing it."""
+        try:
+            entry = session_store.get(session_id) or session_store.create(session_id, INITIAL_SESSION_STATE)
+            return entry.state_json
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error fetching session: {str(e)}")
+
+    @staticmethod
+    def get_state_values(session_id: str, keys: List[str]) -> Dict[str, Any]:
+        """Only the given top-level state keys; an unknown session returns an empty dict."""
+        try:
+            entry = session_store.get(session_id)
+            return entry.values(keys) if entry else {}
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error fetching session: {str(e)}")
+
     @staticmethod
     def _initialize_session(session_id: str) -> Dict[str, Any]:
         try:
-            with get_db_connection("internal_sessions_db") as conn:
-                cursor = conn.cursor()
-                state_json = json.dumps(INITIAL_SESSION_STATE)
-                insert_query = """
-                INSERT INTO session_state (session_id, state, created_at)
-                VALUES (?, ?, ?)
-                """
-                current_time = datetime.now().isoformat()
-                cursor.execute(insert_query, (session_id, state_json, current_time))
-                conn.commit()
-                return {"session_id": session_id, "state": INITIAL_SESSION_STATE, "created_at": current_time}
+            entry = session_store.create(session_id, INITIAL_SESSION_STATE)
+            return {"session_id": session_id, "state": entry.state(), "created_at": entry.created_at}
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error initializing session: {str(e)}")
 
     @staticmethod
     def save_session(session_id: str, state: Dict[str, Any]) -> Dict[str, Any]:
         try:
-            state_json = json.dumps(state)
-            with get_db_connection("internal_sessions_db") as conn:
-                cursor = conn.cursor()
-                conn.execute("BEGIN IMMEDIATE")
-                existing_query = "SELECT session_id FROM session_state WHERE session_id = ?"
-                cursor.execute(existing_query, (session_id,))
-                existing_session = cursor.fetchone()
-                if existing_session:
-                    update_query = "UPDATE session_state SET state = ? WHERE session_id = ?"
-                    cursor.execute(update_query, (state_json, session_id))
-                else:
-                    insert_query = "INSERT INTO session_state (session_id, state, created_at) VALUES (?, ?, ?)"
-                    current_time = datetime.now().isoformat()
-                    cursor.execute(insert_query, (session_id, state_json, current_time))
-                conn.commit()
-            return SessionService.get_session(session_id)
+            # only the keys that changed are written, and the saved state is returned as is
+            entry = session_store.save(session_id, state)
+            return {"session_id": session_id, "state": state, "created_at": entry.created_at}
         except Exception as e:
             if isinstance(e, HTTPException):
                 raise e
@@ -93,17 +69,9 @@ class SessionService:
     @staticmethod
     def delete_session(session_id: str) -> Dict[str, str]:
         try:
-            with get_db_connection("internal_sessions_db") as conn:
-                cursor = conn.cursor()
-                existing_query = "SELECT session_id FROM session_state WHERE session_id = ?"
-                cursor.execute(existing_query, (session_id,))
-                existing_session = cursor.fetchone()
-                if not existing_session:
-                    raise HTTPException(status_code=404, detail="Session not found")
-                delete_query = "DELETE FROM session_state WHERE session_id = ?"
-                cursor.execute(delete_query, (session_id,))
-                conn.commit()
-                return {"message": f"Session with ID {session_id} successfully deleted"}
+            if not session_store.delete(session_id):
+                raise HTTPException(status_code=404, detail="Session not found")
+            return {"message": f"Session with ID {session_id} successfully deleted"}
         except Exception as e:
             if isinstance(e, HTTPException):
                 raise e
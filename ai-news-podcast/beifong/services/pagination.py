@@ -0,0 +1,96 @@
+import json
+import time
+import base64
+import binascii
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, List, Optional, Sequence, Tuple
+from fastapi import HTTPException
+
+COUNT_CACHE_TTL = 30.0
+COUNT_CACHE_SIZE = 512
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode the sort key of the last row of a page as an opaque cursor."""
+    return base64.urlsafe_b64encode(json.dumps(list(values)).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """Decode a cursor produced by ``encode_cursor``, rejecting anything that is not a sort key of ``size`` values."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+    return values
+
+
+def keyset_condition(columns: Sequence[str], descending: bool = True) -> str:
+    """Return a row-value predicate selecting rows after the cursor in ``ORDER BY columns`` order."""
+    return f"({', '.join(columns)}) {'<' if descending else '>'} ({', '.join('?' for _ in columns)})"
+
+
+class CountCache:
+    """
+    Caches filtered ``COUNT(*)`` totals for a few seconds.
+
+    Paging through a listing repeats the same count on every page, and an exact
+    total that lags new rows by ``ttl`` seconds is fine for page navigation.
+    """
+
+    def __init__(self, ttl: float = COUNT_CACHE_TTL, max_size: int = COUNT_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[Tuple, Tuple[float, int]]" = OrderedDict()
+
+    async def get_or_count(self, key: Tuple, count: Callable[[], Awaitable[int]]) -> int:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self._entries.move_to_end(key)
+            return entry[1]
+        total = await count()
+        self._entries[key] = (time.monotonic() + self.ttl, total)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        return total
+
+    def invalidate(self, db_path: Optional[str] = None) -> None:
+        """Drop cached totals, only those of one database when ``db_path`` is given (keys start with it)."""
+        if db_path is None:
+            self._entries.clear()
+            return
+        for key in [key for key in self._entries if key[0] == db_path]:
+            del self._entries[key]
+
+
+def page_info(
+    rows: List[dict],
+    per_page: int,
+    page: int,
+    total: int,
+    cursor: Optional[str],
+    sort_key: Optional[Callable[[dict], Sequence[Any]]],
+) -> Tuple[List[dict], dict]:
+    """
+    Trim the extra row fetched to detect a next page and build the pagination fields.
+
+    ``rows`` holds up to ``per_page + 1`` rows; ``next_cursor`` encodes the sort key of the last
+    returned row, and is left out when ``sort_key`` is None (listings only reachable by page number).
+    """
+    has_next = len(rows) > per_page
+    rows = rows[:per_page]
+    total_pages = (total + per_page - 1) // per_page if total > 0 else 0
+    return rows, {
+        "total": total,
+        "page": page,
+        "per_page": per_page,
+        "total_pages": total_pages,
+        "has_next": has_next,
+        "has_prev": page > 1 or cursor is not None,
+        "next_cursor": encode_cursor(sort_key(rows[-1])) if has_next and sort_key else None,
+    }
+
+
+count_cache = CountCache()
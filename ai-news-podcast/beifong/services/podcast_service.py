@@ -3,8 +3,9 @@ import json
 from typing import List, Dict, Optional, Any
 from datetime import datetime
 from fastapi import HTTPException, UploadFile
+from operator import itemgetter
 from services.db_service import podcasts_db
-import math
+from services.pagination import count_cache, decode_cursor, keyset_condition, page_info
 
 AUDIO_DIR = "podcasts/audio"
 IMAGE_DIR = "podcasts/images"
@@ -28,13 +29,13 @@ class PodcastService:
         language_code: str = None,
         tts_engine: str = None,
         has_audio: bool = None,
+        cursor: str = None,
     ) -> Dict[str, Any]:
         """
         Get a paginated list of podcasts with optional filtering.
+        Pages are addressed by number or by the ``next_cursor`` of the previous page.
         """
         try:
-            offset = (page - 1) * per_page
-            count_query = "SELECT COUNT(*) as count FROM podcasts"
             query = """
             SELECT id, title, date, audio_generated, audio_path, banner_img_path,
                    language_code, tts_engine, created_at
@@ -61,17 +62,25 @@ class PodcastService:
             if has_audio is not None:
                 where_conditions.append("audio_generated = ?")
                 params.append(1 if has_audio else 0)
-            if where_conditions:
-                where_clause = " WHERE " + " AND ".join(where_conditions)
-                query += where_clause
-                count_query += where_clause
-            query += " ORDER BY date DESC, created_at DESC"
-            query += " LIMIT ? OFFSET ?"
-            params.extend([per_page, offset])
-            total_result = await podcasts_db.execute_query(count_query, tuple(params[:-2] if params else ()), fetch=True, fetch_one=True)
-            total_items = total_result.get("count", 0) if total_result else 0
-            total_pages = math.ceil(total_items / per_page) if total_items > 0 else 0
-            podcasts = await podcasts_db.execute_query(query, tuple(params), fetch=True)
+            where_clause = " WHERE " + " AND ".join(where_conditions) if where_conditions else ""
+
+            async def count_podcasts():
+                result = await podcasts_db.execute_query(
+                    f"SELECT COUNT(*) as count FROM podcasts{where_clause}", tuple(params), fetch=True, fetch_one=True
+                )
+                return result.get("count", 0) if result else 0
+
+            total_items = await count_cache.get_or_count((podcasts_db.db_path, where_clause, tuple(params)), count_podcasts)
+            if cursor:
+                keyset = keyset_condition(["date", "id"])
+                query += f"{where_clause} AND {keyset}" if where_clause else f" WHERE {keyset}"
+                query += " ORDER BY date DESC, id DESC LIMIT ?"
+                query_params = (*params, *decode_cursor(cursor, 2), per_page + 1)
+            else:
+                query += where_clause + " ORDER BY date DESC, id DESC LIMIT ? OFFSET ?"
+                query_params = (*params, per_page + 1, (page - 1) * per_page)
+            podcasts = await podcasts_db.execute_query(query, query_params, fetch=True)
+            podcasts, pagination = page_info(podcasts, per_page, page, total_items, cursor, itemgetter("date", "id"))
             for podcast in podcasts:
                 podcast["audio_generated"] = bool(podcast.get("audio_generated", 0))
                 if podcast.get("banner_img_path"):
@@ -80,18 +89,10 @@ class PodcastService:
                     podcast["banner_img"] = None
                 podcast.pop("banner_img_path", None)
                 podcast["identifier"] = str(podcast.get("id", ""))
-            has_next = page < total_pages
-            has_prev = page > 1
-            return {
-                "items": podcasts,
-                "total": total_items,
-                "page": page,
-                "per_page": per_page,
-                "total_pages": total_pages,
-                "has_next": has_next,
-                "has_prev": has_prev,
-            }
+            return {"items": podcasts, **pagination}
         except Exception as e:
+            if isinstance(e, HTTPException):
+                raise e
             raise HTTPException(status_code=500, detail=f"Error loading podcasts: {str(e)}")
 
     async def get_podcast(self, podcast_id: int) -> Optional[Dict[str, Any]]:
@@ -227,6 +228,7 @@ class PodcastService:
             """
             params = (title, date, content_json, sources_json, language_code, tts_engine, current_time)
             podcast_id = await podcasts_db.execute_query(query, params)
+            count_cache.invalidate(podcasts_db.db_path)
             return await self.get_podcast(podcast_id)
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error creating podcast: {str(e)}")
@@ -274,6 +276,7 @@ class PodcastService:
             WHERE id = ?
             """
             await podcasts_db.execute_query(query, tuple(params))
+            count_cache.invalidate(podcasts_db.db_path)
             return await self.get_podcast(podcast_id)
         except Exception as e:
             if isinstance(e, HTTPException):
@@ -288,6 +291,7 @@ class PodcastService:
                 raise HTTPException(status_code=404, detail="Podcast not found")
             query = "DELETE FROM podcasts WHERE id = ?"
             result = await podcasts_db.execute_query(query, (podcast_id,))
+            count_cache.invalidate(podcasts_db.db_path)
             if delete_assets:
                 if existing.get("audio_path"):
                     audio_path = os.path.join(AUDIO_DIR, existing["audio_path"])
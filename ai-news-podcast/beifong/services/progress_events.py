@@ -0,0 +1,191 @@
+import os
+import json
+import time
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+# messages on progress:<session_id> are "<event> <json>", so they can be relayed without parsing
+PROGRESS_CHANNEL_PREFIX = "progress:"
+PROGRESS_HEARTBEAT_SECONDS = float(os.environ.get("PROGRESS_HEARTBEAT_SECONDS", 15))
+PROGRESS_QUEUE_SIZE = int(os.environ.get("PROGRESS_QUEUE_SIZE", 256))
+RESYNC = ("resync", "")
+
+
+def progress_channel(session_id: str) -> str:
+    return f"{PROGRESS_CHANNEL_PREFIX}{session_id}"
+
+
+def sse_frame(event: str, data: str) -> str:
+    return f"event: {event}\ndata: {data}\n\n"
+
+
+def _text(value) -> str:
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
+
+class ProgressPublisher:
+    """
+    Publishes task progress for a session from synchronous code such as the Celery worker.
+
+    ``publish_state`` has the signature of a SessionStore listener, so every saved change goes out
+    as a ``state`` event holding only the keys that changed. Publishing never fails the task.
+    """
+
+    def __init__(self, redis_client):
+        self.redis = redis_client
+
+    def publish(self, session_id: str, event: str, **fields: Any) -> None:
+        self._send(session_id, event, json.dumps({"session_id": session_id, "ts": time.time(), **fields}))
+
+    def publish_state(self, session_id: str, version: int, changed: Dict[str, str], removed: List[str]) -> None:
+        # the store already holds each changed value as JSON text, so it is spliced in as is
+        values = ", ".join(f"{json.dumps(key)}: {text}" for key, text in changed.items())
+        data = (
+            f'{{"session_id": {json.dumps(session_id)}, "ts": {time.time()}, "version": {version}, '
+            f'"changed": {{{values}}}, "removed": {json.dumps(removed)}}}'
+        )
+        self._send(session_id, "state", data)
+
+    def _send(self, session_id: str, event: str, data: str) -> None:
+        try:
+            self.redis.publish(progress_channel(session_id), f"{event} {data}")
+        except Exception as e:
+            print(f"WARNING: Could not publish {event} progress for {session_id}: {e}")
+
+
+class ProgressHub:
+    """
+    Fans progress events out to the streams open in this process.
+
+    One pattern subscription to ``progress:*`` serves every stream, so open streams cost a queue each
+    rather than a Redis connection each. A stream whose queue fills up, or that was open while the
+    subscription reconnected, receives ``resync`` and should send a fresh snapshot.
+    """
+
+    def __init__(self, redis, queue_size: int = PROGRESS_QUEUE_SIZE):
+        self.redis = redis
+        self.queue_size = queue_size
+        self.stats = {"received": 0, "delivered": 0, "resyncs": 0, "reconnects": 0}
+        self._queues: Dict[str, Set[asyncio.Queue]] = {}
+        self._reader: Optional[asyncio.Task] = None
+        self._ready: Optional[asyncio.Event] = None
+
+    async def subscribe(self, session_id: str) -> asyncio.Queue:
+        if self._reader is None or self._reader.done():
+            self._ready = asyncio.Event()
+            self._reader = asyncio.create_task(self._read())
+        await self._ready.wait()
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._queues.setdefault(session_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, session_id: str, queue: asyncio.Queue) -> None:
+        queues = self._queues.get(session_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._queues[session_id]
+
+    def _deliver(self, session_id: str, item: Tuple[str, str]) -> None:
+        for queue in self._queues.get(session_id, ()):
+            if queue.full():
+                # deltas cannot be skipped, so a stream this far behind starts over from a snapshot
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(RESYNC)
+                self.stats["resyncs"] += 1
+            else:
+                queue.put_nowait(item)
+                self.stats["delivered"] += 1
+
+    async def _read(self) -> None:
+        reconnecting = False
+        while True:
+            pubsub = self.redis.pubsub()
+            try:
+                await pubsub.psubscribe(f"{PROGRESS_CHANNEL_PREFIX}*")
+                if reconnecting:
+                    # events published while disconnected are lost; every open stream catches up
+                    for session_id in list(self._queues):
+                        self._deliver(session_id, RESYNC)
+                self._ready.set()
+                async for message in pubsub.listen():
+                    if message["type"] != "pmessage":
+                        continue
+                    self.stats["received"] += 1
+                    event, _, data = _text(message["data"]).partition(" ")
+                    self._deliver(_text(message["channel"])[len(PROGRESS_CHANNEL_PREFIX) :], (event, data))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"WARNING: Progress subscription lost, reconnecting: {e}")
+                self.stats["reconnects"] += 1
+                reconnecting = True
+                await asyncio.sleep(1)
+            finally:
+                try:
+                    await pubsub.reset()
+                except Exception:
+                    pass
+
+    async def close(self) -> None:
+        if self._reader is not None:
+            self._reader.cancel()
+            try:
+                await self._reader
+            except asyncio.CancelledError:
+                pass
+            self._reader = None
+
+
+async def progress_stream(
+    hub: ProgressHub,
+    session_id: str,
+    get_status: Callable[[], Awaitable[Dict[str, Any]]],
+    get_state_json: Callable[[], str],
+    heartbeat: float = PROGRESS_HEARTBEAT_SECONDS,
+) -> AsyncIterator[str]:
+    """
+    Server-sent events for one session.
+
+    Opens with ``snapshot`` (the status response with the full state), then relays ``started``,
+    ``state`` deltas and ends with ``done``. A finished task yields ``done`` with the full status at
+    once. Idle streams get a keepalive every ``heartbeat`` seconds, when the task status is also
+    checked in case its ``done`` event was never published.
+    """
+    queue = await hub.subscribe(session_id)
+
+    async def current():
+        status = await get_status()
+        if status.get("is_processing"):
+            status = dict(status, session_state=await asyncio.to_thread(get_state_json))
+            return "snapshot", status
+        return "done", status
+
+    try:
+        # subscribed before the status is read, so nothing published in between is missed
+        event, status = await current()
+        yield sse_frame(event, json.dumps(status))
+        if event == "done":
+            return
+        while True:
+            try:
+                event, data = await asyncio.wait_for(queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                event, status = await current()
+                if event == "done":
+                    yield sse_frame(event, json.dumps(status))
+                    return
+                yield ": keepalive\n\n"
+                continue
+            if event == RESYNC[0]:
+                event, status = await current()
+                yield sse_frame(event, json.dumps(status))
+                if event == "done":
+                    return
+                continue
+            yield sse_frame(event, data)
+            if event == "done":
+                return
+    finally:
+        hub.unsubscribe(session_id, queue)
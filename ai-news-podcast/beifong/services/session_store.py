@@ -0,0 +1,239 @@
+import os
+import json
+import threading
+from datetime import datetime
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from db.config import get_internal_sessions_db_path
+from db.connection import db_connection
+
+SESSION_SNAPSHOT_EVERY = int(os.environ.get("SESSION_SNAPSHOT_EVERY", 20))
+SESSION_CACHE_SIZE = int(os.environ.get("SESSION_CACHE_SIZE", 128))
+
+SESSION_PATCH_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS session_state_patches (
+        session_id TEXT NOT NULL,
+        version INTEGER NOT NULL,
+        patch TEXT NOT NULL,
+        PRIMARY KEY (session_id, version)
+    ) WITHOUT ROWID
+    """,
+]
+SESSION_VERSION_COLUMNS = {"version": "INTEGER NOT NULL DEFAULT 0", "snapshot_version": "INTEGER NOT NULL DEFAULT 0"}
+
+
+def create_session_patch_tables(conn) -> None:
+    columns = {col[1] for col in conn.execute("PRAGMA table_info(session_state)").fetchall()}
+    for column, column_type in SESSION_VERSION_COLUMNS.items():
+        if column not in columns:
+            conn.execute(f"ALTER TABLE session_state ADD COLUMN {column} {column_type}")
+    for statement in SESSION_PATCH_SCHEMA:
+        conn.execute(statement)
+
+
+def _pointer(key: str) -> str:
+    return "/" + key.replace("~", "~0").replace("/", "~1")
+
+
+def _pointer_key(path: str) -> str:
+    return path[1:].replace("~1", "/").replace("~0", "~")
+
+
+class SessionEntry:
+    """One version of a session's state, held as the JSON text of each top-level key."""
+
+    __slots__ = ("session_id", "version", "snapshot_version", "patch_bytes", "texts", "created_at", "_state_json")
+
+    def __init__(self, session_id: str, version: int, snapshot_version: int, patch_bytes: int, texts: Dict[str, str], created_at: str):
+        self.session_id = session_id
+        self.version = version
+        self.snapshot_version = snapshot_version
+        self.patch_bytes = patch_bytes
+        self.texts = texts
+        self.created_at = created_at
+        self._state_json = None
+
+    @property
+    def state_json(self) -> str:
+        # the same text json.dumps(state) would produce, assembled from the per-key texts
+        if self._state_json is None:
+            self._state_json = "{" + ", ".join(f"{json.dumps(key)}: {text}" for key, text in self.texts.items()) + "}"
+        return self._state_json
+
+    def state(self) -> Dict[str, Any]:
+        """A fresh copy of the state; callers may change it freely."""
+        return {key: json.loads(text) for key, text in self.texts.items()}
+
+    def values(self, keys: Iterable[str]) -> Dict[str, Any]:
+        return {key: json.loads(self.texts[key]) for key in keys if key in self.texts}
+
+
+class SessionStore:
+    """
+    Session state persisted as JSON-patch style deltas of the top-level keys that changed.
+
+    ``session_state.state`` holds a snapshot at ``snapshot_version``; every save that changes
+    something appends one ``session_state_patches`` row with ``replace``/``remove`` operations
+    and bumps ``version``. After ``snapshot_every`` patches, or once the patches outweigh the
+    state, the next save writes a new snapshot and drops them. Loaded versions are cached per
+    process, so reads cost one version lookup until another process saves.
+
+    Callables in ``listeners`` are called after each committed change with the session id, the
+    new version, the JSON text of every changed key and the removed keys.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, snapshot_every: int = SESSION_SNAPSHOT_EVERY, cache_size: int = SESSION_CACHE_SIZE):
+        self.db_path = db_path
+        self.snapshot_every = snapshot_every
+        self.cache_size = cache_size
+        self.stats = {"hits": 0, "refreshes": 0, "loads": 0, "patches": 0, "snapshots": 0, "unchanged": 0, "bytes_written": 0}
+        self._cache: "OrderedDict[str, SessionEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._ready_paths = set()
+        self.listeners: List[Callable[[str, int, Dict[str, str], List[str]], None]] = []
+
+    def _connection(self):
+        db_path = self.db_path or get_internal_sessions_db_path()
+        if db_path not in self._ready_paths:
+            # databases created before patches were stored get their columns on first use
+            with db_connection(db_path) as conn:
+                create_session_patch_tables(conn)
+                conn.commit()
+            self._ready_paths.add(db_path)
+        return db_connection(db_path)
+
+    def _cached(self, session_id: str) -> Optional[SessionEntry]:
+        with self._lock:
+            entry = self._cache.get(session_id)
+            if entry is not None:
+                self._cache.move_to_end(session_id)
+            return entry
+
+    def _remember(self, entry: SessionEntry) -> SessionEntry:
+        with self._lock:
+            self._cache[entry.session_id] = entry
+            self._cache.move_to_end(entry.session_id)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return entry
+
+    def _notify(self, entry: SessionEntry, changed: Dict[str, str], removed: List[str]) -> None:
+        for listener in self.listeners:
+            try:
+                listener(entry.session_id, entry.version, changed, removed)
+            except Exception as e:
+                print(f"WARNING: Session listener failed for {entry.session_id}: {e}")
+
+    def forget(self, session_id: str) -> None:
+        with self._lock:
+            self._cache.pop(session_id, None)
+
+    def _load(self, conn, session_id: str) -> Optional[SessionEntry]:
+        row = conn.execute("SELECT version, snapshot_version, created_at FROM session_state WHERE session_id = ?", (session_id,)).fetchone()
+        if row is None:
+            return None
+        version, snapshot_version, created_at = row
+        cached = self._cached(session_id)
+        if cached is not None and cached.created_at == created_at:
+            if cached.version == version:
+                self.stats["hits"] += 1
+                return cached
+            if snapshot_version <= cached.version < version:
+                # another process saved since: replay only the patches this process has not seen
+                self.stats["refreshes"] += 1
+                return self._remember(self._apply_patches(conn, cached, cached.version, snapshot_version))
+        self.stats["loads"] += 1
+        snapshot = conn.execute("SELECT state FROM session_state WHERE session_id = ?", (session_id,)).fetchone()[0]
+        try:
+            state = json.loads(snapshot) if snapshot else {}
+        except json.JSONDecodeError:
+            state = {}
+        base = SessionEntry(session_id, snapshot_version, snapshot_version, 0, {key: json.dumps(value) for key, value in state.items()}, created_at)
+        return self._remember(self._apply_patches(conn, base, snapshot_version, snapshot_version))
+
+    def _apply_patches(self, conn, base: SessionEntry, after_version: int, snapshot_version: int) -> SessionEntry:
+        texts, version, patch_bytes = dict(base.texts), base.version, base.patch_bytes
+        rows = conn.execute(
+            "SELECT version, patch FROM session_state_patches WHERE session_id = ? AND version > ? ORDER BY version",
+            (base.session_id, after_version),
+        ).fetchall()
+        for patch_version, patch in rows:
+            for op in json.loads(patch):
+                key = _pointer_key(op["path"])
+                if op["op"] == "remove":
+                    texts.pop(key, None)
+                else:
+                    texts[key] = json.dumps(op["value"])
+            version, patch_bytes = patch_version, patch_bytes + len(patch)
+        return SessionEntry(base.session_id, version, snapshot_version, patch_bytes, texts, base.created_at)
+
+    def get(self, session_id: str) -> Optional[SessionEntry]:
+        with self._connection() as conn:
+            return self._load(conn, session_id)
+
+    def create(self, session_id: str, state: Dict[str, Any]) -> SessionEntry:
+        texts = {key: json.dumps(value) for key, value in state.items()}
+        entry = SessionEntry(session_id, 0, 0, 0, texts, datetime.now().isoformat())
+        with self._connection() as conn:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO session_state (session_id, state, created_at, version, snapshot_version) VALUES (?, ?, ?, 0, 0)",
+                (session_id, entry.state_json, entry.created_at),
+            )
+            conn.commit()
+            if cursor.rowcount == 0:
+                # created by another request in the meantime
+                return self._load(conn, session_id)
+        self.stats["bytes_written"] += len(entry.state_json)
+        self._notify(entry, texts, [])
+        return self._remember(entry)
+
+    def save(self, session_id: str, state: Dict[str, Any]) -> SessionEntry:
+        """Persist ``state`` as a patch against the stored version, creating the session if needed."""
+        texts = {key: json.dumps(value) for key, value in state.items()}
+        with self._connection() as conn:
+            # under the write lock, so the patch is diffed against the latest version
+            conn.execute("BEGIN IMMEDIATE")
+            base = self._load(conn, session_id)
+            if base is None:
+                conn.rollback()
+                return self.create(session_id, state)
+            changed = {key: text for key, text in texts.items() if base.texts.get(key) != text}
+            removed = [key for key in base.texts if key not in texts]
+            if not changed and not removed:
+                conn.rollback()
+                self.stats["unchanged"] += 1
+                return base
+            ops = [f'{{"op": "replace", "path": {json.dumps(_pointer(key))}, "value": {text}}}' for key, text in changed.items()]
+            ops += [f'{{"op": "remove", "path": {json.dumps(_pointer(key))}}}' for key in removed]
+            patch = "[" + ", ".join(ops) + "]"
+            version = base.version + 1
+            entry = SessionEntry(session_id, version, base.snapshot_version, base.patch_bytes + len(patch), texts, base.created_at)
+            if version - base.snapshot_version >= self.snapshot_every or entry.patch_bytes > len(entry.state_json):
+                entry.snapshot_version, entry.patch_bytes = version, 0
+                conn.execute(
+                    "UPDATE session_state SET state = ?, version = ?, snapshot_version = ? WHERE session_id = ?",
+                    (entry.state_json, version, version, session_id),
+                )
+                conn.execute("DELETE FROM session_state_patches WHERE session_id = ?", (session_id,))
+                self.stats["snapshots"] += 1
+                self.stats["bytes_written"] += len(entry.state_json)
+            else:
+                conn.execute("INSERT INTO session_state_patches (session_id, version, patch) VALUES (?, ?, ?)", (session_id, version, patch))
+                conn.execute("UPDATE session_state SET version = ? WHERE session_id = ?", (version, session_id))
+                self.stats["patches"] += 1
+                self.stats["bytes_written"] += len(patch)
+            conn.commit()
+        self._notify(entry, changed, removed)
+        return self._remember(entry)
+
+    def delete(self, session_id: str) -> bool:
+        with self._connection() as conn:
+            cursor = conn.execute("DELETE FROM session_state WHERE session_id = ?", (session_id,))
+            conn.execute("DELETE FROM session_state_patches WHERE session_id = ?", (session_id,))
+            conn.commit()
+        self.forget(session_id)
+        return cursor.rowcount > 0
+
+
+session_store = SessionStore()
@@ -1,7 +1,9 @@
 import json
 from typing import List, Optional, Dict, Any
 from fastapi import HTTPException
+from operator import itemgetter
 from services.db_service import social_media_db
+from services.pagination import count_cache, decode_cursor, keyset_condition, page_info
 from models.social_media_schemas import PaginatedPosts, Post
 from datetime import datetime, timedelta
 
@@ -20,10 +22,10 @@ class SocialMediaService:
         date_from: Optional[str] = None,
         date_to: Optional[str] = None,
         search: Optional[str] = None,
+        cursor: Optional[str] = None,
     ) -> PaginatedPosts:
-        """Get social media posts with pagination and filtering."""
+        """Get social media posts with pagination and filtering, by page number or by the ``next_cursor`` of the previous page."""
         try:
-            offset = (page - 1) * per_page
             query_parts = [
                 "SELECT * FROM posts",
                 "WHERE 1=1",
@@ -39,26 +41,37 @@ class SocialMediaService:
                 query_parts.append("AND sentiment = ?")
                 query_params.append(sentiment)
             if category:
-                query_parts.append("AND categories LIKE ?")
-                query_params.append(f'%"{category}"%')
+                query_parts.append("AND EXISTS (SELECT 1 FROM post_categories pc WHERE pc.category = ? AND pc.post_id = posts.post_id)")
+                query_params.append(category)
+            # plain comparisons on the stored ISO timestamps keep the post_timestamp index usable
             if date_from:
-                query_parts.append("AND datetime(post_timestamp) >= datetime(?)")
+                query_parts.append("AND post_timestamp >= ?")
                 query_params.append(date_from)
             if date_to:
-                query_parts.append("AND datetime(post_timestamp) <= datetime(?)")
+                query_parts.append("AND post_timestamp <= ?")
                 query_params.append(date_to)
             if search:
                 query_parts.append("AND (post_text LIKE ? OR user_display_name LIKE ? OR user_handle LIKE ?)")
                 search_param = f"%{search}%"
                 query_params.extend([search_param, search_param, search_param])
-            count_query = " ".join(query_parts).replace("SELECT *", "SELECT COUNT(*)")
-            total_posts = await social_media_db.execute_query(count_query, tuple(query_params), fetch=True, fetch_one=True)
-            total_count = total_posts.get("COUNT(*)", 0) if total_posts else 0
-            query_parts.append("ORDER BY datetime(post_timestamp) DESC, post_id DESC")
-            query_parts.append("LIMIT ? OFFSET ?")
-            query_params.extend([per_page, offset])
+            count_query = " ".join(query_parts).replace("SELECT *", "SELECT COUNT(*) AS count")
+
+            async def count_posts():
+                result = await social_media_db.execute_query(count_query, tuple(query_params), fetch=True, fetch_one=True)
+                return result["count"] if result else 0
+
+            total_count = await count_cache.get_or_count((social_media_db.db_path, count_query, tuple(query_params)), count_posts)
+            if cursor:
+                query_parts.append(f"AND {keyset_condition(['post_timestamp', 'post_id'])}")
+                query_params.extend(decode_cursor(cursor, 2))
+                query_parts.append("ORDER BY post_timestamp DESC, post_id DESC LIMIT ?")
+                query_params.append(per_page + 1)
+            else:
+                query_parts.append("ORDER BY post_timestamp DESC, post_id DESC LIMIT ? OFFSET ?")
+                query_params.extend([per_page + 1, (page - 1) * per_page])
             posts_query = " ".join(query_parts)
             posts_data = await social_media_db.execute_query(posts_query, tuple(query_params), fetch=True)
+            posts_data, pagination = page_info(posts_data, per_page, page, total_count, cursor, itemgetter("post_timestamp", "post_id"))
             posts = []
             for post in posts_data:
                 post_dict = dict(post)
@@ -85,18 +98,7 @@ class SocialMediaService:
                     "views": post_dict.pop("engagement_view_count", 0),
                 }
                 posts.append(post_dict)
-            total_pages = (total_count + per_page - 1) // per_page if total_count > 0 else 0
-            has_next = page < total_pages
-            has_prev = page > 1
-            return PaginatedPosts(
-                items=posts,
-                total=total_count,
-                page=page,
-                per_page=per_page,
-                total_pages=total_pages,
-                has_next=has_next,
-                has_prev=has_prev,
-            )
+            return PaginatedPosts(items=posts, **pagination)
         except Exception as e:
             if isinstance(e, HTTPException):
                 raise e
@@ -145,26 +147,17 @@ class SocialMediaService:
         return [row.get("platform", "") for row in result if row.get("platform")]
 
     async def get_sentiments(self, date_from: Optional[str] = None, date_to: Optional[str] = None) -> List[Dict[str, Any]]:
-        """Get sentiment distribution with post counts."""
+        """Get sentiment distribution with post counts, summed from the daily rollup."""
         try:
-            query_parts = [
-                """
-                SELECT 
-                    sentiment, COUNT(*) as post_count 
-                FROM posts 
-                WHERE sentiment IS NOT NULL
-                """
-            ]
-            params = []
-            if date_from:
-                query_parts.append("AND datetime(post_timestamp) >= datetime(?)")
-                params.append(date_from)
-            if date_to:
-                query_parts.append("AND datetime(post_timestamp) <= datetime(?)")
-                params.append(date_to)
-            query_parts.append("GROUP BY sentiment ORDER BY post_count DESC")
-            query = " ".join(query_parts)
-            return await social_media_db.execute_query(query, tuple(params), fetch=True)
+            day_filter, params = self._day_filter(date_from, date_to)
+            query = f"""
+            SELECT sentiment, SUM(post_count) as post_count
+            FROM daily_sentiment_rollup
+            WHERE sentiment != '' {day_filter}
+            GROUP BY sentiment HAVING SUM(post_count) > 0
+            ORDER BY post_count DESC
+            """
+            return await social_media_db.execute_query(query, params, fetch=True)
         except Exception as e:
             if isinstance(e, HTTPException):
                 raise e
@@ -195,31 +188,17 @@ class SocialMediaService:
         return await social_media_db.execute_query(query, tuple(params), fetch=True)
 
     async def get_categories(self, date_from: Optional[str] = None, date_to: Optional[str] = None) -> List[Dict[str, Any]]:
-        """Get all categories with post counts."""
+        """Get all categories with post counts, summed from the daily rollup."""
         try:
-            query_parts = ["SELECT categories FROM posts WHERE categories IS NOT NULL"]
-            params = []
-            if date_from:
-                query_parts.append("AND datetime(post_timestamp) >= datetime(?)")
-                params.append(date_from)
-            if date_to:
-                query_parts.append("AND datetime(post_timestamp) <= datetime(?)")
-                params.append(date_to) 
-            query = " ".join(query_parts)
-            result = await social_media_db.execute_query(query, tuple(params), fetch=True)
-            category_counts = {}
-            for row in result:
-                if row.get("categories"):
-                    try:
-                        categories = json.loads(row["categories"])
-                        for category in categories:
-                            if category in category_counts:
-                                category_counts[category] += 1
-                            else:
-                                category_counts[category] = 1
-                    except json.JSONDecodeError:
-                        pass
-            return [{"category": category, "post_count": count} for category, count in sorted(category_counts.items(), key=lambda x: x[1], reverse=True)]
+            day_filter, params = self._day_filter(date_from, date_to)
+            query = f"""
+            SELECT category, SUM(post_count) as post_count
+            FROM daily_category_rollup
+            WHERE 1=1 {day_filter}
+            GROUP BY category HAVING SUM(post_count) > 0
+            ORDER BY post_count DESC
+            """
+            return await social_media_db.execute_query(query, params, fetch=True)
         except Exception as e:
             if isinstance(e, HTTPException):
                 raise e
@@ -277,46 +256,7 @@ class SocialMediaService:
     async def get_category_sentiment(self, date_from: Optional[str] = None, date_to: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get sentiment distribution by category."""
         try:
-            date_filter = ""
-            params = []
-            if date_from or date_to:
-                date_filter = "WHERE "
-                if date_from:
-                    date_filter += "datetime(p.post_timestamp) >= datetime(?)"
-                    params.append(date_from)
-                    if date_to:
-                        date_filter += " AND "
-                if date_to:
-                    date_filter += "datetime(p.post_timestamp) <= datetime(?)"
-                    params.append(date_to)
-            query = f"""
-            WITH category_data AS (
-                SELECT 
-                    json_each.value as category,
-                    sentiment,
-                    COUNT(*) as count
-                FROM 
-                    posts p,
-                    json_each(p.categories)
-                {date_filter}
-                GROUP BY 
-                    json_each.value, sentiment
-            )
-            SELECT 
-                category,
-                SUM(count) as total_count,
-                SUM(CASE WHEN sentiment = 'positive' THEN count ELSE 0 END) as positive_count,
-                SUM(CASE WHEN sentiment = 'negative' THEN count ELSE 0 END) as negative_count,
-                SUM(CASE WHEN sentiment = 'neutral' THEN count ELSE 0 END) as neutral_count,
-                SUM(CASE WHEN sentiment = 'critical' THEN count ELSE 0 END) as critical_count
-            FROM 
-                category_data
-            GROUP BY 
-                category
-            ORDER BY 
-                total_count DESC
-            """
-            result = await social_media_db.execute_query(query, tuple(params), fetch=True)
+            result = await self._label_sentiment("category", date_from, date_to)
             for category in result:
                 total = category["total_count"]
                 category["positive_percent"] = (category["positive_count"] / total) * 100 if total > 0 else 0
@@ -337,51 +277,9 @@ class SocialMediaService:
     ) -> List[Dict[str, Any]]:
         """Get trending topics with sentiment breakdown."""
         try:
-            query_parts = [
-                """
-                WITH topic_data AS (
-                    SELECT 
-                        json_each.value as topic,
-                        sentiment,
-                        COUNT(*) as count
-                    FROM 
-                        posts,
-                        json_each(posts.tags)
-                    WHERE tags IS NOT NULL
-                """
-            ]
-            params = []
-            if date_from:
-                query_parts.append("AND datetime(post_timestamp) >= datetime(?)")
-                params.append(date_from)
-            if date_to:
-                query_parts.append("AND datetime(post_timestamp) <= datetime(?)")
-                params.append(date_to)  
-            query_parts.append(
-                """
-                GROUP BY 
-                    json_each.value, sentiment
-                )
-                SELECT 
-                    topic,
-                    SUM(count) as total_count,
-                    SUM(CASE WHEN sentiment = 'positive' THEN count ELSE 0 END) as positive_count,
-                    SUM(CASE WHEN sentiment = 'negative' THEN count ELSE 0 END) as negative_count,
-                    SUM(CASE WHEN sentiment = 'neutral' THEN count ELSE 0 END) as neutral_count,
-                    SUM(CASE WHEN sentiment = 'critical' THEN count ELSE 0 END) as critical_count
-                FROM 
-                    topic_data
-                GROUP BY 
-                    topic
-                ORDER BY 
-                    total_count DESC
-                LIMIT ?
-                """
-            )
-            params.append(limit)
-            query = " ".join(query_parts)
-            result = await social_media_db.execute_query(query, tuple(params), fetch=True)
+            result = await self._label_sentiment("tag", date_from, date_to, limit=limit)
             for topic in result:
+                topic["topic"] = topic.pop("tag")
                 total = topic["total_count"]
                 topic["positive_percent"] = (topic["positive_count"] / total) * 100 if total > 0 else 0
                 topic["negative_percent"] = (topic["negative_count"] / total) * 100 if total > 0 else 0
@@ -401,54 +299,35 @@ class SocialMediaService:
     ) -> List[Dict[str, Any]]:
         """Get sentiment trends over time."""
         try:
-            date_range_query = ""
             if date_from and date_to:
-                date_range_query = f"""
-                WITH RECURSIVE date_range(date) AS (
-                    SELECT date('{date_from}')
-                    UNION ALL
-                    SELECT date(date, '+1 day')
-                    FROM date_range
-                    WHERE date < date('{date_to}')
-                )
-                SELECT date as post_date FROM date_range
-                """
+                params = [date_from, date_to]
             else:
-                days_ago = (datetime.now() - timedelta(days=30)).isoformat()
-                date_range_query = f"""
-                WITH RECURSIVE date_range(date) AS (
-                    SELECT date('{days_ago}')
-                    UNION ALL
-                    SELECT date(date, '+1 day')
-                    FROM date_range
-                    WHERE date < date('now')
-                )
-                SELECT date as post_date FROM date_range
-                """
-            query_parts = [
-                f"""
-                WITH dates AS (
-                    {date_range_query}
-                )
-                SELECT 
-                    dates.post_date,
-                    COALESCE(SUM(CASE WHEN sentiment = 'positive' THEN 1 ELSE 0 END), 0) as positive_count,
-                    COALESCE(SUM(CASE WHEN sentiment = 'negative' THEN 1 ELSE 0 END), 0) as negative_count,
-                    COALESCE(SUM(CASE WHEN sentiment = 'neutral' THEN 1 ELSE 0 END), 0) as neutral_count,
-                    COALESCE(SUM(CASE WHEN sentiment = 'critical' THEN 1 ELSE 0 END), 0) as critical_count,
-                    COUNT(posts.post_id) as total_count
-                FROM 
-                    dates
-                LEFT JOIN 
-                    posts ON date(posts.post_timestamp) = dates.post_date
-                """
-            ]
-            params = []
+                params = [(datetime.now() - timedelta(days=30)).isoformat(), datetime.now().isoformat()]
+            platform_filter = ""
             if platform:
-                query_parts.append("AND posts.platform = ?")
+                platform_filter = "AND r.platform = ?"
                 params.append(platform)
-            query_parts.append("GROUP BY dates.post_date ORDER BY dates.post_date")
-            query = " ".join(query_parts)
+            query = f"""
+            WITH RECURSIVE dates(post_date, last_date) AS (
+                SELECT date(?), date(?)
+                UNION ALL
+                SELECT date(post_date, '+1 day'), last_date
+                FROM dates
+                WHERE post_date < last_date
+            )
+            SELECT 
+                dates.post_date,
+                COALESCE(SUM(CASE WHEN r.sentiment = 'positive' THEN r.post_count ELSE 0 END), 0) as positive_count,
+                COALESCE(SUM(CASE WHEN r.sentiment = 'negative' THEN r.post_count ELSE 0 END), 0) as negative_count,
+                COALESCE(SUM(CASE WHEN r.sentiment = 'neutral' THEN r.post_count ELSE 0 END), 0) as neutral_count,
+                COALESCE(SUM(CASE WHEN r.sentiment = 'critical' THEN r.post_count ELSE 0 END), 0) as critical_count,
+                COALESCE(SUM(r.post_count), 0) as total_count
+            FROM 
+                dates
+            LEFT JOIN 
+                daily_sentiment_rollup r ON r.day = dates.post_date {platform_filter}
+            GROUP BY dates.post_date ORDER BY dates.post_date
+            """
             result = await social_media_db.execute_query(query, tuple(params), fetch=True)
             for day in result:
                 total = day["total_count"]
@@ -599,5 +478,40 @@ class SocialMediaService:
                 raise e
             raise HTTPException(status_code=500, detail=f"Error fetching engagement stats: {str(e)}")
 
+    @staticmethod
+    def _day_filter(date_from: Optional[str], date_to: Optional[str]) -> tuple:
+        # rollups are kept per day, so date bounds apply at day granularity
+        conditions, params = [], []
+        if date_from:
+            conditions.append("AND day >= date(?)")
+            params.append(date_from)
+        if date_to:
+            conditions.append("AND day <= date(?)")
+            params.append(date_to)
+        return " ".join(conditions), tuple(params)
+
+    async def _label_sentiment(
+        self, label: str, date_from: Optional[str], date_to: Optional[str], limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Sum the daily rollup of a label kind ("category" or "tag") into per-label sentiment counts."""
+        day_filter, params = self._day_filter(date_from, date_to)
+        query = f"""
+        SELECT 
+            {label},
+            SUM(post_count) as total_count,
+            SUM(CASE WHEN sentiment = 'positive' THEN post_count ELSE 0 END) as positive_count,
+            SUM(CASE WHEN sentiment = 'negative' THEN post_count ELSE 0 END) as negative_count,
+            SUM(CASE WHEN sentiment = 'neutral' THEN post_count ELSE 0 END) as neutral_count,
+            SUM(CASE WHEN sentiment = 'critical' THEN post_count ELSE 0 END) as critical_count
+        FROM daily_{label}_rollup
+        WHERE 1=1 {day_filter}
+        GROUP BY {label} HAVING SUM(post_count) > 0
+        ORDER BY total_count DESC
+        """
+        if limit is not None:
+            query += " LIMIT ?"
+            params += (limit,)
+        return await social_media_db.execute_query(query, params, fetch=True)
+
 
 social_media_service = SocialMediaService()
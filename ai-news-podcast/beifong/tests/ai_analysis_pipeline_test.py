@@ -0,0 +1,130 @@
+import io
+import os
+import json
+import time
+import zlib
+import sqlite3
+import tempfile
+import argparse
+import threading
+from contextlib import redirect_stdout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from processors.ai_analysis_processor import analyze_in_batches
+
+PARAGRAPH = "<p>" + "Regulators approved the merger after a lengthy review of its effect on prices. " * 6 + "</p>"
+
+
+class StubChatHandler(BaseHTTPRequestHandler):
+    base_latency = 0.2
+    seconds_per_output_token = 0.002
+    rate_limit_every = 0
+    request_count = 0
+    prompt_chars = 0
+    lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with StubChatHandler.lock:
+            StubChatHandler.request_count += 1
+            request_number = StubChatHandler.request_count
+            StubChatHandler.prompt_chars += sum(len(message["content"]) for message in body["messages"])
+        if self.rate_limit_every and request_number % self.rate_limit_every == 0:
+            self.send_response(429)
+            self.send_header("retry-after", "0.2")
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(json.dumps({"error": {"message": "Rate limit reached", "type": "requests"}}).encode())
+            return
+        # generation time grows with the completion budget, like a real model streaming tokens
+        time.sleep(self.base_latency + self.seconds_per_output_token * body.get("max_tokens", 0))
+        content = json.dumps({"categories": ["business", "economy", "regulation"], "summary": "Regulators approved the merger."})
+        payload = {
+            "id": f"chatcmpl-{request_number}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body["model"],
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(json.dumps(payload).encode())
+
+
+def create_articles(tracking_db_path, n_articles):
+    conn = sqlite3.connect(tracking_db_path)
+    conn.execute("""
+    CREATE TABLE crawled_articles (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        entry_id INTEGER,
+        source_id INTEGER,
+        feed_id INTEGER,
+        title TEXT,
+        url TEXT,
+        published_date TIMESTAMP,
+        raw_content TEXT,
+        content TEXT,
+        summary TEXT,
+        metadata TEXT,
+        ai_status TEXT DEFAULT 'pending',
+        ai_error TEXT DEFAULT NULL,
+        ai_attempts INTEGER DEFAULT 0,
+        processed BOOLEAN DEFAULT 0
+    )
+    """)
+    conn.execute("""
+    CREATE TABLE article_categories (
+        article_id INTEGER,
+        category_name TEXT NOT NULL,
+        PRIMARY KEY (article_id, category_name)
+    )
+    """)
+    html = f"<body><nav>Home | World | Business</nav><article>{PARAGRAPH * 60}</article><footer>Footer</footer></body>"
+    conn.executemany(
+        "INSERT INTO crawled_articles (title, url, published_date, raw_content, metadata) VALUES (?, ?, ?, ?, ?)",
+        (
+            (f"Article {i}", f"https://example.com/{i}", "2025-01-01", zlib.compress(html.encode()), json.dumps({"description": ""}))
+            for i in range(n_articles)
+        ),
+    )
+    conn.commit()
+    conn.close()
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Measure AI analysis throughput against a local OpenAI-compatible stub")
+    parser.add_argument("--n_articles", type=int, default=200)
+    parser.add_argument("--batch_size", type=int, default=50)
+    parser.add_argument("--rate_limit_every", type=int, default=20, help="Answer every Nth request with HTTP 429 (0 disables)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    StubChatHandler.rate_limit_every = args.rate_limit_every
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubChatHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    print(f"{'mode':<16} {'analyzed':>9} {'429s':>5} {'prompt chars':>13} {'articles/sec':>13}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for label, concurrency in [("one at a time", 1), ("concurrent x8", 8)]:
+            tracking_db_path = os.path.join(tmp_dir, f"{concurrency}.db")
+            create_articles(tracking_db_path, args.n_articles)
+            StubChatHandler.request_count = StubChatHandler.prompt_chars = 0
+            with redirect_stdout(io.StringIO()):
+                stats = analyze_in_batches(
+                    tracking_db_path=tracking_db_path,
+                    openai_api_key="stub",
+                    batch_size=args.batch_size,
+                    total_batches=args.n_articles // args.batch_size + 1,
+                    concurrency=concurrency,
+                    base_url=base_url,
+                )
+            prompt_chars = StubChatHandler.prompt_chars // max(1, StubChatHandler.request_count)
+            print(f"{label:<16} {stats['success_count']:>9} {stats['rate_limited']:>5} {prompt_chars:>13} {stats['articles_per_second']:>13.2f}")
+    server.shutdown()
@@ -0,0 +1,162 @@
+import os
+import time
+import random
+import sqlite3
+import argparse
+import tempfile
+import statistics
+from itertools import accumulate
+from db.articles import create_article_search_index
+from utils.get_articles import _execute_search
+
+TOPIC_WORDS = ["inflation", "election", "semiconductor", "vaccine", "wildfire", "merger", "satellite", "tariff"]
+CATEGORIES = ["business", "politics", "technology", "health", "science", "climate", "economy", "world"]
+QUERIES = [
+    ["semiconductor"],
+    ["inflation", "tariff"],
+    ["wildfire", "climate"],
+    ["merger", "antitrust", "regulators"],
+]
+# AND queries where a term is only met through the article's category
+CATEGORY_QUERIES = [
+    ["wildfire", "climate"],
+    ["inflation", "economy"],
+    ["semiconductor", "technology"],
+]
+
+
+def make_vocabulary(n_words, rng):
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rng.choices(letters, k=rng.randint(3, 10))) for _ in range(n_words)]
+
+
+def create_articles(tracking_db_path, n_articles, words_per_article, seed=42):
+    rng = random.Random(seed)
+    vocabulary = make_vocabulary(20000, rng) + ["regulators", "antitrust"] * 50
+    cum_weights = list(accumulate(1 / (rank + 1) for rank in range(len(vocabulary))))
+    conn = sqlite3.connect(tracking_db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("""
+    CREATE TABLE crawled_articles (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        entry_id INTEGER,
+        source_id INTEGER,
+        feed_id INTEGER,
+        title TEXT,
+        url TEXT UNIQUE,
+        published_date TIMESTAMP,
+        content TEXT,
+        summary TEXT,
+        ai_status TEXT DEFAULT 'success',
+        processed BOOLEAN DEFAULT 1
+    )
+    """)
+    conn.execute("""
+    CREATE TABLE article_categories (
+        article_id INTEGER,
+        category_name TEXT NOT NULL,
+        PRIMARY KEY (article_id, category_name)
+    )
+    """)
+    conn.execute("CREATE INDEX idx_article_categories_category_name ON article_categories(category_name)")
+    for start in range(0, n_articles, 10000):
+        rows, categories = [], []
+        for article_id in range(start + 1, min(n_articles, start + 10000) + 1):
+            words = rng.choices(vocabulary, cum_weights=cum_weights, k=words_per_article)
+            # roughly one article in a hundred is about each topic
+            if rng.random() < 0.08:
+                topic = rng.choice(TOPIC_WORDS)
+                words[rng.randrange(len(words))] = topic
+                if rng.random() < 0.3:
+                    words[0] = topic
+            content = " ".join(words)
+            day = rng.randint(1, 28)
+            title = f"Article {article_id} {words[0]}"
+            rows.append((article_id, title, f"https://example.com/{article_id}", f"2025-01-{day:02d}", content, " ".join(words[:30])))
+            categories.extend((article_id, name) for name in rng.sample(CATEGORIES, 3))
+        conn.executemany(
+            "INSERT INTO crawled_articles (id, title, url, published_date, content, summary) VALUES (?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        conn.executemany("INSERT INTO article_categories (article_id, category_name) VALUES (?, ?)", categories)
+        conn.commit()
+    conn.close()
+
+
+def like_search(cursor, terms, from_date, limit, use_categories=True, operator="OR"):
+    # the previous LIKE based search, kept here as the baseline
+    base_query = """
+        SELECT DISTINCT ca.id, ca.title, ca.url, ca.published_date, ca.summary as content,
+               ca.source_id, ca.feed_id
+        FROM crawled_articles ca
+        LEFT JOIN article_categories ac ON ca.id = ac.article_id
+        WHERE ca.processed = 1 AND ca.published_date >= ?
+    """
+    clauses, params = [], [from_date]
+    for term in terms:
+        like = f"%{term}%"
+        term_clauses = ["(ca.title LIKE ? OR ca.content LIKE ? OR ca.summary LIKE ?)"]
+        params.extend([like, like, like])
+        if use_categories:
+            term_clauses.append("(ac.category_name LIKE ?)")
+            params.append(like)
+        clauses.append(f"({' OR '.join(term_clauses)})")
+    sql = f"{base_query} AND ({f' {operator} '.join(clauses)}) ORDER BY ca.published_date DESC LIMIT {limit}"
+    cursor.execute(sql, params)
+    return [dict(row) for row in cursor.fetchall()]
+
+
+def measure(search, cursor, repeats):
+    latencies = {}
+    for terms in QUERIES:
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            search(cursor, terms)
+            timings.append((time.perf_counter() - start) * 1000)
+        latencies[" ".join(terms)] = statistics.median(timings)
+    return latencies
+
+
+def check_category_matches(cursor, from_date, n_articles):
+    # both searches return every match here, so the sets must agree whatever the ranking
+    for terms in CATEGORY_QUERIES:
+        expected = {row["id"] for row in like_search(cursor, terms, from_date, n_articles, operator="AND")}
+        found = {row["id"] for row in _execute_search(cursor, terms, from_date, "AND", n_articles)}
+        assert found == expected, f"AND search for {terms} found {len(found)} articles, LIKE found {len(expected)}"
+        print(f"AND {' '.join(terms):<32} {len(found):>6} articles, same as LIKE")
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Compare LIKE and FTS5 article search latency on a synthetic database")
+    parser.add_argument("--n_articles", type=int, default=500000)
+    parser.add_argument("--words_per_article", type=int, default=150)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--db_path", help="Reuse (or keep) the generated database at this path")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tracking_db_path = args.db_path or os.path.join(tmp_dir, "tracking.db")
+        if not os.path.exists(tracking_db_path):
+            start = time.perf_counter()
+            create_articles(tracking_db_path, args.n_articles, args.words_per_article)
+            print(f"Generated {args.n_articles} articles in {time.perf_counter() - start:.1f}s")
+        start = time.perf_counter()
+        conn = sqlite3.connect(tracking_db_path)
+        create_article_search_index(conn)
+        conn.commit()
+        print(f"Built the search index in {time.perf_counter() - start:.1f}s\n")
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        from_date = "2025-01-01"
+        baseline = measure(lambda cursor, terms: like_search(cursor, terms, from_date, 20), cursor, args.repeats)
+        indexed = measure(lambda cursor, terms: _execute_search(cursor, terms, from_date, "OR", 20), cursor, args.repeats)
+        print(f"{'query':<36} {'LIKE p50 ms':>12} {'FTS5 p50 ms':>12}")
+        for query in baseline:
+            print(f"{query:<36} {baseline[query]:>12.1f} {indexed[query]:>12.1f}")
+        print()
+        check_category_matches(cursor, from_date, args.n_articles)
+        conn.close()
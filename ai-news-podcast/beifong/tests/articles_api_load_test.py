@@ -0,0 +1,194 @@
+import os
+import time
+import random
+import sqlite3
+import asyncio
+import argparse
+import tempfile
+import statistics
+from contextlib import contextmanager
+from fastapi import FastAPI, HTTPException
+
+CATEGORIES = ["business", "politics", "technology", "health", "science", "climate", "economy", "world"]
+
+
+def create_databases(tracking_db_path, sources_db_path, n_articles, n_sources=20, seed=42):
+    rng = random.Random(seed)
+    conn = sqlite3.connect(sources_db_path)
+    conn.execute("CREATE TABLE sources (id INTEGER PRIMARY KEY, name TEXT)")
+    conn.execute("CREATE TABLE source_feeds (id INTEGER PRIMARY KEY, source_id INTEGER)")
+    conn.executemany("INSERT INTO sources (id, name) VALUES (?, ?)", ((i, f"Source {i}") for i in range(1, n_sources + 1)))
+    conn.executemany("INSERT INTO source_feeds (id, source_id) VALUES (?, ?)", ((i, i) for i in range(1, n_sources + 1)))
+    conn.commit()
+    conn.close()
+    conn = sqlite3.connect(tracking_db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("""
+    CREATE TABLE crawled_articles (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        feed_id INTEGER,
+        source_id INTEGER,
+        title TEXT,
+        url TEXT,
+        published_date TIMESTAMP,
+        summary TEXT,
+        content TEXT,
+        metadata TEXT,
+        ai_status TEXT DEFAULT 'success',
+        processed BOOLEAN DEFAULT 1
+    )
+    """)
+    conn.execute("CREATE TABLE article_categories (article_id INTEGER, category_name TEXT NOT NULL, PRIMARY KEY (article_id, category_name))")
+    conn.execute("CREATE INDEX idx_crawled_articles_processed ON crawled_articles(processed)")
+    conn.execute("CREATE INDEX idx_article_categories_article_id ON article_categories(article_id)")
+    conn.executemany(
+        "INSERT INTO crawled_articles (id, feed_id, source_id, title, url, published_date, summary) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (
+            (
+                i,
+                i % n_sources + 1,
+                i % n_sources + 1,
+                f"Article {i}",
+                f"https://example.com/{i}",
+                f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                "A short summary of the article. " * 4,
+            )
+            for i in range(1, n_articles + 1)
+        ),
+    )
+    conn.executemany(
+        "INSERT INTO article_categories (article_id, category_name) VALUES (?, ?)",
+        ((i, name) for i in range(1, n_articles + 1) for name in rng.sample(CATEGORIES, 2)),
+    )
+    conn.commit()
+    conn.close()
+
+
+class PerStatementDatabaseService:
+    # the previous service: a fresh connection per statement, run directly on the event loop
+    def __init__(self, db_path):
+        self.db_path = db_path
+
+    @contextmanager
+    def connection(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    async def execute_query(self, query, params=(), fetch=False, fetch_one=False):
+        try:
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(query, params)
+                if fetch_one:
+                    result = cursor.fetchone()
+                    return dict(result) if result else None
+                elif fetch:
+                    return [dict(row) for row in cursor.fetchall()]
+                conn.commit()
+                return cursor.lastrowid
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+
+async def asgi_get(app, path, query_string):
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": query_string.encode(),
+        "headers": [(b"host", b"benchmark")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("benchmark", 80),
+    }
+    status = {}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status["code"] = message["status"]
+
+    await app(scope, receive, send)
+    return status.get("code")
+
+
+def list_request(rng):
+    query = f"page={rng.randint(1, 50)}&per_page=20"
+    if rng.random() < 0.3:
+        query += f"&category={rng.choice(CATEGORIES)}"
+    return "/api/articles/", query
+
+
+def detail_request(rng, n_articles):
+    return f"/api/articles/{rng.randint(1, n_articles)}", ""
+
+
+async def run_load(app, make_request, concurrency, duration, rng):
+    latencies, errors = [], 0
+    loop_lag = []
+    deadline = time.perf_counter() + duration
+
+    async def client():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            path, query = make_request(rng)
+            start = time.perf_counter()
+            if await asgi_get(app, path, query) != 200:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    async def ticker():
+        # how late a 10ms timer fires shows how long handlers hold the event loop
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            await asyncio.sleep(0.01)
+            loop_lag.append(time.perf_counter() - start - 0.01)
+
+    start = time.perf_counter()
+    await asyncio.gather(ticker(), *(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return len(latencies) / elapsed, statistics.median(latencies), max(loop_lag), errors
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Measure /api/articles requests/sec under concurrent load, in process")
+    parser.add_argument("--n_articles", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load per mode")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.environ["TRACKING_DB_PATH"] = os.path.join(tmp_dir, "feed_tracking.db")
+        os.environ["SOURCES_DB_PATH"] = os.path.join(tmp_dir, "sources.db")
+        create_databases(os.environ["TRACKING_DB_PATH"], os.environ["SOURCES_DB_PATH"], args.n_articles)
+        # the services read their database paths at import time
+        import services.article_service as article_service_module
+        from routers.article_router import router as article_router
+
+        app = FastAPI()
+        app.include_router(article_router, prefix="/api/articles")
+        pooled = (article_service_module.tracking_db, article_service_module.sources_db)
+        legacy = (
+            PerStatementDatabaseService(os.environ["TRACKING_DB_PATH"]),
+            PerStatementDatabaseService(os.environ["SOURCES_DB_PATH"]),
+        )
+        workloads = [("list", list_request), ("detail", lambda rng: detail_request(rng, args.n_articles))]
+        print(f"{'endpoint':<8} {'mode':<24} {'req/sec':>8} {'p50 ms':>8} {'max loop lag ms':>16} {'errors':>7}")
+        for endpoint, make_request in workloads:
+            for label, (tracking_db, sources_db) in [("per-statement, on loop", legacy), ("pooled, db executor", pooled)]:
+                article_service_module.tracking_db, article_service_module.sources_db = tracking_db, sources_db
+                rps, p50, lag, errors = asyncio.run(run_load(app, make_request, args.concurrency, args.duration, random.Random(7)))
+                print(f"{endpoint:<8} {label:<24} {rps:>8.1f} {p50 * 1000:>8.1f} {lag * 1000:>16.1f} {errors:>7}")
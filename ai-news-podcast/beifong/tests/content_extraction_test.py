@@ -0,0 +1,97 @@
+import os
+import glob
+import time
+import random
+import tempfile
+import argparse
+from bs4 import BeautifulSoup
+from utils.crawl_url import parse_web_page
+
+SENTENCES = [
+    "The central bank left interest rates unchanged on Thursday, citing persistent inflation.",
+    "Officials said the decision was unanimous, although two members argued for a cut.",
+    "Markets, which had priced in a small chance of a move, barely reacted.",
+    "Analysts expect the first reduction later this year if wage growth keeps slowing.",
+    "The statement noted that housing costs remain the largest driver of price rises.",
+]
+TEMPLATES = [
+    # news site with a labelled article body, share bar and related links
+    """<html><head><title>{title}</title><meta name="description" content="{title}"><script>{script}</script></head><body>
+    <header><nav>{links}</nav></header><div class="share-bar">{links}</div>
+    <div class="article-body">{paragraphs}</div>
+    <div class="related-stories"><ul>{items}</ul></div><footer>{links}</footer></body></html>""",
+    # blog with a content column, sidebar and comment thread
+    """<html><head><title>{title}</title><style>body {{ margin: 0 }}</style></head><body>
+    <div id="wrapper"><div id="content"><h1>{title}</h1>{paragraphs}</div>
+    <div id="sidebar"><ul>{items}</ul></div>
+    <div class="comments"><p>Great post, thanks for sharing your thoughts on this topic today.</p></div></div></body></html>""",
+    # legacy table layout
+    """<html><head><title>{title}</title></head><body><table><tr><td>{links}</td>
+    <td><span class="headline">{title}</span>{paragraphs}</td></tr></table></body></html>""",
+    # unlabelled divs only
+    """<html><head><title>{title}</title><script>{script}</script></head><body><div><div>{links}</div>
+    <div><div>{paragraphs}</div></div><div>{items}</div></div></body></html>""",
+]
+
+
+def write_fixture_corpus(fixtures_dir, n_documents, seed=42):
+    rng = random.Random(seed)
+    for i in range(n_documents):
+        paragraphs = "".join(
+            "<p>" + " ".join(rng.choices(SENTENCES, k=rng.randint(2, 6))) + "</p>" for _ in range(rng.randint(5, 40))
+        )
+        html = rng.choice(TEMPLATES).format(
+            title=f"Fixture article {i}",
+            script="window.dataLayer = [];" * rng.randint(50, 500),
+            links="".join(f"<a href='/section/{j}'>Section {j}</a> " for j in range(rng.randint(20, 120))),
+            items="".join(f"<li><a href='/story/{j}'>Another story headline {j}</a></li>" for j in range(rng.randint(5, 30))),
+            paragraphs=paragraphs,
+        )
+        with open(os.path.join(fixtures_dir, f"article_{i:05d}.html"), "wb") as f:
+            f.write(html.encode("utf-8"))
+
+
+def previous_pipeline(html):
+    # crawl-time parse storing str(body), then a second html.parser pass in the analysis stage
+    soup = BeautifulSoup(html, "html.parser")
+    body = str(soup.find("body"))
+    soup = BeautifulSoup(body, "html.parser")
+    for element in soup(["script", "style", "nav", "header", "footer", "aside"]):
+        element.decompose()
+    text = soup.get_text(separator="\n", strip=True)
+    return "\n".join(line.strip() for line in text.splitlines() if line.strip())
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Compare content extraction speed and output size on saved HTML fixtures")
+    parser.add_argument("--fixtures_dir", help="Directory of saved .html pages (a synthetic corpus is generated when omitted)")
+    parser.add_argument("--n_documents", type=int, default=300, help="Size of the generated corpus")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        fixtures_dir = args.fixtures_dir
+        if not fixtures_dir:
+            fixtures_dir = tmp_dir
+            write_fixture_corpus(fixtures_dir, args.n_documents)
+        documents = []
+        for path in sorted(glob.glob(os.path.join(fixtures_dir, "*.html"))):
+            with open(path, "rb") as f:
+                documents.append(f.read())
+    input_bytes = sum(len(document) for document in documents)
+    print(f"{len(documents)} documents, {input_bytes / len(documents) / 1024:.1f} KB average\n")
+    print(f"{'extractor':<28} {'docs/sec':>9} {'chars/doc':>10} {'tokens/doc':>11}")
+
+    start = time.perf_counter()
+    texts = [previous_pipeline(document) for document in documents]
+    elapsed = time.perf_counter() - start
+    print(f"{'html.parser, two passes':<28} {len(documents) / elapsed:>9.1f} {sum(map(len, texts)) / len(texts):>10.0f} {'-':>11}")
+
+    start = time.perf_counter()
+    pages = [parse_web_page(document, "utf-8") for document in documents]
+    elapsed = time.perf_counter() - start
+    chars = sum(len(page["text"]) for page in pages) / len(pages)
+    tokens = sum(page["token_count"] for page in pages) / len(pages)
+    print(f"{'lxml, single-pass extract':<28} {len(documents) / elapsed:>9.1f} {chars:>10.0f} {tokens:>11.0f}")
@@ -0,0 +1,110 @@
+import io
+import os
+import time
+import sqlite3
+import tempfile
+import argparse
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta
+import numpy as np
+import faiss
+from processors.faiss_indexing_processor import initialize_faiss_index, save_faiss_index, save_id_mapping
+from utils.faiss_search import FaissIndexHolder, build_article_filter
+
+CATEGORIES = ["politics", "technology", "science", "sports", "business", "health", "culture", "world"]
+
+
+def create_synthetic_corpus(tracking_db_path, n_articles, dimension, n_sources, seed=42):
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((200, dimension)).astype(np.float32)
+    vectors = centres[rng.integers(0, len(centres), n_articles)] + 0.4 * rng.standard_normal((n_articles, dimension)).astype(np.float32)
+    faiss.normalize_L2(vectors)
+    start = datetime(2025, 1, 1)
+    conn = sqlite3.connect(tracking_db_path)
+    conn.execute("CREATE TABLE crawled_articles (id INTEGER PRIMARY KEY, source_id INTEGER, published_date TIMESTAMP)")
+    conn.execute("CREATE TABLE article_categories (article_id INTEGER, category_name TEXT NOT NULL, PRIMARY KEY (article_id, category_name))")
+    conn.execute("CREATE INDEX idx_crawled_articles_published_date ON crawled_articles(published_date)")
+    conn.execute("CREATE INDEX idx_article_categories_category_name ON article_categories(category_name)")
+    conn.executemany(
+        "INSERT INTO crawled_articles (id, source_id, published_date) VALUES (?, ?, ?)",
+        (
+            (i + 1, int(rng.integers(1, n_sources + 1)), (start + timedelta(minutes=int(i * 525600 / n_articles))).isoformat())
+            for i in range(n_articles)
+        ),
+    )
+    conn.executemany(
+        "INSERT INTO article_categories (article_id, category_name) VALUES (?, ?)",
+        ((i + 1, CATEGORIES[int(rng.integers(0, len(CATEGORIES)))]) for i in range(n_articles)),
+    )
+    conn.commit()
+    conn.close()
+    return vectors, np.arange(1, n_articles + 1, dtype=np.int64)
+
+
+def exact_filtered_top_k(vectors, article_ids, allowed_article_ids, query, k):
+    mask = np.isin(article_ids, allowed_article_ids)
+    scores = vectors[mask] @ query
+    top = np.argsort(-scores)[:k]
+    return set(article_ids[mask][top].tolist())
+
+
+def run_case(label, holder, tracking_db_path, vectors, article_ids, queries, filters, k, post_filter_k):
+    post_latency, pre_latency, post_recall, pre_recall = [], [], [], []
+    for query in queries:
+        start = time.perf_counter()
+        allowed = build_article_filter(tracking_db_path, **filters)
+        allowed_set = set(allowed.tolist())
+        post_results = [article_id for article_id, _ in holder.search(query, post_filter_k)[0] if article_id in allowed_set][:k]
+        post_latency.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        allowed = build_article_filter(tracking_db_path, **filters)
+        pre_results = [article_id for article_id, _ in holder.search(query, k, allowed_article_ids=allowed)[0]]
+        pre_latency.append(time.perf_counter() - start)
+
+        expected = exact_filtered_top_k(vectors, article_ids, allowed, query, k)
+        post_recall.append(len(expected & set(post_results)) / max(1, len(expected)))
+        pre_recall.append(len(expected & set(pre_results)) / max(1, len(expected)))
+    selectivity = len(allowed) / len(article_ids)
+    print(f"{label:<22} {selectivity:>8.3%} {'post-filter':<12} {np.mean(post_recall):>8.3f} {np.percentile(post_latency, 50) * 1000:>9.2f}")
+    print(f"{'':<22} {'':>8} {'filtered ANN':<12} {np.mean(pre_recall):>8.3f} {np.percentile(pre_latency, 50) * 1000:>9.2f}")
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Compare filtered ANN search with top-k post-filtering")
+    parser.add_argument("--n_articles", type=int, default=100000)
+    parser.add_argument("--dimension", type=int, default=256)
+    parser.add_argument("--n_sources", type=int, default=50)
+    parser.add_argument("--n_queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--post_filter_k", type=int, default=20, help="Over-fetch size of the post-filter approach")
+    parser.add_argument("--index_type", default="hnsw", choices=["flat", "ivfflat", "hnsw"])
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tracking_db_path = os.path.join(tmp_dir, "feed_tracking.db")
+        index_path = os.path.join(tmp_dir, "article_index.faiss")
+        mapping_path = os.path.join(tmp_dir, "article_id_map.npy")
+        vectors, article_ids = create_synthetic_corpus(tracking_db_path, args.n_articles, args.dimension, args.n_sources)
+        with redirect_stdout(io.StringIO()):
+            n_list = max(1, int(4 * np.sqrt(args.n_articles)))
+            index = initialize_faiss_index(dimension=args.dimension, index_type=args.index_type, n_list=n_list, train_vectors=vectors[: n_list * 64])
+            index.add(vectors)
+            save_faiss_index(index, index_path)
+            save_id_mapping(article_ids.tolist(), mapping_path)
+            holder = FaissIndexHolder(index_path, mapping_path)
+            holder.get()
+        queries = vectors[np.random.default_rng(7).choice(len(vectors), args.n_queries, replace=False)]
+        cases = [
+            ("one source", {"source_ids": [1]}),
+            ("five sources", {"source_ids": [1, 2, 3, 4, 5]}),
+            ("one week", {"start_date": "2025-06-01", "end_date": "2025-06-08"}),
+            ("category", {"categories": ["science"]}),
+            ("category + month", {"categories": ["science"], "start_date": "2025-03-01", "end_date": "2025-04-01"}),
+        ]
+        print(f"{'filter':<22} {'matches':>8} {'method':<12} {f'recall@{args.k}':>8} {'p50 ms':>9}")
+        for label, filters in cases:
+            run_case(label, holder, tracking_db_path, vectors, article_ids, queries, filters, args.k, args.post_filter_k)
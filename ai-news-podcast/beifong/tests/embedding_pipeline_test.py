@@ -0,0 +1,123 @@
+import io
+import os
+import json
+import time
+import base64
+import sqlite3
+import tempfile
+import argparse
+import threading
+from contextlib import redirect_stdout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+from processors.embedding_processor import process_articles_for_embedding
+
+
+class StubEmbeddingHandler(BaseHTTPRequestHandler):
+    dimension = 1536
+    latency = 0.05
+    rate_limit_every = 0
+    request_count = 0
+    lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with StubEmbeddingHandler.lock:
+            StubEmbeddingHandler.request_count += 1
+            request_number = StubEmbeddingHandler.request_count
+        if self.rate_limit_every and request_number % self.rate_limit_every == 0:
+            self.send_response(429)
+            self.send_header("retry-after", "0.2")
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(json.dumps({"error": {"message": "Rate limit reached", "type": "requests"}}).encode())
+            return
+        inputs = body["input"] if isinstance(body["input"], list) else [body["input"]]
+        time.sleep(self.latency)
+        data = []
+        for i, text in enumerate(inputs):
+            vector = np.random.default_rng(abs(hash(text)) % 2**32).standard_normal(self.dimension).astype(np.float32)
+            if body.get("encoding_format") == "base64":
+                embedding = base64.b64encode(vector.tobytes()).decode()
+            else:
+                embedding = vector.tolist()
+            data.append({"object": "embedding", "index": i, "embedding": embedding})
+        payload = json.dumps({"object": "list", "data": data, "model": body["model"], "usage": {"prompt_tokens": 0, "total_tokens": 0}})
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(payload.encode())
+
+
+def create_articles(tracking_db_path, n_articles, seed=42):
+    rng = np.random.default_rng(seed)
+    words = ["market", "election", "climate", "research", "league", "policy", "startup", "health", "energy", "court"]
+    conn = sqlite3.connect(tracking_db_path)
+    conn.execute("""
+    CREATE TABLE crawled_articles (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT,
+        summary TEXT,
+        content TEXT,
+        published_date TIMESTAMP,
+        ai_status TEXT DEFAULT 'success',
+        processed BOOLEAN DEFAULT 1,
+        embedding_status TEXT DEFAULT NULL
+    )
+    """)
+    conn.executemany(
+        "INSERT INTO crawled_articles (title, summary, content, published_date) VALUES (?, ?, ?, ?)",
+        (
+            (
+                f"Article {i}",
+                " ".join(rng.choice(words, 40)),
+                " ".join(rng.choice(words, int(rng.integers(200, 2500)))),
+                f"2025-01-01T00:{i % 60:02d}:00",
+            )
+            for i in range(n_articles)
+        ),
+    )
+    conn.commit()
+    conn.close()
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Measure embedding pipeline throughput against a local stub server")
+    parser.add_argument("--n_articles", type=int, default=5000)
+    parser.add_argument("--latency", type=float, default=0.05, help="Simulated seconds per embeddings request")
+    parser.add_argument("--rate_limit_every", type=int, default=25, help="Answer every Nth request with HTTP 429 (0 disables)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    StubEmbeddingHandler.latency = args.latency
+    StubEmbeddingHandler.rate_limit_every = args.rate_limit_every
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubEmbeddingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    configurations = [
+        ("one article per request", {"concurrency": 1, "max_inputs_per_request": 1}),
+        ("batched", {"concurrency": 1}),
+        ("batched + concurrent", {"concurrency": 8}),
+    ]
+    print(f"{'mode':<26} {'requests':>8} {'429s':>6} {'stored':>7} {'articles/sec':>13}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for label, options in configurations:
+            tracking_db_path = os.path.join(tmp_dir, f"{label.replace(' ', '_')}.db")
+            create_articles(tracking_db_path, args.n_articles)
+            with redirect_stdout(io.StringIO()):
+                stats = process_articles_for_embedding(
+                    tracking_db_path=tracking_db_path,
+                    openai_api_key="stub",
+                    batch_size=args.n_articles,
+                    base_url=base_url,
+                    **options,
+                )
+            print(
+                f"{label:<26} {stats['requests']:>8} {stats['rate_limited']:>6} {stats['success_count']:>7} {stats['articles_per_second']:>13.1f}"
+            )
+    server.shutdown()
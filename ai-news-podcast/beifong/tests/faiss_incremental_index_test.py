@@ -0,0 +1,115 @@
+import io
+import os
+import time
+import sqlite3
+import tempfile
+import argparse
+from contextlib import redirect_stdout
+import numpy as np
+from processors.faiss_indexing_processor import ResidentFaissIndexer, process_embeddings_for_indexing
+
+
+def create_synthetic_embeddings(tracking_db_path, total_vectors, dimension, seed=42):
+    rng = np.random.default_rng(seed)
+    conn = sqlite3.connect(tracking_db_path)
+    conn.execute("""
+    CREATE TABLE article_embeddings (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        article_id INTEGER NOT NULL,
+        embedding BLOB NOT NULL,
+        embedding_model TEXT NOT NULL,
+        created_at TEXT NOT NULL,
+        in_faiss_index INTEGER DEFAULT 0
+    )
+    """)
+    conn.execute("CREATE INDEX idx_article_embeddings_in_faiss ON article_embeddings(in_faiss_index)")
+    for start in range(0, total_vectors, 10000):
+        count = min(10000, total_vectors - start)
+        vectors = rng.random((count, dimension), dtype=np.float32)
+        conn.executemany(
+            "INSERT INTO article_embeddings (article_id, embedding, embedding_model, created_at) VALUES (?, ?, 'synthetic', '')",
+            ((start + i + 1, vectors[i].tobytes()) for i in range(count)),
+        )
+    conn.commit()
+    conn.close()
+
+
+def benchmark_legacy(tracking_db_path, index_path, mapping_path, batch_size):
+    timings = []
+    while True:
+        start = time.perf_counter()
+        with redirect_stdout(io.StringIO()):
+            stats = process_embeddings_for_indexing(
+                tracking_db_path=tracking_db_path,
+                index_path=index_path,
+                mapping_path=mapping_path,
+                batch_size=batch_size,
+                index_type="flat",
+            )
+        if stats["processed"] == 0:
+            break
+        timings.append((stats["total_vectors"], time.perf_counter() - start))
+    return timings
+
+
+def benchmark_resident(tracking_db_path, index_path, mapping_path, batch_size, compact_every):
+    timings = []
+    indexer = ResidentFaissIndexer(
+        tracking_db_path=tracking_db_path,
+        index_path=index_path,
+        mapping_path=mapping_path,
+        index_type="flat",
+        chunk_size=batch_size,
+        compact_every=compact_every,
+    )
+    with redirect_stdout(io.StringIO()):
+        indexer.load()
+    while True:
+        start = time.perf_counter()
+        with redirect_stdout(io.StringIO()):
+            processed = indexer.index_next_chunk()
+        if processed == 0:
+            break
+        timings.append((indexer.faiss_index.ntotal, time.perf_counter() - start))
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        indexer.compact()
+    return timings, time.perf_counter() - start
+
+
+def print_timings(label, timings, samples=8):
+    print(f"\n{label}")
+    print(f"{'index size':>12} {'batch ms':>10}")
+    step = max(1, len(timings) // samples)
+    for total_vectors, seconds in timings[::step]:
+        print(f"{total_vectors:>12} {seconds * 1000:>10.2f}")
+    print(f"Total: {sum(seconds for _, seconds in timings):.2f}s over {len(timings)} batches")
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Benchmark per-batch FAISS indexing cost as the index grows")
+    parser.add_argument("--total_vectors", type=int, default=100000)
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--batch_size", type=int, default=1000)
+    parser.add_argument("--compact_every", type=int, default=50)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for mode in ["legacy", "resident"]:
+            tracking_db_path = os.path.join(tmp_dir, f"{mode}.db")
+            index_path = os.path.join(tmp_dir, mode, "article_index.faiss")
+            mapping_path = os.path.join(tmp_dir, mode, "article_id_map.npy")
+            os.makedirs(os.path.dirname(index_path), exist_ok=True)
+            create_synthetic_embeddings(tracking_db_path, args.total_vectors, args.dimension)
+            if mode == "legacy":
+                timings = benchmark_legacy(tracking_db_path, index_path, mapping_path, args.batch_size)
+                print_timings("Reload/rewrite per batch (process_embeddings_for_indexing)", timings)
+            else:
+                timings, compaction_seconds = benchmark_resident(
+                    tracking_db_path, index_path, mapping_path, args.batch_size, args.compact_every
+                )
+                print_timings(f"Resident indexer with delta log (compact every {args.compact_every} batches)", timings)
+                print(f"Final compaction: {compaction_seconds * 1000:.2f} ms")
@@ -0,0 +1,68 @@
+import io
+import time
+import argparse
+from contextlib import redirect_stdout
+import numpy as np
+import faiss
+from processors.faiss_indexing_processor import choose_n_list, default_nprobe, initialize_faiss_index
+
+
+def make_clustered_corpus(n_vectors, n_queries, dimension, n_topics, seed=42):
+    # unit-norm vectors grouped around topic centres, roughly how text embeddings are distributed
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((n_topics, dimension)).astype(np.float32)
+    topics = rng.integers(0, n_topics, n_vectors + n_queries)
+    vectors = centres[topics] + 0.35 * rng.standard_normal((n_vectors + n_queries, dimension)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.ascontiguousarray(vectors[:n_vectors]), np.ascontiguousarray(vectors[n_vectors:])
+
+
+def timed_search(index, queries, k):
+    start = time.perf_counter()
+    _, indices = index.search(queries, k)
+    return indices, (time.perf_counter() - start) * 1000 / len(queries)
+
+
+def recall_at_k(indices, ground_truth):
+    k = ground_truth.shape[1]
+    hits = sum(len(set(found[:k]) & set(expected)) for found, expected in zip(indices, ground_truth))
+    return hits / ground_truth.size
+
+
+def build_index(index_type, dimension, n_list, corpus, train_vectors):
+    with redirect_stdout(io.StringIO()):
+        index = initialize_faiss_index(dimension=dimension, index_type=index_type, n_list=n_list, train_vectors=train_vectors)
+    index.add(corpus)
+    return index
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Compare recall@k and latency of IVF indexes trained on random vs real vectors")
+    parser.add_argument("--n_vectors", type=int, default=100000)
+    parser.add_argument("--n_queries", type=int, default=500)
+    parser.add_argument("--dimension", type=int, default=256)
+    parser.add_argument("--n_topics", type=int, default=400)
+    parser.add_argument("--k", type=int, default=10)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    corpus, queries = make_clustered_corpus(args.n_vectors, args.n_queries, args.dimension, args.n_topics)
+    flat_index = faiss.IndexFlatL2(args.dimension)
+    flat_index.add(corpus)
+    ground_truth, flat_ms = timed_search(flat_index, queries, args.k)
+    print(f"Flat baseline: recall@{args.k}=1.000, {flat_ms:.3f} ms/query")
+
+    n_list = choose_n_list(args.n_vectors)
+    rng = np.random.default_rng(7)
+    sample = corpus[rng.choice(args.n_vectors, size=min(args.n_vectors, n_list * 64), replace=False)]
+    print(f"n_list={n_list} (chosen for {args.n_vectors} vectors), default nprobe={default_nprobe(n_list)}\n")
+    print(f"{'index':<10} {'training':<10} {'nprobe':>6} {f'recall@{args.k}':>10} {'ms/query':>9}")
+    for index_type in ["ivfflat", "ivfpq"]:
+        for training, train_vectors in [("random", None), ("sampled", sample)]:
+            index = build_index(index_type, args.dimension, n_list, corpus, train_vectors)
+            for nprobe in sorted({1, default_nprobe(n_list), 4 * default_nprobe(n_list)}):
+                index.nprobe = nprobe
+                indices, ms = timed_search(index, queries, args.k)
+                print(f"{index_type:<10} {training:<10} {nprobe:>6} {recall_at_k(indices, ground_truth):>10.3f} {ms:>9.3f}")
@@ -0,0 +1,131 @@
+import os
+import time
+import sqlite3
+import argparse
+import tempfile
+from datetime import datetime
+from db.connection import db_connection
+from db.feeds import TRACKING_DB_PRAGMAS, entry_fingerprint, store_feed_entries
+
+
+def create_feed_entries_table(tracking_db_path, wal):
+    conn = sqlite3.connect(tracking_db_path)
+    if wal:
+        conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("""
+    CREATE TABLE feed_entries (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        feed_id INTEGER,
+        source_id INTEGER,
+        entry_id TEXT,
+        title TEXT,
+        link TEXT UNIQUE,
+        published_date TIMESTAMP,
+        content TEXT,
+        summary TEXT,
+        crawl_status TEXT DEFAULT 'pending',
+        crawl_attempts INTEGER DEFAULT 0,
+        processed_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        fingerprint TEXT,
+        UNIQUE(feed_id, entry_id)
+    )
+    """)
+    conn.execute("CREATE INDEX idx_feed_entries_feed_id ON feed_entries(feed_id)")
+    conn.execute("CREATE INDEX idx_feed_entries_link ON feed_entries(link)")
+    conn.execute("CREATE INDEX idx_feed_entries_fingerprint ON feed_entries(feed_id, fingerprint)")
+    conn.commit()
+    conn.close()
+
+
+def make_feed_snapshot(feed_id, start, n_entries):
+    entries = []
+    for i in range(start, start + n_entries):
+        entry_id = f"https://example.com/feed/{feed_id}/story/{i}"
+        entries.append(
+            {
+                "entry_id": entry_id,
+                "title": f"Story {i} from feed {feed_id}",
+                "link": entry_id,
+                "published_date": datetime(2025, 1, 1).isoformat(),
+                "content": "Lorem ipsum dolor sit amet " * 20,
+                "summary": "Lorem ipsum dolor sit amet",
+                "fingerprint": entry_fingerprint(entry_id, entry_id),
+            }
+        )
+    return entries
+
+
+def store_feed_entries_one_by_one(tracking_db_path, feed_id, source_id, entries):
+    # the previous implementation, kept here as the baseline
+    count = 0
+    conn = sqlite3.connect(tracking_db_path)
+    cursor = conn.cursor()
+    for entry in entries:
+        try:
+            cursor.execute(
+                """
+            INSERT INTO feed_entries
+            (feed_id, source_id, entry_id, title, link, published_date, content, summary)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+                (
+                    feed_id,
+                    source_id,
+                    entry["entry_id"],
+                    entry["title"],
+                    entry["link"],
+                    entry["published_date"],
+                    entry["content"],
+                    entry["summary"],
+                ),
+            )
+            count += 1
+        except sqlite3.IntegrityError:
+            pass
+    conn.commit()
+    conn.close()
+    return count
+
+
+def store_feed_entries_shared_connection(tracking_db_path, n_feeds, snapshots):
+    with db_connection(tracking_db_path, TRACKING_DB_PRAGMAS) as conn:
+        return sum(store_feed_entries(tracking_db_path, feed_id, feed_id, snapshots[feed_id], conn) for feed_id in range(n_feeds))
+
+
+def ingest(store, tracking_db_path, n_feeds, snapshots):
+    start = time.perf_counter()
+    if store is store_feed_entries_shared_connection:
+        stored = store(tracking_db_path, n_feeds, snapshots)
+    else:
+        stored = sum(store(tracking_db_path, feed_id, feed_id, snapshots[feed_id]) for feed_id in range(n_feeds))
+    return stored, time.perf_counter() - start
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Measure feed entry ingestion throughput")
+    parser.add_argument("--n_entries", type=int, default=100000)
+    parser.add_argument("--entries_per_feed", type=int, default=50)
+    parser.add_argument("--new_per_poll", type=int, default=2, help="New entries per feed on the repeat poll")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    n_feeds = args.n_entries // args.entries_per_feed
+    first_poll = [make_feed_snapshot(feed_id, 0, args.entries_per_feed) for feed_id in range(n_feeds)]
+    # the next poll returns the same window shifted by a couple of new stories
+    second_poll = [make_feed_snapshot(feed_id, args.new_per_poll, args.entries_per_feed) for feed_id in range(n_feeds)]
+    configurations = [
+        ("one-by-one", store_feed_entries_one_by_one, False),
+        ("bulk + fingerprints", store_feed_entries, True),
+        ("bulk, one connection", store_feed_entries_shared_connection, True),
+    ]
+    print(f"Pragmas for bulk ingestion: {', '.join(TRACKING_DB_PRAGMAS)}")
+    print(f"{'mode':<24} {'poll':<8} {'stored':>8} {'seconds':>8} {'entries/sec':>12}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for label, store, wal in configurations:
+            tracking_db_path = os.path.join(tmp_dir, f"{label.replace(' ', '_')}.db")
+            create_feed_entries_table(tracking_db_path, wal)
+            for poll, snapshots in [("first", first_poll), ("repeat", second_poll)]:
+                stored, elapsed = ingest(store, tracking_db_path, n_feeds, snapshots)
+                print(f"{label:<24} {poll:<8} {stored:>8} {elapsed:>8.2f} {n_feeds * args.entries_per_feed / elapsed:>12.0f}")
@@ -0,0 +1,104 @@
+import io
+import os
+import time
+import sqlite3
+import tempfile
+import argparse
+import threading
+from contextlib import redirect_stdout
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubFeedHandler(BaseHTTPRequestHandler):
+    latency = 0.2
+    entries_per_feed = 20
+    last_modified = formatdate(usegmt=True)
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        etag = f'"{abs(hash(self.path))}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        items = "".join(
+            f"<item><title>{self.path} story {i}</title><link>http://example.com{self.path}/{i}</link>"
+            f"<guid>{self.path}/{i}</guid><description>Summary {i}</description>"
+            f"<pubDate>{self.last_modified}</pubDate></item>"
+            for i in range(self.entries_per_feed)
+        )
+        body = f'<?xml version="1.0"?><rss version="2.0"><channel><title>{self.path}</title>{items}</channel></rss>'.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/rss+xml")
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", self.last_modified)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def create_feeds(sources_db_path, port, n_feeds, n_hosts):
+    conn = sqlite3.connect(sources_db_path)
+    conn.executemany(
+        "INSERT INTO sources (id, name) VALUES (?, ?)",
+        ((host + 1, f"Host {host}") for host in range(n_hosts)),
+    )
+    # 127.0.0.x all reach the same server but count as separate hosts for the politeness limits
+    conn.executemany(
+        "INSERT INTO source_feeds (source_id, feed_url, feed_type) VALUES (?, ?, 'rss')",
+        ((i % n_hosts + 1, f"http://127.0.0.{i % n_hosts + 1}:{port}/feed/{i}") for i in range(n_feeds)),
+    )
+    conn.commit()
+    conn.close()
+
+
+def sequential_baseline(feed_urls):
+    from utils.rss_feed_parser import get_feed_data
+
+    start = time.perf_counter()
+    for feed_url in feed_urls:
+        get_feed_data(feed_url)
+    return len(feed_urls) / (time.perf_counter() - start)
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Compare sequential and concurrent feed fetching against a local stub server")
+    parser.add_argument("--n_feeds", type=int, default=400)
+    parser.add_argument("--n_hosts", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.2, help="Simulated seconds per feed response")
+    parser.add_argument("--per_host_delay", type=float, default=0.1)
+    parser.add_argument("--baseline_feeds", type=int, default=40, help="Feeds fetched by the sequential baseline")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    StubFeedHandler.latency = args.latency
+    server = ThreadingHTTPServer(("0.0.0.0", 0), StubFeedHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.environ["SOURCES_DB_PATH"] = os.path.join(tmp_dir, "sources.db")
+        os.environ["TRACKING_DB_PATH"] = os.path.join(tmp_dir, "feed_tracking.db")
+        from services.db_init import init_sources_db, init_tracking_db
+        from processors.feed_processor import fetch_and_process_feeds
+
+        with redirect_stdout(io.StringIO()):
+            init_sources_db()
+            init_tracking_db()
+        create_feeds(os.environ["SOURCES_DB_PATH"], port, args.n_feeds, args.n_hosts)
+
+        baseline_urls = [f"http://127.0.0.{i % args.n_hosts + 1}:{port}/baseline/{i}" for i in range(args.baseline_feeds)]
+        print(f"{'mode':<28} {'fetched':>8} {'unchanged':>10} {'feeds/sec':>10}")
+        print(f"{'sequential (feedparser)':<28} {len(baseline_urls):>8} {0:>10} {sequential_baseline(baseline_urls):>10.1f}")
+        for label in ["concurrent, cold", "concurrent, conditional GET"]:
+            with redirect_stdout(io.StringIO()):
+                stats = fetch_and_process_feeds(per_host_delay=args.per_host_delay, ignore_schedule=True)
+            print(f"{label:<28} {stats['processed_feeds']:>8} {stats['unchanged_feeds']:>10} {stats['feeds_per_second']:>10.1f}")
+    server.shutdown()
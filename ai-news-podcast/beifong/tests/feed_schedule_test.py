@@ -0,0 +1,79 @@
+import argparse
+import statistics
+import numpy as np
+from utils.feed_schedule import FEED_FAILED, FEED_NEW_ENTRIES, FEED_UNCHANGED, next_poll_interval
+
+HOUR = 60 * 60
+DAY = 24 * HOUR
+FEED_PROFILES = [
+    ("breaking news", 0.3, 10 * 60),
+    ("daily news", 0.4, 2 * HOUR),
+    ("blog", 0.2, 2 * DAY),
+    ("weekly", 0.08, 7 * DAY),
+    ("broken", 0.02, None),
+]
+
+
+def make_feeds(n_feeds, duration, rng):
+    feeds = []
+    weights = [weight for _, weight, _ in FEED_PROFILES]
+    for profile in rng.choice(len(FEED_PROFILES), n_feeds, p=weights):
+        name, _, mean_gap = FEED_PROFILES[profile]
+        if mean_gap is None:
+            feeds.append((name, None))
+            continue
+        # start a few gaps before the window so the first poll already sees history
+        gaps = rng.exponential(mean_gap, int(duration / mean_gap * 2) + 20)
+        feeds.append((name, np.cumsum(gaps) - 10 * mean_gap))
+    return feeds
+
+
+def observed_publish_interval(times, now, window=20):
+    published = times[times <= now][-window:]
+    gaps = np.diff(published)
+    gaps = gaps[gaps > 0]
+    return float(statistics.median(gaps)) if len(gaps) else None
+
+
+def simulate(feeds, duration, fixed_interval=None):
+    requests, delays = 0, []
+    for _, times in feeds:
+        now, interval, failures, last_seen = 0.0, None, 0, -np.inf
+        while now < duration:
+            requests += 1
+            if times is None:
+                failures += 1
+                outcome = FEED_FAILED
+            else:
+                fresh = times[(times > last_seen) & (times <= now)]
+                delays.extend(now - fresh[fresh >= 0])
+                outcome = FEED_NEW_ENTRIES if len(fresh) else FEED_UNCHANGED
+                last_seen = max(last_seen, now)
+                failures = 0
+            if fixed_interval:
+                interval = fixed_interval
+            else:
+                publish_interval = observed_publish_interval(times, now) if times is not None else None
+                interval = next_poll_interval(outcome, interval, publish_interval, failures)
+            now += interval
+    return requests, delays
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Simulate request volume and freshness of fixed vs adaptive feed polling")
+    parser.add_argument("--n_feeds", type=int, default=1000)
+    parser.add_argument("--days", type=float, default=7)
+    parser.add_argument("--fixed_interval", type=float, default=15 * 60, help="Seconds between polls of the fixed schedule")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    duration = args.days * DAY
+    feeds = make_feeds(args.n_feeds, duration, np.random.default_rng(42))
+    print(f"{'schedule':<10} {'requests':>10} {'median delay':>13} {'p95 delay':>10}")
+    for label, fixed_interval in [("fixed", args.fixed_interval), ("adaptive", None)]:
+        requests, delays = simulate(feeds, duration, fixed_interval)
+        median_minutes = np.percentile(delays, 50) / 60
+        p95_minutes = np.percentile(delays, 95) / 60
+        print(f"{label:<10} {requests:>10} {median_minutes:>11.1f}m {p95_minutes:>9.1f}m")
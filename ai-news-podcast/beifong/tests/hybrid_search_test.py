@@ -0,0 +1,170 @@
+import io
+import os
+import time
+import sqlite3
+import argparse
+import tempfile
+from contextlib import redirect_stdout
+import numpy as np
+import faiss
+from db.articles import create_article_search_index
+from processors.faiss_indexing_processor import initialize_faiss_index, save_faiss_index, save_id_mapping
+from utils.hybrid_search import hybrid_search, lexical_candidates, semantic_candidates
+
+FILLER = "officials said on tuesday that the plan would be reviewed again next month after further talks".split()
+
+
+def pseudo_word(rng):
+    return "".join(rng.choice(list("bcdfghjklmnprstvz")) + rng.choice(list("aeiou")) for _ in range(4))
+
+
+def create_labelled_fixtures(tmp_dir, n_topics, subtopics, per_subtopic, n_background, dimension, synonym_rate, seed=42):
+    """
+    Articles are grouped in subtopics of a few topics. A subtopic's articles use its keyword, or a
+    synonym the query never mentions; their vectors sit near the topic but only slightly apart per
+    subtopic. So keyword search misses synonym articles and vector search mixes sibling subtopics.
+    """
+    rng = np.random.default_rng(seed)
+    tracking_db_path = os.path.join(tmp_dir, "feed_tracking.db")
+    sources_db_path = os.path.join(tmp_dir, "sources.db")
+    index_path = os.path.join(tmp_dir, "article_index.faiss")
+    mapping_path = os.path.join(tmp_dir, "article_id_map.npy")
+    rows, vectors, labelled_queries = [], [], []
+    for topic in range(n_topics):
+        centre = rng.standard_normal(dimension)
+        for subtopic in range(subtopics):
+            offset = rng.standard_normal(dimension)
+            keyword, synonym = pseudo_word(rng), pseudo_word(rng)
+            relevant = []
+            for _ in range(per_subtopic):
+                article_id = len(rows) + 1
+                word = synonym if rng.random() < synonym_rate else keyword
+                text = " ".join(rng.choice(FILLER, 40).tolist() + [word])
+                rows.append((article_id, f"Report {article_id}", text, text[:120]))
+                vectors.append(centre + 0.15 * offset + rng.standard_normal(dimension))
+                relevant.append(article_id)
+            query_vector = centre + 0.15 * offset + 0.5 * rng.standard_normal(dimension)
+            labelled_queries.append((keyword, query_vector.astype(np.float32), set(relevant)))
+    keywords = [query for query, _, _ in labelled_queries]
+    for _ in range(n_background):
+        article_id = len(rows) + 1
+        words = rng.choice(FILLER, 40).tolist()
+        # a few unrelated articles mention a keyword in passing
+        if rng.random() < 0.02:
+            words.append(keywords[int(rng.integers(len(keywords)))])
+        text = " ".join(words)
+        rows.append((article_id, f"Report {article_id}", text, text[:120]))
+        vectors.append(rng.standard_normal(dimension))
+    vectors = np.array(vectors, dtype=np.float32)
+    faiss.normalize_L2(vectors)
+
+    conn = sqlite3.connect(tracking_db_path)
+    conn.execute("""
+    CREATE TABLE crawled_articles (
+        id INTEGER PRIMARY KEY,
+        source_id INTEGER,
+        title TEXT,
+        url TEXT,
+        published_date TIMESTAMP,
+        content TEXT,
+        summary TEXT,
+        processed BOOLEAN DEFAULT 1
+    )
+    """)
+    conn.execute("CREATE TABLE article_categories (article_id INTEGER, category_name TEXT NOT NULL)")
+    create_article_search_index(conn)
+    conn.executemany(
+        "INSERT INTO crawled_articles (id, source_id, title, url, published_date, content, summary) VALUES (?, ?, ?, ?, '2025-01-01', ?, ?)",
+        (
+            (article_id, article_id % 10 + 1, title, f"https://example.com/{article_id}", content, summary)
+            for article_id, title, content, summary in rows
+        ),
+    )
+    conn.commit()
+    conn.close()
+    conn = sqlite3.connect(sources_db_path)
+    conn.execute("CREATE TABLE sources (id INTEGER PRIMARY KEY, name TEXT)")
+    conn.executemany("INSERT INTO sources (id, name) VALUES (?, ?)", ((i, f"Source {i}") for i in range(1, 11)))
+    conn.commit()
+    conn.close()
+    with redirect_stdout(io.StringIO()):
+        index = initialize_faiss_index(dimension=dimension, index_type="hnsw")
+        index.add(vectors)
+        save_faiss_index(index, index_path)
+        save_id_mapping(list(range(1, len(rows) + 1)), mapping_path)
+    return tracking_db_path, sources_db_path, index_path, mapping_path, labelled_queries
+
+
+def relevance_metrics(ranked_ids, relevant, k):
+    top = ranked_ids[:k]
+    hits = [article_id in relevant for article_id in top]
+    recall = sum(hits) / min(k, len(relevant))
+    reciprocal_rank = next((1 / (rank + 1) for rank, hit in enumerate(hits) if hit), 0.0)
+    dcg = sum(1 / np.log2(rank + 2) for rank, hit in enumerate(hits) if hit)
+    ideal = sum(1 / np.log2(rank + 2) for rank in range(min(k, len(relevant))))
+    return recall, reciprocal_rank, dcg / ideal
+
+
+def evaluate(label, search, labelled_queries, k):
+    metrics, latencies = [], []
+    for query, query_vector, relevant in labelled_queries:
+        start = time.perf_counter()
+        ranked_ids = search(query, query_vector)
+        latencies.append(time.perf_counter() - start)
+        metrics.append(relevance_metrics(ranked_ids, relevant, k))
+    recall, mrr, ndcg = np.mean(metrics, axis=0)
+    print(f"{label:<10} {recall:>10.3f} {mrr:>7.3f} {ndcg:>8.3f} {np.percentile(latencies, 50) * 1000:>9.2f}")
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Offline relevance and latency harness for keyword, semantic and hybrid article search")
+    parser.add_argument("--n_topics", type=int, default=20)
+    parser.add_argument("--subtopics", type=int, default=5)
+    parser.add_argument("--per_subtopic", type=int, default=10)
+    parser.add_argument("--n_background", type=int, default=20000)
+    parser.add_argument("--dimension", type=int, default=128)
+    parser.add_argument("--synonym_rate", type=float, default=0.4, help="Share of relevant articles that never use the query keyword")
+    parser.add_argument("--k", type=int, default=10)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tracking_db_path, sources_db_path, index_path, mapping_path, labelled_queries = create_labelled_fixtures(
+            tmp_dir, args.n_topics, args.subtopics, args.per_subtopic, args.n_background, args.dimension, args.synonym_rate
+        )
+        print(f"{len(labelled_queries)} labelled queries, {args.per_subtopic} relevant articles each\n")
+        print(f"{'retriever':<10} {f'recall@{args.k}':>10} {'MRR':>7} {f'nDCG@{args.k}':>8} {'p50 ms':>9}")
+        evaluate(
+            "keyword",
+            lambda query, _: [article_id for article_id, _ in lexical_candidates(tracking_db_path, [query], args.k)],
+            labelled_queries,
+            args.k,
+        )
+        evaluate(
+            "semantic",
+            lambda query, vector: [
+                article_id
+                for article_id, _ in semantic_candidates(tracking_db_path, index_path, mapping_path, query, args.k, query_embedding=vector)
+            ],
+            labelled_queries,
+            args.k,
+        )
+        evaluate(
+            "hybrid",
+            lambda query, vector: [
+                result["id"]
+                for result in hybrid_search(
+                    query,
+                    limit=args.k,
+                    query_embedding=vector,
+                    tracking_db_path=tracking_db_path,
+                    sources_db_path=sources_db_path,
+                    index_path=index_path,
+                    mapping_path=mapping_path,
+                )
+            ],
+            labelled_queries,
+            args.k,
+        )
@@ -0,0 +1,94 @@
+import os
+import time
+import random
+import sqlite3
+import asyncio
+import argparse
+import tempfile
+import statistics
+from tests.articles_api_load_test import create_databases
+
+
+def add_listing_index(tracking_db_path):
+    conn = sqlite3.connect(tracking_db_path)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_crawled_articles_listing ON crawled_articles(ai_status, processed, published_date)")
+    conn.commit()
+    conn.close()
+
+
+async def offset_page(tracking_db, page, per_page, date_from):
+    # the previous listing: datetime() around the column, OFFSET paging and a fresh COUNT(*) per request
+    where = "WHERE ca.processed = 1 AND ca.ai_status = 'success' AND datetime(ca.published_date) >= datetime(?)"
+    count = await tracking_db.execute_query(f"SELECT COUNT(*) AS count FROM crawled_articles ca {where}", (date_from,), fetch=True, fetch_one=True)
+    rows = await tracking_db.execute_query(
+        f"SELECT ca.id, ca.title, ca.url, ca.published_date, ca.summary, ca.feed_id FROM crawled_articles ca {where} "
+        "ORDER BY datetime(ca.published_date) DESC, ca.id DESC LIMIT ? OFFSET ?",
+        (date_from, per_page, (page - 1) * per_page),
+        fetch=True,
+    )
+    return count["count"], rows
+
+
+def percentile(latencies, q):
+    return statistics.quantiles(latencies, n=100)[q - 1] * 1000 if len(latencies) > 1 else latencies[0] * 1000
+
+
+async def measure(args):
+    # the services read their database paths at import time
+    from services.article_service import ArticleService
+    from services.db_service import tracking_db
+    from services.pagination import count_cache
+
+    service = ArticleService()
+    date_from = "2025-01-01"
+    results = []
+    for page in (1, args.deep_page):
+        latencies = []
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            await offset_page(tracking_db, page, args.per_page, date_from)
+            latencies.append(time.perf_counter() - start)
+        results.append((f"page {page}", "offset + datetime()", latencies))
+
+    first_page = []
+    for _ in range(args.repeats):
+        count_cache.invalidate()
+        start = time.perf_counter()
+        await service.get_articles(page=1, per_page=args.per_page, date_from=date_from)
+        first_page.append(time.perf_counter() - start)
+    results.append(("page 1", "keyset, cached count", first_page))
+
+    # a reader walking the listing: every page continues from the cursor of the one before
+    deep_pages, cursor = [], None
+    for page in range(1, args.deep_page + 1):
+        start = time.perf_counter()
+        result = await service.get_articles(page=page, per_page=args.per_page, date_from=date_from, cursor=cursor)
+        elapsed = time.perf_counter() - start
+        if page > args.deep_page - args.repeats:
+            deep_pages.append(elapsed)
+        cursor = result.next_cursor
+    results.append((f"page {args.deep_page}", "keyset, cached count", deep_pages))
+    return results
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Compare OFFSET and keyset pagination latency of the article listing")
+    parser.add_argument("--n_articles", type=int, default=200000)
+    parser.add_argument("--per_page", type=int, default=20)
+    parser.add_argument("--deep_page", type=int, default=5000)
+    parser.add_argument("--repeats", type=int, default=20)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    random.seed(42)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.environ["TRACKING_DB_PATH"] = os.path.join(tmp_dir, "feed_tracking.db")
+        os.environ["SOURCES_DB_PATH"] = os.path.join(tmp_dir, "sources.db")
+        create_databases(os.environ["TRACKING_DB_PATH"], os.environ["SOURCES_DB_PATH"], args.n_articles)
+        add_listing_index(os.environ["TRACKING_DB_PATH"])
+        print(f"{args.n_articles} articles, {args.per_page} per page\n")
+        print(f"{'page':<10} {'mode':<22} {'p50 ms':>8} {'p95 ms':>8}")
+        for page, label, latencies in asyncio.run(measure(args)):
+            print(f"{page:<10} {label:<22} {statistics.median(latencies) * 1000:>8.1f} {percentile(latencies, 95):>8.1f}")
@@ -0,0 +1,171 @@
+import os
+import time
+import random
+import argparse
+import tempfile
+import threading
+import numpy as np
+from db.connection import db_connection
+from utils.pipeline_scheduler import PIPELINE_DAG, PipelineScheduler
+
+STAGES = list(PIPELINE_DAG)
+
+
+class StubPipeline:
+    """The crawl -> analyze -> embed -> index stages against a real tracking database, with network calls replaced by sleeps."""
+
+    def __init__(self, tracking_db_path, latencies):
+        self.tracking_db_path = tracking_db_path
+        self.latencies = latencies
+        self.published = {}
+        self.indexed = {}
+        self.max_analyze_backlog = 0
+
+    def publish(self, n_entries):
+        now = time.perf_counter()
+        with db_connection(self.tracking_db_path) as conn:
+            for _ in range(n_entries):
+                link = f"https://example.com/{len(self.published)}"
+                self.published[link] = now
+                conn.execute("INSERT INTO feed_entries (feed_id, source_id, entry_id, title, link) VALUES (1, 1, ?, 'Title', ?)", (link, link))
+            conn.commit()
+
+    def run_stage(self, stage):
+        with db_connection(self.tracking_db_path) as conn:
+            if stage == "url_crawler":
+                rows = conn.execute("SELECT id, link FROM feed_entries WHERE crawl_status = 'pending' LIMIT 100").fetchall()
+                time.sleep(self.latencies[stage] * bool(rows))
+                conn.executemany("INSERT INTO crawled_articles (entry_id, title, url) VALUES (?, 'Title', ?)", [tuple(row) for row in rows])
+                conn.executemany("UPDATE feed_entries SET crawl_status = 'success' WHERE id = ?", [(row["id"],) for row in rows])
+            elif stage == "ai_analyzer":
+                backlog = conn.execute("SELECT COUNT(*) FROM crawled_articles WHERE ai_status = 'pending'").fetchone()[0]
+                self.max_analyze_backlog = max(self.max_analyze_backlog, backlog)
+                rows = conn.execute("SELECT id FROM crawled_articles WHERE ai_status = 'pending' AND processed = 0 LIMIT 20").fetchall()
+                time.sleep(self.latencies[stage] * bool(rows))
+                conn.executemany("UPDATE crawled_articles SET ai_status = 'success', processed = 1 WHERE id = ?", [tuple(row) for row in rows])
+            elif stage == "embedding_processor":
+                rows = conn.execute(
+                    """
+                    SELECT ca.id FROM crawled_articles ca WHERE ca.ai_status = 'success'
+                    AND NOT EXISTS (SELECT 1 FROM article_embeddings ae WHERE ae.article_id = ca.id) LIMIT 100
+                    """
+                ).fetchall()
+                time.sleep(self.latencies[stage] * bool(rows))
+                conn.executemany(
+                    "INSERT INTO article_embeddings (article_id, embedding, embedding_model, created_at) VALUES (?, x'00', 'stub', '')",
+                    [tuple(row) for row in rows],
+                )
+            elif stage == "faiss_indexer":
+                rows = conn.execute(
+                    "SELECT ae.id, ca.url FROM article_embeddings ae JOIN crawled_articles ca ON ca.id = ae.article_id WHERE ae.in_faiss_index = 0"
+                ).fetchall()
+                time.sleep(self.latencies[stage] * bool(rows))
+                conn.executemany("UPDATE article_embeddings SET in_faiss_index = 1 WHERE id = ?", [(row["id"],) for row in rows])
+                now = time.perf_counter()
+                for row in rows:
+                    self.indexed[row["url"]] = now
+            conn.commit()
+
+    def freshness(self):
+        return np.array([self.indexed[link] - published for link, published in self.published.items() if link in self.indexed])
+
+
+def new_tracking_db(tmp_dir, name):
+    os.environ["TRACKING_DB_PATH"] = os.path.join(tmp_dir, f"{name}.db")
+    from services.db_init import init_tracking_db
+
+    init_tracking_db()
+    return os.environ["TRACKING_DB_PATH"]
+
+
+def publish_for(stub, seconds, rate, rng):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        stub.publish(rng.randint(1, 2 * rate))
+        time.sleep(1.0)
+
+
+def run_interval(stub, args, rng):
+    # every stage as its own task, run every ``interval`` seconds from an arbitrary phase
+    stop = threading.Event()
+
+    def loop(stage):
+        stop.wait(rng.uniform(0, args.interval))
+        while not stop.is_set():
+            stub.run_stage(stage)
+            stop.wait(args.interval)
+
+    threads = [threading.Thread(target=loop, args=(stage,), daemon=True) for stage in STAGES]
+    for thread in threads:
+        thread.start()
+    publish_for(stub, args.seconds, args.rate, rng)
+    deadline = time.perf_counter() + len(STAGES) * args.interval * 2
+    while len(stub.indexed) < len(stub.published) and time.perf_counter() < deadline:
+        time.sleep(0.2)
+    stop.set()
+    return None
+
+
+def run_pipeline(stub, args, rng, seconds=None, rate=None, max_backlog=None):
+    pipeline = PipelineScheduler(stub.run_stage, stub.tracking_db_path, max_backlog=max_backlog or args.max_backlog)
+    pipeline.start()
+    stop = threading.Event()
+
+    def poll():
+        while not stop.is_set():
+            pipeline.poll()
+            stop.wait(args.poll)
+
+    poller = threading.Thread(target=poll, daemon=True)
+    poller.start()
+    publish_for(stub, seconds or args.seconds, rate or args.rate, rng)
+    deadline = time.perf_counter() + args.drain
+    while len(stub.indexed) < len(stub.published) and time.perf_counter() < deadline:
+        time.sleep(0.2)
+    stop.set()
+    pipeline.shutdown(wait=True)
+    return pipeline.stats
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="End-to-end freshness, from feed entry to FAISS index, with stubbed network stages")
+    parser.add_argument("--seconds", type=float, default=30, help="How long new entries keep arriving")
+    parser.add_argument("--rate", type=int, default=5, help="Average new entries per second")
+    parser.add_argument("--interval", type=float, default=15, help="Stage task interval in interval mode (a minute or more in production)")
+    parser.add_argument("--poll", type=float, default=1.0, help="Pipeline change poll interval")
+    parser.add_argument("--max_backlog", type=int, default=100)
+    parser.add_argument("--analyze_latency", type=float, default=0.5, help="Seconds per analyzer batch of 20; raise it to see backpressure")
+    parser.add_argument("--burst_seconds", type=float, default=5, help="Burst-then-idle case: how long entries arrive")
+    parser.add_argument("--burst_rate", type=int, default=20, help="Burst-then-idle case: average new entries per second")
+    parser.add_argument("--burst_max_backlog", type=int, default=50, help="Burst-then-idle case: low enough that the crawler is held")
+    parser.add_argument("--drain", type=float, default=120, help="Seconds allowed for the pipeline to index everything published")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    latencies = {"url_crawler": 0.3, "ai_analyzer": args.analyze_latency, "embedding_processor": 0.2, "faiss_indexer": 0.05}
+    print(f"{'mode':<24} {'articles':>9} {'p50 s':>7} {'p95 s':>7} {'max s':>7} {'max analyze backlog':>20}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for mode, run in [(f"interval, every {args.interval:g}s", run_interval), (f"pipeline, poll {args.poll:g}s", run_pipeline)]:
+            stub = StubPipeline(new_tracking_db(tmp_dir, mode.split(",")[0]), latencies)
+            stats = run(stub, args, random.Random(3))
+            freshness = stub.freshness()
+            print(
+                f"{mode:<24} {len(freshness):>9} {np.percentile(freshness, 50):>7.1f} {np.percentile(freshness, 95):>7.1f} "
+                f"{freshness.max():>7.1f} {stub.max_analyze_backlog:>20}"
+            )
+            if stats:
+                print(f"{'':<24} started {dict(stats['started'])}, held {dict(stats['held'])}")
+
+        # a burst, then nothing new: the feed version stops moving, so what is left in the batch-limited
+        # stages (and behind a held crawler) must still drain without waiting for the interval sweep
+        stub = StubPipeline(new_tracking_db(tmp_dir, "burst"), latencies)
+        stats = run_pipeline(stub, args, random.Random(3), args.burst_seconds, args.burst_rate, args.burst_max_backlog)
+        freshness = stub.freshness()
+        print(
+            f"\n{'burst, then idle':<24} {len(freshness):>9} {np.percentile(freshness, 50):>7.1f} {np.percentile(freshness, 95):>7.1f} "
+            f"{freshness.max():>7.1f} {stub.max_analyze_backlog:>20}"
+        )
+        print(f"{'':<24} started {dict(stats['started'])}, held {dict(stats['held'])}")
+        assert len(stub.indexed) == len(stub.published), f"{len(stub.published) - len(stub.indexed)} of {len(stub.published)} entries never indexed"
@@ -0,0 +1,227 @@
+import os
+import io
+import json
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import threading
+import numpy as np
+from fnmatch import fnmatch
+from contextlib import redirect_stdout
+from collections import Counter
+from services.session_store import SessionStore
+from services.progress_events import ProgressHub, ProgressPublisher, progress_stream
+
+STAGES = ["search", "scrape", "select", "script", "banner", "audio"]
+
+
+class StandInRedis:
+    """
+    The slice of Redis the progress path uses, in memory: GET/SET for task results and PUBLISH with
+    pattern subscriptions. The worker side publishes from its own thread, like another process.
+    """
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.data = {}
+        self.finished = {}
+        self.subscribers = []
+        self.commands = Counter()
+
+    async def get(self, key):
+        self.commands["get"] += 1
+        return self.data.get(key)
+
+    def set(self, key, value):
+        self.commands["set"] += 1
+        self.data[key] = value
+
+    def publish(self, channel, message):
+        self.commands["publish"] += 1
+        for pubsub in list(self.subscribers):
+            if any(fnmatch(channel, pattern) for pattern in pubsub.patterns):
+                item = {"type": "pmessage", "channel": channel.encode(), "data": message.encode()}
+                self.loop.call_soon_threadsafe(pubsub.queue.put_nowait, item)
+
+    def pubsub(self):
+        return StandInPubSub(self)
+
+
+class StandInPubSub:
+    def __init__(self, redis):
+        self.redis = redis
+        self.patterns = []
+        self.queue = asyncio.Queue()
+
+    async def psubscribe(self, pattern):
+        self.redis.commands["psubscribe"] += 1
+        self.patterns.append(pattern)
+        self.redis.subscribers.append(self)
+
+    async def listen(self):
+        while True:
+            yield await self.queue.get()
+
+    async def reset(self):
+        if self in self.redis.subscribers:
+            self.redis.subscribers.remove(self)
+
+
+def task_key(session_id):
+    return f"celery-task-meta-{session_id}"
+
+
+async def run_task(session_id, store, publisher, redis, args, rng):
+    """One agent_chat run: a few tool calls that each save the session state, then the result."""
+    await asyncio.sleep(rng.uniform(0, args.ramp) * args.time_scale)
+    redis.set(task_key(session_id), json.dumps({"status": "STARTED"}))
+    publisher.publish(session_id, "started", stage="processing", is_processing=True, process_type="chat")
+    duration = rng.uniform(args.min_task, args.max_task) * args.time_scale
+    state = store.get(session_id).state()
+    for step in range(args.steps):
+        await asyncio.sleep(duration / args.steps)
+        state["stage"] = STAGES[step % len(STAGES)]
+        if step == 1:
+            state["search_results"] = [{"url": f"https://example.com/{i}", "full_text": "x" * 2000} for i in range(10)]
+        store.save(session_id, state)
+    entry = store.get(session_id)
+    result = {"session_id": session_id, "response": "Done", "stage": state["stage"], "is_processing": False, "process_type": None}
+    redis.finished[session_id] = time.time()
+    publisher.publish(session_id, "done", **{key: value for key, value in result.items() if key != "session_id"})
+    redis.set(task_key(session_id), json.dumps({"status": "SUCCESS", "result": dict(result, session_state=entry.state_json)}))
+
+
+def run_workers(sessions, db_path, redis, args):
+    store = SessionStore(db_path)
+    publisher = ProgressPublisher(redis)
+    store.listeners.append(publisher.publish_state)
+    rng = random.Random(11)
+
+    async def main():
+        await asyncio.gather(*(run_task(session_id, store, publisher, redis, args, rng) for session_id in sessions))
+
+    asyncio.run(main())
+
+
+async def check_status(redis, session_id):
+    # the /status handler with a task id: one result backend read per request
+    meta = await redis.get(task_key(session_id))
+    meta = json.loads(meta) if meta else {"status": "PENDING"}
+    if meta["status"] == "SUCCESS":
+        return meta["result"]
+    return {"session_id": session_id, "response": "", "stage": "processing", "session_state": "{}", "is_processing": True}
+
+
+async def poll_client(redis, session_id, args, results):
+    requests, received = 0, 0
+    while True:
+        await asyncio.sleep(args.poll * args.time_scale)
+        status = await check_status(redis, session_id)
+        requests += 1
+        received += len(json.dumps(status))
+        if not status["is_processing"]:
+            state = json.loads(status["session_state"])
+            results[session_id] = {"requests": requests, "bytes": received, "stage_events": 0, "state": state, "done": time.time()}
+            return
+
+
+async def stream_client(hub, api_store, redis, session_id, args, results):
+    state, stage_events, received, latencies = {}, 0, 0, []
+    events = progress_stream(
+        hub, session_id, lambda: check_status(redis, session_id), lambda: api_store.get(session_id).state_json, heartbeat=15 * args.time_scale
+    )
+    async for frame in events:
+        received += len(frame)
+        if frame.startswith(":"):
+            continue
+        event, data = frame.split("\n", 1)
+        event, data = event[7:], json.loads(data[6:])
+        if "ts" in data:
+            latencies.append(time.time() - data["ts"])
+        if event in ("snapshot", "done") and data.get("session_state"):
+            state = json.loads(data["session_state"])
+        elif event == "state":
+            state.update(data["changed"])
+            for key in data["removed"]:
+                state.pop(key, None)
+            stage_events += "stage" in data["changed"]
+    results[session_id] = {
+        "requests": 1,
+        "bytes": received,
+        "stage_events": stage_events,
+        "state": state,
+        "done": time.time(),
+        "latencies": latencies,
+    }
+
+
+async def run(mode, args, tmp_dir):
+    os.environ["INTERNAL_SESSIONS_DB_PATH"] = db_path = os.path.join(tmp_dir, f"{mode}.db")
+    from services.db_init import init_internal_sessions_db
+
+    with redirect_stdout(io.StringIO()):
+        init_internal_sessions_db()
+    sessions = [f"session-{i}" for i in range(args.sessions)]
+    api_store = SessionStore(db_path)
+    for session_id in sessions:
+        api_store.create(session_id, {"stage": "welcome", "search_results": [], "title": "Untitled"})
+    redis = StandInRedis(asyncio.get_running_loop())
+    hub = ProgressHub(redis)
+    results = {}
+    if mode == "stream":
+        # streams open before the workers start so the hub is subscribed; each stream still begins with a snapshot
+        clients = [asyncio.create_task(stream_client(hub, api_store, redis, session_id, args, results)) for session_id in sessions]
+        await asyncio.sleep(0.2)
+    # CPU of the event loop thread: the API side and the simulated clients; HTTP handling of each poll is not included
+    cpu_start = time.thread_time()
+    threading.Thread(target=run_workers, args=(sessions, db_path, redis, args), daemon=True).start()
+    if mode == "poll":
+        clients = [asyncio.create_task(poll_client(redis, session_id, args, results)) for session_id in sessions]
+    await asyncio.gather(*clients)
+    api_cpu = time.thread_time() - cpu_start
+    await hub.close()
+    # every client must end up with the state the workers saved, whether it came whole or as deltas
+    mismatched = sum(results[session_id]["state"] != api_store.get(session_id).state() for session_id in sessions)
+    detection = np.array([results[session_id]["done"] - redis.finished[session_id] for session_id in sessions]) / args.time_scale
+    return results, redis.commands, api_cpu, mismatched, detection
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Concurrent podcast sessions followed by status polling vs the progress stream")
+    parser.add_argument("--sessions", type=int, default=500)
+    parser.add_argument("--poll", type=float, default=3.0, help="Client poll interval in seconds, as the Slack bot uses")
+    parser.add_argument("--min_task", type=float, default=20.0, help="Shortest agent task in seconds")
+    parser.add_argument("--max_task", type=float, default=60.0, help="Longest agent task in seconds")
+    parser.add_argument("--ramp", type=float, default=10.0, help="Seconds over which the tasks start")
+    parser.add_argument("--steps", type=int, default=6, help="State saves per task")
+    parser.add_argument("--time_scale", type=float, default=0.05, help="Run the scenario this much faster than real time")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    print(
+        f"{args.sessions} concurrent sessions, tasks of {args.min_task:g}-{args.max_task:g}s with {args.steps} state saves, "
+        f"run {1 / args.time_scale:g}x faster than real time; latencies in real-time seconds\n"
+    )
+    print(
+        f"{'client':<7} {'requests':>9} {'redis cmds':>11} {'MB to clients':>14} {'stage updates':>14} "
+        f"{'done seen p50 s':>16} {'p95 s':>6} {'loop cpu s':>10} {'stale states':>13}"
+    )
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for mode in ["poll", "stream"]:
+            results, commands, api_cpu, mismatched, detection = asyncio.run(run(mode, args, tmp_dir))
+            reads = commands["get"] + commands["psubscribe"]
+            print(
+                f"{mode:<7} {sum(r['requests'] for r in results.values()):>9} {reads:>11} "
+                f"{sum(r['bytes'] for r in results.values()) / (1024 * 1024):>14.1f} {sum(r['stage_events'] for r in results.values()):>14} "
+                f"{np.percentile(detection, 50):>16.2f} {np.percentile(detection, 95):>6.2f} {api_cpu:>10.2f} {mismatched:>13}"
+            )
+            if mode == "stream":
+                latencies = np.array([latency for r in results.values() for latency in r["latencies"]]) / args.time_scale
+                print(
+                    f"\nstream event delivery p50 {np.percentile(latencies, 50) * 1000:.0f} ms, "
+                    f"p95 {np.percentile(latencies, 95) * 1000:.0f} ms (real time)"
+                )
@@ -0,0 +1,136 @@
+import os
+import io
+import json
+import time
+import random
+import argparse
+import tempfile
+import numpy as np
+from contextlib import redirect_stdout
+from db.connection import db_connection
+from services.session_store import SessionStore
+
+# the shape of db.agent_config_v2.INITIAL_SESSION_STATE, without importing the agent framework
+INITIAL_STATE = {
+    "search_results": [],
+    "show_sources_for_selection": False,
+    "show_script_for_confirmation": False,
+    "generated_script": {},
+    "selected_language": {"code": "en", "name": "English"},
+    "banner_images": [],
+    "banner_url": "",
+    "audio_url": "",
+    "title": "Untitled",
+    "created_at": "",
+    "finished": False,
+}
+WORDS = "market model launch research open source agent benchmark data release policy chip inference training".split()
+
+
+def legacy_save(db_path, session_id, state):
+    # the previous save: the whole state rewritten, then read back and parsed
+    with db_connection(db_path) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("UPDATE session_state SET state = ? WHERE session_id = ?", (json.dumps(state), session_id))
+        conn.commit()
+    return legacy_get(db_path, session_id)
+
+
+def legacy_get(db_path, session_id):
+    with db_connection(db_path) as conn:
+        row = conn.execute("SELECT session_id, state, created_at FROM session_state WHERE session_id = ?", (session_id,)).fetchone()
+    return {"session_id": row["session_id"], "state": json.loads(row["state"]), "created_at": row["created_at"]}
+
+
+def text(rng, n_words):
+    return " ".join(rng.choice(WORDS) for _ in range(n_words))
+
+
+def grow_session(state, rng, turn, sources):
+    """One agent turn: mostly UI flags and stage, sometimes new search results or a new script draft."""
+    state["stage"] = rng.choice(["search", "scrape", "select", "script", "banner", "audio"])
+    state["show_sources_for_selection"] = not state["show_sources_for_selection"]
+    if turn % 5 == 1 and len(state["search_results"]) < sources:
+        for _ in range(min(10, sources - len(state["search_results"]))):
+            state["search_results"].append(
+                {"url": f"https://example.com/{rng.random()}", "title": text(rng, 8), "full_text": text(rng, 3000), "confirmed": False}
+            )
+    if turn % 4 == 3 and state["search_results"]:
+        rng.choice(state["search_results"])["confirmed"] = True
+    if turn % 9 == 8:
+        state["generated_script"] = {"title": text(rng, 6), "sections": [{"type": "dialog", "text": text(rng, 800)} for _ in range(6)]}
+    if turn % 13 == 12:
+        state["title"] = text(rng, 5)
+    return state
+
+
+def run(mode, db_path, args):
+    rng = random.Random(5)
+    session_id = f"session-{mode}"
+    store = SessionStore(db_path, snapshot_every=args.snapshot_every)
+    other = SessionStore(db_path, snapshot_every=args.snapshot_every)
+    state = json.loads(json.dumps(INITIAL_STATE))
+    state["stage"] = "welcome"
+    if mode == "legacy":
+        with db_connection(db_path) as conn:
+            conn.execute("INSERT INTO session_state (session_id, state, created_at) VALUES (?, ?, '')", (session_id, json.dumps(state)))
+            conn.commit()
+    else:
+        store.create(session_id, state)
+    turn_ms, poll_ms, legacy_written = [], [], 0
+    for turn in range(args.turns):
+        start = time.perf_counter()
+        # every tool call reads the state, changes it and saves it
+        if mode == "legacy":
+            state = grow_session(legacy_get(db_path, session_id)["state"], rng, turn, args.sources)
+            legacy_save(db_path, session_id, state)
+            legacy_written += len(json.dumps(state))
+        else:
+            entry = store.get(session_id)
+            store.save(session_id, grow_session(entry.state(), rng, turn, args.sources))
+        turn_ms.append((time.perf_counter() - start) * 1000)
+        for _ in range(args.polls):
+            start = time.perf_counter()
+            if mode == "legacy":
+                body = json.dumps(legacy_get(db_path, session_id)["state"])
+            else:
+                body = store.get(session_id).state_json
+            poll_ms.append((time.perf_counter() - start) * 1000)
+    if mode == "legacy":
+        final = legacy_get(db_path, session_id)["state"]
+    else:
+        # a second process catches up from the snapshot and patches and must see the same state
+        final = other.get(session_id).state()
+        assert final == json.loads(body), "state rebuilt from snapshot and patches differs"
+    written = legacy_written if mode == "legacy" else store.stats["bytes_written"]
+    return np.array(turn_ms), np.array(poll_ms), store.stats, len(json.dumps(final)), written
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Session state save/read latency and bytes written, full rewrite vs patches with a version cache")
+    parser.add_argument("--turns", type=int, default=120, help="Agent tool calls, each reading and saving the state")
+    parser.add_argument("--sources", type=int, default=40, help="Search results collected, each with ~20KB of scraped text")
+    parser.add_argument("--polls", type=int, default=5, help="UI state polls between two tool calls")
+    parser.add_argument("--snapshot_every", type=int, default=20)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.environ["INTERNAL_SESSIONS_DB_PATH"] = os.path.join(tmp_dir, "internal_sessions.db")
+        db_path = os.environ["INTERNAL_SESSIONS_DB_PATH"]
+        from services.db_init import init_internal_sessions_db
+
+        with redirect_stdout(io.StringIO()):
+            init_internal_sessions_db()
+        print(f"{args.turns} turns, up to {args.sources} sources, {args.polls} polls per turn\n")
+        print(f"{'mode':<8} {'state KB':>9} {'turn p50 ms':>12} {'turn p95 ms':>12} {'poll p50 ms':>12} {'poll p95 ms':>12} {'MB written':>11}")
+        for mode in ["legacy", "patches"]:
+            turn_ms, poll_ms, stats, state_bytes, written = run(mode, db_path, args)
+            print(
+                f"{mode:<8} {state_bytes / 1024:>9.0f} {np.percentile(turn_ms, 50):>12.2f} {np.percentile(turn_ms, 95):>12.2f} "
+                f"{np.percentile(poll_ms, 50):>12.3f} {np.percentile(poll_ms, 95):>12.3f} {written / (1024 * 1024):>11.1f}"
+            )
+            if mode == "patches":
+                print(f"\n{stats}")
@@ -0,0 +1,139 @@
+import os
+import json
+import time
+import random
+import sqlite3
+import asyncio
+import argparse
+import tempfile
+import statistics
+from datetime import datetime, timedelta
+from tools.social.db import setup_database
+
+CATEGORIES = ["politics", "technology", "business", "sports", "health", "science", "entertainment", "world"]
+SENTIMENTS = ["positive", "negative", "neutral", "critical"]
+
+
+def create_posts_db(db_path, n_posts, n_days, seed=42):
+    rng = random.Random(seed)
+    tags = [f"topic{i}" for i in range(200)]
+    start = datetime(2025, 1, 1)
+    conn = sqlite3.connect(db_path)
+    setup_database(conn)
+    insert_start = time.perf_counter()
+    conn.executemany(
+        "INSERT INTO posts (post_id, platform, user_handle, post_timestamp, post_text, sentiment, categories, tags) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            (
+                str(i),
+                rng.choice(["x.com", "facebook.com"]),
+                f"user{rng.randint(1, 500)}",
+                (start + timedelta(seconds=rng.randint(0, n_days * 86400 - 1))).isoformat(),
+                "post text " * 20,
+                rng.choice(SENTIMENTS),
+                json.dumps(rng.sample(CATEGORIES, rng.randint(1, 3))),
+                json.dumps(rng.sample(tags, rng.randint(0, 4))),
+            )
+            for i in range(n_posts)
+        ),
+    )
+    conn.commit()
+    insert_seconds = time.perf_counter() - insert_start
+    conn.close()
+    return insert_seconds
+
+
+class JsonColumnQueries:
+    # the previous dashboard queries: LIKE over the JSON text and json_each over every post
+    def __init__(self, db_path):
+        self.conn = sqlite3.connect(db_path)
+        self.conn.row_factory = sqlite3.Row
+
+    def rows(self, query, params=()):
+        return [dict(row) for row in self.conn.execute(query, params).fetchall()]
+
+    def category_page(self, category, date_from, date_to):
+        return self.rows(
+            "SELECT * FROM posts WHERE categories LIKE ? AND datetime(post_timestamp) >= datetime(?) AND datetime(post_timestamp) <= datetime(?) "
+            "ORDER BY datetime(post_timestamp) DESC, post_id DESC LIMIT 20",
+            (f'%"{category}"%', date_from, date_to),
+        )
+
+    def categories(self, date_from, date_to):
+        counts = {}
+        for row in self.rows(
+            "SELECT categories FROM posts WHERE categories IS NOT NULL AND date(post_timestamp) >= date(?) AND date(post_timestamp) <= date(?)",
+            (date_from, date_to),
+        ):
+            for category in json.loads(row["categories"]):
+                counts[category] = counts.get(category, 0) + 1
+        return [{"category": category, "post_count": count} for category, count in sorted(counts.items(), key=lambda x: x[1], reverse=True)]
+
+    def category_sentiment(self, date_from, date_to):
+        return self.rows(
+            """
+            SELECT json_each.value as category, COUNT(*) as total_count,
+                SUM(CASE WHEN sentiment = 'positive' THEN 1 ELSE 0 END) as positive_count
+            FROM posts p, json_each(p.categories)
+            WHERE date(p.post_timestamp) >= date(?) AND date(p.post_timestamp) <= date(?)
+            GROUP BY json_each.value ORDER BY total_count DESC
+            """,
+            (date_from, date_to),
+        )
+
+
+def timed(func, repeats):
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        latencies.append(time.perf_counter() - start)
+    return result, statistics.median(latencies) * 1000
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Compare JSON-column scans with the category junction table and daily rollups")
+    parser.add_argument("--n_posts", type=int, default=200000)
+    parser.add_argument("--n_days", type=int, default=180)
+    parser.add_argument("--repeats", type=int, default=5)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.environ["SOCIAL_MEDIA_DB_PATH"] = os.path.join(tmp_dir, "social_media.db")
+        insert_seconds = create_posts_db(os.environ["SOCIAL_MEDIA_DB_PATH"], args.n_posts, args.n_days)
+        print(f"{args.n_posts} posts over {args.n_days} days inserted in {insert_seconds:.1f}s (triggers maintain junctions and rollups)\n")
+        # the services read their database paths at import time
+        from services.social_media_service import SocialMediaService
+
+        service = SocialMediaService()
+        legacy = JsonColumnQueries(os.environ["SOCIAL_MEDIA_DB_PATH"])
+        date_from, date_to = "2025-02-01", "2025-05-31"
+        checks = [
+            (
+                "category filter, page 1",
+                lambda: legacy.category_page("science", date_from, date_to),
+                lambda: asyncio.run(service.get_posts(category="science", date_from=date_from, date_to=date_to, per_page=20)),
+                lambda old, new: [row["post_id"] for row in old] == [post.post_id for post in new.items],
+            ),
+            (
+                "category counts",
+                lambda: legacy.categories(date_from, date_to),
+                lambda: asyncio.run(service.get_categories(date_from, date_to)),
+                lambda old, new: sorted(map(tuple, (row.values() for row in old))) == sorted(map(tuple, (row.values() for row in new))),
+            ),
+            (
+                "category sentiment",
+                lambda: legacy.category_sentiment(date_from, date_to),
+                lambda: asyncio.run(service.get_category_sentiment(date_from, date_to)),
+                lambda old, new: {row["category"]: (row["total_count"], row["positive_count"]) for row in old}
+                == {row["category"]: (row["total_count"], row["positive_count"]) for row in new},
+            ),
+        ]
+        print(f"{'query':<24} {'json scan ms':>13} {'indexed ms':>11} {'same result':>12}")
+        for label, old_query, new_query, same in checks:
+            old_result, old_ms = timed(old_query, args.repeats)
+            new_result, new_ms = timed(new_query, args.repeats)
+            print(f"{label:<24} {old_ms:>13.1f} {new_ms:>11.1f} {str(same(old_result, new_result)):>12}")
@@ -0,0 +1,70 @@
+import os
+import time
+import argparse
+import tempfile
+from statistics import median
+
+CHAIN = [
+    "python -m processors.feed_processor",
+    "python -m processors.url_processor",
+    "python -m processors.ai_analysis_processor",
+    "python -m processors.embedding_processor",
+    "python -m processors.faiss_indexing_processor",
+]
+
+
+def use_empty_databases(tmp_dir):
+    # with nothing to process every run is pure overhead: startup, imports, DB setup
+    for db_name in ["sources_db", "tracking_db", "tasks_db"]:
+        os.environ[f"{db_name.upper()}_PATH"] = os.path.join(tmp_dir, f"{db_name}.db")
+    os.environ["FAISS_INDEX_DB_PATH"] = os.path.join(tmp_dir, "faiss", "article_index.faiss")
+    os.environ["FAISS_MAPPING_FILE_PATH"] = os.path.join(tmp_dir, "faiss", "article_id_map.npy")
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    from services.db_init import init_sources_db, init_tracking_db, init_tasks_db
+
+    init_sources_db()
+    init_tracking_db()
+    init_tasks_db()
+
+
+def run_chain(runner, rounds):
+    timings = {command: [] for command in CHAIN}
+    for _ in range(rounds):
+        for command in CHAIN:
+            result = runner.run(command, timeout=600)
+            if result["status"] != "success":
+                raise RuntimeError(f"{command} failed: {result['error_message']}")
+            timings[command].append(result["seconds"])
+    return timings
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Per-task overhead of scheduled processors, subprocess vs persistent in-process workers")
+    parser.add_argument("--rounds", type=int, default=5, help="Times the whole chain runs in each mode")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        use_empty_databases(tmp_dir)
+        from utils.task_runner import TaskRunner
+
+        subprocess_timings = run_chain(TaskRunner(1, mode="subprocess"), args.rounds)
+        runner = TaskRunner(1, mode="inprocess")
+        start = time.perf_counter()
+        runner.start()
+        inprocess_timings = run_chain(runner, args.rounds)
+        total = time.perf_counter() - start
+        runner.shutdown()
+    print(f"{'task':<46} {'subprocess ms':>14} {'in-process first ms':>20} {'in-process warm ms':>19}")
+    for command in CHAIN:
+        warm = median(inprocess_timings[command][1:]) if args.rounds > 1 else float("nan")
+        print(
+            f"{command:<46} {median(subprocess_timings[command]) * 1000:>14.0f} "
+            f"{inprocess_timings[command][0] * 1000:>20.0f} {warm * 1000:>19.0f}"
+        )
+    subprocess_chain = sum(median(t) for t in subprocess_timings.values())
+    warm_chain = sum(median(t[1:]) for t in inprocess_timings.values()) if args.rounds > 1 else float("nan")
+    print(f"\nchain per run: subprocess {subprocess_chain * 1000:.0f} ms, in-process warm {warm_chain * 1000:.0f} ms")
+    print(f"in-process total for {args.rounds} runs, including worker start: {total:.1f}s")
@@ -0,0 +1,56 @@
+import os
+import io
+import time
+import random
+import argparse
+import tempfile
+from contextlib import redirect_stdout
+from utils.tts_cache import SegmentCache
+from utils.tts_stream import render_script
+from tests.tts_streaming_test import WORDS, StubEngine, stub_script
+
+
+def edit_script(script, share, rng):
+    """Rewrite ``share`` of the lines, as a reviewer asking for script changes would."""
+    edited = [dict(entry) for entry in script]
+    for i in rng.sample(range(len(edited)), max(1, int(len(edited) * share))):
+        edited[i]["text"] = " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 20)))
+    return edited
+
+
+def generate(script, engine, output_path, cache, workers):
+    cache_key = lambda speaker, text: ("stub", "stub-model", f"voice-{speaker}", "en")  # noqa: E731
+    with redirect_stdout(io.StringIO()) as log:
+        start = time.perf_counter()
+        render_script(script, engine, output_path, 0.7, workers, cache_key=cache_key, cache=cache)
+        elapsed = time.perf_counter() - start
+    summary = next(line for line in log.getvalue().splitlines() if "Segment cache" in line)
+    return elapsed, summary.split("Segment cache ", 1)[1]
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Wall time of regenerating a podcast after script edits, with the segment cache")
+    parser.add_argument("--minutes", type=float, default=10.0, help="Length of the spoken script")
+    parser.add_argument("--latency", type=float, default=0.8, help="Seconds the stub engine takes per line, like a remote TTS API")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--edit_shares", default="0.05,0.2", help="Shares of lines changed in each regeneration")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    rng = random.Random(7)
+    engine = StubEngine(args.latency)
+    script = stub_script(args.minutes)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = SegmentCache(os.path.join(tmp_dir, "tts_cache"))
+        output_path = os.path.join(tmp_dir, "episode.wav")
+        print(f"{len(script)} lines, stub engine {args.latency}s per line, {args.workers} workers\n")
+        print(f"{'generation':<24} {'wall s':>7}  cache")
+        first, summary = generate(script, engine, output_path, cache, args.workers)
+        print(f"{'first':<24} {first:>7.1f}  {summary}")
+        for share in (float(value) for value in args.edit_shares.split(",")):
+            script = edit_script(script, share, rng)
+            elapsed, summary = generate(script, engine, output_path, cache, args.workers)
+            print(f"{f'after {share:.0%} of lines edited':<24} {elapsed:>7.1f}  {summary}")
+        print(f"\ncache size {cache.size_bytes() / (1024 * 1024):.1f} MB")
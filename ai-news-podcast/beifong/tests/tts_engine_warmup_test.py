@@ -0,0 +1,87 @@
+import time
+import argparse
+import numpy as np
+from utils.tts_engine_selector import KokoroEngineRegistry
+
+FIRST_LINE = "Welcome back to the show, today we are looking at the biggest stories of the week."
+
+
+class StubTensor:
+    def __init__(self, megabytes):
+        self.megabytes = megabytes
+
+    def numel(self):
+        return int(self.megabytes * 1024 * 1024 / 4)
+
+    def element_size(self):
+        return 4
+
+
+class StubModel:
+    def __init__(self, load_seconds):
+        time.sleep(load_seconds)
+
+    def parameters(self):
+        return [StubTensor(312)]
+
+    def buffers(self):
+        return []
+
+
+class StubPipeline:
+    def __init__(self, voices_seconds):
+        time.sleep(voices_seconds)
+        self.voices = {"voice_1": StubTensor(0.5), "voice_2": StubTensor(0.5)}
+
+    def __call__(self, text, voice, speed=1.0):
+        yield text, None, np.zeros(24_000, dtype=np.float32)
+
+
+def stub_loaders(load_seconds):
+    def create_pipelines(lang_code, model, count):
+        return [StubPipeline(load_seconds / 4) for _ in range(count)]
+
+    return (lambda: StubModel(load_seconds)), create_pipelines
+
+
+def time_to_first_audio(registry, lang_code):
+    from utils.text_to_audio_kokoro import text_to_speech
+
+    start = time.perf_counter()
+    with registry.pipelines(lang_code) as pipelines:
+        audio = text_to_speech(pipelines[0], FIRST_LINE, 1, sampling_rate=24_000, lang_code=lang_code)
+    assert audio.size > 0
+    return time.perf_counter() - start
+
+
+def stub_time_to_first_audio(registry, lang_code):
+    start = time.perf_counter()
+    with registry.pipelines(lang_code) as pipelines:
+        next(pipelines[0](FIRST_LINE, voice="voice_1"))
+    return time.perf_counter() - start
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Cold and warm time-to-first-audio of Kokoro with the process-level engine registry")
+    parser.add_argument("--lang_codes", default="b,h", help="Kokoro language codes to load, in order")
+    parser.add_argument("--memory_budget_mb", type=int, default=1024)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--stub", type=float, default=None, help="Use a stub engine that takes this many seconds to load instead of Kokoro")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    if args.stub is None:
+        registry = KokoroEngineRegistry(memory_budget_mb=args.memory_budget_mb)
+        measure = time_to_first_audio
+    else:
+        load_model, create_pipelines = stub_loaders(args.stub)
+        registry = KokoroEngineRegistry(args.memory_budget_mb, workers=2, load_model=load_model, create_pipelines=create_pipelines)
+        measure = stub_time_to_first_audio
+    print(f"{'language':<9} {'cold ms':>9} {'warm ms':>9}")
+    for lang_code in args.lang_codes.split(","):
+        cold = measure(registry, lang_code)
+        warm = min(measure(registry, lang_code) for _ in range(args.repeats))
+        print(f"{lang_code:<9} {cold * 1000:>9.1f} {warm * 1000:>9.1f}")
+    print(f"\n{registry.health()}")
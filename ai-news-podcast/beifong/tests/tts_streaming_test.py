@@ -0,0 +1,93 @@
+import os
+import time
+import random
+import argparse
+import resource
+import tempfile
+import multiprocessing
+import numpy as np
+import soundfile as sf
+from utils.tts_stream import render_script
+
+SAMPLING_RATE = 24_000
+SECONDS_PER_WORD = 0.35
+WORDS = "the markets moved sharply today as investors weighed new data on inflation jobs and growth across regions".split()
+
+
+def stub_script(minutes, seed=42):
+    """Two speakers alternating lines of 8-20 words until the spoken audio lasts ``minutes``."""
+    rng = random.Random(seed)
+    entries, seconds = [], 0.0
+    while seconds < minutes * 60:
+        words = [rng.choice(WORDS) for _ in range(rng.randint(8, 20))]
+        entries.append({"speaker": len(entries) % 2 + 1, "text": " ".join(words)})
+        seconds += len(words) * SECONDS_PER_WORD
+    return entries
+
+
+class StubEngine:
+    """Stands in for a TTS engine: waits ``latency`` seconds per line, then returns a voiced tone as long as the text."""
+
+    def __init__(self, latency):
+        self.latency = latency
+
+    def __call__(self, speaker, text):
+        time.sleep(self.latency)
+        rng = np.random.default_rng(abs(hash(text)) % (2**32))
+        n_samples = int(len(text.split()) * SECONDS_PER_WORD * SAMPLING_RATE)
+        t = np.arange(n_samples, dtype=np.float32) / SAMPLING_RATE
+        pitch = 120 if speaker == 1 else 210
+        audio = 0.3 * np.sin(2 * np.pi * pitch * t) * (0.6 + 0.4 * np.sin(2 * np.pi * 3 * t))
+        return (audio + 0.02 * rng.standard_normal(n_samples)).astype(np.float32), SAMPLING_RATE
+
+
+def render_in_memory(script, synthesize, output_path, silence_duration):
+    # the previous pipeline: one line at a time, every segment kept, one peak normalization at the end
+    segments = []
+    silence = np.zeros(int(SAMPLING_RATE * silence_duration), dtype=np.float32)
+    for entry in script:
+        audio, _ = synthesize(entry["speaker"], entry["text"])
+        segments.extend([audio, silence])
+    full_audio = np.concatenate(segments)
+    full_audio = full_audio / np.max(np.abs(full_audio)) * 0.9
+    sf.write(output_path, full_audio, SAMPLING_RATE, subtype="PCM_16")
+    return output_path
+
+
+def run_mode(mode, args, results):
+    script = stub_script(args.minutes)
+    engine = StubEngine(args.latency)
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_path = os.path.join(tmp_dir, "episode.wav")
+        start = time.perf_counter()
+        if mode == "in-memory, sequential":
+            render_in_memory(script, engine, output_path, 0.7)
+        else:
+            render_script(script, engine, output_path, 0.7, args.workers, sampling_rate=SAMPLING_RATE)
+        elapsed = time.perf_counter() - start
+        duration = sf.info(output_path).duration
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    results.put((mode, len(script), duration, elapsed, baseline / 1024, peak / 1024))
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Time and peak memory of podcast audio rendering with a stub TTS engine")
+    parser.add_argument("--minutes", type=float, default=45.0, help="Length of the spoken script")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds the stub engine waits per line")
+    parser.add_argument("--workers", type=int, default=4)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    # each mode runs in a fresh process so its peak RSS is its own
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    print(f"{'mode':<26} {'lines':>6} {'audio min':>10} {'wall s':>8} {'base RSS MB':>12} {'peak RSS MB':>12}")
+    for mode in ["in-memory, sequential", f"streaming, {args.workers} workers"]:
+        process = context.Process(target=run_mode, args=(mode, args, results))
+        process.start()
+        mode, lines, duration, elapsed, baseline, peak = results.get()
+        process.join()
+        print(f"{mode:<26} {lines:>6} {duration / 60:>10.1f} {elapsed:>8.1f} {baseline:>12.0f} {peak:>12.0f}")
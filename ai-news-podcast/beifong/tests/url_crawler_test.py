@@ -0,0 +1,158 @@
+import io
+import os
+import time
+import sqlite3
+import tempfile
+import argparse
+import threading
+from contextlib import redirect_stdout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import requests
+from bs4 import BeautifulSoup
+from db.articles import update_entry_status
+from utils.content_extractor import parse_html_document
+from utils.crawl_url import extract_document_meta_tags
+from processors.url_processor import crawl_in_batches
+
+PARAGRAPH = "<p>" + "The committee published its findings on Tuesday after months of hearings. " * 8 + "</p>"
+
+
+class StubArticleHandler(BaseHTTPRequestHandler):
+    latency = 0.1
+    oversized_every = 50
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        article_number = int(self.path.rsplit("/", 1)[-1])
+        # every so often serve a runaway page to exercise the byte cap
+        paragraphs = 2000 if self.oversized_every and article_number % self.oversized_every == 0 else 40
+        body = (
+            f"<html><head><title>Article {article_number}</title>"
+            '<meta name="description" content="A fixture article"><meta property="og:title" content="Fixture">'
+            "<script>" + "var tracking = {};" * 500 + "</script></head><body>"
+            "<nav>" + "<a href='/'>Section</a>" * 100 + "</nav>"
+            f"<article><h1>Article {article_number}</h1>{PARAGRAPH * paragraphs}</article>"
+            "<footer>Copyright</footer></body></html>"
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def create_tracking_db(tracking_db_path, port, n_pages, n_hosts):
+    conn = sqlite3.connect(tracking_db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("""
+    CREATE TABLE feed_entries (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        feed_id INTEGER,
+        source_id INTEGER,
+        entry_id TEXT,
+        title TEXT,
+        link TEXT UNIQUE,
+        published_date TIMESTAMP,
+        crawl_status TEXT DEFAULT 'pending',
+        crawl_attempts INTEGER DEFAULT 0
+    )
+    """)
+    conn.execute("""
+    CREATE TABLE crawled_articles (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        entry_id INTEGER,
+        source_id INTEGER,
+        feed_id INTEGER,
+        title TEXT,
+        url TEXT UNIQUE,
+        published_date TIMESTAMP,
+        raw_content TEXT,
+        content TEXT,
+        summary TEXT,
+        metadata TEXT
+    )
+    """)
+    # 127.0.0.x all reach the same server but count as separate hosts for the politeness limits
+    conn.executemany(
+        "INSERT INTO feed_entries (feed_id, source_id, entry_id, title, link, published_date) VALUES (1, 1, ?, ?, ?, '2025-01-01')",
+        ((str(i), f"Article {i}", f"http://127.0.0.{i % n_hosts + 1}:{port}/article/{i}") for i in range(n_pages)),
+    )
+    conn.commit()
+    conn.close()
+
+
+def crawl_serially(tracking_db_path, limit):
+    # the previous crawler: one bare request at a time, full body, html.parser, plain text storage
+    conn = sqlite3.connect(tracking_db_path)
+    conn.row_factory = sqlite3.Row
+    entries = [dict(row) for row in conn.execute("SELECT * FROM feed_entries LIMIT ?", (limit,))]
+    conn.close()
+    start = time.perf_counter()
+    for entry in entries:
+        response = requests.get(entry["link"], timeout=10)
+        soup = BeautifulSoup(response.text, "html.parser")
+        meta_tags = extract_document_meta_tags(parse_html_document(response.content, response.encoding))
+        conn = sqlite3.connect(tracking_db_path)
+        conn.execute(
+            "INSERT INTO crawled_articles (entry_id, url, raw_content, metadata) VALUES (?, ?, ?, ?)",
+            (entry["id"], entry["link"], str(soup.find("body")), str(meta_tags)),
+        )
+        conn.commit()
+        conn.close()
+        update_entry_status(tracking_db_path, entry["id"], "success")
+    return len(entries) / (time.perf_counter() - start)
+
+
+def stored_bytes(tracking_db_path):
+    conn = sqlite3.connect(tracking_db_path)
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    count, content_bytes = conn.execute("SELECT COUNT(*), SUM(LENGTH(raw_content)) FROM crawled_articles").fetchone()
+    conn.execute("VACUUM")
+    conn.close()
+    return count, content_bytes or 0, os.path.getsize(tracking_db_path)
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Measure crawler pages/sec and database growth against a local fixture server")
+    parser.add_argument("--n_pages", type=int, default=500)
+    parser.add_argument("--n_hosts", type=int, default=25)
+    parser.add_argument("--latency", type=float, default=0.1, help="Simulated seconds per page response")
+    parser.add_argument("--per_host_delay", type=float, default=0.05)
+    parser.add_argument("--baseline_pages", type=int, default=100, help="Pages fetched by the serial baseline")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    StubArticleHandler.latency = args.latency
+    server = ThreadingHTTPServer(("0.0.0.0", 0), StubArticleHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+    print(f"{'mode':<22} {'pages':>6} {'pages/sec':>10} {'KB/page stored':>15} {'DB KB/page':>11}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        baseline_db_path = os.path.join(tmp_dir, "baseline.db")
+        create_tracking_db(baseline_db_path, port, args.baseline_pages, args.n_hosts)
+        pages_per_second = crawl_serially(baseline_db_path, args.baseline_pages)
+        count, content_bytes, db_bytes = stored_bytes(baseline_db_path)
+        print(
+            f"{'serial, plain text':<22} {count:>6} {pages_per_second:>10.1f} "
+            f"{content_bytes / count / 1024:>15.1f} {db_bytes / count / 1024:>11.1f}"
+        )
+
+        tracking_db_path = os.path.join(tmp_dir, "concurrent.db")
+        create_tracking_db(tracking_db_path, port, args.n_pages, args.n_hosts)
+        with redirect_stdout(io.StringIO()):
+            stats = crawl_in_batches(
+                tracking_db_path=tracking_db_path,
+                batch_size=args.n_pages,
+                total_batches=1,
+                per_host_delay=args.per_host_delay,
+            )
+        count, content_bytes, db_bytes = stored_bytes(tracking_db_path)
+        pages_per_second = stats["success_count"] / stats["elapsed_seconds"]
+        print(f"{'concurrent, zlib':<22} {count:>6} {pages_per_second:>10.1f} {content_bytes / count / 1024:>15.1f} {db_bytes / count / 1024:>11.1f}")
+    server.shutdown()
@@ -0,0 +1,133 @@
+import io
+import os
+import time
+import argparse
+import tempfile
+import multiprocessing
+from collections import Counter
+from contextlib import redirect_stdout
+from db.connection import db_connection, execute_query
+from db.feeds import get_uncrawled_entries
+from db.articles import get_unprocessed_articles, update_articles_status, update_entry_status
+
+
+def create_tracking_db(tmp_dir, n_items):
+    os.environ["TRACKING_DB_PATH"] = os.path.join(tmp_dir, "tracking.db")
+    from services.db_init import init_tracking_db
+
+    with redirect_stdout(io.StringIO()):
+        init_tracking_db()
+    tracking_db_path = os.environ["TRACKING_DB_PATH"]
+    with db_connection(tracking_db_path) as conn:
+        conn.executemany(
+            "INSERT INTO feed_entries (feed_id, source_id, entry_id, title, link, published_date) VALUES (1, 1, ?, 'Title', ?, ?)",
+            [(str(i), f"https://example.com/entry/{i}", f"2025-01-01T00:{i // 60 % 60:02d}:{i % 60:02d}") for i in range(n_items)],
+        )
+        conn.executemany(
+            "INSERT INTO crawled_articles (entry_id, title, url, published_date) VALUES (?, 'Title', ?, ?)",
+            [(i, f"https://example.com/article/{i}", f"2025-01-01T00:{i // 60 % 60:02d}:{i % 60:02d}") for i in range(n_items)],
+        )
+        conn.commit()
+    return tracking_db_path
+
+
+def legacy_claim(tracking_db_path, table, limit):
+    # the previous claim: put every 'processing' row back, then select and mark in separate statements
+    status, attempts = ("crawl_status", "crawl_attempts") if table == "feed_entries" else ("ai_status", "ai_attempts")
+    execute_query(tracking_db_path, f"UPDATE {table} SET {status} = 'pending' WHERE {status} = 'processing'")
+    rows = execute_query(
+        tracking_db_path,
+        f"SELECT id FROM {table} WHERE {status} = 'pending' AND {attempts} < 3 ORDER BY published_date DESC LIMIT ?",
+        (limit,),
+        fetch=True,
+    )
+    ids = [row["id"] for row in rows]
+    if ids:
+        execute_query(tracking_db_path, f"UPDATE {table} SET {status} = 'processing' WHERE id IN ({','.join('?' * len(ids))})", tuple(ids))
+    return [{"id": item_id, "lease_owner": None} for item_id in ids]
+
+
+def finish(tracking_db_path, table, items, worker_id):
+    if table == "feed_entries":
+        for item in items:
+            update_entry_status(tracking_db_path, item["id"], "success", item["lease_owner"])
+    else:
+        outcomes = [(item["id"], {"summary": "s", "content": "c", "categories": ["news"]}, True, None) for item in items]
+        with redirect_stdout(io.StringIO()):
+            update_articles_status(tracking_db_path, outcomes, lease_owner=worker_id)
+
+
+def run_worker(tracking_db_path, table, mode, batch_size, seconds_per_item, lease_seconds, crash, results):
+    worker_id = f"worker-{os.getpid()}"
+    processed = []
+    while True:
+        if mode == "legacy":
+            items = legacy_claim(tracking_db_path, table, batch_size)
+        elif table == "feed_entries":
+            items = get_uncrawled_entries(tracking_db_path, limit=batch_size, worker_id=worker_id, lease_seconds=lease_seconds)
+        else:
+            items = get_unprocessed_articles(tracking_db_path, limit=batch_size, max_attempts=3, worker_id=worker_id, lease_seconds=lease_seconds)
+        if not items:
+            status = "crawl_status" if table == "feed_entries" else "ai_status"
+            # rows still leased to a worker come back when the lease expires, so wait for them
+            if mode == "lease" and execute_query(tracking_db_path, f"SELECT 1 FROM {table} WHERE {status} = 'processing' LIMIT 1", fetch=True):
+                time.sleep(0.2)
+                continue
+            break
+        if crash:
+            # dies holding its claim; the rows come back only when the lease expires
+            results.put(("crashed", [item["id"] for item in items]))
+            return
+        time.sleep(seconds_per_item * len(items))
+        processed.extend(item["id"] for item in items)
+        finish(tracking_db_path, table, items, worker_id if mode == "lease" else None)
+    results.put(("processed", processed))
+
+
+def run(table, mode, args):
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    # a crash under the old claim is undone by the next reset anyway, so only lease runs include one
+    crash = args.crash and mode == "lease"
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tracking_db_path = create_tracking_db(tmp_dir, args.n_items)
+        start = time.perf_counter()
+        workers = [
+            context.Process(
+                target=run_worker,
+                args=(tracking_db_path, table, mode, args.batch_size, args.seconds_per_item, args.lease_seconds, crash and i == 0, results),
+            )
+            for i in range(args.workers)
+        ]
+        for worker in workers:
+            worker.start()
+        outcomes = [results.get() for _ in workers]
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - start
+    counts = Counter(item_id for kind, ids in outcomes if kind == "processed" for item_id in ids)
+    crashed = sum(len(ids) for kind, ids in outcomes if kind == "crashed")
+    duplicates = sum(count - 1 for count in counts.values() if count > 1)
+    missing = args.n_items - len(counts)
+    return sum(counts.values()), duplicates, missing, crashed, elapsed
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Parallel crawler/analyzer workers claiming from one tracking database: duplicates and throughput")
+    parser.add_argument("--n_items", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--batch_size", type=int, default=25)
+    parser.add_argument("--seconds_per_item", type=float, default=0.005, help="Simulated crawl/analysis time per item")
+    parser.add_argument("--lease_seconds", type=int, default=2, help="Short, so the crashed worker's claim is reclaimed during the run")
+    parser.add_argument("--no_crash", dest="crash", action="store_false", help="Do not make the first lease worker die holding a claim")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    print(f"{args.n_items} items, {args.workers} processes, batches of {args.batch_size}\n")
+    print(f"{'table':<17} {'claiming':<8} {'processed':>10} {'duplicates':>11} {'missing':>8} {'crashed claim':>14} {'wall s':>7}")
+    for table in ["feed_entries", "crawled_articles"]:
+        for mode in ["legacy", "lease"]:
+            processed, duplicates, missing, crashed, elapsed = run(table, mode, args)
+            print(f"{table:<17} {mode:<8} {processed:>10} {duplicates:>11} {missing:>8} {crashed:>14} {elapsed:>7.1f}")
@@ -1,47 +1,20 @@
+from typing import List, Optional
 from agno.agent import Agent
 import os
-import numpy as np
-import faiss
-from openai import OpenAI
 from db.config import get_tracking_db_path, get_faiss_db_path, get_sources_db_path
 from db.connection import execute_query
-from utils.load_api_keys import load_api_key
+from utils.faiss_search import EMBEDDING_MODEL, build_article_filter, embed_queries, get_faiss_index_holder
 import traceback
 import json
 
-EMBEDDING_MODEL = "text-embedding-3-small"
-
 
 def generate_query_embedding(query_text, model=EMBEDDING_MODEL):
     try:
-        api_key = load_api_key("OPENAI_API_KEY")
-        if not api_key:
-            return None, "OpenAI API key not found"
-        client = OpenAI(api_key=api_key)
-        response = client.embeddings.create(input=query_text, model=model)
-        return response.data[0].embedding, None
+        return embed_queries([query_text], model=model)[0], None
     except Exception as e:
         return None, str(e)
 
 
-def load_faiss_index(index_path):
-    if not os.path.exists(index_path):
-        return None, f"FAISS index not found at {index_path}"
-    try:
-        return faiss.read_index(index_path), None
-    except Exception as e:
-        return None, f"Error loading FAISS index: {str(e)}"
-
-
-def load_id_mapping(mapping_path):
-    if not os.path.exists(mapping_path):
-        return None, f"ID mapping not found at {mapping_path}"
-    try:
-        return np.load(mapping_path).tolist(), None
-    except Exception as e:
-        return None, f"Error loading ID mapping: {str(e)}"
-
-
 def get_article_details(tracking_db_path, article_ids):
     if not article_ids:
         return []
@@ -80,15 +53,27 @@ def get_source_names(source_ids):
         return {}
 
 
-def embedding_search(agent: Agent, prompt: str) -> str:
+def embedding_search(
+    agent: Agent,
+    prompt: str,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    source_ids: Optional[List[int]] = None,
+    categories: Optional[List[str]] = None,
+) -> str:
     """
     Perform a semantic search using embeddings to find articles related to the query on internal articles databse which are crawled from preselected user rss feeds.
     This search uses vector representations to find semantically similar content,
-    filtering for only high-quality matches (similarity score ≥ 85%).
+    filtering for only high-quality matches (cosine similarity ≥ 85%).
+    Optional filters restrict the search to matching articles before ranking.
 
     Args:
         agent: The Agno agent instance
         prompt: The search query
+        start_date: Only include articles published on or after this ISO date
+        end_date: Only include articles published on or before this ISO date
+        source_ids: Only include articles from these source ids
+        categories: Only include articles tagged with one of these categories
 
     Returns:
         Search results
@@ -101,36 +86,32 @@ def embedding_search(agent: Agent, prompt: str) -> str:
     if not os.path.exists(index_path) or not os.path.exists(mapping_path):
         return "Embedding search not available: index files not found. Continuing with other search methods."
     query_embedding, error = generate_query_embedding(prompt)
-    if not query_embedding:
+    if query_embedding is None:
         return f"Semantic search unavailable: {error}. Continuing with other search methods."
-    query_vector = np.array([query_embedding]).astype(np.float32)
     try:
-        faiss_index, error = load_faiss_index(index_path)
-        if error:
-            return f"Semantic search unavailable: {error}. Continuing with other search methods."
-        id_map, error = load_id_mapping(mapping_path)
-        if error:
-            return f"Semantic search unavailable: {error}. Continuing with other search methods."
-        distances, indices = faiss_index.search(query_vector, top_k)
-        results_with_metrics = []
-        for i, idx in enumerate(indices[0]):
-            if idx >= 0 and idx < len(id_map):
-                distance = float(distances[0][i])
-                similarity = float(np.exp(-distance)) if distance > 0 else 0
-                if similarity >= similarity_threshold:
-                    article_id = id_map[idx]
-                    results_with_metrics.append((idx, distance, similarity, article_id))
-        results_with_metrics.sort(key=lambda x: x[2], reverse=True)
-        result_article_ids = [item[3] for item in results_with_metrics]
-        if not result_article_ids:
+        allowed_article_ids = build_article_filter(
+            tracking_db_path, start_date=start_date, end_date=end_date, source_ids=source_ids, categories=categories
+        )
+        try:
+            matches = get_faiss_index_holder(index_path, mapping_path).search(
+                query_embedding, top_k, allowed_article_ids=allowed_article_ids
+            )[0]
+        except Exception as e:
+            return f"Semantic search unavailable: Error loading FAISS index: {str(e)}. Continuing with other search methods."
+        similarities = {}
+        for article_id, similarity in matches:
+            if similarity >= similarity_threshold and similarity > similarities.get(article_id, -1.0):
+                similarities[article_id] = similarity
+        if not similarities:
             return "No high-quality semantic matches found (threshold: 85%). Continuing with other search methods."
-        results = get_article_details(tracking_db_path, result_article_ids)
+        results = get_article_details(tracking_db_path, list(similarities))
+        results.sort(key=lambda result: similarities.get(result.get("id"), 0), reverse=True)
         source_ids = [result.get("source_id") for result in results if result.get("source_id")]
         source_names = get_source_names(source_ids)
         formatted_results = []
-        for i, result in enumerate(results):
+        for result in results:
             article_id = result.get("id")
-            similarity = next((item[2] for item in results_with_metrics if item[3] == article_id), 0)
+            similarity = similarities.get(article_id, 0)
             similarity_percent = int(similarity * 100)
             source_id = str(result.get("source_id", "unknown"))
             source_name = source_names.get(source_id, source_id)
@@ -150,4 +131,4 @@ def embedding_search(agent: Agent, prompt: str) -> str:
         return f"Found {len(formatted_results)}, results: {json.dumps(formatted_results, indent=2)}"
     except Exception as e:
         traceback.print_exc()
-        return f"Error in semantic search: {str(e)}. Continuing with other search methods."
\ No newline at end of file
+        return f"Error in semantic search: {str(e)}. Continuing with other search methods."
@@ -0,0 +1,63 @@
+from typing import List, Optional
+from agno.agent import Agent
+from utils.hybrid_search import hybrid_search
+import json
+
+DESCRIPTION_CHARS = 300
+
+
+def hybrid_search_articles(
+    agent: Agent,
+    query: str,
+    terms: Optional[List[str]] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    source_ids: Optional[List[int]] = None,
+    categories: Optional[List[str]] = None,
+) -> str:
+    """
+    Search the internal articles database (crawled from the user's preselected rss feeds) for a topic.
+    Keyword and semantic matches are looked up together and returned as one ranked, deduplicated list,
+    so there is no need to call another internal article search afterwards.
+
+    Args:
+        agent: The agent instance
+        query: The topic or question to search for
+        terms: Optional keywords or phrases to match exactly, taken from the query when omitted
+        start_date: Only include articles published on or after this ISO date
+        end_date: Only include articles published on or before this ISO date
+        source_ids: Only include articles from these source ids
+        categories: Only include articles tagged with one of these categories
+
+    Returns:
+        A formatted string response with the search results
+    """
+    print(f"Hybrid Search Input: {query} terms: {terms}")
+    try:
+        results = hybrid_search(
+            query,
+            terms=terms,
+            start_date=start_date,
+            end_date=end_date,
+            source_ids=source_ids,
+            categories=categories,
+        )
+    except Exception as e:
+        print(f"Error in hybrid search: {e}")
+        return "I encountered an error while searching internal articles. Continuing with other search methods."
+    if not results:
+        return "No relevant articles found in our database. Continuing with other search methods."
+    formatted_results = [
+        {
+            "id": result["id"],
+            "title": result["title"],
+            "url": result["url"],
+            "published_date": result["published_date"],
+            "description": (result["summary"] or result["snippet"] or "")[:DESCRIPTION_CHARS],
+            "source_name": result["source_name"],
+            "matched_by": result["matched_by"],
+            "is_scrapping_required": False,
+        }
+        for result in results
+    ]
+    return f"Found {len(formatted_results)} internal articles ranked by relevance, check quality before using them: {json.dumps(formatted_results)}"
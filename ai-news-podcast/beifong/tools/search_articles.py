@@ -2,6 +2,7 @@ import sqlite3
 from typing import List, Union
 from agno.agent import Agent
 from db.config import get_tracking_db_path
+from db.articles import ARTICLE_SEARCH_MATCHES, build_search_query
 import json
 
 
@@ -37,24 +38,20 @@ def search_articles(agent: Agent, terms: Union[str, List[str]]) -> str:
 
 
 def execute_simple_search(conn, terms, limit):
-    base_query = """
-        SELECT DISTINCT ca.id, ca.title, ca.url, ca.published_date, 
+    match_query = build_search_query(terms)
+    if not match_query:
+        return []
+    query = f"""
+        SELECT ca.id, ca.title, ca.url, ca.published_date,
                COALESCE(ca.summary, ca.content) as content,
-               ca.source_id, ca.feed_id
-        FROM crawled_articles ca
-        WHERE ca.processed = 1 
-          AND (
+               ca.source_id, ca.feed_id, matches.snippet
+        FROM ({ARTICLE_SEARCH_MATCHES}) matches
+        JOIN crawled_articles ca ON ca.id = matches.article_id
+        WHERE ca.processed = 1
+        ORDER BY matches.score, ca.published_date DESC
+        LIMIT ?
     """
-    clauses = []
-    params = []
-    for term in terms:
-        like_term = f"%{term}%"
-        clauses.append("(ca.title LIKE ? OR ca.content LIKE ? OR ca.summary LIKE ?)")
-        params.extend([like_term, like_term, like_term])
-
-    query = base_query + " OR ".join(clauses) + ") ORDER BY ca.published_date DESC LIMIT ?"
-    params.append(limit)
-    cursor = conn.execute(query, params)
+    cursor = conn.execute(query, (match_query, limit))
     return [dict(row) for row in cursor.fetchall()]
 
 
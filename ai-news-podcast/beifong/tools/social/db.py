@@ -42,10 +42,139 @@ def setup_database(conn):
     conn.execute("CREATE INDEX IF NOT EXISTS idx_posts_platform ON posts(platform)")
     conn.execute("CREATE INDEX IF NOT EXISTS idx_posts_user_handle ON posts(user_handle)")
     conn.execute("CREATE INDEX IF NOT EXISTS idx_posts_post_timestamp ON posts(post_timestamp)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_posts_timestamp_post_id ON posts(post_timestamp, post_id)")
     conn.execute("CREATE INDEX IF NOT EXISTS idx_posts_sentiment ON posts(sentiment)")
+    create_post_label_tables(conn)
     conn.commit()
 
 
+# label kind -> (JSON column on posts, junction table, daily rollup table)
+POST_LABELS = {
+    "category": ("categories", "post_categories", "daily_category_rollup"),
+    "tag": ("tags", "post_tags", "daily_tag_rollup"),
+}
+
+
+def _json_labels(ref, column):
+    # malformed or missing JSON yields no labels rather than failing the write
+    return f"json_each(CASE WHEN json_valid({ref}.{column}) THEN {ref}.{column} ELSE '[]' END)"
+
+
+def _add_post_statements(ref):
+    statements = [
+        f"""INSERT INTO daily_sentiment_rollup (day, platform, sentiment, post_count)
+        SELECT date({ref}.post_timestamp), COALESCE({ref}.platform, ''), COALESCE({ref}.sentiment, ''), 1
+        WHERE date({ref}.post_timestamp) IS NOT NULL
+        ON CONFLICT (day, platform, sentiment) DO UPDATE SET post_count = post_count + 1"""
+    ]
+    for label, (column, junction, rollup) in POST_LABELS.items():
+        statements.append(
+            f"INSERT OR IGNORE INTO {junction} (post_id, {label}) SELECT {ref}.post_id, value FROM {_json_labels(ref, column)} WHERE type = 'text'"
+        )
+        statements.append(
+            f"""INSERT INTO {rollup} (day, {label}, sentiment, post_count)
+            SELECT date({ref}.post_timestamp), {label}, COALESCE({ref}.sentiment, ''), 1 FROM {junction}
+            WHERE post_id = {ref}.post_id AND date({ref}.post_timestamp) IS NOT NULL
+            ON CONFLICT (day, {label}, sentiment) DO UPDATE SET post_count = post_count + 1"""
+        )
+    return statements
+
+
+def _remove_post_statements(ref):
+    statements = [
+        f"""UPDATE daily_sentiment_rollup SET post_count = post_count - 1
+        WHERE day = date({ref}.post_timestamp) AND platform = COALESCE({ref}.platform, '') AND sentiment = COALESCE({ref}.sentiment, '')"""
+    ]
+    for label, (_, junction, rollup) in POST_LABELS.items():
+        statements.append(
+            f"""UPDATE {rollup} SET post_count = post_count - 1
+            WHERE day = date({ref}.post_timestamp) AND sentiment = COALESCE({ref}.sentiment, '')
+            AND {label} IN (SELECT {label} FROM {junction} WHERE post_id = {ref}.post_id)"""
+        )
+        statements.append(f"DELETE FROM {junction} WHERE post_id = {ref}.post_id")
+    return statements
+
+
+def _trigger(name, event, statements):
+    body = ";\n".join(statements)
+    return f"CREATE TRIGGER IF NOT EXISTS {name} AFTER {event} ON posts BEGIN\n{body};\nEND"
+
+
+def create_post_label_tables(conn):
+    """
+    Create the category/tag junction tables and daily rollups beside ``posts``.
+
+    Triggers on ``posts`` keep them in step with the JSON ``categories``/``tags`` columns, so
+    filters use an index and dashboard aggregates read one row per day instead of every post.
+    Existing posts are backfilled the first time the tables are created.
+    """
+    existed = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'daily_sentiment_rollup'").fetchone()
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS daily_sentiment_rollup (
+        day TEXT NOT NULL,
+        platform TEXT NOT NULL,
+        sentiment TEXT NOT NULL,
+        post_count INTEGER NOT NULL,
+        PRIMARY KEY (day, platform, sentiment)
+    ) WITHOUT ROWID
+    """)
+    for label, (_, junction, rollup) in POST_LABELS.items():
+        conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {junction} (
+            post_id TEXT NOT NULL,
+            {label} TEXT NOT NULL,
+            PRIMARY KEY ({label}, post_id)
+        ) WITHOUT ROWID
+        """)
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{junction}_post_id ON {junction}(post_id, {label})")
+        conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {rollup} (
+            day TEXT NOT NULL,
+            {label} TEXT NOT NULL,
+            sentiment TEXT NOT NULL,
+            post_count INTEGER NOT NULL,
+            PRIMARY KEY (day, {label}, sentiment)
+        ) WITHOUT ROWID
+        """)
+    conn.execute(_trigger("posts_labels_ai", "INSERT", _add_post_statements("new")))
+    conn.execute(_trigger("posts_labels_ad", "DELETE", _remove_post_statements("old")))
+    conn.execute(
+        _trigger(
+            "posts_labels_au",
+            "UPDATE OF post_timestamp, platform, sentiment, categories, tags",
+            _remove_post_statements("old") + _add_post_statements("new"),
+        )
+    )
+    if not existed:
+        rebuild_post_label_tables(conn)
+
+
+def rebuild_post_label_tables(conn):
+    """Recompute the junction tables and rollups from the ``posts`` table."""
+    conn.execute("DELETE FROM daily_sentiment_rollup")
+    conn.execute("""
+    INSERT INTO daily_sentiment_rollup (day, platform, sentiment, post_count)
+    SELECT date(post_timestamp), COALESCE(platform, ''), COALESCE(sentiment, ''), COUNT(*)
+    FROM posts WHERE date(post_timestamp) IS NOT NULL
+    GROUP BY 1, 2, 3
+    """)
+    for label, (column, junction, rollup) in POST_LABELS.items():
+        conn.execute(f"DELETE FROM {junction}")
+        conn.execute(f"DELETE FROM {rollup}")
+        conn.execute(f"""
+        INSERT OR IGNORE INTO {junction} (post_id, {label})
+        SELECT posts.post_id, value FROM posts, {_json_labels('posts', column)}
+        WHERE type = 'text'
+        """)
+        conn.execute(f"""
+        INSERT INTO {rollup} (day, {label}, sentiment, post_count)
+        SELECT date(p.post_timestamp), j.{label}, COALESCE(p.sentiment, ''), COUNT(*)
+        FROM {junction} j JOIN posts p ON p.post_id = j.post_id
+        WHERE date(p.post_timestamp) IS NOT NULL
+        GROUP BY 1, 2, 3
+        """)
+
+
 def parse_engagement_count(count_str):
     if not count_str:
         return 0
@@ -0,0 +1,151 @@
+import re
+from typing import Dict, Optional
+from lxml import etree
+from lxml import html as lxml_html
+import tiktoken
+
+TOKEN_ENCODING = "cl100k_base"
+STRIPPED_TAGS = (
+    "script",
+    "style",
+    "noscript",
+    "nav",
+    "header",
+    "footer",
+    "aside",
+    "form",
+    "iframe",
+    "svg",
+    "button",
+    "select",
+    "template",
+)
+SCORED_TAGS = ("p", "pre", "blockquote")
+BLOCK_TAGS = ("p", "pre", "blockquote", "li", "h1", "h2", "h3", "h4", "h5", "h6", "td", "dd", "dt", "figcaption", "div", "section", "br")
+PROTECTED_TAGS = ("html", "body", "article", "main")
+TAG_SCORES = {"article": 10, "main": 10, "div": 5, "section": 3, "pre": 3, "td": 3, "blockquote": 3, "form": -3, "li": -3, "ul": -3, "ol": -3}
+POSITIVE_PATTERN = re.compile(r"article|body|content|entry|main|page|post|story|text|blog", re.I)
+NEGATIVE_PATTERN = re.compile(
+    r"comment|footer|sidebar|sponsor|promo|related|share|social|widget|banner|advert|\bads?\b|nav|menu|breadcrumb|cookie|newsletter|subscribe|popup|modal",
+    re.I,
+)
+CLASS_WEIGHT = 25
+MIN_PARAGRAPH_CHARS = 25
+SIBLING_SCORE_RATIO = 0.2
+
+_encoding = None
+_encoding_unavailable = False
+
+
+def count_tokens(text: str) -> int:
+    global _encoding, _encoding_unavailable
+    if _encoding is None and not _encoding_unavailable:
+        try:
+            _encoding = tiktoken.get_encoding(TOKEN_ENCODING)
+        except Exception as e:
+            # tiktoken downloads its vocabulary on first use, don't fail the crawl without it
+            print(f"Token encoding unavailable, approximating token counts: {str(e)}")
+            _encoding_unavailable = True
+    if _encoding is None:
+        return len(text) // 4
+    return len(_encoding.encode(text, disallowed_special=()))
+
+
+def _class_weight(element) -> int:
+    weight = 0
+    for attribute in (element.get("class"), element.get("id")):
+        if attribute:
+            if NEGATIVE_PATTERN.search(attribute):
+                weight -= CLASS_WEIGHT
+            if POSITIVE_PATTERN.search(attribute):
+                weight += CLASS_WEIGHT
+    return weight
+
+
+def _link_density(element) -> float:
+    text_length = len(element.text_content())
+    if not text_length:
+        return 0.0
+    link_length = sum(len(link.text_content()) for link in element.iter("a"))
+    return link_length / text_length
+
+
+def _drop_boilerplate(body) -> None:
+    etree.strip_elements(body, etree.Comment, *STRIPPED_TAGS, with_tail=False)
+    # drop containers that are clearly chrome (share bars, related links, comment threads)
+    for element in list(body.iter("div", "section", "ul", "span", "p")):
+        attributes = f"{element.get('class', '')} {element.get('id', '')}"
+        if NEGATIVE_PATTERN.search(attributes) and not POSITIVE_PATTERN.search(attributes):
+            if element.getparent() is not None and element.tag not in PROTECTED_TAGS:
+                element.drop_tree()
+
+
+def _score_candidates(body) -> Dict:
+    scores = {}
+    for paragraph in body.iter(*SCORED_TAGS):
+        text = paragraph.text_content().strip()
+        if len(text) < MIN_PARAGRAPH_CHARS:
+            continue
+        score = 1 + text.count(",") + min(len(text) // 100, 3)
+        parent = paragraph.getparent()
+        grandparent = parent.getparent() if parent is not None else None
+        for ancestor, share in ((parent, 1.0), (grandparent, 0.5)):
+            if ancestor is None or not isinstance(ancestor.tag, str):
+                continue
+            if ancestor not in scores:
+                scores[ancestor] = TAG_SCORES.get(ancestor.tag, 0) + _class_weight(ancestor)
+            scores[ancestor] += score * share
+    return {element: score * (1 - _link_density(element)) for element, score in scores.items()}
+
+
+def _select_content(body, scores):
+    if not scores:
+        return [body]
+    top = max(scores, key=scores.get)
+    parent = top.getparent()
+    if parent is None:
+        return [top]
+    threshold = max(10, scores[top] * SIBLING_SCORE_RATIO)
+    selected = []
+    for sibling in parent:
+        if sibling is top or scores.get(sibling, 0) >= threshold:
+            selected.append(sibling)
+        elif sibling.tag == "p":
+            text = sibling.text_content()
+            if len(text) > 80 and _link_density(sibling) < 0.25:
+                selected.append(sibling)
+    return selected
+
+
+def _element_text(element) -> str:
+    for block in element.iter(*BLOCK_TAGS):
+        block.tail = "\n" + (block.tail or "")
+    lines = (" ".join(line.split()) for line in "".join(element.itertext()).splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def extract_main_text(body) -> str:
+    """
+    Return the article text of a parsed ``<body>``, readability style.
+
+    Paragraph-like blocks score their parent and grandparent by length and comma count,
+    class/id names and link density adjust the score, and the best container plus its
+    strong siblings is kept. The tree is modified in place.
+    """
+    if body is None:
+        return ""
+    _drop_boilerplate(body)
+    selected = _select_content(body, _score_candidates(body))
+    return "\n".join(text for text in (_element_text(element) for element in selected) if text)
+
+
+def parse_html_document(html: bytes, encoding: Optional[str] = None):
+    try:
+        parser = lxml_html.HTMLParser(encoding=encoding) if encoding else None
+    except LookupError:
+        # unknown charset label from the server, let libxml2 sniff it
+        parser = None
+    try:
+        return lxml_html.document_fromstring(html, parser=parser)
+    except (etree.ParserError, ValueError):
+        return None
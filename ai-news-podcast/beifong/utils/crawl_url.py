@@ -1,7 +1,22 @@
+import asyncio
 import requests
-from bs4 import BeautifulSoup
 import random
-from typing import Dict, List, TypedDict
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, TypedDict
+from urllib.parse import urlsplit
+import aiohttp
+from lxml import html as lxml_html
+from utils.content_extractor import count_tokens, extract_main_text, parse_html_document
+from utils.feed_fetcher import HostPoliteness
+
+HTML_PARSER = "lxml"
+
+MAX_HTML_BYTES = 2 * 1024 * 1024
+READ_CHUNK_SIZE = 64 * 1024
+DEFAULT_CONCURRENCY = 32
+DEFAULT_PER_HOST_LIMIT = 2
+DEFAULT_PER_HOST_DELAY = 1.0
+DEFAULT_TIMEOUT = 15
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
 
 
 class MetadataDict(TypedDict):
@@ -15,6 +30,8 @@ class MetadataDict(TypedDict):
 class WebData(TypedDict):
     raw_html: str
     metadata: MetadataDict
+    text: str
+    token_count: int
 
 
 USER_AGENTS: List[str] = [
@@ -33,24 +50,27 @@ HEADERS: Dict[str, str] = {
 }
 
 
-def extract_meta_tags(soup: BeautifulSoup) -> MetadataDict:
-    metadata: MetadataDict = {
+def empty_metadata() -> MetadataDict:
+    return {
         "title": "",
         "description": "",
         "og": {},
         "twitter": {},
         "other_meta": {},
     }
-    title_tag = soup.find("title")
-    if title_tag:
-        metadata["title"] = title_tag.text.strip()
-    for meta in soup.find_all("meta"):
-        name = meta.get("name", "").lower()
-        prop = meta.get("property", "").lower()
-        content = meta.get("content", "")
-        if prop.startswith("ogg:"):
-            og_key = prop[3:]
-            metadata["og"][og_key] = content
+
+
+def extract_document_meta_tags(document) -> MetadataDict:
+    metadata = empty_metadata()
+    title = document.findtext(".//title")
+    if title:
+        metadata["title"] = title.strip()
+    for meta in document.iter("meta"):
+        name = (meta.get("name") or "").lower()
+        prop = (meta.get("property") or "").lower()
+        content = meta.get("content") or ""
+        if prop.startswith("og:"):
+            metadata["og"][prop[3:]] = content
         elif prop.startswith("twitter:") or name.startswith("twitter:"):
             twitter_key = prop[8:] if prop.startswith("twitter:") else name[8:]
             metadata["twitter"][twitter_key] = content
@@ -61,10 +81,108 @@ def extract_meta_tags(soup: BeautifulSoup) -> MetadataDict:
     return metadata
 
 
-def get_web_data(url: str) -> WebData:
-    HEADERS["User-Agent"] = random.choice(USER_AGENTS)
-    response = requests.get(url, headers=HEADERS, timeout=10)
-    soup = BeautifulSoup(response.text, "html.parser")
-    metadata = extract_meta_tags(soup)
-    body = str(soup.find("body"))
-    return {"raw_html": body, "metadata": metadata}
+def parse_web_page(html: bytes, encoding: Optional[str] = None) -> WebData:
+    """
+    Parse a downloaded page once and extract everything later stages need.
+
+    Runs at crawl time (top-level so it can run in a process pool): the body HTML is
+    kept for reprocessing, while ``text`` holds the extracted article body and
+    ``token_count`` its size, so analysis and embedding never parse HTML again.
+    """
+    document = parse_html_document(html, encoding)
+    if document is None:
+        return {"raw_html": "", "metadata": empty_metadata(), "text": "", "token_count": 0}
+    metadata = extract_document_meta_tags(document)
+    body = document.find("body")
+    raw_html = lxml_html.tostring(body, encoding="unicode") if body is not None else ""
+    text = extract_main_text(body)
+    return {"raw_html": raw_html, "metadata": metadata, "text": text, "token_count": count_tokens(text)}
+
+
+_session = None
+
+
+def _get_session() -> requests.Session:
+    global _session
+    if _session is None:
+        _session = requests.Session()
+        _session.headers.update(HEADERS)
+    return _session
+
+
+def get_web_data(url: str, max_bytes: int = MAX_HTML_BYTES) -> WebData:
+    session = _get_session()
+    with session.get(url, headers={"User-Agent": random.choice(USER_AGENTS)}, timeout=10, stream=True) as response:
+        content = bytearray()
+        for chunk in response.iter_content(READ_CHUNK_SIZE):
+            content.extend(chunk)
+            if len(content) >= max_bytes:
+                break
+        return parse_web_page(bytes(content[:max_bytes]), response.encoding)
+
+
+async def read_capped(response: aiohttp.ClientResponse, max_bytes: int) -> bytes:
+    # stop reading once the cap is hit rather than buffering multi-megabyte pages
+    content = bytearray()
+    async for chunk in response.content.iter_chunked(READ_CHUNK_SIZE):
+        content.extend(chunk)
+        if len(content) >= max_bytes:
+            break
+    return bytes(content[:max_bytes])
+
+
+async def fetch_web_data(
+    session: aiohttp.ClientSession,
+    politeness: HostPoliteness,
+    url: str,
+    max_bytes: int = MAX_HTML_BYTES,
+    parse_executor=None,
+) -> Optional[WebData]:
+    async with politeness:
+        async with session.get(url, headers={"User-Agent": random.choice(USER_AGENTS)}) as response:
+            response.raise_for_status()
+            if response.content_type and response.content_type not in HTML_CONTENT_TYPES:
+                return None
+            encoding = response.charset
+            content = await read_capped(response, max_bytes)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(parse_executor, parse_web_page, content, encoding)
+
+
+async def iter_crawled_pages(
+    entries: List[Dict[str, Any]],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    per_host_limit: int = DEFAULT_PER_HOST_LIMIT,
+    per_host_delay: float = DEFAULT_PER_HOST_DELAY,
+    timeout: float = DEFAULT_TIMEOUT,
+    max_bytes: int = MAX_HTML_BYTES,
+    parse_executor=None,
+) -> AsyncIterator[Tuple[Dict[str, Any], Optional[WebData], Optional[str]]]:
+    """
+    Crawl entry links over one pooled HTTP session, yielding ``(entry, web_data, error)`` as each finishes.
+
+    Bodies are read up to ``max_bytes`` and parsed in ``parse_executor`` so the event loop keeps downloading.
+    """
+
+    async def crawl(entry, politeness):
+        try:
+            return entry, await fetch_web_data(session, politeness, entry["link"], max_bytes, parse_executor), None
+        except Exception as e:
+            return entry, None, f"{type(e).__name__}: {str(e)}"
+
+    connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=per_host_limit, ttl_dns_cache=300)
+    hosts: Dict[str, HostPoliteness] = {}
+    headers = {key: value for key, value in HEADERS.items() if key != "Connection"}
+    async with aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(total=timeout),
+        headers=headers,
+    ) as session:
+        tasks = []
+        for entry in entries:
+            host = urlsplit(entry["link"]).netloc.lower()
+            if host not in hosts:
+                hosts[host] = HostPoliteness(per_host_limit, per_host_delay)
+            tasks.append(asyncio.create_task(crawl(entry, hosts[host])))
+        for task in asyncio.as_completed(tasks):
+            yield await task
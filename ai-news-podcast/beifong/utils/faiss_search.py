@@ -0,0 +1,282 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+import faiss
+from openai import OpenAI
+from db.config import get_faiss_db_path
+from db.connection import execute_query
+from utils.load_api_keys import load_api_key
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+QUERY_EMBEDDING_CACHE_SIZE = 1024
+INDEX_CHECK_INTERVAL = 1.0
+EXACT_FILTER_LIMIT = 10000
+
+_openai_clients: Dict[str, OpenAI] = {}
+_clients_lock = threading.Lock()
+_index_holders: Dict[Tuple[str, str], "FaissIndexHolder"] = {}
+_holders_lock = threading.Lock()
+
+
+def _file_version(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _read_index(index_path: str):
+    mmap_flags = getattr(faiss, "IO_FLAG_MMAP", 0) | getattr(faiss, "IO_FLAG_READ_ONLY", 0)
+    if mmap_flags:
+        try:
+            return faiss.read_index(index_path, mmap_flags)
+        except Exception:
+            # not every index type can be memory-mapped, fall back to a regular load
+            pass
+    return faiss.read_index(index_path)
+
+
+def _search_parameters(index, search_params: Optional[dict] = None, selector=None):
+    search_params = search_params or {}
+    if isinstance(index, faiss.IndexIVF):
+        params = faiss.SearchParametersIVF()
+        params.nprobe = search_params.get("nprobe", index.nprobe)
+    elif hasattr(index, "hnsw"):
+        params = faiss.SearchParametersHNSW()
+        params.efSearch = search_params.get("ef", index.hnsw.efSearch)
+    else:
+        params = faiss.SearchParameters()
+    if selector is not None:
+        params.sel = selector
+    return params
+
+
+def _cosine_similarities(index, distances: np.ndarray) -> np.ndarray:
+    if index.metric_type == faiss.METRIC_INNER_PRODUCT:
+        return distances
+    # squared L2 between unit vectors is 2 - 2cos, older indexes were built with L2
+    return 1.0 - distances / 2.0
+
+
+class FaissIndexHolder:
+    """
+    Keeps one FAISS index and its article id mapping resident for the whole process.
+
+    The files are re-read only when the index, mapping or metadata sidecar
+    (``<index>.meta.json``, whose generation is bumped on every compaction) changes
+    on disk, and at most once per ``check_interval`` seconds.
+    """
+
+    def __init__(self, index_path: str, mapping_path: str, check_interval: float = INDEX_CHECK_INTERVAL):
+        self.index_path = index_path
+        self.mapping_path = mapping_path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._index = None
+        self._id_map = None
+        self._version = None
+        self._last_check = 0.0
+
+    def _disk_version(self):
+        return (
+            _file_version(self.index_path),
+            _file_version(self.mapping_path),
+            _file_version(f"{self.index_path}.meta.json"),
+        )
+
+    def _reload_if_changed(self):
+        now = time.monotonic()
+        if self._index is not None and now - self._last_check < self.check_interval:
+            return
+        self._last_check = now
+        version = self._disk_version()
+        if version == self._version:
+            return
+        if version[0] is None or version[1] is None:
+            raise FileNotFoundError(f"FAISS index or ID mapping not found at {self.index_path}")
+        index = _read_index(self.index_path)
+        id_map = np.load(self.mapping_path, mmap_mode="r")
+        if len(id_map) != index.ntotal:
+            # caught between the index and mapping swaps of a compaction, keep the previous pair
+            if self._index is None:
+                raise RuntimeError("FAISS index and ID mapping are out of sync")
+            return
+        self._index, self._id_map, self._version = index, id_map, version
+        print(f"Loaded FAISS index with {index.ntotal} vectors from {self.index_path}")
+
+    def get(self):
+        with self._lock:
+            self._reload_if_changed()
+            return self._index, self._id_map
+
+    @property
+    def ntotal(self) -> int:
+        index, _ = self.get()
+        return index.ntotal
+
+    def search(
+        self, queries, k: int, search_params: Optional[dict] = None, allowed_article_ids: Optional[np.ndarray] = None
+    ) -> List[List[Tuple[int, float]]]:
+        """
+        Search a batch of query vectors, returning ``(article_id, cosine_similarity)`` pairs per query.
+
+        When ``allowed_article_ids`` is given only those articles are visited, through a
+        FAISS ID selector, so filtered queries still return up to ``k`` matches.
+        """
+        index, id_map = self.get()
+        query_vectors = np.array(np.atleast_2d(queries), dtype=np.float32, order="C")
+        faiss.normalize_L2(query_vectors)
+        selector = None
+        if allowed_article_ids is not None:
+            mask = np.isin(id_map, allowed_article_ids)
+            if not mask.any():
+                return [[] for _ in range(len(query_vectors))]
+            positions = np.flatnonzero(mask)
+            if len(positions) <= EXACT_FILTER_LIMIT:
+                # graph and IVF traversal miss most matches of very selective filters, scoring them directly is exact and cheap
+                results = self._exact_search(index, id_map, query_vectors, positions, k)
+                if results is not None:
+                    return results
+            # the selector borrows this buffer, it stays referenced until the search returns
+            bitmap = np.packbits(mask, bitorder="little")
+            selector = faiss.IDSelectorBitmap(len(mask), faiss.swig_ptr(bitmap))
+        params = _search_parameters(index, search_params, selector)
+        distances, indices = index.search(query_vectors, min(k, index.ntotal) or 1, params=params)
+        similarities = _cosine_similarities(index, distances)
+        results = []
+        for row_similarities, row_indices in zip(similarities, indices):
+            results.append(
+                [(int(id_map[idx]), float(similarity)) for idx, similarity in zip(row_indices, row_similarities) if 0 <= idx < len(id_map)]
+            )
+        return results
+
+    @staticmethod
+    def _exact_search(index, id_map, query_vectors, positions, k):
+        try:
+            vectors = index.reconstruct_batch(positions.astype(np.int64))
+        except RuntimeError:
+            # IVF indexes without a direct map cannot reconstruct, use the ID selector instead
+            return None
+        faiss.normalize_L2(vectors)
+        similarities = query_vectors @ vectors.T
+        top = np.argsort(-similarities, axis=1)[:, :k]
+        return [
+            [(int(id_map[positions[i]]), float(row_similarities[i])) for i in row_top]
+            for row_top, row_similarities in zip(top, similarities)
+        ]
+
+
+def get_faiss_index_holder(index_path: Optional[str] = None, mapping_path: Optional[str] = None) -> FaissIndexHolder:
+    default_index_path, default_mapping_path = get_faiss_db_path()
+    key = (index_path or default_index_path, mapping_path or default_mapping_path)
+    with _holders_lock:
+        if key not in _index_holders:
+            _index_holders[key] = FaissIndexHolder(*key)
+        return _index_holders[key]
+
+
+def article_filter_clauses(
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    source_ids: Optional[Sequence[int]] = None,
+    categories: Optional[Sequence[str]] = None,
+) -> Tuple[List[str], list]:
+    """Return SQL conditions on ``crawled_articles ca`` and their parameters for the filters that are set."""
+    clauses = []
+    params = []
+    if start_date:
+        clauses.append("ca.published_date >= ?")
+        params.append(start_date)
+    if end_date:
+        clauses.append("ca.published_date <= ?")
+        params.append(end_date)
+    if source_ids:
+        clauses.append(f"ca.source_id IN ({','.join(['?'] * len(source_ids))})")
+        params.extend(source_ids)
+    if categories:
+        clauses.append(
+            "EXISTS (SELECT 1 FROM article_categories ac WHERE ac.article_id = ca.id "
+            f"AND ac.category_name IN ({','.join(['?'] * len(categories))}))"
+        )
+        params.extend(category.lower().strip() for category in categories)
+    return clauses, params
+
+
+def build_article_filter(
+    tracking_db_path: str,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    source_ids: Optional[Sequence[int]] = None,
+    categories: Optional[Sequence[str]] = None,
+) -> Optional[np.ndarray]:
+    """Return the ids of articles matching the filters, or None when no filter is set."""
+    clauses, params = article_filter_clauses(start_date, end_date, source_ids, categories)
+    if not clauses:
+        return None
+    query = "SELECT ca.id FROM crawled_articles ca WHERE " + " AND ".join(clauses)
+    rows = execute_query(tracking_db_path, query, params, fetch=True)
+    return np.fromiter((row["id"] for row in rows), dtype=np.int64, count=len(rows))
+
+
+def get_openai_client(api_key: Optional[str] = None) -> Optional[OpenAI]:
+    api_key = api_key or load_api_key("OPENAI_API_KEY")
+    if not api_key:
+        return None
+    with _clients_lock:
+        if api_key not in _openai_clients:
+            _openai_clients[api_key] = OpenAI(api_key=api_key)
+        return _openai_clients[api_key]
+
+
+def normalize_query_text(text: str) -> str:
+    return " ".join(text.split()).casefold()
+
+
+class QueryEmbeddingCache:
+    def __init__(self, max_size: int = QUERY_EMBEDDING_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: "OrderedDict[Tuple[str, str], np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, model: str, text: str) -> Optional[np.ndarray]:
+        key = (model, normalize_query_text(text))
+        with self._lock:
+            embedding = self._entries.get(key)
+            if embedding is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return embedding
+
+    def put(self, model: str, text: str, embedding) -> None:
+        key = (model, normalize_query_text(text))
+        with self._lock:
+            self._entries[key] = np.asarray(embedding, dtype=np.float32)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+query_embedding_cache = QueryEmbeddingCache()
+
+
+def embed_queries(texts: Sequence[str], model: str = EMBEDDING_MODEL, client: Optional[OpenAI] = None) -> np.ndarray:
+    """Embed query texts in one request, serving repeated prompts from the LRU cache."""
+    embeddings: List[Optional[np.ndarray]] = [query_embedding_cache.get(model, text) for text in texts]
+    missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+    if missing:
+        client = client or get_openai_client()
+        if client is None:
+            raise ValueError("OpenAI API key not found")
+        response = client.embeddings.create(input=[texts[i] for i in missing], model=model)
+        for i, item in zip(missing, sorted(response.data, key=lambda item: item.index)):
+            embeddings[i] = np.asarray(item.embedding, dtype=np.float32)
+            query_embedding_cache.put(model, texts[i], embeddings[i])
+    return np.vstack(embeddings)
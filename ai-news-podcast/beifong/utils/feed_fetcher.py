@@ -0,0 +1,99 @@
+import time
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+import aiohttp
+from utils.rss_feed_parser import parse_feed_content
+
+DEFAULT_CONCURRENCY = 64
+DEFAULT_PER_HOST_LIMIT = 2
+DEFAULT_PER_HOST_DELAY = 1.0
+DEFAULT_TIMEOUT = 30
+USER_AGENT = "Beifong/1.0 feed reader"
+
+
+class HostPoliteness:
+    """Caps concurrent requests to one host and spaces their start times by ``delay`` seconds."""
+
+    def __init__(self, limit: int, delay: float):
+        self.delay = delay
+        self._semaphore = asyncio.Semaphore(limit)
+        self._lock = asyncio.Lock()
+        self._next_request_at = 0.0
+
+    async def __aenter__(self):
+        await self._semaphore.acquire()
+        async with self._lock:
+            now = time.monotonic()
+            start_at = max(now, self._next_request_at)
+            self._next_request_at = start_at + self.delay
+        if start_at > now:
+            await asyncio.sleep(start_at - now)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._semaphore.release()
+
+
+async def fetch_feed(
+    session: aiohttp.ClientSession,
+    politeness: HostPoliteness,
+    feed: Dict[str, Any],
+    tracking_info: Optional[Dict[str, Any]],
+    parse_executor=None,
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    headers = {}
+    if tracking_info:
+        if tracking_info.get("last_etag"):
+            headers["If-None-Match"] = tracking_info["last_etag"]
+        if tracking_info.get("last_modified"):
+            headers["If-Modified-Since"] = tracking_info["last_modified"]
+    try:
+        async with politeness:
+            async with session.get(feed["feed_url"], headers=headers) as response:
+                status = response.status
+                etag = response.headers.get("ETag")
+                modified = response.headers.get("Last-Modified")
+                content = await response.read() if status != 304 else b""
+        if status == 304:
+            return feed, {"is_rss_feed": True, "status": 304, "etag": etag, "modified": modified}
+        if status >= 400:
+            return feed, {"error": f"HTTP {status}"}
+        loop = asyncio.get_running_loop()
+        feed_data = await loop.run_in_executor(parse_executor, parse_feed_content, content)
+        feed_data.update({"status": status, "etag": etag, "modified": modified})
+        return feed, feed_data
+    except Exception as e:
+        return feed, {"error": f"{type(e).__name__}: {str(e)}"}
+
+
+async def iter_fetched_feeds(
+    feeds: List[Dict[str, Any]],
+    tracking_infos: Dict[int, Dict[str, Any]],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    per_host_limit: int = DEFAULT_PER_HOST_LIMIT,
+    per_host_delay: float = DEFAULT_PER_HOST_DELAY,
+    timeout: float = DEFAULT_TIMEOUT,
+    parse_executor=None,
+) -> AsyncIterator[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """
+    Fetch all feeds over one pooled HTTP session and yield ``(feed, feed_data)`` as each finishes.
+
+    Requests are conditional on the stored ``last_etag``/``last_modified`` values, and
+    parsing runs in ``parse_executor`` so the event loop keeps downloading.
+    """
+    connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=per_host_limit, ttl_dns_cache=300)
+    hosts: Dict[str, HostPoliteness] = {}
+    async with aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(total=timeout),
+        headers={"User-Agent": USER_AGENT},
+    ) as session:
+        tasks = []
+        for feed in feeds:
+            host = urlsplit(feed["feed_url"]).netloc.lower()
+            if host not in hosts:
+                hosts[host] = HostPoliteness(per_host_limit, per_host_delay)
+            tasks.append(asyncio.create_task(fetch_feed(session, hosts[host], feed, tracking_infos.get(feed["id"]), parse_executor)))
+        for task in asyncio.as_completed(tasks):
+            yield await task
@@ -0,0 +1,61 @@
+import random
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+MIN_POLL_INTERVAL = 10 * 60
+MAX_POLL_INTERVAL = 24 * 60 * 60
+DEFAULT_POLL_INTERVAL = 60 * 60
+MAX_FAILURE_INTERVAL = 7 * 24 * 60 * 60
+POLLS_PER_PUBLISH_INTERVAL = 2
+UNCHANGED_BACKOFF = 1.5
+QUIET_PUBLISH_INTERVALS = 4
+POLL_JITTER = 0.1
+
+FEED_NEW_ENTRIES = "new_entries"
+FEED_UNCHANGED = "unchanged"
+FEED_FAILED = "failed"
+
+
+def _clamp(seconds: float, low: float = MIN_POLL_INTERVAL, high: float = MAX_POLL_INTERVAL) -> float:
+    return max(low, min(high, seconds))
+
+
+def is_feed_due(tracking_info: Optional[Dict[str, Any]], now: Optional[datetime] = None) -> bool:
+    if not tracking_info or not tracking_info.get("next_poll_at"):
+        return True
+    now = now or datetime.now()
+    return tracking_info["next_poll_at"] <= now.isoformat()
+
+
+def next_poll_interval(
+    outcome: str,
+    current_interval: Optional[float] = None,
+    publish_interval: Optional[float] = None,
+    failure_count: int = 0,
+) -> float:
+    """
+    Seconds to wait before polling a feed again after a poll with ``outcome``.
+
+    Feeds that publish get polled a few times per observed publish interval, feeds
+    answering 304 or an unchanged hash back off gradually, and failing feeds back off
+    exponentially up to a week.
+    """
+    current_interval = current_interval or DEFAULT_POLL_INTERVAL
+    if outcome == FEED_FAILED:
+        return min(MAX_FAILURE_INTERVAL, DEFAULT_POLL_INTERVAL * 2 ** max(0, failure_count - 1))
+    if outcome == FEED_NEW_ENTRIES:
+        if publish_interval:
+            return _clamp(publish_interval / POLLS_PER_PUBLISH_INTERVAL)
+        return _clamp(current_interval / UNCHANGED_BACKOFF)
+    interval = current_interval * UNCHANGED_BACKOFF
+    if publish_interval:
+        # stay responsive to feeds that usually publish often but are briefly quiet
+        interval = min(interval, publish_interval * QUIET_PUBLISH_INTERVALS)
+    return _clamp(interval)
+
+
+def schedule_next_poll(interval: float, now: Optional[datetime] = None) -> str:
+    # jitter spreads feeds that were added together across the polling window
+    now = now or datetime.now()
+    jittered = interval * random.uniform(1 - POLL_JITTER, 1 + POLL_JITTER)
+    return (now + timedelta(seconds=jittered)).isoformat()
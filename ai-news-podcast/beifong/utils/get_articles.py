@@ -3,6 +3,7 @@ import openai
 import json
 from datetime import datetime, timedelta
 from typing import List, Dict, Any
+from db.articles import ARTICLE_SEARCH_MATCHES, ARTICLE_SEARCH_TABLE, build_search_query
 
 TOPIC_EXTRACTION_MODEL = "gpt-4o-mini"
 
@@ -99,33 +100,51 @@ def _execute_search(
             from_date = adjusted_date
         except Exception as e:
             print(f"Warning: Could not adjust date with fallback: {e}")
-    base_query = """
-        SELECT DISTINCT ca.id, ca.title, ca.url, ca.published_date, ca.summary as content, 
-               ca.source_id, ca.feed_id
-        FROM crawled_articles ca
-        WHERE ca.processed = 1 AND ca.published_date >= ?
-    """
-    if use_categories:
-        base_query = """
-            SELECT DISTINCT ca.id, ca.title, ca.url, ca.published_date, ca.summary as content,
-                   ca.source_id, ca.feed_id
-            FROM crawled_articles ca
-            LEFT JOIN article_categories ac ON ca.id = ac.article_id
-            WHERE ca.processed = 1 AND ca.published_date >= ?
+    terms = [term.strip() for term in terms if term and term.strip()]
+    if not terms:
+        return []
+    # categories are stored lowercased, an exact match keeps this on the category index
+    category_names = sorted({term.lower() for term in terms}) if use_categories else []
+    match_operator, required, required_params = operator, "", []
+    if category_names and operator == "AND":
+        # each term may be met by the text or by a category, so the text is matched on any term for
+        # ranking and every term is then required through its own set of matching articles
+        term_sets = [
+            f"""
+            SELECT article_id FROM (
+                SELECT rowid AS article_id FROM {ARTICLE_SEARCH_TABLE} WHERE {ARTICLE_SEARCH_TABLE} MATCH ?
+                UNION
+                SELECT article_id FROM article_categories WHERE category_name = ?
+            )
+            """
+            for _ in terms
+        ]
+        required = f"AND ca.id IN ({' INTERSECT '.join(term_sets)})"
+        for term in terms:
+            required_params.extend([build_search_query([term]), term.lower()])
+        match_operator = "OR"
+    candidates = f"SELECT article_id, score, snippet FROM ({ARTICLE_SEARCH_MATCHES})"
+    params = [build_search_query(terms, match_operator)]
+    if category_names:
+        placeholders = ",".join(["?"] * len(category_names))
+        candidates += f"""
+            UNION ALL
+            SELECT article_id, 0.0, NULL FROM article_categories WHERE category_name IN ({placeholders})
         """
-    clauses, params = [], [from_date]
-    for term in terms:
-        term_clauses = []
-        like = f"%{term}%"
-        term_clauses.append("(ca.title LIKE ? OR ca.content LIKE ? OR ca.summary LIKE ?)")
-        params.extend([like, like, like])
-        if use_categories:
-            term_clauses.append("(ac.category_name LIKE ?)")
-            params.append(like)
-        if term_clauses:
-            clauses.append(f"({' OR '.join(term_clauses)})")
-    where = f" {operator} ".join(clauses)
-    sql = f"{base_query} AND ({where}) ORDER BY ca.published_date DESC LIMIT {limit}"
+        params.extend(category_names)
+    sql = f"""
+        SELECT ca.id, ca.title, ca.url, ca.published_date, ca.summary as content,
+               ca.source_id, ca.feed_id, MAX(matches.snippet) as snippet
+        FROM ({candidates}) matches
+        JOIN crawled_articles ca ON ca.id = matches.article_id
+        WHERE ca.processed = 1 AND ca.published_date >= ? {required}
+        GROUP BY ca.id
+        ORDER BY MIN(matches.score), ca.published_date DESC
+        LIMIT ?
+    """
+    params.append(from_date)
+    params.extend(required_params)
+    params.append(limit)
     cursor.execute(sql, params)
     return [dict(row) for row in cursor.fetchall()]
 
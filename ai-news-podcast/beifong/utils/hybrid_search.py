@@ -0,0 +1,161 @@
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from db.articles import ARTICLE_SEARCH_MATCHES, build_search_query
+from db.config import get_faiss_db_path, get_sources_db_path, get_tracking_db_path
+from db.connection import execute_query
+from utils.faiss_search import article_filter_clauses, build_article_filter, embed_queries, get_faiss_index_holder
+
+RRF_K = 60
+CANDIDATES_PER_RETRIEVER = 50
+MIN_SEMANTIC_SIMILARITY = 0.3
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from has have how in is it its of on or that the this to was were what when where which who why will with".split()
+)
+QUERY_WORD = re.compile(r"\w+")
+
+_retrieval_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="hybrid-search")
+
+
+def query_terms(query: str) -> List[str]:
+    return [word for word in QUERY_WORD.findall(query.casefold()) if len(word) > 1 and word not in STOP_WORDS]
+
+
+def lexical_candidates(
+    tracking_db_path: str, terms: Sequence[str], limit: int, filters: Optional[dict] = None
+) -> List[Tuple[int, str]]:
+    """Return ``(article_id, snippet)`` pairs for the best BM25 matches of any of the terms."""
+    match_query = build_search_query(terms)
+    if not match_query:
+        return []
+    clauses, params = article_filter_clauses(**(filters or {}))
+    query = f"""
+        SELECT matches.article_id, matches.snippet
+        FROM ({ARTICLE_SEARCH_MATCHES}) matches
+        JOIN crawled_articles ca ON ca.id = matches.article_id
+        WHERE {" AND ".join(["ca.processed = 1", *clauses])}
+        ORDER BY matches.score
+        LIMIT ?
+    """
+    rows = execute_query(tracking_db_path, query, [match_query, *params, limit], fetch=True)
+    return [(row["article_id"], row["snippet"]) for row in rows]
+
+
+def semantic_candidates(
+    tracking_db_path: str,
+    index_path: str,
+    mapping_path: str,
+    query: str,
+    limit: int,
+    filters: Optional[dict] = None,
+    query_embedding: Optional[np.ndarray] = None,
+    min_similarity: float = MIN_SEMANTIC_SIMILARITY,
+) -> List[Tuple[int, float]]:
+    """Return ``(article_id, cosine_similarity)`` pairs for the nearest articles in the FAISS index."""
+    if not os.path.exists(index_path) or not os.path.exists(mapping_path):
+        return []
+    if query_embedding is None:
+        query_embedding = embed_queries([query])[0]
+    allowed_article_ids = build_article_filter(tracking_db_path, **(filters or {}))
+    matches = get_faiss_index_holder(index_path, mapping_path).search(
+        query_embedding, limit, allowed_article_ids=allowed_article_ids
+    )[0]
+    best = {}
+    for article_id, similarity in matches:
+        if similarity >= min_similarity and similarity > best.get(article_id, -1.0):
+            best[article_id] = similarity
+    return sorted(best.items(), key=lambda match: match[1], reverse=True)
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[int]], k: int = RRF_K) -> List[Tuple[int, float]]:
+    """Fuse ranked id lists, scoring each id by the sum of ``1 / (k + rank)`` over the lists it appears in."""
+    scores: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, article_id in enumerate(ranking, start=1):
+            scores[article_id] = scores.get(article_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+def get_articles_with_sources(tracking_db_path: str, sources_db_path: str, article_ids: Sequence[int]) -> Dict[int, dict]:
+    if not article_ids:
+        return {}
+    placeholders = ",".join(["?"] * len(article_ids))
+    rows = execute_query(
+        tracking_db_path,
+        f"SELECT id, title, url, published_date, summary, source_id FROM crawled_articles WHERE id IN ({placeholders})",
+        list(article_ids),
+        fetch=True,
+    )
+    articles = {row["id"]: dict(row) for row in rows}
+    source_ids = sorted({article["source_id"] for article in articles.values() if article["source_id"]})
+    source_names = {}
+    if source_ids:
+        placeholders = ",".join(["?"] * len(source_ids))
+        try:
+            rows = execute_query(sources_db_path, f"SELECT id, name FROM sources WHERE id IN ({placeholders})", source_ids, fetch=True)
+            source_names = {row["id"]: row["name"] for row in rows}
+        except Exception as e:
+            print(f"Error fetching source names: {e}")
+    for article in articles.values():
+        article["source_name"] = source_names.get(article["source_id"], "Unknown Source")
+    return articles
+
+
+def _run_retriever(retriever, *args, **kwargs):
+    try:
+        return retriever(*args, **kwargs)
+    except Exception as e:
+        print(f"{retriever.__name__} failed, continuing with the other retriever: {e}")
+        return []
+
+
+def hybrid_search(
+    query: str,
+    terms: Optional[Sequence[str]] = None,
+    limit: int = 10,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    source_ids: Optional[Sequence[int]] = None,
+    categories: Optional[Sequence[str]] = None,
+    query_embedding: Optional[np.ndarray] = None,
+    candidates: int = CANDIDATES_PER_RETRIEVER,
+    tracking_db_path: Optional[str] = None,
+    sources_db_path: Optional[str] = None,
+    index_path: Optional[str] = None,
+    mapping_path: Optional[str] = None,
+) -> List[dict]:
+    """
+    Search internal articles with BM25 and the FAISS index at the same time and fuse both rankings.
+
+    The keyword lookup uses ``terms`` when given, otherwise the words of ``query``.
+    Each article appears once, with ``matched_by`` naming the retrievers that found it.
+    """
+    tracking_db_path = tracking_db_path or get_tracking_db_path()
+    sources_db_path = sources_db_path or get_sources_db_path()
+    if index_path is None or mapping_path is None:
+        index_path, mapping_path = get_faiss_db_path()
+    filters = {"start_date": start_date, "end_date": end_date, "source_ids": source_ids, "categories": categories}
+    lexical_future = _retrieval_executor.submit(
+        _run_retriever, lexical_candidates, tracking_db_path, list(terms or query_terms(query)), candidates, filters
+    )
+    semantic_future = _retrieval_executor.submit(
+        _run_retriever, semantic_candidates, tracking_db_path, index_path, mapping_path, query, candidates, filters, query_embedding
+    )
+    lexical, semantic = lexical_future.result(), semantic_future.result()
+    snippets = dict(lexical)
+    similarities = dict(semantic)
+    fused = reciprocal_rank_fusion([[article_id for article_id, _ in lexical], [article_id for article_id, _ in semantic]])[:limit]
+    articles = get_articles_with_sources(tracking_db_path, sources_db_path, [article_id for article_id, _ in fused])
+    results = []
+    for article_id, score in fused:
+        article = articles.get(article_id)
+        if article is None:
+            continue
+        article["score"] = score
+        article["snippet"] = snippets.get(article_id)
+        article["similarity"] = similarities.get(article_id)
+        article["matched_by"] = [name for name, found in (("keyword", snippets), ("semantic", similarities)) if article_id in found]
+        results.append(article)
+    return results
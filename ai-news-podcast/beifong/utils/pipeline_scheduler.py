@@ -0,0 +1,115 @@
+import os
+import threading
+import traceback
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+from db.config import get_tracking_db_path
+from db.pipeline import count_stage_backlog, ensure_pipeline_changes, get_stage_versions
+
+PIPELINE_POLL_SECONDS = float(os.environ.get("PIPELINE_POLL_SECONDS", 1.0))
+PIPELINE_MAX_BACKLOG = int(os.environ.get("PIPELINE_MAX_BACKLOG", 500))
+
+# each stage mapped to the stage whose output it consumes; feed_processor has no upstream
+# and keeps its interval schedule, everything after it runs when there is new work
+PIPELINE_DAG = {
+    "url_crawler": "feed_processor",
+    "ai_analyzer": "url_crawler",
+    "embedding_processor": "ai_analyzer",
+    "faiss_indexer": "embedding_processor",
+}
+
+
+def downstream_of(stage: str) -> Optional[str]:
+    return next((name for name, upstream in PIPELINE_DAG.items() if upstream == stage), None)
+
+
+class PipelineScheduler:
+    """
+    Starts pipeline stages when the stage upstream of them has committed new rows.
+
+    Triggers in the tracking database bump a per-stage version in ``pipeline_changes``; every
+    ``poll()`` reads those few rows and calls ``run_stage(stage)`` in the background for each
+    stage whose upstream version moved since it last started. Stages work in limited batches, so
+    a run that made progress and still leaves rows waiting is due again on the next poll. A stage
+    is held back while the stage after it has more than ``max_backlog`` rows waiting, so a slow
+    analyzer is not buried by the crawler; the held stage stays due and its downstream is started
+    even when nothing new arrived for it. Each stage runs at most once at a time; work committed
+    during a run starts the next one.
+    """
+
+    def __init__(
+        self,
+        run_stage: Callable[[str], None],
+        tracking_db_path: Optional[str] = None,
+        max_backlog: int = PIPELINE_MAX_BACKLOG,
+    ):
+        self.run_stage = run_stage
+        self.tracking_db_path = tracking_db_path
+        self.max_backlog = max_backlog
+        self.stats = {"started": Counter(), "held": Counter()}
+        self._seen: Dict[str, int] = {}
+        self._due = set()
+        self._running = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=len(PIPELINE_DAG), thread_name_prefix="pipeline")
+
+    def start(self) -> None:
+        self.tracking_db_path = self.tracking_db_path or get_tracking_db_path()
+        ensure_pipeline_changes(self.tracking_db_path)
+
+    def is_held(self, stage: Optional[str]) -> bool:
+        """True while the stage after ``stage`` has more than ``max_backlog`` rows waiting."""
+        downstream = downstream_of(stage) if stage else None
+        if downstream is None:
+            return False
+        return count_stage_backlog(self.tracking_db_path, downstream, self.max_backlog + 1) > self.max_backlog
+
+    def poll(self) -> None:
+        try:
+            versions = get_stage_versions(self.tracking_db_path)
+            for stage, upstream in PIPELINE_DAG.items():
+                version = versions.get(upstream, 0)
+                with self._lock:
+                    if stage in self._running or (stage not in self._due and self._seen.get(stage) == version):
+                        continue
+                if self.is_held(stage):
+                    self.stats["held"][stage] += 1
+                    with self._lock:
+                        # the held stage resumes once the stage after it drains, which is started
+                        # below in this same poll even if its own upstream version is not moving
+                        self._due.update((stage, downstream_of(stage)))
+                    continue
+                with self._lock:
+                    # recorded before the run, so rows committed while it runs start another one
+                    self._seen[stage] = version
+                    self._due.discard(stage)
+                    self._running.add(stage)
+                self.stats["started"][stage] += 1
+                self._executor.submit(self._run, stage)
+        except Exception as e:
+            print(f"ERROR: Pipeline poll failed: {e}")
+
+    def _run(self, stage: str) -> None:
+        due = False
+        try:
+            before = get_stage_versions(self.tracking_db_path).get(stage, 0)
+            self.run_stage(stage)
+            # a batch that produced output and left rows behind runs again; one that made no
+            # progress waits for new upstream work or the interval sweep instead of spinning
+            if get_stage_versions(self.tracking_db_path).get(stage, 0) != before:
+                due = count_stage_backlog(self.tracking_db_path, stage, 1) > 0
+        except Exception:
+            print(f"ERROR: Pipeline stage {stage} failed: {traceback.format_exc()}")
+        finally:
+            with self._lock:
+                self._running.discard(stage)
+                if due:
+                    self._due.add(stage)
+
+    def idle(self) -> bool:
+        with self._lock:
+            return not self._running
+
+    def shutdown(self, wait: bool = False) -> None:
+        self._executor.shutdown(wait=wait)
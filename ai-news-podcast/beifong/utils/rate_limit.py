@@ -0,0 +1,43 @@
+import time
+import random
+import threading
+from typing import Optional
+
+
+class AdaptiveBackoff:
+    """Shared pause for all in-flight requests that grows on rate limits and decays on success."""
+
+    def __init__(self, base_delay: float = 1.0, max_delay: float = 60.0):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.delay = 0.0
+        self.resume_at = 0.0
+        self.rate_limited = 0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            pause = self.resume_at - time.monotonic()
+        if pause > 0:
+            time.sleep(pause)
+
+    def on_rate_limit(self, retry_after: Optional[float] = None) -> None:
+        with self._lock:
+            self.rate_limited += 1
+            self.delay = min(self.max_delay, max(self.base_delay, self.delay * 2))
+            pause = retry_after if retry_after else self.delay * random.uniform(1.0, 1.25)
+            self.resume_at = max(self.resume_at, time.monotonic() + pause)
+
+    def on_success(self) -> None:
+        with self._lock:
+            self.delay = self.delay / 2 if self.delay > self.base_delay else 0.0
+
+    def transient_pause(self, attempt: int) -> float:
+        return min(self.max_delay, self.base_delay * 2**attempt)
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    try:
+        return float(error.response.headers.get("retry-after"))
+    except (AttributeError, TypeError, ValueError):
+        return None
@@ -1,26 +1,30 @@
 import feedparser
 from datetime import datetime
+import calendar
+import time
 import hashlib
+import statistics
 from typing import List, Dict, Any, Optional
+from db.feeds import entry_fingerprint
 
 
 def get_hash(entries: List[Dict[str, str]]) -> str:
-    texts = ""
-    for entry in entries:
-        texts += (
-            str(entry.get("id", ""))
-            + str(entry.get("title", ""))
-            + str(entry.get("published_date", ""))
-        )
-    return hashlib.md5(texts.encode()).hexdigest()
+    fingerprints = "".join(sorted(entry["fingerprint"] for entry in entries))
+    return hashlib.md5(fingerprints.encode()).hexdigest()
 
 
 def parse_feed_entries(entries: List[Dict[str, Any]]) -> List[Dict[str, str]]:
     parsed_entries = []
     for entry in entries:
         content = entry.get("content") or entry.get("description") or ""
+        if isinstance(content, list):
+            # atom entries carry a list of content blocks
+            content = "\n".join(block.get("value", "") for block in content)
+        # feedparser's parsed dates are UTC; ISO text keeps published_date sortable and comparable in SQL
+        parsed_date = entry.get("published_parsed") or entry.get("updated_parsed")
         published = (
-            entry.get("published")
+            (time.strftime("%Y-%m-%dT%H:%M:%S", parsed_date) if parsed_date else None)
+            or entry.get("published")
             or entry.get("updated")
             or entry.get("pubDate")
             or entry.get("created")
@@ -38,19 +42,28 @@ def parse_feed_entries(entries: List[Dict[str, Any]]) -> List[Dict[str, str]]:
                 "content": content,
                 "published_date": published,
                 "entry_id": entry_id,
+                "fingerprint": entry_fingerprint(entry_id, link),
             }
         )
     return parsed_entries
 
 
+def get_publish_interval(entries: List[Dict[str, Any]]) -> Optional[float]:
+    """Median seconds between consecutive entries, or None when fewer than two carry a date."""
+    timestamps = sorted(
+        calendar.timegm(parsed)
+        for parsed in (entry.get("published_parsed") or entry.get("updated_parsed") for entry in entries)
+        if parsed
+    )
+    gaps = [later - earlier for earlier, later in zip(timestamps, timestamps[1:]) if later > earlier]
+    return float(statistics.median(gaps)) if gaps else None
+
+
 def is_rss_feed(feed_data: Any) -> bool:
     return feed_data.bozo and hasattr(feed_data, "bozo_exception")
 
 
-def get_feed_data(
-    feed_url: str, etag: Optional[str] = None, modified: Optional[Any] = None
-) -> Dict[str, Any]:
-    feed_data = feedparser.parse(feed_url, etag=etag, modified=modified)
+def build_feed_result(feed_data: Any) -> Dict[str, Any]:
     if is_rss_feed(feed_data):
         return {
             "is_rss_feed": False,
@@ -59,6 +72,7 @@ def get_feed_data(
             "status": None,
             "current_hash": None,
             "etag": None,
+            "publish_interval": None,
         }
     status = feed_data.get("status", 200)
     etag = feed_data.get("etag", None)
@@ -72,5 +86,17 @@ def get_feed_data(
         "status": status,
         "current_hash": current_hash,
         "etag": etag,
+        "publish_interval": get_publish_interval(entries),
         "is_rss_feed": True,
     }
+
+
+def get_feed_data(
+    feed_url: str, etag: Optional[str] = None, modified: Optional[Any] = None
+) -> Dict[str, Any]:
+    return build_feed_result(feedparser.parse(feed_url, etag=etag, modified=modified))
+
+
+def parse_feed_content(content: bytes) -> Dict[str, Any]:
+    """Parse an already downloaded feed body; top-level so it can run in a process pool."""
+    return build_feed_result(feedparser.parse(content))
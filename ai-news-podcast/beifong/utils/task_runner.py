@@ -0,0 +1,284 @@
+import os
+import sys
+import time
+import queue
+import shlex
+import signal
+import threading
+import traceback
+import subprocess
+import multiprocessing
+from collections import deque
+from importlib import import_module
+from contextlib import redirect_stderr, redirect_stdout
+from typing import Any, Dict, List, Optional, Tuple
+
+TASK_RUNNER_MODE = os.environ.get("TASK_RUNNER_MODE", "inprocess")
+TASK_LOG_MAX_BYTES = int(os.environ.get("TASK_LOG_MAX_BYTES", 256 * 1024))
+TASK_WARM_MODULES = os.environ.get(
+    "TASK_WARM_MODULES",
+    "processors.feed_processor,processors.url_processor,processors.ai_analysis_processor,"
+    "processors.embedding_processor,processors.faiss_indexing_processor",
+)
+ERROR_TAIL_CHARS = 4000
+
+# modules that scheduled commands run with ``python -m`` mapped to their in-process entry point,
+# called with the command's remaining arguments; other commands run as a subprocess
+TASK_ENTRY_POINTS = {
+    "processors.feed_processor": "main",
+    "processors.url_processor": "main",
+    "processors.ai_analysis_processor": "main",
+    "processors.embedding_processor": "main",
+    "processors.faiss_indexing_processor": "main",
+    "processors.podcast_generator_processor": "main",
+    "processors.x_scraper_processor": "main",
+    "processors.fb_scraper_processor": "main",
+}
+
+
+class LogRingBuffer:
+    """
+    Text sink that keeps only the last ``max_bytes`` written to it.
+
+    Tasks can log without bound; what is stored with the execution is the tail, prefixed with
+    how much was dropped.
+    """
+
+    def __init__(self, max_bytes: int = TASK_LOG_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.dropped = 0
+        self._chunks = deque()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def write(self, text: str) -> int:
+        if not text:
+            return 0
+        with self._lock:
+            self._chunks.append(text)
+            self._size += len(text)
+            while self._size > self.max_bytes and len(self._chunks) > 1:
+                dropped = self._chunks.popleft()
+                self._size -= len(dropped)
+                self.dropped += len(dropped)
+            if self._size > self.max_bytes:
+                # a single chunk larger than the buffer: keep its end
+                excess = self._size - self.max_bytes
+                self._chunks[0] = self._chunks[0][excess:]
+                self._size -= excess
+                self.dropped += excess
+        return len(text)
+
+    def flush(self) -> None:
+        pass
+
+    def isatty(self) -> bool:
+        return False
+
+    def getvalue(self) -> str:
+        with self._lock:
+            text = "".join(self._chunks)
+        return f"[... {self.dropped} characters of earlier output dropped ...]\n{text}" if self.dropped else text
+
+
+def parse_command(command: str) -> Optional[Tuple[str, List[str]]]:
+    """Return ``(module, argv)`` of a ``python -m <module> ...`` command with a registered entry point, else None."""
+    try:
+        parts = shlex.split(command)
+    except ValueError:
+        return None
+    if len(parts) < 3 or not os.path.basename(parts[0]).startswith("python") or parts[1] != "-m":
+        return None
+    if parts[2] not in TASK_ENTRY_POINTS:
+        return None
+    return parts[2], parts[3:]
+
+
+def run_entry_point(module: str, argv: List[str], log_max_bytes: int = TASK_LOG_MAX_BYTES) -> Dict[str, Any]:
+    """Run a registered entry point in this process, capturing its output like a subprocess would."""
+    log = LogRingBuffer(log_max_bytes)
+    sys.argv = [module, *argv]
+    with redirect_stdout(log), redirect_stderr(log):
+        try:
+            entry_point = getattr(import_module(module), TASK_ENTRY_POINTS[module])
+            returncode = entry_point(argv) if argv else entry_point()
+        except SystemExit as e:
+            if isinstance(e.code, str):
+                print(e.code)
+            returncode = 1 if isinstance(e.code, str) else e.code
+        except BaseException:
+            traceback.print_exc()
+            returncode = 1
+    return {"returncode": returncode or 0, "output": log.getvalue()}
+
+
+def _worker_main(conn, warm_modules: List[str]) -> None:
+    for module in warm_modules:
+        try:
+            import_module(module)
+        except Exception as e:
+            print(f"WARNING: Could not preload {module}: {e}")
+    while True:
+        try:
+            request = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+        if request is None:
+            break
+        conn.send(run_entry_point(*request))
+
+
+class TaskWorker:
+    """A long-lived child process that runs entry points one at a time, keeping its imports and DB pools between tasks."""
+
+    def __init__(self, context, warm_modules: List[str], name: str):
+        self.context = context
+        self.warm_modules = warm_modules
+        self.name = name
+        self._start()
+
+    def _start(self) -> None:
+        self.conn, child_conn = self.context.Pipe()
+        # not a daemon: processors start process pools of their own
+        self.process = self.context.Process(target=_worker_main, args=(child_conn, self.warm_modules), name=self.name)
+        self.process.start()
+        child_conn.close()
+
+    def restart(self) -> None:
+        self.close(timeout=0)
+        self._start()
+
+    def run(self, module: str, argv: List[str], timeout: float, log_max_bytes: int) -> Dict[str, Any]:
+        self.conn.send((module, argv, log_max_bytes))
+        if not self.conn.poll(timeout):
+            self.restart()
+            return {"returncode": None, "output": "", "error": f"Task timed out after {timeout} seconds"}
+        try:
+            result = self.conn.recv()
+        except EOFError:
+            self.process.join(timeout=5)
+            exitcode = self.process.exitcode
+            self.restart()
+            return {"returncode": None, "output": "", "error": f"Task worker exited with code {exitcode}"}
+        return result
+
+    def close(self, timeout: float = 5) -> None:
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout=timeout)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+def run_subprocess(command: str, timeout: float, log_max_bytes: int = TASK_LOG_MAX_BYTES) -> Dict[str, Any]:
+    """Run ``command`` in a shell, streaming its stdout and stderr into ring buffers as it runs."""
+    stdout, stderr = LogRingBuffer(log_max_bytes), LogRingBuffer(log_max_bytes)
+    # own process group, so a timeout also kills what the shell started
+    process = subprocess.Popen(command, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, start_new_session=True)
+
+    def pump(stream, log):
+        for line in stream:
+            log.write(line)
+        stream.close()
+
+    readers = [threading.Thread(target=pump, args=pair, daemon=True) for pair in ((process.stdout, stdout), (process.stderr, stderr))]
+    for reader in readers:
+        reader.start()
+    error = None
+    try:
+        process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+        process.wait()
+        error = f"Task timed out after {timeout} seconds"
+    for reader in readers:
+        reader.join()
+    stderr_text = stderr.getvalue()
+    output = f"STDOUT:\n{stdout.getvalue()}\n\nSTDERR:\n{stderr_text}" if stderr_text else stdout.getvalue()
+    if error is None and process.returncode != 0:
+        error = stderr_text[-ERROR_TAIL_CHARS:] if stderr_text else f"Process exited with code {process.returncode}"
+    return {"returncode": process.returncode, "output": output, "error": error}
+
+
+class TaskRunner:
+    """
+    Runs scheduled task commands on a pool of persistent worker processes.
+
+    Commands of the form ``python -m <module> [args]`` whose module is in ``TASK_ENTRY_POINTS``
+    run in a warm worker, which skips interpreter startup and the heavy imports on every run.
+    Anything else, or everything when ``mode`` is ``"subprocess"``, runs in a shell as before.
+    Workers are started on first use, each preloading ``warm_modules``.
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        mode: str = TASK_RUNNER_MODE,
+        warm_modules: Optional[List[str]] = None,
+        log_max_bytes: int = TASK_LOG_MAX_BYTES,
+    ):
+        self.max_workers = max_workers
+        self.mode = mode
+        self.warm_modules = [m for m in TASK_WARM_MODULES.split(",") if m] if warm_modules is None else warm_modules
+        self.log_max_bytes = log_max_bytes
+        self._context = multiprocessing.get_context("spawn")
+        self._idle = queue.LifoQueue()
+        self._workers = []
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Start every worker now, so their preloading overlaps with the scheduler's startup."""
+        if self.mode == "subprocess":
+            return
+        with self._lock:
+            while len(self._workers) < self.max_workers:
+                self._add_worker()
+
+    def _add_worker(self) -> None:
+        worker = TaskWorker(self._context, self.warm_modules, f"task-worker-{len(self._workers) + 1}")
+        self._workers.append(worker)
+        self._idle.put(worker)
+
+    def _acquire(self) -> TaskWorker:
+        with self._lock:
+            if self._idle.empty() and len(self._workers) < self.max_workers:
+                self._add_worker()
+        return self._idle.get()
+
+    def run(self, command: str, timeout: float) -> Dict[str, Any]:
+        """
+        Run ``command`` and return ``status`` ("success"/"failed"), ``error_message``, ``output``
+        (the log tail), ``mode`` and ``seconds``.
+        """
+        start = time.perf_counter()
+        parsed = parse_command(command) if self.mode != "subprocess" else None
+        if parsed is None:
+            mode = "subprocess"
+            result = run_subprocess(command, timeout, self.log_max_bytes)
+        else:
+            mode = "inprocess"
+            worker = self._acquire()
+            try:
+                result = worker.run(*parsed, timeout, self.log_max_bytes)
+            finally:
+                self._idle.put(worker)
+            if result.get("error") is None and result["returncode"] != 0:
+                result["error"] = result["output"][-ERROR_TAIL_CHARS:] or f"Task exited with code {result['returncode']}"
+        return {
+            "status": "failed" if result.get("error") else "success",
+            "error_message": result.get("error"),
+            "output": result["output"],
+            "mode": mode,
+            "seconds": time.perf_counter() - start,
+        }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.close()
+
@@ -1,47 +1,13 @@
 import os
-from typing import List, Tuple, Optional, Any
+from typing import Tuple, Optional, Any
 import tempfile
 import numpy as np
 import soundfile as sf
 from elevenlabs.client import ElevenLabs
+from utils.tts_stream import render_script
 
 TEXT_TO_SPEECH_MODEL = "eleven_multilingual_v2"
-
-
-def create_silence_audio(silence_duration: float, sampling_rate: int) -> np.ndarray:
-    if sampling_rate <= 0:
-        print(f"Warning: Invalid sampling rate ({sampling_rate}) for silence generation")
-        return np.zeros(0, dtype=np.float32)
-    return np.zeros(int(sampling_rate * silence_duration), dtype=np.float32)
-
-
-def combine_audio_segments(audio_segments: List[np.ndarray], silence_duration: float, sampling_rate: int) -> np.ndarray:
-    if not audio_segments:
-        return np.zeros(0, dtype=np.float32)
-    if sampling_rate <= 0:
-        combined = np.concatenate(audio_segments) if audio_segments else np.zeros(0, dtype=np.float32)
-    else:
-        silence = create_silence_audio(silence_duration, sampling_rate)
-        combined_with_silence = []
-        for i, segment in enumerate(audio_segments):
-            combined_with_silence.append(segment)
-            if i < len(audio_segments) - 1:
-                combined_with_silence.append(silence)
-        combined = np.concatenate(combined_with_silence)
-    max_amp = np.max(np.abs(combined))
-    if max_amp > 0:
-        combined = combined / max_amp * 0.95
-    return combined
-
-
-def write_to_disk(output_path: str, audio_data: np.ndarray, sampling_rate: int) -> None:
-    if sampling_rate <= 0:
-        print(f"Error: Cannot write audio file with invalid sampling rate ({sampling_rate})")
-        return
-    try:
-        sf.write(output_path, audio_data, sampling_rate)
-    except Exception as e:
-        print(f"Error writing audio file '{output_path}': {e}")
+ELEVENLABS_TTS_WORKERS = 4
 
 
 def text_to_speech_elevenlabs(
@@ -133,6 +99,7 @@ def create_podcast(
     elevenlabs_model: str = "eleven_multilingual_v2",
     voice_map: dict = {1: "Rachel", 2: "Adam"},
     api_key: str = None,
+    max_workers: int = ELEVENLABS_TTS_WORKERS,
 ) -> str:
     if not api_key:
         print("Warning: Using hardcoded API key")
@@ -148,49 +115,15 @@ def create_podcast(
         return None
     output_path = os.path.abspath(output_path)
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    generated_segments = []
-    determined_sampling_rate = -1
-    entries = script.entries if hasattr(script, "entries") else script
-    for i, entry in enumerate(entries):
-        if hasattr(entry, "speaker"):
-            speaker_id = entry.speaker
-            entry_text = entry.text
-        else:
-            speaker_id = entry["speaker"]
-            entry_text = entry["text"]
-        result = text_to_speech_elevenlabs(
-            client=client,
-            text=entry_text,
-            speaker_id=speaker_id,
-            voice_map=voice_map,
-            model_id=elevenlabs_model,
-        )
-        if result:
-            segment_audio, segment_rate = result
 
-            if determined_sampling_rate == -1:
-                determined_sampling_rate = segment_rate
-            elif determined_sampling_rate != segment_rate:
-                try:
-                    import librosa
+    def synthesize(speaker_id: int, text: str):
+        return text_to_speech_elevenlabs(client=client, text=text, speaker_id=speaker_id, voice_map=voice_map, model_id=elevenlabs_model)
 
-                    segment_audio = librosa.resample(
-                        segment_audio,
-                        orig_sr=segment_rate,
-                        target_sr=determined_sampling_rate,
-                    )
-                except ImportError:
-                    determined_sampling_rate = segment_rate
-                except Exception:
-                    pass
-            generated_segments.append(segment_audio)
-    if not generated_segments or determined_sampling_rate <= 0:
-        return None
-    full_audio = combine_audio_segments(generated_segments, silence_duration, determined_sampling_rate)
-    if full_audio.size == 0:
-        return None
-    write_to_disk(output_path, full_audio, determined_sampling_rate)
-    if os.path.exists(output_path):
-        return output_path
-    else:
+    def cache_key(speaker_id: int, text: str):
+        return "elevenlabs", elevenlabs_model, voice_map.get(speaker_id, ""), lang_code
+
+    try:
+        return render_script(script, synthesize, output_path, silence_duration, max_workers, cache_key=cache_key)
+    except Exception as e:
+        print(f"Error writing audio file '{output_path}': {e}")
         return None
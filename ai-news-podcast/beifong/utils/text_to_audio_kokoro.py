@@ -1,17 +1,24 @@
 # ruff: noqa: E402
 import os
+import queue
 import warnings
-from typing import List, Any
+from typing import Any, Dict, List, Optional
 import numpy as np
-import soundfile as sf
+import torch
 from .translate_podcast import translate_script
+from .tts_stream import render_script
 
 os.environ["PYTHONWARNINGS"] = "ignore"
 os.environ["TORCH_CPP_LOG_LEVEL"] = "ERROR"
 os.environ["TF_CPP_MIN_LOG_LEVEL"] = "3"
 warnings.filterwarnings("ignore")
 
-from kokoro import KPipeline
+from kokoro import KModel, KPipeline
+
+KOKORO_WORKERS = 2
+KOKORO_REPO_ID = "hexgrad/Kokoro-82M"
+KOKORO_VOICES = {"h": {1: "hf_alpha", 2: "hm_omega"}}
+DEFAULT_KOKORO_VOICES = {1: "af_heart", 2: "bm_lewis"}
 
 
 class ScriptEntry:
@@ -20,16 +27,31 @@ class ScriptEntry:
         self.speaker = speaker
 
 
-def create_slience_audio(silence_duration: float, sampling_rate: int) -> np.ndarray:
-    return np.zeros(int(sampling_rate * silence_duration), dtype=np.float32)
+def kokoro_voices(lang_code: str) -> Dict[int, str]:
+    return KOKORO_VOICES.get(lang_code, DEFAULT_KOKORO_VOICES)
+
+
+def load_model() -> KModel:
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    return KModel(repo_id=KOKORO_REPO_ID).to(device).eval()
+
+
+def create_pipelines(lang_code: str, model: KModel, count: int) -> List[KPipeline]:
+    """
+    Build ``count`` pipelines for one language over a shared model, with the language's voices loaded.
+
+    Each synthesis thread needs its own pipeline (text frontend state); the voice tensors are shared.
+    """
+    pipelines = [KPipeline(lang_code=lang_code, repo_id=KOKORO_REPO_ID, model=model) for _ in range(count)]
+    for voice in kokoro_voices(lang_code).values():
+        pipelines[0].load_voice(voice)
+    for pipeline in pipelines[1:]:
+        pipeline.voices = pipelines[0].voices
+    return pipelines
 
 
 def text_to_speech(pipeline: KPipeline, text: str, speaker_id: int, sampling_rate: int, lang_code: str) -> np.ndarray:
-    if lang_code == "h":
-        voices = {1: "hf_alpha", 2: "hm_omega"}
-    else:
-        voices = {1: "af_heart", 2: "bm_lewis"}
-    voice = voices[speaker_id]
+    voice = kokoro_voices(lang_code)[speaker_id]
     audio_chunks = []
     for _, _, audio in pipeline(text, voice=voice, speed=1.0):
         if audio is not None:
@@ -43,56 +65,18 @@ def text_to_speech(pipeline: KPipeline, text: str, speaker_id: int, sampling_rat
         return np.zeros(0, dtype=np.float32)
 
 
-def create_audio_segments(
-    pipeline: KPipeline,
-    script: Any,
-    silence_duration: float,
-    sampling_rate: int,
-    lang_code: str,
-) -> List[np.ndarray]:
-    audio_segments = []
-    silence = create_slience_audio(silence_duration, sampling_rate)
-    entries = script if isinstance(script, list) else script.entries
-    for entry in entries:
-        text = entry["text"] if isinstance(entry, dict) else entry.text
-        speaker = entry["speaker"] if isinstance(entry, dict) else entry.speaker
-        segment_audio = text_to_speech(
-            pipeline,
-            text,
-            speaker,
-            sampling_rate=sampling_rate,
-            lang_code=lang_code,
-        )
-        if len(segment_audio) > 0:
-            try:
-                audio_segments.append(segment_audio)
-            except Exception:
-                fallback_silence = create_slience_audio(len(text) * 0.1, sampling_rate)
-                audio_segments.append(fallback_silence)
-            audio_segments.append(silence)
-    return audio_segments
-
-
-def combine_full_segments(audio_segments: List[np.ndarray]) -> np.ndarray:
-    full_audio = np.concatenate(audio_segments)
-    max_amp = np.max(np.abs(full_audio))
-    if max_amp > 0:
-        full_audio = full_audio / max_amp * 0.9
-    return full_audio
-
-
-def write_to_disk(output_path: str, full_audio: np.ndarray, sampling_rate: int) -> None:
-    return sf.write(output_path, full_audio, sampling_rate, subtype="PCM_16")
-
-
 def create_podcast(
     script: Any,
     output_path: str,
     silence_duration: float = 0.7,
     sampling_rate: int = 24_000,
     lang_code: str = "b",
-) -> str:
-    pipeline = KPipeline(lang_code=lang_code)
+    max_workers: int = KOKORO_WORKERS,
+    pipelines: Optional[List[KPipeline]] = None,
+) -> Optional[str]:
+    """Render ``script`` with Kokoro; ``pipelines`` are warm pipelines for ``lang_code``, loaded here when not given."""
+    if pipelines is None:
+        pipelines = create_pipelines(lang_code, load_model(), max_workers)
     if lang_code != "b":
         if isinstance(script, list):
             script = translate_script(script, lang_code)
@@ -100,10 +84,21 @@ def create_podcast(
             script = translate_script(script.entries, lang_code)
     output_path = os.path.abspath(output_path)
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    audio_segments = create_audio_segments(pipeline, script, silence_duration, sampling_rate, lang_code)
-    full_audio = combine_full_segments(audio_segments)
-    write_to_disk(output_path, full_audio, sampling_rate)
-    return output_path
+    idle = queue.SimpleQueue()
+    for pipeline in pipelines:
+        idle.put(pipeline)
+
+    def synthesize(speaker: int, text: str):
+        pipeline = idle.get()
+        try:
+            return text_to_speech(pipeline, text, speaker, sampling_rate=sampling_rate, lang_code=lang_code), sampling_rate
+        finally:
+            idle.put(pipeline)
+
+    def cache_key(speaker: int, text: str):
+        return "kokoro", KOKORO_REPO_ID, kokoro_voices(lang_code)[speaker], lang_code
+
+    return render_script(script, synthesize, output_path, silence_duration, len(pipelines), sampling_rate=sampling_rate, cache_key=cache_key)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,154 @@
+import os
+import json
+import time
+import hashlib
+import threading
+import unicodedata
+from typing import Callable, Dict, Optional, Tuple
+import numpy as np
+
+TTS_CACHE_DIR = os.environ.get("TTS_CACHE_DIR", os.path.join("podcasts", "tts_cache"))
+TTS_CACHE_MAX_MB = int(os.environ.get("TTS_CACHE_MAX_MB", 1024))
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def segment_key(engine: str, model: str, voice: str, language: str, text: str) -> str:
+    """Content address of one rendered line: what was said, and by which engine, model and voice."""
+    return hashlib.sha256(json.dumps([engine, model, voice, language, normalize_text(text)]).encode()).hexdigest()
+
+
+class SegmentCache:
+    """
+    On-disk cache of synthesized script lines, one ``.npz`` file per segment key.
+
+    A hit refreshes the file's mtime; once the files exceed ``max_bytes`` the least recently
+    used are deleted. Each entry also keeps how long its synthesis took, so hits can be
+    reported as time saved.
+    """
+
+    def __init__(self, cache_dir: str = TTS_CACHE_DIR, max_bytes: int = TTS_CACHE_MAX_MB * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "seconds_saved": 0.0}
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._sizes = {}
+        for name in os.listdir(cache_dir):
+            if name.endswith(".npz"):
+                self._sizes[name[:-4]] = os.path.getsize(os.path.join(cache_dir, name))
+        self._total = sum(self._sizes.values())
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.npz")
+
+    def get(self, key: str) -> Optional[Tuple[np.ndarray, int, float]]:
+        """Return ``(audio, rate, synthesis seconds)`` of a cached segment, or None."""
+        path = self._path(key)
+        try:
+            with np.load(path) as entry:
+                audio, rate, seconds = entry["audio"], int(entry["rate"]), float(entry["seconds"])
+            os.utime(path)
+        except Exception:
+            # missing, evicted meanwhile, or a torn file: synthesize the line again
+            with self._lock:
+                self.stats["misses"] += 1
+            return None
+        with self._lock:
+            self.stats["hits"] += 1
+            self.stats["seconds_saved"] += seconds
+        return audio, rate, seconds
+
+    def put(self, key: str, audio: np.ndarray, rate: int, seconds: float) -> None:
+        path = self._path(key)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as f:
+            np.savez(f, audio=np.asarray(audio, dtype=np.float32), rate=rate, seconds=seconds)
+        os.replace(temp_path, path)
+        size = os.path.getsize(path)
+        with self._lock:
+            self._total += size - self._sizes.get(key, 0)
+            self._sizes[key] = size
+            if self._total > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        def last_used(key):
+            try:
+                return os.path.getmtime(self._path(key))
+            except OSError:
+                return 0.0
+
+        # evict down to 90% so a full cache does not rescan on every write
+        for key in sorted(self._sizes, key=last_used):
+            if self._total <= self.max_bytes * 0.9:
+                break
+            try:
+                os.unlink(self._path(key))
+            except FileNotFoundError:
+                pass
+            self._total -= self._sizes.pop(key)
+            self.stats["evictions"] += 1
+
+    def size_bytes(self) -> int:
+        return self._total
+
+
+def get_segment_cache() -> SegmentCache:
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = SegmentCache()
+        return _default_cache
+
+
+class CachedSynthesizer:
+    """
+    Wraps ``synthesize(speaker, text)`` with a segment cache.
+
+    ``cache_key(speaker, text)`` returns the ``(engine, model, voice, language)`` that, with the
+    text, identify a rendered line. Only misses reach the engine; failed lines are not cached.
+    """
+
+    def __init__(self, synthesize: Callable, cache_key: Callable[[int, str], Tuple[str, str, str, str]], cache: SegmentCache):
+        self.synthesize = synthesize
+        self.cache_key = cache_key
+        self.cache = cache
+        self.hits = 0
+        self.misses = 0
+        self.seconds_saved = 0.0
+        self._lock = threading.Lock()
+
+    def __call__(self, speaker: int, text: str):
+        key = segment_key(*self.cache_key(speaker, text), text)
+        cached = self.cache.get(key)
+        if cached is not None:
+            audio, rate, seconds = cached
+            with self._lock:
+                self.hits += 1
+                self.seconds_saved += seconds
+            return audio, rate
+        start = time.perf_counter()
+        result = self.synthesize(speaker, text)
+        with self._lock:
+            self.misses += 1
+        if result is not None:
+            try:
+                self.cache.put(key, result[0], result[1], time.perf_counter() - start)
+            except OSError as e:
+                print(f"WARNING: Could not cache TTS segment: {e}")
+        return result
+
+    def summary(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            "seconds_saved": round(self.seconds_saved, 1),
+        }
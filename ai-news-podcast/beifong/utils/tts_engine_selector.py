@@ -1,10 +1,155 @@
 import os
-from typing import Any, Callable, Optional
+import time
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Optional
 from utils.load_api_keys import load_api_key
 
 _TTS_ENGINES = {}
 TTS_OPENAI_MODEL = "gpt-4o-mini-tts"
 TTS_ELEVENLABS_MODEL = "eleven_multilingual_v2"
+KOKORO_MEMORY_BUDGET_MB = int(os.environ.get("KOKORO_MEMORY_BUDGET_MB", 1024))
+TTS_WARM_LANGUAGES = os.environ.get("TTS_WARM_LANGUAGES", "")
+
+
+def kokoro_lang_code(language_code: str) -> str:
+    return "h" if language_code == "hi" else "b"
+
+
+def _tensor_bytes(tensors: Iterable[Any]) -> int:
+    return sum(tensor.numel() * tensor.element_size() for tensor in tensors)
+
+
+class KokoroEngineRegistry:
+    """
+    Keeps Kokoro warm across podcast generations in this process.
+
+    The model is loaded once and shared; each language gets a set of pipelines with its voices
+    preloaded. Languages are evicted least recently used first once the model and voice tensors
+    exceed ``memory_budget_mb``, and the model itself is dropped when no language is left. A
+    language's pipelines serve one generation at a time.
+    """
+
+    def __init__(
+        self,
+        memory_budget_mb: int = KOKORO_MEMORY_BUDGET_MB,
+        workers: Optional[int] = None,
+        load_model: Optional[Callable[[], Any]] = None,
+        create_pipelines: Optional[Callable[[str, Any, int], List[Any]]] = None,
+    ):
+        self.memory_budget = memory_budget_mb * 1024 * 1024
+        self.workers = workers
+        self._load_model = load_model
+        self._create_pipelines = create_pipelines
+        self._model = None
+        self._model_bytes = 0
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._model_lock = threading.Lock()
+        self.stats = {"hits": 0, "loads": 0, "evictions": 0, "model_loads": 0, "load_seconds": {}}
+
+    def _loaders(self):
+        if self._load_model is None or self._create_pipelines is None:
+            from utils.text_to_audio_kokoro import KOKORO_WORKERS, create_pipelines, load_model
+
+            self._load_model = self._load_model or load_model
+            self._create_pipelines = self._create_pipelines or create_pipelines
+            self.workers = self.workers or KOKORO_WORKERS
+        return self._load_model, self._create_pipelines
+
+    def _ensure_model(self):
+        with self._model_lock:
+            if self._model is None:
+                load_model, _ = self._loaders()
+                self._model = load_model()
+                self._model_bytes = _tensor_bytes([*self._model.parameters(), *self._model.buffers()])
+                self.stats["model_loads"] += 1
+            return self._model
+
+    def _load(self, entry: Dict[str, Any], lang_code: str) -> None:
+        start = time.perf_counter()
+        model = self._ensure_model()
+        _, create_pipelines = self._loaders()
+        entry["pipelines"] = create_pipelines(lang_code, model, self.workers or 1)
+        entry["bytes"] = _tensor_bytes(entry["pipelines"][0].voices.values())
+        self.stats["loads"] += 1
+        self.stats["load_seconds"][lang_code] = round(time.perf_counter() - start, 3)
+        print(f"INFO: Kokoro pipelines for '{lang_code}' ready in {self.stats['load_seconds'][lang_code]}s")
+
+    def memory_bytes(self) -> int:
+        return self._model_bytes + sum(entry["bytes"] for entry in self._entries.values())
+
+    def _evict_over_budget(self, keep: str) -> None:
+        with self._lock:
+            for lang_code in list(self._entries):
+                if self.memory_bytes() <= self.memory_budget:
+                    break
+                entry = self._entries[lang_code]
+                # languages in use are never evicted under a running generation
+                if lang_code == keep or not entry["lock"].acquire(blocking=False):
+                    continue
+                try:
+                    del self._entries[lang_code]
+                    self.stats["evictions"] += 1
+                    print(f"INFO: Evicted Kokoro pipelines for '{lang_code}' to stay within the memory budget")
+                finally:
+                    entry["lock"].release()
+
+    @contextmanager
+    def pipelines(self, lang_code: str):
+        """Hold the warm pipelines of a Kokoro language code for one generation, loading them on first use."""
+        with self._lock:
+            entry = self._entries.get(lang_code)
+            if entry is None:
+                entry = self._entries[lang_code] = {"lock": threading.Lock(), "pipelines": None, "bytes": 0}
+            else:
+                self.stats["hits"] += 1
+            self._entries.move_to_end(lang_code)
+        with entry["lock"]:
+            if entry["pipelines"] is None:
+                self._load(entry, lang_code)
+                loaded = True
+            else:
+                loaded = False
+            yield entry["pipelines"]
+        if loaded:
+            self._evict_over_budget(keep=lang_code)
+
+    def warm_up(self, language_codes: Optional[Iterable[str]] = None) -> Dict[str, float]:
+        """Load the pipelines of the given podcast languages (``TTS_WARM_LANGUAGES`` by default) ahead of the first request."""
+        if language_codes is None:
+            language_codes = [code.strip() for code in TTS_WARM_LANGUAGES.split(",") if code.strip()]
+        timings = {}
+        for language_code in language_codes:
+            start = time.perf_counter()
+            with self.pipelines(kokoro_lang_code(language_code)):
+                pass
+            timings[language_code] = round(time.perf_counter() - start, 3)
+        return timings
+
+    def evict(self, lang_code: Optional[str] = None) -> None:
+        """Drop one language, or every language and the model."""
+        with self._lock:
+            for code in [lang_code] if lang_code else list(self._entries):
+                if self._entries.pop(code, None) is not None:
+                    self.stats["evictions"] += 1
+            if not self._entries:
+                with self._model_lock:
+                    self._model, self._model_bytes = None, 0
+
+    def health(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "model_loaded": self._model is not None,
+                "warm_languages": [code for code, entry in self._entries.items() if entry["pipelines"] is not None],
+                "memory_mb": round(self.memory_bytes() / (1024 * 1024), 1),
+                "memory_budget_mb": round(self.memory_budget / (1024 * 1024), 1),
+                **self.stats,
+            }
+
+
+kokoro_registry = KokoroEngineRegistry()
 
 
 def register_tts_engine(name: str, generator_func: Callable):
@@ -51,12 +196,16 @@ def register_default_engines():
     def kokoro_generator(script, output_path, language_code, silence_duration, voice_map):
         from utils.text_to_audio_kokoro import create_podcast as kokoro_create_podcast
 
-        kokoro_lang_code = "b"
-        if language_code == "hi":
-            kokoro_lang_code = "h"
-        return kokoro_create_podcast(
-            script=script, output_path=output_path, silence_duration=silence_duration, sampling_rate=24_000, lang_code=kokoro_lang_code
-        )
+        lang_code = kokoro_lang_code(language_code)
+        with kokoro_registry.pipelines(lang_code) as pipelines:
+            return kokoro_create_podcast(
+                script=script,
+                output_path=output_path,
+                silence_duration=silence_duration,
+                sampling_rate=24_000,
+                lang_code=lang_code,
+                pipelines=pipelines,
+            )
 
     def openai_generator(script, output_path, language_code, silence_duration, voice_map):
         from utils.text_to_audio_openai import create_podcast as openai_create_podcast
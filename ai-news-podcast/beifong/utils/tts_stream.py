@@ -0,0 +1,200 @@
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+import numpy as np
+import soundfile as sf
+from utils.tts_cache import CachedSynthesizer, SegmentCache, get_segment_cache
+
+TARGET_RMS = 0.1
+PEAK_CEILING = 0.95
+LOUDNESS_SMOOTHING = 0.2
+
+
+def script_entries(script: Any) -> List[Tuple[int, str]]:
+    """Return ``(speaker, text)`` pairs from a script object, or a list of entry objects or dicts."""
+    entries = script.entries if hasattr(script, "entries") else script
+    return [(entry["speaker"], entry["text"]) if isinstance(entry, dict) else (entry.speaker, entry.text) for entry in entries]
+
+
+def synthesize_in_order(items: Iterable[Any], synthesize: Callable[[Any], Any], max_workers: int) -> Iterator[Any]:
+    """
+    Yield ``synthesize(item)`` for every item, in input order, computing up to ``max_workers`` at once.
+
+    At most ``2 * max_workers`` results are held at a time, so memory does not grow with the input.
+    A failing item yields None after its error is printed.
+    """
+
+    def run(item):
+        try:
+            return synthesize(item)
+        except Exception as e:
+            print(f"ERROR: Speech synthesis failed: {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tts") as executor:
+        pending = deque()
+        for item in items:
+            pending.append(executor.submit(run, item))
+            if len(pending) >= 2 * max_workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+class RunningLoudnessNormalizer:
+    """
+    Scales each segment towards ``target_rms`` using a smoothed loudness estimate of the segments so far.
+
+    Unlike peak-normalizing the finished episode it needs no second pass; the smoothing keeps
+    speakers' relative loudness, and the gain is capped so no segment peaks above ``peak_ceiling``.
+    """
+
+    def __init__(self, target_rms: float = TARGET_RMS, peak_ceiling: float = PEAK_CEILING, smoothing: float = LOUDNESS_SMOOTHING):
+        self.target_rms = target_rms
+        self.peak_ceiling = peak_ceiling
+        self.smoothing = smoothing
+        self.level = None
+
+    def __call__(self, segment: np.ndarray) -> np.ndarray:
+        peak = float(np.max(np.abs(segment))) if segment.size else 0.0
+        if peak == 0:
+            return segment
+        rms = float(np.sqrt(np.mean(np.square(segment, dtype=np.float64))))
+        self.level = rms if self.level is None else (1 - self.smoothing) * self.level + self.smoothing * rms
+        gain = min(self.target_rms / self.level, self.peak_ceiling / peak)
+        return (segment * gain).astype(np.float32)
+
+
+class StreamingWavWriter:
+    """
+    Appends normalized speech segments, separated by silence, to a 16-bit WAV file as they arrive.
+
+    The file is opened on the first segment, at ``sampling_rate`` or else at that segment's rate;
+    later segments at another rate are resampled. ``intro`` audio, as ``(audio, rate)``, is written
+    as is ahead of the first segment.
+    """
+
+    def __init__(
+        self,
+        output_path: str,
+        silence_duration: float,
+        sampling_rate: Optional[int] = None,
+        intro: Optional[Tuple[np.ndarray, int]] = None,
+    ):
+        self.output_path = output_path
+        self.silence_duration = silence_duration
+        self.sampling_rate = sampling_rate
+        self.intro = intro
+        self.normalize = RunningLoudnessNormalizer()
+        self.segments = 0
+        self.frames = 0
+        self._file = None
+
+    def _open(self, segment_rate: int) -> None:
+        self.sampling_rate = self.sampling_rate or segment_rate
+        os.makedirs(os.path.dirname(os.path.abspath(self.output_path)), exist_ok=True)
+        self._file = sf.SoundFile(self.output_path, mode="w", samplerate=self.sampling_rate, channels=1, subtype="PCM_16")
+        if self.intro is not None:
+            self.write_music(*self.intro)
+
+    def _append(self, audio: np.ndarray) -> None:
+        self._file.write(audio)
+        self.frames += len(audio)
+
+    def write(self, segment: np.ndarray, segment_rate: int) -> None:
+        segment = as_mono(segment)
+        if segment.size == 0:
+            return
+        if self._file is None:
+            self._open(segment_rate)
+        if segment_rate != self.sampling_rate:
+            segment = resample(segment, segment_rate, self.sampling_rate)
+        if self.segments:
+            self._append(np.zeros(int(self.sampling_rate * self.silence_duration), dtype=np.float32))
+        self._append(self.normalize(segment))
+        self.segments += 1
+
+    def write_music(self, audio: np.ndarray, rate: int) -> None:
+        """Write intro/outro music without normalization or a pause; ignored until speech opened the file."""
+        if self._file is None:
+            return
+        audio = as_mono(audio)
+        self._append(resample(audio, rate, self.sampling_rate) if rate != self.sampling_rate else audio)
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def as_mono(audio: np.ndarray) -> np.ndarray:
+    audio = np.asarray(audio, dtype=np.float32)
+    return audio.mean(axis=1) if audio.ndim > 1 else audio
+
+
+def resample(segment: np.ndarray, orig_sr: int, target_sr: int) -> np.ndarray:
+    try:
+        import librosa
+
+        return librosa.resample(segment, orig_sr=orig_sr, target_sr=target_sr)
+    except ImportError:
+        pass
+    except Exception as e:
+        print(f"ERROR: Resampling failed: {e}")
+        return segment
+    try:
+        from scipy import signal
+
+        return signal.resample(segment, int(len(segment) * target_sr / orig_sr)).astype(np.float32)
+    except ImportError:
+        print(f"WARNING: Neither librosa nor scipy available to resample {orig_sr} Hz to {target_sr} Hz, writing as is")
+    return segment
+
+
+def render_script(
+    script: Any,
+    synthesize: Callable[[int, str], Optional[Tuple[np.ndarray, int]]],
+    output_path: str,
+    silence_duration: float,
+    max_workers: int,
+    sampling_rate: Optional[int] = None,
+    intro: Optional[Tuple[np.ndarray, int]] = None,
+    outro: Optional[Tuple[np.ndarray, int]] = None,
+    cache_key: Optional[Callable[[int, str], Tuple[str, str, str, str]]] = None,
+    cache: Optional[SegmentCache] = None,
+) -> Optional[str]:
+    """
+    Synthesize every script line with ``synthesize(speaker, text) -> (audio, rate) | None`` and stream them, in script order, into ``output_path``.
+
+    With ``cache_key(speaker, text) -> (engine, model, voice, language)`` lines already rendered
+    are read from the segment cache (``cache``, or the shared one) instead of synthesized.
+    Returns the output path, or None when no line produced audio.
+    """
+    entries = script_entries(script)
+    if cache_key is not None:
+        synthesize = CachedSynthesizer(synthesize, cache_key, cache or get_segment_cache())
+    print(f"INFO: Synthesizing {len(entries)} script entries with {max_workers} workers")
+    with StreamingWavWriter(output_path, silence_duration, sampling_rate, intro=intro) as writer:
+        for i, result in enumerate(synthesize_in_order(entries, lambda entry: synthesize(*entry), max_workers)):
+            if result is None:
+                print(f"WARNING: Failed to generate audio for entry {i + 1}")
+                continue
+            writer.write(*result)
+        if outro is not None:
+            writer.write_music(*outro)
+    if not writer.segments:
+        print("ERROR: No audio segments were generated")
+        if os.path.exists(output_path):
+            os.unlink(output_path)
+        return None
+    print(f"INFO: Wrote {writer.segments} segments, {writer.frames / writer.sampling_rate:.1f}s of audio to {output_path}")
+    if isinstance(synthesize, CachedSynthesizer):
+        print(f"INFO: Segment cache {synthesize.summary()}")
+    return output_path